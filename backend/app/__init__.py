@@ -210,6 +210,13 @@ def create_app(config_name=None):
         except Exception as fallback_error:
             app.logger.error(f"❌ Failed to initialize fallback reminder scheduler: {str(fallback_error)}")
     
+    # Keep free-tier usage counters in line with the source tables
+    try:
+        from .services.usage_counter_service import start_usage_counter_reconciler
+        start_usage_counter_reconciler(app)
+    except Exception as e:
+        app.logger.error(f"❌ Failed to start usage counter reconciler: {str(e)}")
+    
     # Add a generic OPTIONS route handler
     @app.route('/api/<path:path>', methods=['OPTIONS'])
     def handle_api_options(path):
@@ -39,6 +39,34 @@ class Config:
     # MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     # MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@mrwhite.com')
 
+    # Reminder notification fan-out (per-channel send rates and worker counts)
+    NOTIFICATION_EMAIL_RATE_PER_SECOND = float(os.getenv('NOTIFICATION_EMAIL_RATE_PER_SECOND', '14'))  # SES default quota
+    NOTIFICATION_PUSH_RATE_PER_SECOND = float(os.getenv('NOTIFICATION_PUSH_RATE_PER_SECOND', '50'))  # FCM calls/second
+    NOTIFICATION_SMS_RATE_PER_SECOND = float(os.getenv('NOTIFICATION_SMS_RATE_PER_SECOND', '10'))
+    NOTIFICATION_EMAIL_CONNECTIONS = int(os.getenv('NOTIFICATION_EMAIL_CONNECTIONS', '4'))
+    NOTIFICATION_PUSH_CONCURRENCY = int(os.getenv('NOTIFICATION_PUSH_CONCURRENCY', '8'))
+
+    # Precision scheduler: only reminders due within the window are held as jobs
+    REMINDER_SCHEDULE_WINDOW_HOURS = int(os.getenv('REMINDER_SCHEDULE_WINDOW_HOURS', '24'))
+    REMINDER_SCHEDULE_REFILL_MINUTES = int(os.getenv('REMINDER_SCHEDULE_REFILL_MINUTES', '60'))
+
+    # Free-tier usage counters: how often they are repaired from the source tables
+    USAGE_COUNTER_RECONCILE_MINUTES = int(os.getenv('USAGE_COUNTER_RECONCILE_MINUTES', '60'))
+
+    # Enhanced book generation: chapters written in parallel (shared across all books)
+    BOOK_CHAPTER_CONCURRENCY = int(os.getenv('BOOK_CHAPTER_CONCURRENCY', '4'))
+    # Rendered PDF/EPUB files and downloaded chapter images are cached here
+    BOOK_RENDER_CACHE_DIR = os.getenv('BOOK_RENDER_CACHE_DIR', '/tmp/book_render_cache')
+    BOOK_IMAGE_CACHE_MAX_MB = int(os.getenv('BOOK_IMAGE_CACHE_MAX_MB', '512'))
+    BOOK_IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv('BOOK_IMAGE_DOWNLOAD_CONCURRENCY', '8'))
+    # Message categorization: messages per page (one bulk insert each) and per LLM prompt
+    BOOK_CATEGORIZATION_BATCH_SIZE = int(os.getenv('BOOK_CATEGORIZATION_BATCH_SIZE', '1000'))
+    BOOK_CATEGORIZATION_AI_BATCH = int(os.getenv('BOOK_CATEGORIZATION_AI_BATCH', '40'))
+    # Embedding categorizer: below these cosine scores a message counts as ambiguous
+    BOOK_CATEGORIZATION_MIN_SIMILARITY = float(os.getenv('BOOK_CATEGORIZATION_MIN_SIMILARITY', '0.2'))
+    BOOK_CATEGORIZATION_MIN_MARGIN = float(os.getenv('BOOK_CATEGORIZATION_MIN_MARGIN', '0.02'))
+    BOOK_CATEGORIZATION_LLM_MAX_MESSAGES = int(os.getenv('BOOK_CATEGORIZATION_LLM_MAX_MESSAGES', '200'))  # per run
+
     # CORS Configuration
     FRONTEND_URL = os.getenv('FRONTEND_URL')
     CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', '3600'))
@@ -36,8 +36,8 @@ class CareRecord(db.Model):
     is_active = db.Column(db.Boolean, default=True, index=True)
     
     # Audit fields
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), index=True)
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
     documents = db.relationship('Document', backref='care_record', lazy=True, cascade='all, delete-orphan')
@@ -87,8 +87,8 @@ class Document(db.Model):
     meta_data = db.Column(JSON, nullable=True)  # Store additional structured data
     is_processed = db.Column(db.Boolean, default=False, index=True)
     processing_status = db.Column(db.String(50), default='pending', index=True)  # pending, processing, completed, failed
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), index=True)
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     def __repr__(self):
         return f"<Document {self.id} - {self.filename}>"
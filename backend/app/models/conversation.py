@@ -16,6 +16,11 @@ class Conversation(db.Model):
     # user relationship is defined via backref in User model
     messages = db.relationship('Message', backref='conversation', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Conversation list: newest first, keyset-paginated on (updated_at, id)
+        db.Index('ix_conversations_user_updated_id', 'user_id', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Conversation {self.id}>"
     
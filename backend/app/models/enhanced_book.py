@@ -20,10 +20,11 @@ class EnhancedBook(db.Model):
                           onupdate=lambda: datetime.now(timezone.utc))
     pdf_url = db.Column(db.String(255))
     epub_url = db.Column(db.String(255))
+    generation_plan = db.Column(JSON)  # Chapter plan of an unfinished generation, resumed by the next run
     
     # Relationships
     chapters = db.relationship('EnhancedBookChapter', backref='book', lazy=True, 
-                              cascade='all, delete-orphan')
+                              cascade='all, delete-orphan', order_by='EnhancedBookChapter.order')
     
     def to_dict(self):
         """Convert book to dictionary"""
@@ -78,6 +79,10 @@ class EnhancedBookChapter(db.Model):
 class MessageCategory(db.Model):
     """Model for categorized messages"""
     __tablename__ = 'message_categories'
+    __table_args__ = (
+        # Incremental categorization checks "already categorized for this book" per message
+        db.Index('ix_message_categories_book_message', 'book_id', 'message_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=False)
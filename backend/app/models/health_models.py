@@ -211,6 +211,16 @@ class HealthReminder(db.Model):
     # Extra data for timezone and follow-up metadata
     extra_data = db.Column(JSON, nullable=True)
     
+    # Serve the reminder dispatcher's startup rebuild and delta resync, the
+    # follow-up sweep and the precision scheduler's windowed load
+    __table_args__ = (
+        db.Index('ix_health_reminders_status_reminder_date', 'status', 'reminder_date'),
+        db.Index('ix_health_reminders_status_due_date', 'status', 'due_date'),
+        db.Index('ix_health_reminders_status_next_followup_at', 'status', 'next_followup_at'),
+        db.Index('ix_health_reminders_updated_at', 'updated_at'),
+        db.Index('ix_health_reminders_created_at', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<HealthReminder(id={self.id}, type={self.reminder_type.value}, due={self.due_date} {self.due_time or ''})>"
     
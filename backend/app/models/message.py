@@ -39,6 +39,11 @@ class Message(db.Model):
     # Relationships
     attachments = db.relationship('Attachment', backref='message', lazy=True, cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Per-conversation message order: last-message previews and paged history
+        db.Index('ix_messages_conversation_created_id', 'conversation_id', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Message {self.id} - {self.type}>"
     
@@ -0,0 +1,15 @@
+from app import db
+from datetime import datetime, timezone
+
+class UsageCounter(db.Model):
+    """Per-user usage count for one metric in one period (day, month or all time)"""
+    __tablename__ = 'usage_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    metric = db.Column(db.String(32), primary_key=True)  # 'chat_messages', 'documents', 'care_records', 'conversations'
+    period = db.Column(db.String(16), primary_key=True)  # 'd:2025-07-14', 'm:2025-07' or 'total'
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"<UsageCounter user={self.user_id} {self.metric}@{self.period}={self.count}>"
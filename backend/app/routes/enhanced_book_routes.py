@@ -1,5 +1,5 @@
 import os
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, redirect, send_file
 from app import db
 from app.models.enhanced_book import EnhancedBook, EnhancedBookChapter
 from app.services.enhanced_book_service import EnhancedBookService
@@ -54,7 +54,8 @@ def categorize_messages(book_id):
         categorized_messages = enhanced_book_service.categorize_messages(
             user_id=g.user_id,
             book_id=book_id,
-            categories=data['categories']
+            categories=data['categories'],
+            use_ai=bool(data.get('use_ai', False))
         )
         
         return jsonify({'success': True, 'categorized_messages': categorized_messages}), 200
@@ -63,10 +64,44 @@ def categorize_messages(book_id):
 
 @enhanced_book_bp.route('/enhanced-books/<int:book_id>/generate', methods=['POST'])
 @require_auth
-@require_credits('book_generation')
 def generate_book_chapters(book_id):
-    """Generate book chapters from categorized messages"""
+    """Generate book chapters from categorized messages (pass {"background": true} to poll for progress instead of waiting)"""
+    try:
+        # A generation already running was paid for by the request that started it
+        job = enhanced_book_service.get_running_generation(
+            user_id=g.user_id,
+            book_id=book_id
+        )
+        if job:
+            data = request.get_json(silent=True) or {}
+            if data.get('background'):
+                return jsonify({'success': True, 'job': job}), 202
+            
+            # Waits for the running job instead of starting another
+            book = enhanced_book_service.generate_book_chapters(
+                user_id=g.user_id,
+                book_id=book_id
+            )
+            return jsonify({'success': True, 'book': book}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+    
+    return _start_book_generation(book_id)
+
+@require_credits('book_generation')
+def _start_book_generation(book_id):
+    """Charge for and run a new generation of the book"""
     try:
+        data = request.get_json(silent=True) or {}
+        
+        if data.get('background'):
+            job = enhanced_book_service.generate_book_chapters(
+                user_id=g.user_id,
+                book_id=book_id,
+                wait=False
+            )
+            return jsonify({'success': True, 'job': job}), 202
+        
         # Generate chapters
         book = enhanced_book_service.generate_book_chapters(
             user_id=g.user_id,
@@ -77,6 +112,22 @@ def generate_book_chapters(book_id):
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@enhanced_book_bp.route('/enhanced-books/<int:book_id>/generate/status', methods=['GET'])
+@require_auth
+def get_generation_status(book_id):
+    """Get per-chapter progress of a book's generation"""
+    try:
+        job = enhanced_book_service.get_generation_status(
+            user_id=g.user_id,
+            book_id=book_id
+        )
+        
+        return jsonify({'success': True, 'job': job}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @enhanced_book_bp.route('/enhanced-books/<int:book_id>/pdf', methods=['POST'])
 @require_auth
 def generate_pdf(book_id):
@@ -107,6 +158,35 @@ def generate_epub(book_id):
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@enhanced_book_bp.route('/enhanced-books/<int:book_id>/<any(pdf, epub):fmt>/download', methods=['GET'])
+@require_auth
+def download_book(book_id, fmt):
+    """Stream the book's PDF or EPUB (rendered only if the book changed since the last render)"""
+    try:
+        artifact = enhanced_book_service.render_book(
+            user_id=g.user_id,
+            book_id=book_id,
+            fmt=fmt
+        )
+        
+        # Rendered on another instance: the S3 copy is current
+        if not artifact.path:
+            return redirect(artifact.url)
+        
+        return send_file(
+            artifact.path,
+            mimetype='application/pdf' if fmt == 'pdf' else 'application/epub+zip',
+            as_attachment=True,
+            download_name=f"enhanced_book_{book_id}.{fmt}",
+            etag=artifact.fingerprint,
+            conditional=True,
+            max_age=0
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @enhanced_book_bp.route('/enhanced-books', methods=['GET'])
 @require_auth
 def get_user_books():
@@ -9,6 +9,7 @@ import logging
 from app.models.health_models import HealthReminder, ReminderType, ReminderStatus, RecurrenceType, ReminderNotification
 from app.models.user import User
 from app.services.reminder_scheduler_service import get_scheduler_service
+from app.services.reminder_due_queue import sync_reminder, discard_reminder
 from app.services.ai_time_manager import get_ai_time_manager
 from app.middleware.auth import require_auth
 from app import db
@@ -302,6 +303,8 @@ def create_reminder():
             logger.error(f"❌ Error scheduling new reminder {reminder.id}: {str(e)}")
             # Don't fail the request if scheduling fails
         
+        sync_reminder(reminder, user.timezone)
+        
         # Get countdown information
         countdown_info = None
         # Combine due_date and due_time for proper datetime handling
@@ -565,6 +568,8 @@ def update_reminder(reminder_id):
             logger.error(f"❌ Error rescheduling updated reminder {reminder.id}: {str(e)}")
             # Don't fail the request if scheduling fails
         
+        sync_reminder(reminder, user.timezone)
+        
         # Get countdown information
         countdown_info = None
         # Combine due_date and due_time for proper datetime handling
@@ -625,6 +630,7 @@ def delete_reminder(reminder_id):
         # Now safely delete the reminder
         db.session.delete(reminder)
         db.session.commit()
+        discard_reminder(reminder_id)
         
         return jsonify({
             'success': True,
@@ -853,6 +859,8 @@ def create_reminder_internal():
             logger.error(f"❌ Error scheduling new internal reminder {reminder.id}: {str(e)}")
             # Don't fail the request if scheduling fails
         
+        sync_reminder(reminder, user.timezone)
+        
         # Calculate display datetime for response
         display_datetime = None
         if due_date and due_time:
@@ -936,6 +944,7 @@ def mark_reminder_completed(reminder_id):
             }
         
         db.session.commit()
+        sync_reminder(reminder)
         
         current_app.logger.info(f"✅ Reminder {reminder_id} marked as completed by user {user_id}")
         
@@ -1060,6 +1069,7 @@ def stop_followup_notifications(reminder_id):
         }
         
         db.session.commit()
+        sync_reminder(reminder)
         
         current_app.logger.info(f"🔕 Stopped follow-up notifications for reminder {reminder_id}")
         
@@ -1182,6 +1192,8 @@ def batch_complete_reminders():
                 })
         
         db.session.commit()
+        for completed in results['completed']:
+            discard_reminder(completed['id'])
         
         current_app.logger.info(f"📋 Batch completed {len(results['completed'])} reminders for user {user_id}")
         
@@ -11,6 +11,7 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.prompts import ChatPromptTemplate
 from pinecone import Pinecone
 from app.utils.cache import cached, cache, performance_monitor
+from shared.embedding_cache import cached_embeddings
 import json
 
 
@@ -33,12 +34,12 @@ class AIService:
     def embeddings_model(self):
         """Lazy initialization of embeddings model with caching"""
         if self._embeddings_model is None:
-            self._embeddings_model = OpenAIEmbeddings(
+            self._embeddings_model = cached_embeddings(OpenAIEmbeddings(
                 model=current_app.config['OPENAI_EMBEDDING_MODEL'],
                 api_key=os.getenv("OPENAI_API_KEY"),
                 chunk_size=500,
                 max_retries=3
-            )
+            ))
         return self._embeddings_model
     
     @property
@@ -99,9 +100,8 @@ class AIService:
         """Generate optimized namespace for user data"""
         return f"{namespace_type}-user{user_id}"
     
-    @cached(ttl=3600, key_prefix="embedding")
     def get_embedding(self, text: str) -> List[float]:
-        """Get embedding with caching for frequently used texts"""
+        """Get embedding; served from the shared embedding cache for repeated texts"""
         try:
             return self.embeddings_model.embed_query(text)
         except Exception as e:
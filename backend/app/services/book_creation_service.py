@@ -11,6 +11,7 @@ import tempfile
 
 # Document processing and AI libraries
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from shared.embedding_cache import cached_embeddings
 from langchain_core.documents import Document as LangchainDocument
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool
@@ -123,7 +124,7 @@ class BookCreationService:
             temperature=0.7,
             max_tokens=4000
         )
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(model="text-embedding-3-small"))
         
         # Memory for conversation state
         self.memory = MemorySaver()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Book Generation Engine
+Background, parallel chapter generation for enhanced books
+
+A generation job plans the book's chapters, then writes them on a bounded
+worker pool shared by every book (BOOK_CHAPTER_CONCURRENCY LLM calls in flight
+at once), so a 12-chapter book takes roughly ceil(12 / workers) LLM latencies
+instead of 12. Each chapter is committed as soon as its content arrives.
+
+Jobs are resumable: the chapter plan is stored on the book
+(EnhancedBook.generation_plan) when it is first built, and generating again
+after a crash, a restart or a failed chapter resumes against that stored plan,
+skipping the chapters already saved. Planning is not deterministic (new
+messages, embedding/LLM theme grouping), so a resume never re-plans. Once a
+book completes the plan is cleared; the next generation plans afresh from the
+current messages and replaces the book's chapters.
+
+Workers only make the LLM call - every database read and write stays on the
+job's coordinator thread, which owns its session.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+from app import db
+from app.models.enhanced_book import EnhancedBook, EnhancedBookChapter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChapterTask:
+    """One planned chapter and where it is in the pipeline"""
+    order: int
+    title: str
+    message_texts: List[str]
+    images_json: str
+    status: str = 'pending'  # pending, generating, saved, resumed, failed
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'order': self.order, 'title': self.title, 'status': self.status, 'error': self.error}
+
+    def to_plan(self) -> Dict[str, Any]:
+        """What is persisted in EnhancedBook.generation_plan"""
+        return {'order': self.order, 'title': self.title,
+                'message_texts': self.message_texts, 'images_json': self.images_json}
+
+    @classmethod
+    def from_plan(cls, entry: Dict[str, Any]) -> 'ChapterTask':
+        return cls(order=entry['order'], title=entry['title'],
+                   message_texts=entry['message_texts'], images_json=entry['images_json'])
+
+
+@dataclass
+class BookGenerationJob:
+    """Progress of generating one book"""
+    book_id: int
+    user_id: int
+    status: str = 'queued'  # queued, planning, running, completed, failed
+    chapters: List[ChapterTask] = field(default_factory=list)
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def count(self, *statuses: str) -> int:
+        return sum(1 for chapter in self.chapters if chapter.status in statuses)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = len(self.chapters)
+        finished = self.count('saved', 'resumed')
+        return {
+            'book_id': self.book_id,
+            'status': self.status,
+            'total_chapters': total,
+            'completed_chapters': finished,
+            'resumed_chapters': self.count('resumed'),
+            'failed_chapters': self.count('failed'),
+            'progress': int(finished / total * 100) if total else 0,
+            'chapters': [chapter.to_dict() for chapter in self.chapters],
+            'error': self.error,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class BookGenerationEngine:
+    """Runs book generation jobs with a bounded, shared chapter worker pool"""
+
+    def __init__(self, book_service, max_workers: Optional[int] = None):
+        """
+        Args:
+            book_service: EnhancedBookService used for planning and chapter writing
+            max_workers: Chapters written at once across all books (default BOOK_CHAPTER_CONCURRENCY)
+        """
+        self.book_service = book_service
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[int, BookGenerationJob] = {}
+        self._lock = threading.Lock()
+
+    # ==================== JOBS ====================
+
+    def submit(self, user_id: int, book_id: int, app=None) -> BookGenerationJob:
+        """
+        Start generating a book in the background
+
+        If the book is already being generated, the running job is returned
+        instead of starting a second one.
+        """
+        app = app or current_app._get_current_object()
+        with self._lock:
+            job = self.running_job(book_id)
+            if job:
+                return job
+            job = BookGenerationJob(book_id=book_id, user_id=user_id)
+            self._jobs[book_id] = job
+
+        threading.Thread(target=self._run, args=(app, job), name=f'book-generation-{book_id}', daemon=True).start()
+        return job
+
+    def get_job(self, book_id: int) -> Optional[BookGenerationJob]:
+        """Latest job for a book in this process, if any"""
+        return self._jobs.get(book_id)
+
+    def running_job(self, book_id: int) -> Optional[BookGenerationJob]:
+        """The book's job in this process if it has not finished yet"""
+        job = self._jobs.get(book_id)
+        return job if job and not job.done.is_set() else None
+
+    def _pool(self, app) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self.max_workers or app.config.get('BOOK_CHAPTER_CONCURRENCY', 4)
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='book-chapter')
+        return self._executor
+
+    def _run(self, app, job: BookGenerationJob):
+        with app.app_context():
+            try:
+                self._generate(app, job)
+            except Exception as e:
+                logger.error(f"❌ Error generating book {job.book_id}: {str(e)}")
+                db.session.rollback()
+                job.status = 'failed'
+                job.error = str(e)
+                self._set_book_status(job.book_id, 'error')
+            finally:
+                job.finished_at = datetime.utcnow()
+                db.session.remove()
+                job.done.set()
+
+    # ==================== PIPELINE ====================
+
+    def _generate(self, app, job: BookGenerationJob):
+        book = db.session.get(EnhancedBook, job.book_id)
+        if not book or book.user_id != job.user_id:
+            raise ValueError("Book not found or access denied")
+
+        book.status = 'processing'
+        db.session.commit()
+
+        job.status = 'planning'
+        if book.generation_plan:
+            # Unfinished generation: resume against the plan it started with
+            job.chapters = [ChapterTask.from_plan(entry) for entry in book.generation_plan]
+        else:
+            job.chapters = self.plan_chapters(book)
+            # A new plan replaces the book's chapters; stored with the deletion so
+            # an interrupted run always resumes against it
+            replaced = (db.session.query(EnhancedBookChapter)
+                        .filter(EnhancedBookChapter.book_id == book.id)
+                        .delete(synchronize_session=False))
+            book.generation_plan = [task.to_plan() for task in job.chapters]
+            db.session.commit()
+            if replaced:
+                logger.info(f"🗑️  Replacing {replaced} chapters of '{book.title}' with a new plan")
+
+        planned = {(task.order, task.title) for task in job.chapters}
+        saved = set(db.session.query(EnhancedBookChapter.order, EnhancedBookChapter.title)
+                    .filter(EnhancedBookChapter.book_id == book.id).all())
+        stale = saved - planned
+        if stale:
+            # Not part of the stored plan (e.g. written by an older version)
+            for order, title in stale:
+                (db.session.query(EnhancedBookChapter)
+                 .filter_by(book_id=book.id, order=order, title=title)
+                 .delete(synchronize_session=False))
+            db.session.commit()
+            logger.info(f"🗑️  Removed {len(stale)} chapters of '{book.title}' that are not in its plan")
+
+        pending = []
+        for task in job.chapters:
+            if (task.order, task.title) in saved:
+                task.status = 'resumed'
+            else:
+                pending.append(task)
+
+        job.status = 'running'
+        if saved:
+            logger.info(f"🔁 Resuming '{book.title}': {len(job.chapters) - len(pending)} of {len(job.chapters)} chapters already saved")
+
+        pool = self._pool(app)
+        futures = {
+            pool.submit(self._write_chapter, app, task, book.tone_type, book.text_style): task
+            for task in pending
+        }
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                content = future.result()
+                self._save_chapter(book.id, task, content)
+            except Exception as e:
+                db.session.rollback()
+                task.status = 'failed'
+                task.error = str(e)
+                logger.error(f"  ❌ Chapter {task.order}: {task.title} failed: {str(e)}")
+                continue
+            logger.info(f"  ✅ Chapter {task.order}: {task.title} ({len(task.message_texts)} messages) "
+                        f"[{job.count('saved', 'resumed')}/{len(job.chapters)}]")
+
+        failed = job.count('failed')
+        if failed:
+            job.status = 'failed'
+            job.error = f"{failed} chapter(s) failed to generate; generate the book again to retry them"
+            book.status = 'error'
+        else:
+            job.status = 'completed'
+            book.status = 'completed'
+            book.generation_plan = None
+        db.session.commit()
+        logger.info(f"{'✅' if not failed else '⚠️ '} Book generation {job.status}: {book.title}")
+
+    def plan_chapters(self, book: EnhancedBook) -> List[ChapterTask]:
+        """Group the user's messages and photos into ordered chapters (no LLM calls)"""
+        service = self.book_service
+        logger.info(f"🎨 Planning chapters for book '{book.title}' (type: {book.book_type})")
+
+        messages = service._get_ic_messages(book.user_id, book.book_type)
+        images = service._get_all_user_images(book.user_id)
+        if not messages:
+            raise ValueError("No messages found for book generation")
+
+        chapters_data = service._create_flexible_chapters(
+            messages, images, book.book_type, book.tone_type, book.text_style
+        )
+        logger.info(f"📚 Created {len(chapters_data)} chapters")
+
+        return [
+            ChapterTask(
+                order=idx,
+                title=chapter_data['title'],
+                message_texts=[m.content for m in chapter_data['messages']],
+                # Chapter images are embedded in the content (used in PDF generation)
+                images_json=json.dumps([{
+                    's3_url': img['s3_url'],
+                    'description': img['description']
+                } for img in chapter_data['images']])
+            )
+            for idx, chapter_data in enumerate(chapters_data, 1)
+        ]
+
+    def _write_chapter(self, app, task: ChapterTask, tone_type: str, text_style: str) -> str:
+        """Worker: generate one chapter's text (LLM call only, no database access)"""
+        with app.app_context():
+            task.status = 'generating'
+            return self.book_service._generate_chapter_content(task.message_texts, task.title, tone_type, text_style)
+
+    def _save_chapter(self, book_id: int, task: ChapterTask, content: str):
+        """Commit one finished chapter, unless another worker process already saved it (same plan entry)"""
+        exists = db.session.query(EnhancedBookChapter.id).filter_by(
+            book_id=book_id, order=task.order, title=task.title
+        ).first()
+        if not exists:
+            db.session.add(EnhancedBookChapter(
+                book_id=book_id,
+                title=task.title,
+                content=content + f"\n<!-- IMAGES: {task.images_json} -->",
+                category=task.title,
+                order=task.order
+            ))
+            db.session.commit()
+        task.status = 'saved'
+
+    def _set_book_status(self, book_id: int, status: str):
+        try:
+            book = db.session.get(EnhancedBook, book_id)
+            if book:
+                book.status = status
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Error updating status of book {book_id}: {str(e)}")
+            db.session.rollback()
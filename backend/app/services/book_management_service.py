@@ -14,6 +14,7 @@ import fitz  # PyMuPDF for better PDF handling
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document as LangchainDocument
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from shared.embedding_cache import cached_embeddings
 from langchain_community.document_loaders import PyPDFLoader
 
 # LangGraph and LangChain imports
@@ -96,7 +97,7 @@ class BookManagementService:
             temperature=0.3,
             max_tokens=2000
         )
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(model="text-embedding-3-large"))
         self.checkpointer = MemorySaver()
         self.graph = None
         self._initialize_book_graph()
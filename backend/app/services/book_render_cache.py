@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Book Render Cache
+Content-addressed caching for enhanced book PDF/EPUB rendering
+
+Three layers, from cheapest to most expensive to rebuild:
+  - Artifact fingerprint: a hash of the book's render inputs (book id, style,
+    author and every chapter's id/order/title/updated_at), computed from a
+    column projection without loading chapter content. It is part of the S3
+    key, so an unchanged book is recognised from book.pdf_url alone.
+  - Chapter fragments: each chapter's parsed, image-interleaved HTML keyed by
+    chapter id + updated_at, so a render after one chapter edit only re-parses
+    that chapter.
+  - Images: S3 images are downloaded once into a local cache (concurrently,
+    over one pooled HTTP session) and reused by every render and format.
+
+Rendered files are also kept locally (latest per book and format) so download
+routes can stream them without another render or S3 round trip.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Bump when the templates or the chapter HTML layout change, to invalidate every artifact
+RENDER_VERSION = 1
+
+_IMAGES_COMMENT = re.compile(r'<!-- IMAGES: (.*?) -->')
+_CHAPTER_HEADING = re.compile(r'^Chapter \d+:.*?\n', flags=re.MULTILINE)
+
+# (content, formatted_content, image_urls) of a prepared chapter
+ChapterFragment = Tuple[str, str, List[str]]
+
+
+@dataclass
+class BookArtifact:
+    """A rendered book file"""
+    fingerprint: str
+    format: str
+    url: Optional[str] = None
+    path: Optional[str] = None
+    cache_hit: bool = False
+
+
+def book_fingerprint(book, author_name: str, chapter_rows: Iterable[Tuple], fmt: str) -> str:
+    """
+    Hash everything a render depends on
+
+    Args:
+        book: EnhancedBook
+        author_name: Name printed on the cover
+        chapter_rows: (id, order, title, updated_at) per chapter, in reading order
+        fmt: 'pdf' or 'epub'
+
+    Returns:
+        Hex digest identifying the rendered output
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([
+        RENDER_VERSION, fmt, book.id, book.title, book.cover_image, book.book_type,
+        book.tone_type, book.text_style, author_name
+    ], default=str).encode())
+    for chapter_id, order, title, updated_at in chapter_rows:
+        digest.update(f"|{chapter_id}:{order}:{title}:{updated_at.isoformat() if updated_at else ''}".encode())
+    return digest.hexdigest()
+
+
+def split_chapter_content(content: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """Separate a chapter's text from the images JSON embedded in it"""
+    images = []
+    images_match = _IMAGES_COMMENT.search(content)
+    if images_match:
+        try:
+            images = json.loads(images_match.group(1))
+            content = content.replace(images_match.group(0), '')
+        except ValueError:
+            pass
+    return _CHAPTER_HEADING.sub('', content), images
+
+
+def format_chapter_html(content: str, images: List[Dict[str, str]], self_closing: bool = False) -> str:
+    """
+    Lay out a chapter's paragraphs with its images spread evenly through the text
+
+    Args:
+        content: Chapter text (paragraphs separated by blank lines)
+        images: [{'src': ..., 'description': ...}] in display order
+        self_closing: Close <img/> tags (XHTML for EPUB)
+    """
+    paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+    close = ' />' if self_closing else '>'
+
+    def image_html(img):
+        return f'''
+                            <div class="image-container">
+                                <img src="{img['src']}" alt="{img['description']}" class="chapter-image"{close}
+                                <p class="image-caption">{img['description']}</p>
+                            </div>
+                            '''
+
+    if not images or not paragraphs:
+        return "".join(f"<p>{paragraph}</p>\n" for paragraph in paragraphs)
+
+    # Place an image after every N paragraphs (at least 2), leftovers go at the end
+    spacing = max(2, len(paragraphs) // (len(images) + 1))
+    parts = []
+    image_idx = 0
+    paragraph_count = 0
+    for i, paragraph in enumerate(paragraphs):
+        parts.append(f"<p>{paragraph}</p>\n")
+        paragraph_count += 1
+        if image_idx < len(images) and paragraph_count >= spacing and i < len(paragraphs) - 1:
+            parts.append(image_html(images[image_idx]))
+            image_idx += 1
+            paragraph_count = 0
+    parts.extend(image_html(img) for img in images[image_idx:])
+    return "".join(parts)
+
+
+class BookImageCache:
+    """Local, size-capped cache of chapter images keyed by their URL"""
+
+    def __init__(self, directory: str, max_bytes: int, concurrency: int = 8):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self._session = requests.Session()
+        self._session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        self._session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url: str) -> str:
+        ext = url.split('.')[-1].split('?')[0].lower()
+        if not ext.isalnum() or len(ext) > 5:
+            ext = 'jpg'
+        return os.path.join(self.directory, f"{hashlib.sha1(url.encode()).hexdigest()}.{ext}")
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        Make every URL available locally, downloading the missing ones in parallel
+
+        Returns:
+            {url: local path} for every image that is available (failed downloads are left out)
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        available = {url: self.path_for(url) for url in urls}
+        missing = [url for url, path in available.items() if not os.path.exists(path)]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(missing))) as pool:
+                for url, ok in zip(missing, pool.map(self._download, missing)):
+                    if not ok:
+                        available.pop(url)
+            logger.info(f"  📥 Downloaded {len(missing)} images ({len(urls) - len(missing)} cached)")
+            self.prune()
+        return available
+
+    def _download(self, url: str) -> bool:
+        path = self.path_for(url)
+        try:
+            response = self._session.get(url, timeout=10)
+            if response.status_code != 200:
+                logger.warning(f"  ⚠️  Failed to download image ({response.status_code}): {url}")
+                return False
+            partial = f"{path}.{threading.get_ident()}.part"
+            with open(partial, 'wb') as f:
+                f.write(response.content)
+            os.replace(partial, path)
+            return True
+        except Exception as e:
+            logger.warning(f"  ⚠️  Failed to download image: {str(e)}")
+            return False
+
+    def prune(self):
+        """Drop the least recently used images once the cache is over its size cap"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+            total = sum(entry.stat().st_size for entry in entries)
+            for entry in sorted(entries, key=lambda e: e.stat().st_atime):
+                if total <= self.max_bytes:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"⚠️  Image cache prune failed: {str(e)}")
+
+
+class ChapterFragmentCache:
+    """Bounded LRU of prepared chapters keyed by (chapter id, updated_at, format)"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, ChapterFragment]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[ChapterFragment]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def put(self, key: Tuple, fragment: ChapterFragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class BookRenderCache:
+    """Image, chapter fragment and artifact caches for book rendering"""
+
+    def __init__(self, directory: str, image_cache_bytes: int, image_concurrency: int = 8):
+        self.directory = directory
+        self.images = BookImageCache(os.path.join(directory, 'images'), image_cache_bytes, image_concurrency)
+        self.fragments = ChapterFragmentCache()
+        # (book id, format) -> [lock, renders holding or waiting for it]
+        self._locks: Dict[Tuple[int, str], List] = {}
+        self._locks_guard = threading.Lock()
+
+    @contextmanager
+    def lock(self, book_id: int, fmt: str) -> Iterator[None]:
+        """
+        Serialises renders of one book and format so concurrent requests render once
+
+        A lock only exists while a render holds or waits for it, so the map
+        does not grow with every book ever rendered.
+        """
+        key = (book_id, fmt)
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+    def artifact_path(self, book_id: int, fingerprint: str, fmt: str) -> str:
+        folder = os.path.join(self.directory, 'artifacts', str(book_id))
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{fingerprint}.{fmt}")
+
+    def cached_artifact(self, book_id: int, fingerprint: str, fmt: str) -> Optional[str]:
+        path = self.artifact_path(book_id, fingerprint, fmt)
+        return path if os.path.exists(path) else None
+
+    def keep_only(self, book_id: int, fingerprint: str, fmt: str):
+        """Delete older renders of this book and format"""
+        folder = os.path.join(self.directory, 'artifacts', str(book_id))
+        for name in os.listdir(folder):
+            if name.endswith(f".{fmt}") and not name.startswith(fingerprint):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    pass
+
+
+# ==================== SERVICE INSTANCE ====================
+
+_render_cache: Optional[BookRenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_book_render_cache() -> BookRenderCache:
+    """Get the process-wide book render cache (configured from the current app)"""
+    global _render_cache
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                config = current_app.config
+                _render_cache = BookRenderCache(
+                    directory=config.get('BOOK_RENDER_CACHE_DIR', '/tmp/book_render_cache'),
+                    image_cache_bytes=config.get('BOOK_IMAGE_CACHE_MAX_MB', 512) * 1024 * 1024,
+                    image_concurrency=config.get('BOOK_IMAGE_DOWNLOAD_CONCURRENCY', 8)
+                )
+    return _render_cache
@@ -14,6 +14,7 @@ from app.utils.s3_handler import upload_file_to_s3, delete_file_from_s3
 from app.utils.file_handler import extract_and_store, get_user_namespace
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai.embeddings import OpenAIEmbeddings
+from shared.embedding_cache import cached_embeddings
 from langchain_core.documents import Document as LangchainDocument
 
 
@@ -381,7 +382,7 @@ class CareArchiveService:
             from langchain_openai.embeddings import OpenAIEmbeddings
             import os
             
-            embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+            embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
             namespace = get_user_namespace(user_id)
             index_name = os.getenv("PINECONE_INDEX_NAME")
             
@@ -564,7 +565,7 @@ class CareArchiveService:
             )
             
             # Store in Pinecone
-            embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+            embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
             namespace = get_user_namespace(care_record.user_id)
             index_name = os.getenv("PINECONE_INDEX_NAME")
             
@@ -653,7 +654,7 @@ class CareArchiveService:
             from langchain_openai.embeddings import OpenAIEmbeddings
             import os
             
-            embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+            embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
             namespace = get_user_namespace(care_record.user_id)
             index_name = os.getenv("PINECONE_INDEX_NAME")
             
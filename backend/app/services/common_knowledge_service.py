@@ -11,6 +11,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from langchain_openai import OpenAIEmbeddings
+from shared.embedding_cache import cached_embeddings
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from flask import current_app
@@ -37,10 +38,10 @@ class CommonKnowledgeService:
             self.index = None
         
         # Initialize embeddings
-        self.embeddings = OpenAIEmbeddings(
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(
             model="text-embedding-ada-002",
             chunk_size=1000
-        )
+        ))
         
         # Create vector store
         if self.index:
@@ -15,6 +15,7 @@ import numpy as np
 from flask import current_app
 
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from shared.embedding_cache import cached_embeddings
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
@@ -62,7 +63,7 @@ class Context7SemanticService:
             temperature=0.1,
             max_tokens=2000
         )
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(model="text-embedding-3-large"))
         
         # Context7 semantic patterns
         self.semantic_patterns = self._initialize_semantic_patterns()
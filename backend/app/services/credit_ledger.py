@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Credit Ledger
+Atomic check-and-deduct on users.credits_balance with a buffered transaction ledger.
+
+Every balance change is one conditional UPDATE ... WHERE credits_balance >= cost
+RETURNING credits_balance, so concurrent requests from one user can never
+overdraw and no row lock is held across Python code. The daily and monthly
+usage counters are updated in the same statement.
+
+Usage rows for credit_transactions are appended to an in-memory buffer and
+written with one multi-row INSERT per flush (by size or interval). Purchases
+and other top-ups still go through CreditSystemService synchronously because
+their rows carry the payment ids used for duplicate prevention.
+
+Durability: the balance UPDATE commits before its ledger row is written, so
+the two are not one transaction. Buffered rows are flushed on clean shutdown
+(atexit), but a crash or SIGKILL loses the rows of the last flush interval -
+users.credits_balance stays correct, credit_transactions can miss those
+usage rows.
+
+A batch that keeps failing is retried row by row; rows the database rejects
+on their own (constraint or data errors, e.g. a user deleted inside the flush
+window) are logged and dropped so they cannot block later writes. When the
+buffer reaches max_buffer rows, append() flushes synchronously on the
+caller's thread.
+"""
+
+import atexit
+import json
+import logging
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app import db
+from app.models.credit_transaction import CreditTransaction
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_users = User.__table__
+_transactions = CreditTransaction.__table__
+
+
+class CreditLedger:
+    """Conditional-UPDATE balance changes plus a bulk-flushed credit_transactions ledger"""
+
+    def __init__(self, app=None, flush_size: int = 200, flush_interval: float = 0.5,
+                 max_buffer: int = 10000, max_batch_attempts: int = 3):
+        """
+        Args:
+            app: Flask app used for the flusher's app context (default: current app)
+            flush_size: Buffered rows that wake the flusher early
+            flush_interval: Seconds between flushes
+            max_buffer: Buffered rows at which append() flushes synchronously
+            max_batch_attempts: Failed bulk flushes before the rows are retried one by one
+        """
+        self.app = app
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_batch_attempts = max_batch_attempts
+        self._buffer: List[Dict[str, Any]] = []
+        self._failed_flushes = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'debits': 0, 'rejected': 0, 'ledger_rows_written': 0, 'flushes': 0,
+                      'failed_flushes': 0, 'dead_lettered': 0, 'sync_flushes': 0}
+
+    # ==================== BALANCE CHANGES ====================
+
+    def _adjust(self, user_id: int, debit: int, usage: int = 0, require_elite: bool = False) -> Optional[int]:
+        """
+        Apply one atomic balance change
+
+        Args:
+            user_id: User to charge
+            debit: Credits to take (negative refunds); positive debits require the balance to cover them
+            usage: Credits to add to the daily/monthly usage counters
+            require_elite: Only apply for users with an active Elite subscription
+
+        Returns:
+            The new balance, or None when the condition failed (or the user does not exist)
+        """
+        stmt = update(_users).where(_users.c.id == user_id)
+        if debit > 0:
+            stmt = stmt.where(_users.c.credits_balance >= debit)
+        if require_elite:
+            stmt = stmt.where(_users.c.is_premium.is_(True), _users.c.subscription_status == 'active')
+
+        values = {'credits_balance': _users.c.credits_balance - debit}
+        if usage:
+            today = date.today()
+            values.update(
+                credits_used_today=case(
+                    (_users.c.last_credit_reset_date == today, func.coalesce(_users.c.credits_used_today, 0) + usage),
+                    else_=usage
+                ),
+                last_credit_reset_date=today,
+                credits_used_this_month=func.coalesce(_users.c.credits_used_this_month, 0) + usage,
+            )
+
+        try:
+            row = db.session.execute(stmt.values(**values).returning(_users.c.credits_balance)).first()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return row[0] if row else None
+
+    def debit(self, user_id: int, amount: int, action: str, metadata: Dict = None,
+              require_elite: bool = False) -> Optional[int]:
+        """
+        Check and deduct in one statement, then queue the usage ledger row
+
+        Returns:
+            The new balance, or None if the user cannot afford it (nothing is charged)
+        """
+        balance = self._adjust(user_id, amount, usage=amount, require_elite=require_elite)
+        if balance is None:
+            self.stats['rejected'] += 1
+            return None
+        self.stats['debits'] += 1
+        self.append(user_id, -amount, 'usage', {'action': action, 'metadata': metadata})
+        return balance
+
+    # ==================== LEDGER ====================
+
+    def append(self, user_id: int, amount: int, transaction_type: str, metadata: Dict = None):
+        """Queue a credit_transactions row for the next bulk flush"""
+        now = datetime.utcnow()
+        row = {
+            'user_id': user_id,
+            'amount': amount,
+            'transaction_type': transaction_type,
+            'transaction_metadata': json.dumps(metadata) if metadata else None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        with self._lock:
+            self._buffer.append(row)
+            size = len(self._buffer)
+        self._ensure_flusher()
+        if size >= self.max_buffer:
+            # Backpressure: the flusher is not keeping up, write on the caller's thread
+            self.stats['sync_flushes'] += 1
+            self.flush()
+        elif size >= self.flush_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write every buffered ledger row with a single multi-row INSERT
+
+        After max_batch_attempts consecutive failures the rows are written one
+        at a time so a single bad row cannot hold back the rest.
+
+        Returns:
+            Rows written
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(_transactions), rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                self._failed_flushes += 1
+                self.stats['failed_flushes'] += 1
+                if self._failed_flushes < self.max_batch_attempts:
+                    logger.error(f"❌ Error flushing {len(rows)} credit ledger rows, will retry: {str(e)}")
+                    self._requeue(rows)
+                    return 0
+                logger.error(f"❌ Flushing {len(rows)} credit ledger rows failed {self._failed_flushes} times, "
+                             f"retrying them one by one: {str(e)}")
+                return self._flush_one_by_one(rows)
+        self._failed_flushes = 0
+        self.stats['ledger_rows_written'] += len(rows)
+        self.stats['flushes'] += 1
+        return len(rows)
+
+    def _flush_one_by_one(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert rows individually, dead-lettering the ones the database rejects"""
+        written = 0
+        requeued = False
+        for index, row in enumerate(rows):
+            try:
+                db.session.execute(insert(_transactions), [row])
+                db.session.commit()
+                written += 1
+            except (IntegrityError, DataError) as e:
+                db.session.rollback()
+                self.stats['dead_lettered'] += 1
+                logger.error(f"❌ Dropping credit ledger row rejected by the database: "
+                             f"{json.dumps(row, default=str)} ({str(e)})")
+            except Exception as e:
+                # Not the row's fault (connection, outage): keep the rest for the next flush
+                db.session.rollback()
+                logger.error(f"❌ Error writing credit ledger rows, will retry: {str(e)}")
+                self._requeue(rows[index:])
+                requeued = True
+                break
+        if not requeued:
+            self._failed_flushes = 0
+        self.stats['ledger_rows_written'] += written
+        return written
+
+    def _requeue(self, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._buffer[:0] = rows
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def _ensure_flusher(self):
+        if self._thread and self._thread.is_alive():
+            return
+        if self.app is None:
+            self.app = current_app._get_current_object()
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='credit-ledger-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self):
+        """Stop the flusher and write what is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self.app is not None:
+            self.flush()
+
+
+# ==================== SERVICE INSTANCE ====================
+
+_ledger: Optional[CreditLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_credit_ledger() -> CreditLedger:
+    """Get the process-wide credit ledger (flushed on exit)"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = CreditLedger()
+                atexit.register(_ledger.stop)
+    return _ledger
@@ -6,6 +6,7 @@ from app.models.user import User
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.credit_transaction import CreditTransaction
+from app.services.credit_ledger import get_credit_ledger
 import logging
 import json
 
@@ -64,49 +65,53 @@ class CreditSystemService:
         'xlarge': {'credits': 5001, 'price': 49.99, 'bonus': 1200},  # $49.99 for $62.00 worth
     }
     
+    # Actions free users may spend credits on; everything else needs Elite
+    FREE_TIER_ACTIONS = ('chat_message_basic', 'document_upload')
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.ledger = get_credit_ledger()
     
     def check_and_deduct_credits(self, user_id: int, action: str, metadata: Dict = None) -> Tuple[bool, str, int]:
         """
         Check if user has enough credits and deduct them
         
+        The check and the deduction are one conditional UPDATE, so concurrent
+        requests cannot overdraw the balance.
+        
         Returns:
             Tuple of (success: bool, message: str, credits_deducted: int)
         """
         try:
-            user = User.query.get(user_id)
-            if not user:
-                return False, "User not found", 0
-            
             # Calculate credit cost
             base_cost = self.CREDIT_COSTS.get(action, 3)
             total_cost = self._calculate_dynamic_cost(action, base_cost, metadata)
             
-            # Check user's subscription and available credits
-            available_credits = self._get_available_credits(user)
+            # Free users only get the free-tier actions; Elite users can use all features if they have credits
+            balance = self.ledger.debit(user_id, total_cost, action, metadata,
+                                        require_elite=action not in self.FREE_TIER_ACTIONS)
+            if balance is not None:
+                return True, f"Success. {total_cost} credits deducted (${total_cost/100:.2f}).", total_cost
             
-            # For Elite users, check if they have access to the feature
-            if user.is_premium and user.subscription_status == 'active':
-                # Elite users can use all features if they have credits
-                if available_credits < total_cost:
-                    shortage = total_cost - available_credits
-                    return False, f"Insufficient credits. Need {total_cost} credits (${total_cost/100:.2f}), have {available_credits} (${available_credits/100:.2f}). Purchase {shortage} more credits to continue.", 0
-            else:
-                # Free users have limited access
-                free_plan = self.SUBSCRIPTION_PLANS['free']
-                if action not in ['chat_message_basic', 'document_upload'] or available_credits < total_cost:
-                    return False, f"Upgrade to Elite Pack for full access to all features and monthly credit allowance.", 0
-            
-            # Deduct credits
-            self._deduct_credits(user, total_cost, action, metadata)
-            
-            return True, f"Success. {total_cost} credits deducted (${total_cost/100:.2f}).", total_cost
+            return False, self._denial_message(user_id, total_cost), 0
             
         except Exception as e:
             self.logger.error(f"Error checking/deducting credits: {str(e)}")
             return False, "Credit system error", 0
     
+    def _denial_message(self, user_id: int, total_cost: int) -> str:
+        """Explain a rejected deduction (only read on the failure path)"""
+        user = User.query.get(user_id)
+        if not user:
+            return "User not found"
+        
+        if user.is_premium and user.subscription_status == 'active':
+            available_credits = self._get_available_credits(user)
+            shortage = total_cost - available_credits
+            return f"Insufficient credits. Need {total_cost} credits (${total_cost/100:.2f}), have {available_credits} (${available_credits/100:.2f}). Purchase {shortage} more credits to continue."
+        
+        return f"Upgrade to Elite Pack for full access to all features and monthly credit allowance."
+    
     def add_credits(self, user_id: int, amount: int, source: str = 'purchase', metadata: Dict = None) -> bool:
         """Add credits to user account with duplicate prevention"""
         try:
@@ -321,29 +326,6 @@ class CreditSystemService:
         
         return int(base_cost * complexity_multiplier)
     
-    def _deduct_credits(self, user: User, amount: int, action: str, metadata: Dict = None):
-        """Deduct credits from user account"""
-        # All users (free and Elite) use their actual credits_balance
-        # No automatic daily credit usage - users must manually claim daily credits first
-        user.credits_balance -= amount
-        
-        # Update usage counters
-        today = datetime.now().date()
-        if user.last_credit_reset_date != today:
-            user.credits_used_today = 0
-            user.last_credit_reset_date = today
-        
-        user.credits_used_today += amount
-        user.credits_used_this_month += amount
-        
-        # Record transaction
-        self._record_credit_transaction(user.id, -amount, 'usage', {
-            'action': action,
-            'metadata': metadata
-        })
-        
-        db.session.commit()
-    
     def _check_and_reset_credits(self, user: User):
         """Reset daily credits and handle monthly refills"""
         today = datetime.now().date()
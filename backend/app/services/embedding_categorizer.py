@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Embedding Categorizer
+Assigns messages to categories (or book chapter themes) by vector similarity
+
+Messages and category descriptions are embedded through the shared embedding
+cache, so a message embedded once (by any service on the host) is never sent
+to the embedding API again. Assignment is one cosine-similarity matrix
+(messages x categories) in NumPy; a message is confident when its best score
+clears a floor and beats the runner-up by a margin. Only the least confident
+messages - capped per run - are sent to the LLM, many per prompt.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Messages longer than this are cut before embedding (the opening carries the topic)
+MAX_EMBED_CHARS = 2000
+
+
+@dataclass
+class CategorizationResult:
+    """Category per message plus how each was decided"""
+    labels: List[str]
+    assignments: List[str]
+    scores: np.ndarray
+    confident: int = 0
+    llm_sent: int = 0
+    llm_resolved: int = 0
+    llm_calls: int = 0
+    low_confidence: List[int] = field(default_factory=list)
+
+    def grouped(self, items: Sequence) -> Dict[str, list]:
+        """Group items (ids or message objects, aligned with the input texts) by category"""
+        result = {label: [] for label in self.labels}
+        for item, label in zip(items, self.assignments):
+            result[label].append(item)
+        return result
+
+
+class EmbeddingCategorizer:
+    """Cosine-similarity categorizer with an LLM fallback for ambiguous messages"""
+
+    def __init__(
+        self,
+        embed_documents: Callable[[List[str]], List[List[float]]],
+        resolve_with_llm: Optional[Callable[[List[str], Dict[str, str]], Dict[int, str]]] = None,
+        min_similarity: float = 0.2,
+        min_margin: float = 0.02,
+        max_llm_messages: int = 200,
+        llm_batch_size: int = 50,
+        embed_batch_size: int = 512
+    ):
+        """
+        Args:
+            embed_documents: Embeds a list of texts (use a cache-backed model)
+            resolve_with_llm: Given texts and {category: description}, returns {index: category}
+            min_similarity: Best cosine score a confident message must reach
+            min_margin: Lead over the second-best category a confident message must have
+            max_llm_messages: Default cap on low-confidence messages sent to the LLM per categorize() call
+            llm_batch_size: Messages per LLM prompt
+            embed_batch_size: Texts per embedding request
+        """
+        self.embed_documents = embed_documents
+        self.resolve_with_llm = resolve_with_llm
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.max_llm_messages = max_llm_messages
+        self.llm_batch_size = llm_batch_size
+        self.embed_batch_size = embed_batch_size
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches and return L2-normalised float32 rows"""
+        vectors = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            batch = [(text or '').strip()[:MAX_EMBED_CHARS] or '(empty)' for text in texts[start:start + self.embed_batch_size]]
+            vectors.extend(self.embed_documents(batch))
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def categorize(self, texts: List[str], categories: Dict[str, str],
+                   max_llm_messages: Optional[int] = None) -> CategorizationResult:
+        """
+        Assign every text to one category
+
+        Args:
+            texts: Message texts
+            categories: {category name: description}, in priority order (ties go to the first)
+            max_llm_messages: Override the LLM cap (e.g. what is left of a per-run budget)
+
+        Returns:
+            CategorizationResult with one category per text
+        """
+        labels = list(categories)
+        if not texts:
+            return CategorizationResult(labels=labels, assignments=[], scores=np.zeros((0, len(labels))))
+
+        category_vectors = self._embed([f"{label}: {description}" for label, description in categories.items()])
+        message_vectors = self._embed(texts)
+
+        # Cosine similarity of every message to every category in one product
+        scores = message_vectors @ category_vectors.T
+        best = scores.argmax(axis=1)
+
+        if len(labels) > 1:
+            top_two = np.partition(scores, -2, axis=1)[:, -2:]
+            margin = top_two[:, 1] - top_two[:, 0]
+        else:
+            margin = np.full(len(texts), np.inf, dtype=np.float32)
+        top = scores[np.arange(len(texts)), best]
+        confident = (top >= self.min_similarity) & (margin >= self.min_margin)
+
+        assignments = [labels[i] for i in best]
+        result = CategorizationResult(labels=labels, assignments=assignments, scores=scores,
+                                      confident=int(confident.sum()))
+
+        # Least confident first: smallest margin, then lowest score
+        uncertain = np.flatnonzero(~confident)
+        uncertain = uncertain[np.lexsort((top[uncertain], margin[uncertain]))]
+        result.low_confidence = uncertain.tolist()
+
+        llm_cap = self.max_llm_messages if max_llm_messages is None else max(0, max_llm_messages)
+        if self.resolve_with_llm and len(uncertain) and llm_cap:
+            result.llm_sent = min(len(uncertain), llm_cap)
+            self._resolve(texts, categories, uncertain[:llm_cap], result)
+
+        logger.info(f"🧭 Categorized {len(texts)} messages: {result.confident} by similarity, "
+                    f"{result.llm_resolved} by LLM ({result.llm_calls} calls), "
+                    f"{len(uncertain) - result.llm_resolved} low-confidence kept at best match")
+        return result
+
+    def _resolve(self, texts: List[str], categories: Dict[str, str], indices: np.ndarray,
+                 result: CategorizationResult):
+        """Let the LLM decide the ambiguous messages, many per prompt"""
+        for start in range(0, len(indices), self.llm_batch_size):
+            batch = indices[start:start + self.llm_batch_size]
+            result.llm_calls += 1
+            try:
+                decided = self.resolve_with_llm([texts[i] for i in batch], categories)
+            except Exception as e:
+                logger.warning(f"⚠️  LLM categorization failed for {len(batch)} messages, keeping best matches: {str(e)}")
+                continue
+            for position, label in decided.items():
+                if 0 <= position < len(batch) and label in categories:
+                    result.assignments[batch[position]] = label
+                    result.llm_resolved += 1
@@ -7,6 +7,7 @@ import ebooklib
 from ebooklib import epub
 from flask import current_app, copy_current_request_context
 import boto3
+from sqlalchemy import insert
 from app import db
 from app.models.enhanced_book import EnhancedBook, EnhancedBookChapter, MessageCategory
 from app.models.message import Message
@@ -15,6 +16,11 @@ from app.models.image import UserImage
 from app.models.user import User
 from app.services.ai_service import AIService
 from app.services.content_chunking_service import ContentChunkingService, ContentChunk
+from app.services.book_generation_engine import BookGenerationEngine
+from app.services.embedding_categorizer import EmbeddingCategorizer
+from app.services.book_render_cache import (
+    BookArtifact, book_fingerprint, format_chapter_html, get_book_render_cache, split_chapter_content
+)
 from app.book_config.book_types import get_book_type_config, get_photo_layout, should_filter_content, get_filter_keywords, CONTENT_THRESHOLDS
 import re
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -38,6 +44,60 @@ from intelligent_chat.models.document import Document as ICDocument
 
 logger = logging.getLogger(__name__)
 
+# Keywords describing each message category (TF-IDF rules and embedding descriptions)
+CATEGORY_KEYWORDS = {
+    'Health': ['health', 'doctor', 'sick', 'medicine', 'hospital', 'pain', 'symptom', 'illness', 'disease', 'medical', 'treatment', 'therapy', 'cure', 'diagnosis', 'patient'],
+    'Nutrition': ['food', 'diet', 'eat', 'meal', 'nutrition', 'vitamin', 'calorie', 'protein', 'carbohydrate', 'fat', 'vegetable', 'fruit', 'organic', 'nutrient', 'healthy eating'],
+    'Exercise': ['exercise', 'workout', 'gym', 'fitness', 'run', 'training', 'sport', 'cardio', 'strength', 'muscle', 'weight lifting', 'jogging', 'swimming', 'yoga', 'stretching'],
+    'Memories': ['remember', 'memory', 'past', 'childhood', 'experience', 'moment', 'recall', 'reminisce', 'nostalgia', 'history', 'old times', 'flashback', 'recollection', 'memorable', 'unforgettable'],
+    'Advice': ['advice', 'suggest', 'recommendation', 'tip', 'guidance', 'help', 'counsel', 'insight', 'wisdom', 'suggestion', 'opinion', 'perspective', 'mentor', 'guide', 'consult'],
+    'Stories': ['story', 'tale', 'narrative', 'fiction', 'anecdote', 'account', 'adventure', 'episode', 'experience', 'event', 'incident', 'chapter', 'chronicle', 'saga', 'legend'],
+    'Questions': ['question', 'ask', 'inquiry', 'query', 'wonder', 'curious', 'how', 'what', 'when', 'where', 'why', 'who', 'which', 'problem', 'doubt'],
+    'Reflections': ['reflect', 'think', 'contemplate', 'ponder', 'meditate', 'introspect', 'consider', 'evaluate', 'analyze', 'examine', 'insight', 'perspective', 'viewpoint', 'opinion', 'thought'],
+    'Daily Life': ['daily', 'routine', 'everyday', 'regular', 'habit', 'schedule', 'life', 'ordinary', 'common', 'typical', 'usual', 'mundane', 'normal', 'day-to-day', 'lifestyle'],
+    'Goals': ['goal', 'aim', 'objective', 'target', 'aspiration', 'ambition', 'purpose', 'intention', 'plan', 'dream', 'desire', 'achievement', 'success', 'milestone', 'vision'],
+    'Challenges': ['challenge', 'difficulty', 'obstacle', 'problem', 'hurdle', 'barrier', 'struggle', 'issue', 'complication', 'setback', 'trouble', 'hardship', 'adversity', 'trial', 'test'],
+    'Achievements': ['achievement', 'accomplish', 'success', 'victory', 'triumph', 'win', 'attain', 'reach', 'complete', 'achieve', 'milestone', 'breakthrough', 'feat', 'progress', 'advancement']
+}
+
+# What each book chapter theme covers, per book type
+THEME_DESCRIPTIONS = {
+    'relationship': {
+        'How We Met': 'Initial meeting, first encounters, getting to know each other',
+        'Learning Each Other': 'Understanding personalities, habits, preferences',
+        'Daily Life Together': 'Routine activities, everyday moments, shared experiences',
+        'Challenges & Growth': 'Difficulties faced together, how you grew stronger',
+        'Special Moments': 'Memorable occasions, celebrations, milestones',
+        'Our Bond Today': 'Current relationship, ongoing connection, present day',
+        'Looking Forward': 'Future plans, hopes, dreams together'
+    },
+    'medical': {
+        'Health Profile & Baseline': 'Initial health status, basic health information',
+        'Preventive Care': 'Regular checkups, vaccinations, wellness visits',
+        'Nutrition & Diet': 'Food, eating habits, dietary needs, feeding',
+        'Medical History': 'Past illnesses, treatments, medical events',
+        'Ongoing Monitoring': 'Regular health tracking, observations, monitoring',
+        'Surgical Records': 'Surgeries, procedures, medical interventions',
+        'Chronic Conditions': 'Ongoing health issues, long-term care'
+    },
+    'training': {
+        'Foundation & Basic Commands': 'Basic training, sit, stay, come commands',
+        'Intermediate Skills': 'More advanced commands, leash training, house training',
+        'Behavioral Training': 'Behavior modification, problem solving, good habits',
+        'Advanced Training & Tricks': 'Complex commands, tricks, advanced skills',
+        'Training Philosophy': 'Training approach, methods, principles',
+        'Ongoing Development': 'Continuous learning, skill maintenance, progress'
+    },
+    'family': {
+        'Family Circle': 'Immediate family members, close family relationships',
+        'Furry Friends': 'Other pets, animal companions, playmates',
+        'Extended Family & Visitors': 'Relatives, friends, people who visit',
+        'Community Connections': 'Neighbors, local community, social interactions',
+        'Special Moments Together': 'Celebrations, gatherings, memorable events',
+        'The Social Butterfly': 'Social personality, interactions with others'
+    }
+}
+
 class EnhancedBookService:
     """Service for enhanced book creation with categorization and tone customization"""
     
@@ -53,6 +113,9 @@ class EnhancedBookService:
         self.s3_bucket = os.environ.get('S3_BUCKET_NAME')
         # Use a smaller number of workers to avoid overloading the system
         self.executor = ThreadPoolExecutor(max_workers=3)
+        # Parallel, resumable chapter generation
+        self.generation_engine = BookGenerationEngine(self)
+        self._embedding_categorizer = None
     
     def create_enhanced_book(self, user_id, title, tone_type, text_style, categories, cover_image=None, book_type='general'):
         """Create a new enhanced book"""
@@ -78,9 +141,23 @@ class EnhancedBookService:
             db.session.rollback()
             raise
     
-    def categorize_messages(self, user_id, book_id, categories):
+    def categorize_messages(self, user_id, book_id, categories, use_ai=False):
         """
         Categorize all messages for a user based on provided categories
+        
+        Messages are streamed in keyset-paginated batches, categorized per
+        batch and written with one bulk insert per batch. Messages already
+        categorized for this book are skipped, so re-runs only process new
+        messages.
+        
+        Args:
+            user_id: Owner of the book
+            book_id: Book the categories are for
+            categories: Category names to sort messages into
+            use_ai: Categorize with the LLM (many messages per prompt) instead of TF-IDF rules
+        
+        Returns:
+            Dictionary of category -> message ids categorized by this run
         """
         try:
             # Get the book
@@ -88,38 +165,11 @@ class EnhancedBookService:
             if not book or book.user_id != user_id:
                 raise ValueError("Book not found or access denied")
             
-            # Get all user conversations
-            conversations = Conversation.query.filter_by(user_id=user_id).all()
-            conversation_ids = [conv.id for conv in conversations]
-            
-            # Get all messages from these conversations
-            messages = Message.query.filter(
-                Message.conversation_id.in_(conversation_ids),
-                Message.type == 'user'  # Only categorize user messages
-            ).order_by(Message.created_at).all()
+            categorized_messages, processed = self._categorize_in_batches(user_id, book_id, categories, use_ai=use_ai)
             
-            if not messages:
+            if not processed and not MessageCategory.query.filter_by(book_id=book_id).first():
                 raise ValueError("No messages found for categorization")
             
-            # Prepare messages for categorization
-            message_texts = [msg.content for msg in messages]
-            message_ids = [msg.id for msg in messages]
-            
-            # Use hybrid approach to categorize messages
-            categorized_messages = self._categorize_with_hybrid_approach(message_texts, message_ids, categories)
-            
-            # Store categorizations in database
-            for category, msg_ids in categorized_messages.items():
-                for msg_id in msg_ids:
-                    message_category = MessageCategory(
-                        message_id=msg_id,
-                        category=category,
-                        book_id=book_id
-                    )
-                    db.session.add(message_category)
-            
-            db.session.commit()
-            
             # Update book status
             book.status = 'categorized'
             db.session.commit()
@@ -130,6 +180,190 @@ class EnhancedBookService:
             db.session.rollback()
             raise
     
+    def _iter_uncategorized_message_batches(self, user_id, book_id, batch_size, since=None):
+        """
+        Yield pages of (id, content) for the user's messages not yet categorized for the book
+        
+        Keyset-paginated on message id, so each page is one indexed range scan
+        and only one page of rows is held in memory.
+        """
+        already_categorized = db.session.query(MessageCategory.id).filter(
+            MessageCategory.book_id == book_id,
+            MessageCategory.message_id == Message.id
+        ).exists()
+        
+        query = db.session.query(Message.id, Message.content)\
+            .join(Conversation, Message.conversation_id == Conversation.id)\
+            .filter(
+                Conversation.user_id == user_id,
+                Message.type == 'user',  # Only categorize user messages
+                ~already_categorized
+            )
+        if since:
+            query = query.filter(Conversation.updated_at >= since)
+        
+        last_id = 0
+        while True:
+            page = query.filter(Message.id > last_id).order_by(Message.id).limit(batch_size).all()
+            if not page:
+                return
+            yield page
+            last_id = page[-1].id
+    
+    def _categorize_in_batches(self, user_id, book_id, categories, since=None, use_ai=False):
+        """
+        Categorize uncategorized messages page by page with bulk inserts
+        
+        Each page is committed on its own, so an interrupted run keeps its
+        progress and the next run continues from there.
+        
+        Returns:
+            Tuple of (category -> message ids categorized, number of messages processed)
+        """
+        batch_size = current_app.config.get('BOOK_CATEGORIZATION_BATCH_SIZE', 1000)
+        # Ambiguous messages the LLM may see across the whole run, not per page
+        llm_budget = current_app.config.get('BOOK_CATEGORIZATION_LLM_MAX_MESSAGES', 200)
+        result = {category: [] for category in categories}
+        processed = 0
+        
+        for page in self._iter_uncategorized_message_batches(user_id, book_id, batch_size, since=since):
+            message_ids = [row.id for row in page]
+            message_texts = [row.content or '' for row in page]
+            
+            if use_ai:
+                categorized = self._categorize_with_ai_in_batches(message_texts, message_ids, categories)
+            else:
+                categorized, llm_sent = self._categorize_with_embeddings(
+                    message_texts, message_ids, categories, llm_budget=llm_budget
+                )
+                llm_budget -= llm_sent
+            
+            now = datetime.utcnow()
+            rows = [
+                {'message_id': msg_id, 'category': category, 'book_id': book_id, 'created_at': now}
+                for category, msg_ids in categorized.items()
+                for msg_id in msg_ids
+            ]
+            if rows:
+                db.session.execute(insert(MessageCategory.__table__), rows)
+            db.session.commit()
+            
+            for category, msg_ids in categorized.items():
+                result.setdefault(category, []).extend(msg_ids)
+            processed += len(message_ids)
+            logger.info(f"🏷️  Categorized {processed} messages for book {book_id} so far")
+        
+        return result, processed
+    
+    def _categorize_with_ai_in_batches(self, message_texts, message_ids, categories):
+        """
+        Categorize with the LLM, many messages per prompt
+        
+        Messages the model leaves out (or whole batches that fail) fall back to
+        the hybrid TF-IDF categorizer.
+        """
+        batch_size = current_app.config.get('BOOK_CATEGORIZATION_AI_BATCH', 40)
+        result = {category: [] for category in categories}
+        
+        for start in range(0, len(message_ids), batch_size):
+            # Long messages are trimmed to keep each prompt bounded
+            batch_texts = [text[:500] for text in message_texts[start:start + batch_size]]
+            batch_ids = message_ids[start:start + batch_size]
+            
+            try:
+                categorized = self._categorize_with_ai(batch_texts, batch_ids, categories)
+            except Exception as e:
+                logger.warning(f"⚠️  AI categorization failed for {len(batch_ids)} messages, using rules: {str(e)}")
+                categorized = {}
+            
+            assigned = set()
+            for category, msg_ids in categorized.items():
+                if category not in result:
+                    continue
+                fresh = [msg_id for msg_id in msg_ids if msg_id not in assigned]
+                result[category].extend(fresh)
+                assigned.update(fresh)
+            
+            leftover = [i for i, msg_id in enumerate(batch_ids) if msg_id not in assigned]
+            if leftover:
+                fallback = self._categorize_with_hybrid_approach(
+                    [batch_texts[i] for i in leftover], [batch_ids[i] for i in leftover], categories
+                )
+                for category, msg_ids in fallback.items():
+                    result.setdefault(category, []).extend(msg_ids)
+        
+        return result
+    
+    @property
+    def embedding_categorizer(self):
+        """Similarity categorizer over the shared embedding cache (created on first use)"""
+        if self._embedding_categorizer is None:
+            config = current_app.config
+            self._embedding_categorizer = EmbeddingCategorizer(
+                embed_documents=self.ai_service.embeddings_model.embed_documents,
+                resolve_with_llm=self._resolve_categories_with_llm,
+                min_similarity=config.get('BOOK_CATEGORIZATION_MIN_SIMILARITY', 0.2),
+                min_margin=config.get('BOOK_CATEGORIZATION_MIN_MARGIN', 0.02),
+                max_llm_messages=config.get('BOOK_CATEGORIZATION_LLM_MAX_MESSAGES', 200),
+                llm_batch_size=config.get('BOOK_CATEGORIZATION_AI_BATCH', 40)
+            )
+        return self._embedding_categorizer
+    
+    def _categorize_with_embeddings(self, message_texts, message_ids, categories, llm_budget=None):
+        """
+        Categorize by cosine similarity to the category descriptions
+        
+        Falls back to the TF-IDF rules if embeddings are unavailable.
+        
+        Returns:
+            Tuple of (category -> message ids, number of messages sent to the LLM)
+        """
+        try:
+            descriptions = {
+                category: ', '.join(CATEGORY_KEYWORDS[category]) if category in CATEGORY_KEYWORDS
+                else f"Messages about {category}"
+                for category in categories
+            }
+            result = self.embedding_categorizer.categorize(message_texts, descriptions, max_llm_messages=llm_budget)
+            return result.grouped(message_ids), result.llm_sent
+        except Exception as e:
+            logger.error(f"Error in embedding categorization, using rules: {str(e)}")
+            return self._categorize_with_hybrid_approach(message_texts, message_ids, categories), 0
+    
+    def _resolve_categories_with_llm(self, message_texts, categories):
+        """
+        Ask the LLM to place ambiguous messages, all in one prompt
+        
+        Args:
+            message_texts: Messages the similarity scores could not separate
+            categories: {category: description}
+        
+        Returns:
+            Dictionary of message index (0-based) -> category
+        """
+        prompt = "Assign each message to exactly one of these categories:\n"
+        for category, description in categories.items():
+            prompt += f"- {category}: {description}\n"
+        
+        prompt += "\nMessages:\n"
+        for i, text in enumerate(message_texts):
+            prompt += f"{i+1}. {text[:300]}\n"
+        
+        prompt += '\nRespond with only a JSON object mapping each message number to its category, e.g. {"1": "Category"}.'
+        
+        response_text = self.ai_service.generate_completion(
+            messages=[{"role": "system", "content": prompt}],
+            max_tokens=20 * len(message_texts) + 50,
+            temperature=0.0
+        )
+        
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if not json_match:
+            raise ValueError("Could not parse AI response")
+        
+        return {int(number) - 1: category for number, category in json.loads(json_match.group(0)).items()
+                if str(number).isdigit()}
+    
     def _categorize_with_ai(self, message_texts, message_ids, categories):
         """
         Use AI to categorize messages into provided categories
@@ -184,21 +418,7 @@ class EnhancedBookService:
         Use a hybrid TF-IDF + rule-based approach to categorize messages into provided categories
         """
         try:
-            # Dictionary of keywords for each category
-            category_keywords = {
-                'Health': ['health', 'doctor', 'sick', 'medicine', 'hospital', 'pain', 'symptom', 'illness', 'disease', 'medical', 'treatment', 'therapy', 'cure', 'diagnosis', 'patient'],
-                'Nutrition': ['food', 'diet', 'eat', 'meal', 'nutrition', 'vitamin', 'calorie', 'protein', 'carbohydrate', 'fat', 'vegetable', 'fruit', 'organic', 'nutrient', 'healthy eating'],
-                'Exercise': ['exercise', 'workout', 'gym', 'fitness', 'run', 'training', 'sport', 'cardio', 'strength', 'muscle', 'weight lifting', 'jogging', 'swimming', 'yoga', 'stretching'],
-                'Memories': ['remember', 'memory', 'past', 'childhood', 'experience', 'moment', 'recall', 'reminisce', 'nostalgia', 'history', 'old times', 'flashback', 'recollection', 'memorable', 'unforgettable'],
-                'Advice': ['advice', 'suggest', 'recommendation', 'tip', 'guidance', 'help', 'counsel', 'insight', 'wisdom', 'suggestion', 'opinion', 'perspective', 'mentor', 'guide', 'consult'],
-                'Stories': ['story', 'tale', 'narrative', 'fiction', 'anecdote', 'account', 'adventure', 'episode', 'experience', 'event', 'incident', 'chapter', 'chronicle', 'saga', 'legend'],
-                'Questions': ['question', 'ask', 'inquiry', 'query', 'wonder', 'curious', 'how', 'what', 'when', 'where', 'why', 'who', 'which', 'problem', 'doubt'],
-                'Reflections': ['reflect', 'think', 'contemplate', 'ponder', 'meditate', 'introspect', 'consider', 'evaluate', 'analyze', 'examine', 'insight', 'perspective', 'viewpoint', 'opinion', 'thought'],
-                'Daily Life': ['daily', 'routine', 'everyday', 'regular', 'habit', 'schedule', 'life', 'ordinary', 'common', 'typical', 'usual', 'mundane', 'normal', 'day-to-day', 'lifestyle'],
-                'Goals': ['goal', 'aim', 'objective', 'target', 'aspiration', 'ambition', 'purpose', 'intention', 'plan', 'dream', 'desire', 'achievement', 'success', 'milestone', 'vision'],
-                'Challenges': ['challenge', 'difficulty', 'obstacle', 'problem', 'hurdle', 'barrier', 'struggle', 'issue', 'complication', 'setback', 'trouble', 'hardship', 'adversity', 'trial', 'test'],
-                'Achievements': ['achievement', 'accomplish', 'success', 'victory', 'triumph', 'win', 'attain', 'reach', 'complete', 'achieve', 'milestone', 'breakthrough', 'feat', 'progress', 'advancement']
-            }
+            category_keywords = CATEGORY_KEYWORDS
             
             # Initialize TF-IDF vectorizer
             vectorizer = TfidfVectorizer(
@@ -615,47 +835,25 @@ class EnhancedBookService:
         return chapters
     
     def _categorize_messages_by_themes(self, messages, themes, theme_type):
-        """Use AI to categorize messages by specific themes"""
+        """Assign messages to chapter themes by embedding similarity (LLM only for ambiguous ones)"""
         try:
-            # Create theme descriptions for AI
-            theme_descriptions = {
-                'relationship': {
-                    'How We Met': 'Initial meeting, first encounters, getting to know each other',
-                    'Learning Each Other': 'Understanding personalities, habits, preferences',
-                    'Daily Life Together': 'Routine activities, everyday moments, shared experiences',
-                    'Challenges & Growth': 'Difficulties faced together, how you grew stronger',
-                    'Special Moments': 'Memorable occasions, celebrations, milestones',
-                    'Our Bond Today': 'Current relationship, ongoing connection, present day',
-                    'Looking Forward': 'Future plans, hopes, dreams together'
-                },
-                'medical': {
-                    'Health Profile & Baseline': 'Initial health status, basic health information',
-                    'Preventive Care': 'Regular checkups, vaccinations, wellness visits',
-                    'Nutrition & Diet': 'Food, eating habits, dietary needs, feeding',
-                    'Medical History': 'Past illnesses, treatments, medical events',
-                    'Ongoing Monitoring': 'Regular health tracking, observations, monitoring',
-                    'Surgical Records': 'Surgeries, procedures, medical interventions',
-                    'Chronic Conditions': 'Ongoing health issues, long-term care'
-                },
-                'training': {
-                    'Foundation & Basic Commands': 'Basic training, sit, stay, come commands',
-                    'Intermediate Skills': 'More advanced commands, leash training, house training',
-                    'Behavioral Training': 'Behavior modification, problem solving, good habits',
-                    'Advanced Training & Tricks': 'Complex commands, tricks, advanced skills',
-                    'Training Philosophy': 'Training approach, methods, principles',
-                    'Ongoing Development': 'Continuous learning, skill maintenance, progress'
-                },
-                'family': {
-                    'Family Circle': 'Immediate family members, close family relationships',
-                    'Furry Friends': 'Other pets, animal companions, playmates',
-                    'Extended Family & Visitors': 'Relatives, friends, people who visit',
-                    'Community Connections': 'Neighbors, local community, social interactions',
-                    'Special Moments Together': 'Celebrations, gatherings, memorable events',
-                    'The Social Butterfly': 'Social personality, interactions with others'
-                }
-            }
+            descriptions = THEME_DESCRIPTIONS.get(theme_type, {})
+            result = self.embedding_categorizer.categorize(
+                [m.content for m in messages],
+                {theme: descriptions.get(theme, f"Content related to {theme}") for theme in themes}
+            ).grouped(messages)
             
-            descriptions = theme_descriptions.get(theme_type, {})
+            for theme in themes:
+                logger.info(f"🎯 Theme '{theme}': {len(result[theme])} messages")
+            return result
+        except Exception as e:
+            logger.error(f"Error in embedding theme categorization, asking the LLM: {str(e)}")
+            return self._categorize_messages_by_themes_with_llm(messages, themes, theme_type)
+    
+    def _categorize_messages_by_themes_with_llm(self, messages, themes, theme_type):
+        """Use AI to categorize messages by specific themes"""
+        try:
+            descriptions = THEME_DESCRIPTIONS.get(theme_type, {})
             
             # Prepare messages for AI categorization
             message_texts = [m.content for m in messages]
@@ -753,84 +951,72 @@ Themes and their descriptions:
         
         return chapters
 
-    def generate_book_chapters(self, user_id, book_id):
+    def generate_book_chapters(self, user_id, book_id, wait=True):
         """
         Generate book chapters from ic_messages with photos
+        
+        Chapters are written in parallel by the generation engine and saved as
+        they finish. An interrupted generation resumes against its stored
+        chapter plan; a finished book is planned again and its chapters replaced.
+        
+        Args:
+            user_id: Owner of the book
+            book_id: Book to generate
+            wait: Block until the book is finished (False returns the job progress right away)
+        
+        Returns:
+            The book dict when waiting, otherwise the generation job's progress dict
         """
-        try:
-            # Get the book
-            book = EnhancedBook.query.get(book_id)
-            if not book or book.user_id != user_id:
-                raise ValueError("Book not found or access denied")
-            
-            # Update book status
-            book.status = 'processing'
-            db.session.commit()
-            
-            logger.info(f"🎨 Generating chapters for book '{book.title}' (type: {book.book_type})")
-            
-            # Fetch messages from ic_messages
-            messages = self._get_ic_messages(user_id, book.book_type)
-            
-            # Fetch images from both tables
-            images = self._get_all_user_images(user_id)
-            
-            if not messages:
-                raise ValueError("No messages found for book generation")
-            
-            # Create flexible chapters based on book type
-            chapters_data = self._create_flexible_chapters(
-                messages, 
-                images, 
-                book.book_type,
-                book.tone_type,
-                book.text_style
-            )
-            
-            logger.info(f"📚 Created {len(chapters_data)} chapters")
-            
-            # Generate content for each chapter and save to database
-            for idx, chapter_data in enumerate(chapters_data, 1):
-                # Generate AI content from messages
-                message_texts = [m.content for m in chapter_data['messages']]
-                chapter_content = self._generate_chapter_content(
-                    message_texts,
-                    chapter_data['title'],
-                    book.tone_type,
-                    book.text_style
-                )
-                
-                # Store chapter images as JSON in content (will be used in PDF generation)
-                chapter_images_json = json.dumps([{
-                    's3_url': img['s3_url'],
-                    'description': img['description']
-                } for img in chapter_data['images']])
-                
-                # Create chapter
-                chapter = EnhancedBookChapter(
-                    book_id=book_id,
-                    title=chapter_data['title'],
-                    content=chapter_content + f"\n<!-- IMAGES: {chapter_images_json} -->",  # Embed images in content
-                    category=chapter_data['title'],
-                    order=idx
-                )
-                db.session.add(chapter)
-                logger.info(f"  ✅ Chapter {idx}: {chapter_data['title']} ({len(message_texts)} messages, {len(chapter_data['images'])} images)")
-            
-            db.session.commit()
-            
-            # Update book status
-            book.status = 'completed'
-            db.session.commit()
-            
-            logger.info(f"✅ Book generation completed: {book.title}")
-            return book.to_dict()
-        except Exception as e:
-            logger.error(f"❌ Error generating book chapters: {str(e)}")
-            book.status = 'error'
-            db.session.commit()
-            db.session.rollback()
-            raise
+        book = EnhancedBook.query.get(book_id)
+        if not book or book.user_id != user_id:
+            raise ValueError("Book not found or access denied")
+        
+        job = self.generation_engine.submit(user_id, book_id)
+        if not wait:
+            return job.to_dict()
+        
+        job.done.wait()
+        if job.status != 'completed':
+            raise ValueError(job.error or "Book generation failed")
+        
+        db.session.expire_all()
+        return EnhancedBook.query.get(book_id).to_dict()
+    
+    def get_running_generation(self, user_id, book_id):
+        """
+        Progress of the book's generation if one is running in this process
+        
+        Returns:
+            The job progress dict, or None when nothing is running
+        """
+        job = self.generation_engine.running_job(book_id)
+        if not job or job.user_id != user_id:
+            return None
+        return job.to_dict()
+    
+    def get_generation_status(self, user_id, book_id):
+        """
+        Progress of the book's latest generation job
+        
+        Falls back to the saved chapters when no job ran in this process
+        (e.g. after a restart).
+        """
+        book = EnhancedBook.query.get(book_id)
+        if not book or book.user_id != user_id:
+            raise ValueError("Book not found or access denied")
+        
+        job = self.generation_engine.get_job(book_id)
+        if job:
+            return job.to_dict()
+        
+        saved = EnhancedBookChapter.query.filter_by(book_id=book_id).count()
+        return {
+            'book_id': book_id,
+            'status': book.status,
+            'total_chapters': None,
+            'completed_chapters': saved,
+            'chapters': []
+        }
     
     def _generate_chapter_content(self, messages, category, tone_type, text_style):
         """
@@ -876,190 +1062,12 @@ Themes and their descriptions:
     def generate_pdf(self, user_id, book_id):
         """
         Generate PDF from book chapters using WeasyPrint and Jinja2 templates
+        
+        Returns the existing PDF URL without rendering when nothing the PDF
+        depends on has changed since the last render.
         """
         try:
-            # Get the book
-            book = EnhancedBook.query.get(book_id)
-            if not book or book.user_id != user_id:
-                raise ValueError("Book not found or access denied")
-            
-            # Get user for author name
-            user = User.query.get(user_id)
-            author_name = user.username if user else "Anonymous"
-            
-            # Get chapters
-            chapters = EnhancedBookChapter.query.filter_by(book_id=book_id).order_by(EnhancedBookChapter.order).all()
-            if not chapters:
-                raise ValueError("No chapters found for this book")
-            
-            # Create a temporary folder for the book
-            temp_folder = current_app.config.get('TEMP_FOLDER', '/tmp')
-            book_temp_folder = os.path.join(temp_folder, f"enhanced_book_{book_id}_{uuid.uuid4().hex}")
-            os.makedirs(book_temp_folder, exist_ok=True)
-            
-            # Get photo layout config for this book type
-            photo_layout = get_photo_layout(get_book_type_config(book.book_type)['photo_priority'])
-            logger.info(f"📸 Photo layout: {photo_layout['layout_class']}")
-            
-            # Create images folder in temp directory
-            images_folder = os.path.join(book_temp_folder, "images")
-            os.makedirs(images_folder, exist_ok=True)
-            
-            # Prepare chapters data with images
-            chapters_data = []
-            for chapter in chapters:
-                clean_title = chapter.title
-                if ":" in clean_title:
-                    clean_title = clean_title.split(":", 1)[1].strip()
-                
-                content = chapter.content
-                
-                # Extract images JSON from content
-                chapter_images = []
-                images_match = re.search(r'<!-- IMAGES: (.*?) -->', content)
-                if images_match:
-                    try:
-                        chapter_images = json.loads(images_match.group(1))
-                        # Remove the comment from content
-                        content = content.replace(images_match.group(0), '')
-                    except:
-                        pass
-                
-                # Download images to temp folder
-                local_images = []
-                for idx, img in enumerate(chapter_images):
-                    try:
-                        response = requests.get(img['s3_url'], timeout=10)
-                        if response.status_code == 200:
-                            img_ext = img['s3_url'].split('.')[-1].split('?')[0] or 'jpg'
-                            local_img_path = os.path.join(images_folder, f"chapter_{chapter.order}_img_{idx}.{img_ext}")
-                            with open(local_img_path, 'wb') as f:
-                                f.write(response.content)
-                            local_images.append({
-                                'path': local_img_path,
-                                'description': img['description']
-                            })
-                            logger.info(f"  📥 Downloaded image {idx+1} for chapter {chapter.order}")
-                    except Exception as e:
-                        logger.warning(f"  ⚠️  Failed to download image: {str(e)}")
-                
-                content = re.sub(r'^Chapter \d+:.*?\n', '', content, flags=re.MULTILINE)
-                
-                # Parse paragraphs and intersperse images naturally
-                paragraphs = content.split('\n\n')
-                paragraphs = [p.strip() for p in paragraphs if p.strip()]
-                
-                # Calculate image placement positions
-                formatted_content = ""
-                if local_images and len(paragraphs) > 0:
-                    # Distribute images evenly throughout the text
-                    # Place images after every N paragraphs, where N = total_paragraphs / (num_images + 1)
-                    num_images = len(local_images)
-                    num_paragraphs = len(paragraphs)
-                    
-                    # Calculate spacing - at least 2 paragraphs between images
-                    spacing = max(2, num_paragraphs // (num_images + 1))
-                    
-                    image_idx = 0
-                    paragraph_count = 0
-                    
-                    for i, paragraph in enumerate(paragraphs):
-                        # Add paragraph
-                        formatted_content += f"<p>{paragraph}</p>\n"
-                        paragraph_count += 1
-                        
-                        # Check if we should insert an image after this paragraph
-                        should_insert_image = (
-                            image_idx < num_images and  # Still have images to place
-                            paragraph_count >= spacing and  # Enough paragraphs have passed
-                            i < len(paragraphs) - 1  # Not the last paragraph
-                        )
-                        
-                        if should_insert_image:
-                            img = local_images[image_idx]
-                            formatted_content += f'''
-                            <div class="image-container">
-                                <img src="file://{img['path']}" alt="{img['description']}" class="chapter-image">
-                                <p class="image-caption">{img['description']}</p>
-                            </div>
-                            '''
-                            image_idx += 1
-                            paragraph_count = 0  # Reset counter
-                    
-                    # If there are remaining images, add them at the end
-                    while image_idx < num_images:
-                        img = local_images[image_idx]
-                        formatted_content += f'''
-                        <div class="image-container">
-                            <img src="file://{img['path']}" alt="{img['description']}" class="chapter-image">
-                            <p class="image-caption">{img['description']}</p>
-                        </div>
-                        '''
-                        image_idx += 1
-                else:
-                    # No images, just format paragraphs
-                    for paragraph in paragraphs:
-                        formatted_content += f"<p>{paragraph}</p>\n"
-                
-                chapters_data.append({
-                    'title': chapter.title,
-                    'clean_title': clean_title,
-                    'content': content,
-                    'formatted_content': formatted_content,
-                    'images': []  # Images are now embedded in formatted_content
-                })
-            
-            # Set up Jinja2 environment
-            template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
-            env = Environment(loader=FileSystemLoader(template_dir))
-            template = env.get_template('book/content.html')
-            
-            # Render template with data
-            html_content = template.render(
-                book=book,
-                author_name=author_name,
-                chapters=chapters_data,
-                font_family=self._get_font_family(book.text_style),
-                photo_layout=photo_layout
-            )
-            
-            # Save HTML to file for debugging
-            html_path = os.path.join(book_temp_folder, "book.html")
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            logger.info(f"HTML content saved to: {html_path}")
-            
-            # Generate PDF
-            pdf_filename = f"enhanced_book_{book_id}_{uuid.uuid4().hex}.pdf"
-            pdf_path = os.path.join(book_temp_folder, pdf_filename)
-            
-            # Create PDF using WeasyPrint
-            HTML(string=html_content).write_pdf(pdf_path)
-            
-            # Upload to S3
-            s3_key = f"books/{user_id}/{pdf_filename}"
-            self.s3_client.upload_file(
-                pdf_path,
-                self.s3_bucket,
-                s3_key,
-                ExtraArgs={'ContentType': 'application/pdf'}
-            )
-            
-            # Update book with PDF URL
-            book.pdf_url = f"https://{self.s3_bucket}.s3.amazonaws.com/{s3_key}"
-            db.session.commit()
-            
-            # Clean up temp files
-            if os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            
-            # Clean up temp folder
-            import shutil
-            if os.path.exists(book_temp_folder):
-                shutil.rmtree(book_temp_folder)
-            
-            return book.pdf_url
+            return self.render_book(user_id, book_id, 'pdf').url
         except Exception as e:
             logger.error(f"Error generating PDF: {str(e)}")
             raise
@@ -1067,213 +1075,278 @@ Themes and their descriptions:
     def generate_epub(self, user_id, book_id):
         """
         Generate EPUB from book chapters
+        
+        Returns the existing EPUB URL without rendering when the book is unchanged.
         """
         try:
-            # Get the book
-            book = EnhancedBook.query.get(book_id)
-            if not book or book.user_id != user_id:
-                raise ValueError("Book not found or access denied")
-            
-            # Get user for author name
-            user = User.query.get(user_id)
-            author_name = user.username if user else "Anonymous"
-            
-            # Get chapters
-            chapters = EnhancedBookChapter.query.filter_by(book_id=book_id).order_by(EnhancedBookChapter.order).all()
-            if not chapters:
-                raise ValueError("No chapters found for this book")
-            
-            # Create EPUB book
-            epub_book = epub.EpubBook()
-            epub_book.set_identifier(f"enhanced-book-{book_id}")
-            epub_book.set_title(book.title)
-            epub_book.set_language('en')
-            epub_book.add_author(author_name)
-            
-            # Add CSS
-            style = '''
-            @namespace epub "http://www.idpf.org/2007/ops";
-            body {
-                font-family: ''' + self._get_font_family(book.text_style) + ''';
-            }
-            h1 {
-                text-align: center;
-                margin-bottom: 50px;
-            }
-            h2 {
-                margin-top: 40px;
-            }
-            .chapter {
-                margin-bottom: 30px;
-            }
-            .image-container {
-                margin: 20px 0;
-                text-align: center;
-            }
-            .chapter-image {
-                max-width: 100%;
-                height: auto;
-            }
-            .image-caption {
-                font-size: 0.9em;
-                font-style: italic;
-                color: #666;
-                margin-top: 10px;
-            }
-            '''
-            
-            css = epub.EpubItem(
-                uid="style_default",
-                file_name="style/default.css",
-                media_type="text/css",
-                content=style
-            )
-            epub_book.add_item(css)
-            
-            # Create chapters
-            epub_chapters = []
-            toc = []
-            spine = ['nav']
-            
-            for i, chapter in enumerate(chapters):
-                content = chapter.content
-                
-                # Extract images JSON from content
-                chapter_images = []
-                images_match = re.search(r'<!-- IMAGES: (.*?) -->', content)
-                if images_match:
-                    try:
-                        chapter_images = json.loads(images_match.group(1))
-                        # Remove the comment from content
-                        content = content.replace(images_match.group(0), '')
-                    except:
-                        pass
-                
-                # Download and add images to EPUB
-                epub_images = []
-                for idx, img in enumerate(chapter_images):
-                    try:
-                        response = requests.get(img['s3_url'], timeout=10)
-                        if response.status_code == 200:
-                            img_ext = img['s3_url'].split('.')[-1].split('?')[0] or 'jpg'
-                            img_filename = f"chapter_{i+1}_img_{idx}.{img_ext}"
-                            
-                            # Determine media type
-                            media_type = f"image/{img_ext}" if img_ext in ['jpg', 'jpeg', 'png', 'gif'] else 'image/jpeg'
-                            
-                            # Create EPUB image item
-                            epub_img = epub.EpubItem(
-                                uid=f"img_{i+1}_{idx}",
-                                file_name=f"images/{img_filename}",
-                                media_type=media_type,
-                                content=response.content
-                            )
-                            epub_book.add_item(epub_img)
-                            epub_images.append({
-                                'filename': img_filename,
-                                'description': img['description']
-                            })
-                            logger.info(f"  📥 Added image {idx+1} to EPUB for chapter {i+1}")
-                    except Exception as e:
-                        logger.warning(f"  ⚠️  Failed to download image for EPUB: {str(e)}")
-                
-                # Parse paragraphs and intersperse images naturally
-                content = re.sub(r'^Chapter \d+:.*?\n', '', content, flags=re.MULTILINE)
-                paragraphs = content.split('\n\n')
-                paragraphs = [p.strip() for p in paragraphs if p.strip()]
-                
-                # Create formatted content with interspersed images
-                formatted_content = ""
-                if epub_images and len(paragraphs) > 0:
-                    num_images = len(epub_images)
-                    num_paragraphs = len(paragraphs)
-                    spacing = max(2, num_paragraphs // (num_images + 1))
-                    
-                    image_idx = 0
-                    paragraph_count = 0
-                    
-                    for j, paragraph in enumerate(paragraphs):
-                        formatted_content += f"<p>{paragraph}</p>\n"
-                        paragraph_count += 1
-                        
-                        should_insert_image = (
-                            image_idx < num_images and
-                            paragraph_count >= spacing and
-                            j < len(paragraphs) - 1
-                        )
-                        
-                        if should_insert_image:
-                            img = epub_images[image_idx]
-                            formatted_content += f'''
-                            <div class="image-container">
-                                <img src="images/{img['filename']}" alt="{img['description']}" class="chapter-image" />
-                                <p class="image-caption">{img['description']}</p>
-                            </div>
-                            '''
-                            image_idx += 1
-                            paragraph_count = 0
-                    
-                    # Add remaining images at the end
-                    while image_idx < num_images:
-                        img = epub_images[image_idx]
-                        formatted_content += f'''
-                        <div class="image-container">
-                            <img src="images/{img['filename']}" alt="{img['description']}" class="chapter-image" />
-                            <p class="image-caption">{img['description']}</p>
-                        </div>
-                        '''
-                        image_idx += 1
+            return self.render_book(user_id, book_id, 'epub').url
+        except Exception as e:
+            logger.error(f"Error generating EPUB: {str(e)}")
+            raise
+    
+    def render_book(self, user_id, book_id, fmt):
+        """
+        Render a book to PDF or EPUB, reusing the cached artifact when possible
+        
+        The artifact is keyed by a fingerprint of the book's render inputs
+        (style, author and each chapter's updated_at), which is also part of
+        the S3 key, so an unchanged book is a cache hit without loading any
+        chapter content.
+        
+        Args:
+            user_id: Owner of the book
+            book_id: Book to render
+            fmt: 'pdf' or 'epub'
+        
+        Returns:
+            BookArtifact with the S3 URL and, when rendered on this instance, the local file path
+        """
+        book = EnhancedBook.query.get(book_id)
+        if not book or book.user_id != user_id:
+            raise ValueError("Book not found or access denied")
+        
+        # Get user for author name
+        user = User.query.get(user_id)
+        author_name = user.username if user else "Anonymous"
+        
+        chapter_rows = db.session.query(
+            EnhancedBookChapter.id, EnhancedBookChapter.order,
+            EnhancedBookChapter.title, EnhancedBookChapter.updated_at
+        ).filter_by(book_id=book_id).order_by(EnhancedBookChapter.order).all()
+        if not chapter_rows:
+            raise ValueError("No chapters found for this book")
+        
+        cache = get_book_render_cache()
+        fingerprint = book_fingerprint(book, author_name, chapter_rows, fmt)
+        s3_key = f"books/{user_id}/enhanced_book_{book_id}_{fingerprint[:32]}.{fmt}"
+        url = f"https://{self.s3_bucket}.s3.amazonaws.com/{s3_key}"
+        url_attr = 'pdf_url' if fmt == 'pdf' else 'epub_url'
+        
+        with cache.lock(book_id, fmt):
+            path = cache.cached_artifact(book_id, fingerprint, fmt)
+            if getattr(book, url_attr) == url:
+                logger.info(f"♻️  {fmt.upper()} for book {book_id} is unchanged, reusing it")
+                return BookArtifact(fingerprint=fingerprint, format=fmt, url=url, path=path, cache_hit=True)
+            
+            if path is None:
+                chapters = EnhancedBookChapter.query.filter_by(book_id=book_id).order_by(EnhancedBookChapter.order).all()
+                path = cache.artifact_path(book_id, fingerprint, fmt)
+                partial_path = f"{path}.{uuid.uuid4().hex}.part"
+                if fmt == 'pdf':
+                    self._render_pdf(book, author_name, chapters, cache, partial_path)
                 else:
-                    # No images, just format paragraphs
-                    for paragraph in paragraphs:
-                        formatted_content += f"<p>{paragraph}</p>\n"
-                
-                epub_chapter = epub.EpubHtml(
-                    title=chapter.title,
-                    file_name=f'chapter_{i+1}.xhtml',
-                    lang='en'
-                )
-                epub_chapter.content = f'<h2>{chapter.title}</h2><div class="chapter">{formatted_content}</div>'
-                epub_chapter.add_item(css)
-                
-                epub_book.add_item(epub_chapter)
-                epub_chapters.append(epub_chapter)
-                toc.append(epub.Link(f'chapter_{i+1}.xhtml', chapter.title, f'chapter{i+1}'))
-                spine.append(epub_chapter)
-            
-            # Add TOC and spine
-            epub_book.toc = toc
-            epub_book.spine = spine
-            epub_book.add_item(epub.EpubNcx())
-            epub_book.add_item(epub.EpubNav())
-            
-            # Generate EPUB
-            epub_filename = f"enhanced_book_{book_id}_{uuid.uuid4().hex}.epub"
-            epub_path = os.path.join(current_app.config['TEMP_FOLDER'], epub_filename)
-            
-            epub.write_epub(epub_path, epub_book)
+                    self._render_epub(book, author_name, chapters, cache, partial_path)
+                os.replace(partial_path, path)
+                cache.keep_only(book_id, fingerprint, fmt)
             
             # Upload to S3
-            s3_key = f"books/{user_id}/{epub_filename}"
             self.s3_client.upload_file(
-                epub_path,
+                path,
                 self.s3_bucket,
                 s3_key,
-                ExtraArgs={'ContentType': 'application/epub+zip'}
+                ExtraArgs={'ContentType': 'application/pdf' if fmt == 'pdf' else 'application/epub+zip'}
             )
             
-            # Update book with EPUB URL
-            book.epub_url = f"https://{self.s3_bucket}.s3.amazonaws.com/{s3_key}"
+            # Update book with the file URL
+            previous_url = getattr(book, url_attr)
+            setattr(book, url_attr, url)
             db.session.commit()
+            self._delete_replaced_artifact(previous_url, user_id, book_id, fmt)
             
-            # Clean up temp file
-            if os.path.exists(epub_path):
-                os.remove(epub_path)
-            
-            return book.epub_url
+            return BookArtifact(fingerprint=fingerprint, format=fmt, url=url, path=path)
+    
+    def _delete_replaced_artifact(self, previous_url, user_id, book_id, fmt):
+        """
+        Delete the S3 object of the render the book no longer points at
+        
+        Each fingerprint gets its own key, so without this every content change
+        would leave the previous render behind. Only keys this service writes for
+        the same book and format are deleted.
+        """
+        prefix = f"https://{self.s3_bucket}.s3.amazonaws.com/"
+        if not previous_url or not previous_url.startswith(prefix):
+            return
+        previous_key = previous_url[len(prefix):]
+        if not (previous_key.startswith(f"books/{user_id}/enhanced_book_{book_id}_")
+                and previous_key.endswith(f".{fmt}")):
+            return
+        try:
+            self.s3_client.delete_object(Bucket=self.s3_bucket, Key=previous_key)
+            logger.info(f"🗑️  Deleted replaced {fmt.upper()} render {previous_key}")
         except Exception as e:
-            logger.error(f"Error generating EPUB: {str(e)}")
-            raise
+            logger.warning(f"⚠️  Failed to delete replaced render {previous_key}: {str(e)}")
+    
+    def _prepare_chapters(self, chapters, fmt, cache):
+        """
+        Parse chapter content and lay out its images, reusing cached chapter HTML
+        
+        Returns:
+            List of (chapter, content, formatted_content, image_paths)
+        """
+        prepared = []
+        wanted_urls = []
+        for chapter in chapters:
+            key = (chapter.id, chapter.updated_at, fmt)
+            cached = cache.fragments.get(key)
+            if cached:
+                prepared.append((chapter, key, cached, None))
+                wanted_urls.extend(cached[2])
+            else:
+                parsed = split_chapter_content(chapter.content)
+                prepared.append((chapter, key, None, parsed))
+                wanted_urls.extend(img['s3_url'] for img in parsed[1])
+        
+        # One concurrent pass for every image that is not cached locally yet
+        local_paths = cache.images.fetch_many(wanted_urls)
+        
+        result = []
+        for chapter, key, cached, parsed in prepared:
+            if cached:
+                content, formatted_content, image_urls = cached
+            else:
+                content, images = parsed
+                available = [img for img in images if img['s3_url'] in local_paths]
+                image_urls = [img['s3_url'] for img in available]
+                formatted_content = format_chapter_html(content, [{
+                    'src': (f"file://{local_paths[img['s3_url']]}" if fmt == 'pdf'
+                            else f"images/{os.path.basename(local_paths[img['s3_url']])}"),
+                    'description': img['description']
+                } for img in available], self_closing=(fmt == 'epub'))
+                if len(available) == len(images):  # retry missing images on the next render
+                    cache.fragments.put(key, (content, formatted_content, image_urls))
+            result.append((chapter, content, formatted_content,
+                           [local_paths[url] for url in image_urls if url in local_paths]))
+        return result
+    
+    def _render_pdf(self, book, author_name, chapters, cache, pdf_path):
+        """Render chapters to a PDF file with WeasyPrint"""
+        # Get photo layout config for this book type
+        photo_layout = get_photo_layout(get_book_type_config(book.book_type)['photo_priority'])
+        logger.info(f"📸 Photo layout: {photo_layout['layout_class']}")
+        
+        chapters_data = []
+        for chapter, content, formatted_content, _ in self._prepare_chapters(chapters, 'pdf', cache):
+            clean_title = chapter.title
+            if ":" in clean_title:
+                clean_title = clean_title.split(":", 1)[1].strip()
+            
+            chapters_data.append({
+                'title': chapter.title,
+                'clean_title': clean_title,
+                'content': content,
+                'formatted_content': formatted_content,
+                'images': []  # Images are embedded in formatted_content
+            })
+        
+        # Set up Jinja2 environment
+        template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+        env = Environment(loader=FileSystemLoader(template_dir))
+        template = env.get_template('book/content.html')
+        
+        # Render template with data
+        html_content = template.render(
+            book=book,
+            author_name=author_name,
+            chapters=chapters_data,
+            font_family=self._get_font_family(book.text_style),
+            photo_layout=photo_layout
+        )
+        
+        # Create PDF using WeasyPrint
+        HTML(string=html_content).write_pdf(pdf_path)
+        logger.info(f"📄 Rendered PDF for book {book.id} ({len(chapters_data)} chapters)")
+    
+    def _render_epub(self, book, author_name, chapters, cache, epub_path):
+        """Build an EPUB file from the chapters"""
+        # Create EPUB book
+        epub_book = epub.EpubBook()
+        epub_book.set_identifier(f"enhanced-book-{book.id}")
+        epub_book.set_title(book.title)
+        epub_book.set_language('en')
+        epub_book.add_author(author_name)
+        
+        # Add CSS
+        style = '''
+        @namespace epub "http://www.idpf.org/2007/ops";
+        body {
+            font-family: ''' + self._get_font_family(book.text_style) + ''';
+        }
+        h1 {
+            text-align: center;
+            margin-bottom: 50px;
+        }
+        h2 {
+            margin-top: 40px;
+        }
+        .chapter {
+            margin-bottom: 30px;
+        }
+        .image-container {
+            margin: 20px 0;
+            text-align: center;
+        }
+        .chapter-image {
+            max-width: 100%;
+            height: auto;
+        }
+        .image-caption {
+            font-size: 0.9em;
+            font-style: italic;
+            color: #666;
+            margin-top: 10px;
+        }
+        '''
+        
+        css = epub.EpubItem(
+            uid="style_default",
+            file_name="style/default.css",
+            media_type="text/css",
+            content=style
+        )
+        epub_book.add_item(css)
+        
+        # Create chapters
+        toc = []
+        spine = ['nav']
+        added_images = set()
+        
+        for i, (chapter, _, formatted_content, image_paths) in enumerate(self._prepare_chapters(chapters, 'epub', cache)):
+            # Each image file is stored once, even if several chapters use it
+            for image_path in image_paths:
+                img_filename = os.path.basename(image_path)
+                if img_filename in added_images:
+                    continue
+                img_ext = img_filename.rsplit('.', 1)[-1]
+                media_type = {'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif'}.get(img_ext, 'image/jpeg')
+                with open(image_path, 'rb') as f:
+                    epub_book.add_item(epub.EpubItem(
+                        uid=f"img_{img_filename.split('.')[0]}",
+                        file_name=f"images/{img_filename}",
+                        media_type=media_type,
+                        content=f.read()
+                    ))
+                added_images.add(img_filename)
+            
+            epub_chapter = epub.EpubHtml(
+                title=chapter.title,
+                file_name=f'chapter_{i+1}.xhtml',
+                lang='en'
+            )
+            epub_chapter.content = f'<h2>{chapter.title}</h2><div class="chapter">{formatted_content}</div>'
+            epub_chapter.add_item(css)
+            
+            epub_book.add_item(epub_chapter)
+            toc.append(epub.Link(f'chapter_{i+1}.xhtml', chapter.title, f'chapter{i+1}'))
+            spine.append(epub_chapter)
+        
+        # Add TOC and spine
+        epub_book.toc = toc
+        epub_book.spine = spine
+        epub_book.add_item(epub.EpubNcx())
+        epub_book.add_item(epub.EpubNav())
+        
+        epub.write_epub(epub_path, epub_book)
+        logger.info(f"📘 Rendered EPUB for book {book.id} ({len(toc)} chapters, {len(added_images)} images)")
     
     def _get_font_family(self, text_style):
         """
@@ -1702,69 +1775,24 @@ Maintain consistency with the overall chapter style and narrative flow.
                 logger.error(f"Book {book_id} not found or access denied for user {user_id}")
                 return {}
             
-            # Get all user conversations from the last 7 days
+            # Only messages from conversations active in the last 7 days
             recent_date = datetime.utcnow() - timedelta(days=7)
-            conversations = Conversation.query.filter_by(user_id=user_id).filter(
-                Conversation.updated_at >= recent_date
-            ).all()
-            
-            if not conversations:
-                logger.info(f"No recent conversations found for user {user_id}")
-                return {}
-            
-            conversation_ids = [conv.id for conv in conversations]
-            
-            # Get all messages from these conversations
-            all_messages = Message.query.filter(
-                Message.conversation_id.in_(conversation_ids),
-                Message.type == 'user'  # Only categorize user messages
-            ).order_by(Message.created_at).all()
-            
-            if not all_messages:
-                logger.info(f"No recent messages found for user {user_id}")
-                return {}
-            
-            # Get all messages that are already categorized for this book
-            categorized_message_ids = db.session.query(MessageCategory.message_id).filter(
-                MessageCategory.book_id == book_id
-            ).all()
-            categorized_message_ids = [msg_id[0] for msg_id in categorized_message_ids]
-            
-            # Filter out messages that are already categorized
-            uncategorized_messages = [msg for msg in all_messages if msg.id not in categorized_message_ids]
+            categorized_messages, processed = self._categorize_in_batches(
+                user_id, book_id, categories, since=recent_date
+            )
             
-            if not uncategorized_messages:
+            if not processed:
                 logger.info(f"No uncategorized messages found for book {book_id}")
                 return {}
             
-            logger.info(f"Found {len(uncategorized_messages)} uncategorized messages for book {book_id}")
-            
-            # Prepare messages for categorization
-            message_texts = [msg.content for msg in uncategorized_messages]
-            message_ids = [msg.id for msg in uncategorized_messages]
-            
-            # Use hybrid approach to categorize messages
-            categorized_messages = self._categorize_with_hybrid_approach(message_texts, message_ids, categories)
-            
-            # Store categorizations in database
-            for category, msg_ids in categorized_messages.items():
-                for msg_id in msg_ids:
-                    message_category = MessageCategory(
-                        message_id=msg_id,
-                        category=category,
-                        book_id=book_id
-                    )
-                    db.session.add(message_category)
-            
-            db.session.commit()
-            logger.info(f"Successfully categorized {len(message_ids)} recent messages for book {book_id}")
+            logger.info(f"Successfully categorized {processed} recent messages for book {book_id}")
             
             return categorized_messages
         except Exception as e:
             logger.error(f"Error categorizing recent messages: {str(e)}")
             db.session.rollback()
             return {}
-            
+    
     def get_formatted_recent_chats(self, user_id, book_id, tone_type, text_style, category=None, chapter_id=None):
         """
         Get and format recent chat messages for a book
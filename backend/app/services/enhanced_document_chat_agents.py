@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from shared.embedding_cache import cached_embeddings
 from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Command
@@ -80,7 +81,7 @@ class EnhancedDocumentChatAgents:
             temperature=0.3,
             max_tokens=2000
         )
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(model="text-embedding-3-large"))
 
         self.checkpointer = MemorySaver()
         self.graph = None
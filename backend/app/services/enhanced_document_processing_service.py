@@ -15,6 +15,7 @@ import fitz  # PyMuPDF for better PDF handling
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document as LangchainDocument
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from shared.embedding_cache import cached_embeddings
 from langchain_community.document_loaders import (
     PyPDFLoader,
     UnstructuredPDFLoader,
@@ -81,10 +82,10 @@ class EnhancedDocumentProcessingService:
     """Enhanced document processing service with Context7 LangGraph patterns"""
     
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
+        self.embeddings = cached_embeddings(OpenAIEmbeddings(
             model="text-embedding-3-large",
             chunk_size=1000
-        )
+        ))
         self.chat_model = ChatOpenAI(
             model="gpt-4",
             temperature=0.1,
@@ -292,18 +292,11 @@ class FCMService:
         
         total_success = 0
         total_failure = 0
-        platform_results = {}
         
         # Extract active FCM tokens
-        active_tokens = []
-        for platform, token_data in user_device_tokens.items():
-            if (isinstance(token_data, dict) and 
-                token_data.get('active', True) and 
-                token_data.get('type') == 'fcm' and 
-                token_data.get('token')):
-                
-                active_tokens.append(token_data['token'])
-                platform_results[platform] = {'attempted': True}
+        active_tokens = self.extract_active_tokens(user_device_tokens)
+        platform_results = {platform: {'attempted': True} for platform in active_tokens}
+        active_tokens = list(active_tokens.values())
         
         if not active_tokens:
             logger.info("No active FCM tokens found for user")
@@ -341,6 +334,24 @@ class FCMService:
             'platform_results': platform_results
         }
     
+    @staticmethod
+    def extract_active_tokens(user_device_tokens: Optional[Dict[str, Dict]]) -> Dict[str, str]:
+        """
+        Get the active FCM tokens from a user's device_tokens column
+        
+        Returns:
+            dict: platform -> token
+        """
+        active_tokens = {}
+        for platform, token_data in (user_device_tokens or {}).items():
+            if (isinstance(token_data, dict) and 
+                token_data.get('active', True) and 
+                token_data.get('type') == 'fcm' and 
+                token_data.get('token')):
+                
+                active_tokens[platform] = token_data['token']
+        return active_tokens
+    
     def is_available(self) -> bool:
         """Check if FCM service is available"""
         return self.initialized
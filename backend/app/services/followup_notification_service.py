@@ -8,6 +8,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from flask import current_app
+from sqlalchemy import and_, or_
 from app import db
 from app.models.health_models import HealthReminder, ReminderStatus, ReminderNotification, NotificationStatus
 from app.models.user import User
@@ -37,7 +38,7 @@ class FollowupNotificationService:
     def check_and_send_followups(self) -> Dict[str, Any]:
         """
         Main method to check for overdue reminders and send follow-up notifications
-        Should be called by scheduler every 5 minutes
+        On-demand sweep; scheduled follow-ups are sent by the reminder due-queue dispatcher
         """
         try:
             current_app.logger.info("🔔 Starting follow-up notification check...")
@@ -45,27 +46,7 @@ class FollowupNotificationService:
             # Get all reminders that need follow-up notifications
             overdue_reminders = self._get_reminders_needing_followup()
             
-            results = {
-                'total_checked': len(overdue_reminders),
-                'followups_sent': 0,
-                'completed_series': 0,
-                'errors': []
-            }
-            
-            for reminder in overdue_reminders:
-                try:
-                    if self._send_followup_notification(reminder):
-                        results['followups_sent'] += 1
-                        
-                        # Check if this was the last follow-up
-                        if reminder.current_followup_count >= reminder.max_followup_count:
-                            results['completed_series'] += 1
-                            current_app.logger.info(f"📋 Completed follow-up series for reminder {reminder.id}")
-                    
-                except Exception as e:
-                    error_msg = f"Error sending follow-up for reminder {reminder.id}: {str(e)}"
-                    current_app.logger.error(error_msg)
-                    results['errors'].append(error_msg)
+            results = self.send_followups(overdue_reminders)
             
             current_app.logger.info(f"✅ Follow-up check completed: {results}")
             return results
@@ -74,20 +55,59 @@ class FollowupNotificationService:
             current_app.logger.error(f"❌ Follow-up notification check failed: {str(e)}")
             return {'error': str(e)}
     
+    def send_followups(self, reminders: List[HealthReminder]) -> Dict[str, Any]:
+        """
+        Send the next follow-up for reminders already known to be due
+        Used by the polling check above and by the reminder due-queue dispatcher
+        """
+        results = {
+            'total_checked': len(reminders),
+            'followups_sent': 0,
+            'completed_series': 0,
+            'errors': []
+        }
+        
+        for reminder in reminders:
+            try:
+                if self._send_followup_notification(reminder):
+                    results['followups_sent'] += 1
+                    
+                    # Check if this was the last follow-up
+                    if reminder.current_followup_count >= reminder.max_followup_count:
+                        results['completed_series'] += 1
+                        current_app.logger.info(f"📋 Completed follow-up series for reminder {reminder.id}")
+                
+            except Exception as e:
+                error_msg = f"Error sending follow-up for reminder {reminder.id}: {str(e)}"
+                current_app.logger.error(error_msg)
+                results['errors'].append(error_msg)
+        
+        return results
+    
     def _get_reminders_needing_followup(self) -> List[HealthReminder]:
         """
         Get all reminders that need follow-up notifications
         """
         try:
-            now = datetime.utcnow()
+            # should_send_followup() compares against the server clock
+            now = datetime.now()
             
-            # Query reminders that need follow-up
+            # Only rows whose next follow-up (or first one, at the due date) has
+            # come - a pending reminder due next month is never loaded
             reminders = (db.session.query(HealthReminder)
                         .filter(
                             HealthReminder.status == ReminderStatus.PENDING,
                             HealthReminder.enable_followup_notifications == True,
                             HealthReminder.followup_notifications_stopped == False,
-                            HealthReminder.current_followup_count < HealthReminder.max_followup_count
+                            HealthReminder.current_followup_count < HealthReminder.max_followup_count,
+                            HealthReminder.due_date <= now.date(),
+                            or_(
+                                HealthReminder.next_followup_at <= now,
+                                and_(
+                                    HealthReminder.next_followup_at.is_(None),
+                                    HealthReminder.current_followup_count == 0
+                                )
+                            )
                         )
                         .all())
             
@@ -358,6 +378,9 @@ class FollowupNotificationService:
             
             db.session.commit()
             
+            from app.services.reminder_due_queue import discard_reminder
+            discard_reminder(reminder_id)
+            
             current_app.logger.info(f"✅ Reminder {reminder_id} marked as completed via {completion_method}")
             
             return {
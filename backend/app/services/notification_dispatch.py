@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Notification Dispatch Pipeline
+Concurrent, rate-limited delivery of reminder notifications in batches
+
+Email, push and SMS each get their own worker pool, rate limiter and long-lived
+transport (pooled SMTP connections, one SES client), so a burst of reminders
+is sent in parallel across channels instead of one reminder and one channel at
+a time. Pushes with identical content are merged into FCM multicast calls.
+
+Workers only do transport I/O - building content and writing notification
+rows stays on the caller's thread, which owns the database session.
+"""
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# FCM accepts at most this many tokens per multicast message
+FCM_MULTICAST_LIMIT = 500
+
+
+@dataclass
+class EmailJob:
+    """One reminder email"""
+    key: Any
+    recipient: str
+    subject: str
+    html: str
+    text: str
+    from_email: str
+
+
+@dataclass
+class PushJob:
+    """One reminder push to all of a user's devices"""
+    key: Any
+    tokens: List[str]
+    title: str
+    body: str
+    data: Dict[str, str] = field(default_factory=dict)
+    click_action: Optional[str] = None
+
+
+@dataclass
+class SmsJob:
+    """One reminder text message"""
+    key: Any
+    phone_number: str
+    message: str
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of one job on one channel"""
+    key: Any
+    channel: str
+    success: bool
+    detail: str
+    sent_count: int = 0
+    failed_count: int = 0
+
+
+class RateLimiter:
+    """Thread-safe token bucket; acquire() blocks until a send is allowed"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = burst if burst is not None else max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPConnectionPool:
+    """
+    Pool of authenticated SMTP connections reused across messages
+
+    A connection the server has dropped is replaced and the message retried
+    once; connections that fail any other way are discarded.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 size: int = 4, timeout: float = 30, smtp_factory: Callable = smtplib.SMTP):
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._smtp_factory = smtp_factory
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self.connections_opened = 0
+
+    def send(self, from_email: str, recipients: List[str], message: str):
+        with self._slots:
+            conn = self._take()
+            try:
+                try:
+                    conn.sendmail(from_email, recipients, message)
+                except smtplib.SMTPServerDisconnected:
+                    self._quit(conn)
+                    conn = self._connect()
+                    conn.sendmail(from_email, recipients, message)
+            except smtplib.SMTPResponseException:
+                # The server answered (e.g. rejected a recipient); the connection is still good
+                self._idle.put(conn)
+                raise
+            except Exception:
+                self._quit(conn)
+                raise
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _take(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _connect(self):
+        conn = self._smtp_factory(self.host, self.port, timeout=self.timeout)
+        conn.starttls()
+        conn.login(self.username, self.password)
+        self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _quit(conn):
+        try:
+            conn.quit()
+        except Exception:
+            pass
+
+
+class NotificationDispatcher:
+    """
+    Sends batches of email, push and SMS jobs concurrently
+
+    Transports are plain callables so they can be swapped for stubs:
+        send_email(job) -> detail string (raises on failure)
+        send_multicast(tokens, title, body, data, click_action) -> FCMService result dict
+        send_sms(job) -> detail string (raises on failure)
+    """
+
+    CHANNELS = ('email', 'push', 'sms')
+
+    def __init__(self, send_email: Callable[[EmailJob], str],
+                 send_multicast: Callable[..., Dict[str, Any]],
+                 send_sms: Optional[Callable[[SmsJob], str]] = None,
+                 rates: Optional[Dict[str, float]] = None,
+                 concurrency: Optional[Dict[str, int]] = None):
+        """
+        Initialize the dispatcher
+
+        Args:
+            send_email: Email transport
+            send_multicast: Push transport, same signature as FCMService.send_multicast_notification
+            send_sms: SMS transport (defaults to the simulated sender)
+            rates: Sends per second per channel (0 disables the limit)
+            concurrency: Worker threads per channel
+        """
+        self._senders = {
+            'email': send_email,
+            'push': send_multicast,
+            'sms': send_sms or (lambda job: "SMS notification sent (simulated)"),
+        }
+        rates = rates or {}
+        concurrency = concurrency or {}
+        self._limiters = {channel: RateLimiter(rates.get(channel, 0)) for channel in self.CHANNELS}
+        self._pools = {
+            channel: ThreadPoolExecutor(
+                max_workers=max(1, concurrency.get(channel, 4)),
+                thread_name_prefix=f"notify-{channel}"
+            )
+            for channel in self.CHANNELS
+        }
+
+    def dispatch(self, emails: List[EmailJob] = (), pushes: List[PushJob] = (),
+                 sms: List[SmsJob] = ()) -> List[DeliveryResult]:
+        """Send every job and wait for all of them; never raises for a failed send"""
+        futures = []
+        for job in emails:
+            futures.append(self._pools['email'].submit(self._send_one, 'email', job))
+        for group in self._group_pushes(pushes):
+            futures.append(self._pools['push'].submit(self._send_push_group, group))
+        for job in sms:
+            futures.append(self._pools['sms'].submit(self._send_one, 'sms', job))
+
+        results: List[DeliveryResult] = []
+        for future in futures:
+            outcome = future.result()
+            if isinstance(outcome, list):
+                results.extend(outcome)
+            else:
+                results.append(outcome)
+        return results
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+
+    def _send_one(self, channel: str, job) -> DeliveryResult:
+        self._limiters[channel].acquire()
+        try:
+            detail = self._senders[channel](job)
+            return DeliveryResult(job.key, channel, True, detail, sent_count=1)
+        except Exception as e:
+            return DeliveryResult(job.key, channel, False, f"{channel} send error: {str(e)}", failed_count=1)
+
+    @staticmethod
+    def _group_pushes(pushes: List[PushJob]) -> List[List[PushJob]]:
+        """Jobs with identical content share multicast calls (up to FCM_MULTICAST_LIMIT tokens)"""
+        groups: Dict[Tuple, List[List[PushJob]]] = {}
+        for job in pushes:
+            content = (job.title, job.body, job.click_action, tuple(sorted(job.data.items())))
+            chunks = groups.setdefault(content, [[]])
+            if chunks[-1] and sum(len(j.tokens) for j in chunks[-1]) + len(job.tokens) > FCM_MULTICAST_LIMIT:
+                chunks.append([])
+            chunks[-1].append(job)
+        return [chunk for chunks in groups.values() for chunk in chunks]
+
+    def _send_push_group(self, jobs: List[PushJob]) -> List[DeliveryResult]:
+        first = jobs[0]
+        tokens = [token for job in jobs for token in job.tokens]
+        failed: set = set()
+
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            chunk = tokens[start:start + FCM_MULTICAST_LIMIT]
+            self._limiters['push'].acquire()
+            try:
+                result = self._senders['push'](
+                    tokens=chunk,
+                    title=first.title,
+                    body=first.body,
+                    data=dict(first.data),
+                    click_action=first.click_action
+                )
+                failed.update(result.get('failed_tokens', []))
+            except Exception as e:
+                logger.error(f"FCM multicast failed for {len(chunk)} tokens: {str(e)}")
+                failed.update(chunk)
+
+        results = []
+        for job in jobs:
+            failed_count = sum(1 for token in job.tokens if token in failed)
+            sent_count = len(job.tokens) - failed_count
+            if sent_count:
+                detail = f"FCM notification sent to {sent_count} device(s)"
+            else:
+                detail = f"Failed to send FCM notification to any device ({failed_count} failures)"
+            results.append(DeliveryResult(job.key, 'push', sent_count > 0, detail, sent_count, failed_count))
+        return results
+
+
+# ==================== PRODUCTION TRANSPORTS ====================
+
+def build_mime_message(job: EmailJob) -> str:
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = job.subject
+    msg['From'] = job.from_email
+    msg['To'] = job.recipient
+    msg.attach(MIMEText(job.text, 'plain'))
+    msg.attach(MIMEText(job.html, 'html'))
+    return msg.as_string()
+
+
+def _create_dispatcher(config) -> NotificationDispatcher:
+    """Wire the dispatcher to SMTP (preferred) or SES, and FCM, from Flask config"""
+    smtp_host = config.get('SES_SMTP_HOST') or config.get('MAIL_SERVER')
+    smtp_port = config.get('SES_SMTP_PORT') or config.get('MAIL_PORT', 587)
+    smtp_username = config.get('SES_SMTP_USERNAME') or config.get('MAIL_USERNAME')
+    smtp_password = config.get('SES_SMTP_PASSWORD') or config.get('MAIL_PASSWORD')
+    email_connections = config.get('NOTIFICATION_EMAIL_CONNECTIONS', 4)
+
+    if smtp_host and smtp_username and smtp_password:
+        smtp_pool = SMTPConnectionPool(smtp_host, smtp_port, smtp_username, smtp_password, size=email_connections)
+
+        def send_email(job: EmailJob) -> str:
+            smtp_pool.send(job.from_email, [job.recipient], build_mime_message(job))
+            return "Email sent successfully via SMTP"
+
+    elif config.get('AWS_ACCESS_KEY_ID') and config.get('AWS_SECRET_ACCESS_KEY'):
+        import boto3
+        ses_client = boto3.client(
+            'ses',
+            aws_access_key_id=config.get('AWS_ACCESS_KEY_ID'),
+            aws_secret_access_key=config.get('AWS_SECRET_ACCESS_KEY'),
+            region_name='us-east-1'  # SES region
+        )
+
+        def send_email(job: EmailJob) -> str:
+            response = ses_client.send_email(
+                Source=job.from_email,
+                Destination={'ToAddresses': [job.recipient]},
+                Message={
+                    'Subject': {'Data': job.subject, 'Charset': 'UTF-8'},
+                    'Body': {
+                        'Text': {'Data': job.text, 'Charset': 'UTF-8'},
+                        'Html': {'Data': job.html, 'Charset': 'UTF-8'}
+                    }
+                }
+            )
+            return f"Email sent via SES (Message ID: {response['MessageId']})"
+
+    else:
+        def send_email(job: EmailJob) -> str:
+            raise RuntimeError("Email server not configured")
+
+    from app.services.fcm_service import get_fcm_service
+    fcm_service = get_fcm_service()
+
+    return NotificationDispatcher(
+        send_email=send_email,
+        send_multicast=fcm_service.send_multicast_notification,
+        rates={
+            'email': config.get('NOTIFICATION_EMAIL_RATE_PER_SECOND', 14),
+            'push': config.get('NOTIFICATION_PUSH_RATE_PER_SECOND', 50),
+            'sms': config.get('NOTIFICATION_SMS_RATE_PER_SECOND', 10),
+        },
+        concurrency={
+            'email': email_connections,
+            'push': config.get('NOTIFICATION_PUSH_CONCURRENCY', 8),
+            'sms': 2,
+        }
+    )
+
+
+# ==================== SERVICE INSTANCE ====================
+
+_dispatcher_instance: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get the process-wide dispatcher (created from current_app.config on first use)"""
+    global _dispatcher_instance
+    if _dispatcher_instance is None:
+        from flask import current_app
+        with _dispatcher_lock:
+            if _dispatcher_instance is None:
+                _dispatcher_instance = _create_dispatcher(current_app.config)
+    return _dispatcher_instance
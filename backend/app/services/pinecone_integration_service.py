@@ -11,6 +11,10 @@ import openai
 from datetime import datetime, timezone
 import httpx
 from pinecone import Pinecone
+from shared.embedding_cache import get_embedding_cache
+
+# Cache namespace for the book-notes embedding model
+BOOK_NOTES_EMBEDDING_MODEL_ID = "text-embedding-3-small:1024"
 
 def safe_log(level: str, message: str):
     """Safely log message, handling cases where Flask context is not available"""
@@ -61,13 +65,20 @@ class PineconeBookNotesService:
     def create_embedding(self, text: str) -> List[float]:
         """Create embedding for text using OpenAI with 1024 dimensions"""
         try:
+            embedding_cache = get_embedding_cache()
+            embedding = embedding_cache.get(BOOK_NOTES_EMBEDDING_MODEL_ID, text)
+            if embedding is not None:
+                return embedding
+            
             # Use text-embedding-3-small with dimension parameter to get 1024 dimensions
             response = self.client.embeddings.create(
                 model="text-embedding-3-small",
                 input=text,
                 dimensions=1024  # Specify 1024 dimensions to match the dog-project index
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            embedding_cache.put(BOOK_NOTES_EMBEDDING_MODEL_ID, text, embedding)
+            return embedding
         except Exception as e:
             safe_log('error', f"❌ Error creating embedding: {str(e)}")
             return []
@@ -16,6 +16,9 @@ from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 import atexit
 import os
 import json
+import time as time_module
+import numpy as np
+from sqlalchemy import and_, or_
 
 from app import db
 from app.models.health_models import (
@@ -27,6 +30,24 @@ from app.services.reminder_notification_service import get_notification_service
 
 logger = logging.getLogger(__name__)
 
+# Columns the bulk scheduler needs; skips hydrating full HealthReminder objects
+_SCHEDULE_PROJECTION = (
+    HealthReminder.id,
+    HealthReminder.due_date,
+    HealthReminder.due_time,
+    HealthReminder.reminder_date,
+    HealthReminder.reminder_time,
+    HealthReminder.extra_data,
+)
+
+# Fire 30 seconds early so delivery lands on time
+TRIGGER_BUFFER_SECONDS = 30
+# A reminder scheduled up to 5 minutes after its time fires immediately
+# instead of being moved to tomorrow
+PASSED_TRIGGER_GRACE_SECONDS = 300
+DEFAULT_TRIGGER_TIME = time(9, 0)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 class PrecisionReminderScheduler:
     """
     Precision reminder scheduler using APScheduler
@@ -39,6 +60,13 @@ class PrecisionReminderScheduler:
         self.notification_service = get_notification_service()
         self.is_running = False
         
+        # Only reminders firing before window_end are materialized as jobs;
+        # a rolling job extends the window as time passes
+        self.window_hours = app.config.get('REMINDER_SCHEDULE_WINDOW_HOURS', 24) if app else 24
+        self.refill_minutes = app.config.get('REMINDER_SCHEDULE_REFILL_MINUTES', 60) if app else 60
+        self._window_end = None
+        self._last_window_load = {}
+        
         # Ensure jobs directory exists
         jobs_dir = app.config.get('JOB_STORE_DIR', 'jobs') if app else 'jobs'
         os.makedirs(jobs_dir, exist_ok=True)
@@ -90,15 +118,16 @@ class PrecisionReminderScheduler:
             return
         
         try:
+            # Queue the first window of pending reminders before starting so
+            # APScheduler writes them to the job store in a single pass
+            self._schedule_existing_reminders()
+            
             self.scheduler.start()
             self.is_running = True
             
             # Register cleanup on exit
             atexit.register(self.stop)
             
-            # Schedule existing pending reminders
-            self._schedule_existing_reminders()
-            
             # Schedule recurring maintenance tasks
             self._schedule_maintenance_tasks()
             
@@ -116,6 +145,9 @@ class PrecisionReminderScheduler:
         try:
             self.scheduler.shutdown()
             self.is_running = False
+            
+            from app.services.reminder_due_queue import stop_reminder_dispatcher
+            stop_reminder_dispatcher()
             logger.info("🛑 Precision reminder scheduler stopped")
             
         except Exception as e:
@@ -130,28 +162,118 @@ class PrecisionReminderScheduler:
         logger.error(f"❌ Job error: {event.job_id} - {event.exception}")
     
     def _schedule_existing_reminders(self):
-        """Schedule all existing pending reminders"""
+        """Bulk-schedule pending reminders that fire inside the scheduling window"""
+        now = time_module.time()
+        self._window_end = now + self.window_hours * 3600
+        self._materialize_window(now, self._window_end, move_passed=True,
+                                 grace_seconds=PASSED_TRIGGER_GRACE_SECONDS)
+    
+    def _extend_schedule_window(self):
+        """Rolling job: materialize reminders that entered the window since the last load"""
+        if self._window_end is None:
+            return
+        start = self._window_end
+        end = time_module.time() + self.window_hours * 3600
+        if end <= start:
+            return
+        # Publish the new edge first so reminders created meanwhile are added directly
+        self._window_end = end
+        self._materialize_window(start, end, move_passed=False)
+    
+    def _materialize_window(self, start: float, end: float, move_passed: bool,
+                            grace_seconds: float = 0):
+        """
+        Add jobs for pending reminders whose trigger falls in (start, end]
+        
+        Args:
+            start: Window start as a UTC epoch
+            end: Window end as a UTC epoch
+            move_passed: Move reminders whose time already passed today to tomorrow
+                (startup only, matching the single-reminder path)
+            grace_seconds: Reminders whose time passed less than this long before
+                start fire at start instead (startup only)
+        """
+        started = time_module.perf_counter()
         try:
             with self.app.app_context():
-                # Get all pending reminders
-                pending_reminders = db.session.query(HealthReminder).filter(
-                    HealthReminder.status == ReminderStatus.PENDING
-                ).all()
-                
-                scheduled_count = 0
-                skipped_count = 0
-                
-                for reminder in pending_reminders:
-                    if self._schedule_single_reminder(reminder):
-                        scheduled_count += 1
-                    else:
-                        skipped_count += 1
-                
-                logger.info(f"📅 Scheduled {scheduled_count} reminders, skipped {skipped_count}")
-                
+                # Trigger dates are local, so pad the UTC range by a day each side
+                low = datetime.fromtimestamp(start, pytz.UTC).date() - timedelta(days=1)
+                high = datetime.fromtimestamp(end, pytz.UTC).date() + timedelta(days=1)
+                rows = (db.session.query(*_SCHEDULE_PROJECTION, User.timezone)
+                        .outerjoin(User, User.id == HealthReminder.user_id)
+                        .filter(
+                            HealthReminder.status == ReminderStatus.PENDING,
+                            or_(
+                                and_(HealthReminder.reminder_date.between(low, high),
+                                     HealthReminder.reminder_time.isnot(None)),
+                                HealthReminder.due_date.between(low, high)
+                            )
+                        )
+                        .yield_per(5000))
+                triggers, moved, invalid_timezones = compute_trigger_times(
+                    rows, start, end, move_passed, grace_seconds
+                )
+                self._apply_bulk_fixes(moved, invalid_timezones)
+                db.session.remove()
+            
+            self._add_reminder_jobs(triggers)
+            self._last_window_load = {
+                'jobs_added': len(triggers),
+                'moved_to_tomorrow': sum(len(ids) for ids in moved.values()),
+                'seconds': round(time_module.perf_counter() - started, 3),
+                'window_end': datetime.fromtimestamp(end, pytz.UTC).isoformat(),
+            }
+            logger.info(f"📅 Scheduled {len(triggers)} reminders up to "
+                        f"{self._last_window_load['window_end']} in {self._last_window_load['seconds']}s")
+            
         except Exception as e:
             logger.error(f"❌ Error scheduling existing reminders: {str(e)}")
     
+    def _apply_bulk_fixes(self, moved: Dict[tuple, List[int]], invalid_timezones: set):
+        """Persist moved-to-tomorrow dates and reset invalid user timezones in one commit"""
+        if not moved and not invalid_timezones:
+            return
+        try:
+            for (column, new_date), ids in moved.items():
+                for i in range(0, len(ids), 1000):
+                    (db.session.query(HealthReminder)
+                     .filter(HealthReminder.id.in_(ids[i:i + 1000]))
+                     .update({getattr(HealthReminder, column): new_date}, synchronize_session=False))
+            if invalid_timezones:
+                logger.warning(f"❌ Invalid user timezones {sorted(invalid_timezones)}, resetting to UTC")
+                (db.session.query(User)
+                 .filter(User.timezone.in_(list(invalid_timezones)))
+                 .update({User.timezone: 'UTC'}, synchronize_session=False))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"⚠️  Failed to persist bulk reminder date fixes: {str(e)}")
+    
+    def _job_app_config(self) -> Dict[str, Any]:
+        """Config handed to the standalone notification function"""
+        return {
+            'DATABASE_URL': self.app.config.get('DATABASE_URL'),
+            'SECRET_KEY': self.app.config.get('SECRET_KEY')
+        }
+    
+    def _add_reminder_jobs(self, triggers: List[tuple]):
+        """
+        Register one date job per (reminder_id, utc_epoch)
+        
+        Triggers arrive sorted by fire time so each insert lands at the end of
+        the memory store's sorted job list.
+        """
+        app_config = self._job_app_config()
+        for reminder_id, fire_at in triggers:
+            self.scheduler.add_job(
+                func=send_reminder_notification_standalone,
+                trigger='date',
+                run_date=datetime.fromtimestamp(fire_at, pytz.UTC),
+                args=[reminder_id, app_config],
+                id=f"reminder_{reminder_id}",
+                replace_existing=True
+            )
+    
     def _schedule_maintenance_tasks(self):
         """
         Schedule recurring maintenance tasks for the scheduler
@@ -168,16 +290,21 @@ class PrecisionReminderScheduler:
                 max_instances=1
             )
             
-            # Follow-up notification checks every 1 minute (changed from 5 minutes)
+            # Roll the scheduling window forward well before it runs out
             self.scheduler.add_job(
-                func=self._check_followup_notifications,
+                func=self._extend_schedule_window,
                 trigger='interval',
-                minutes=2,  # Changed from 5 minutes to 2 minute
-                id='followup_notifications_check',
+                minutes=self.refill_minutes,
+                id='extend_schedule_window',
                 replace_existing=True,
                 max_instances=1
             )
             
+            # Follow-ups come off the due-time queue as each one comes due
+            # instead of a 2-minute poll over every pending reminder
+            from app.services.reminder_due_queue import FOLLOWUP, start_reminder_dispatcher
+            start_reminder_dispatcher(self.app, kinds=(FOLLOWUP,))
+            
             logger.info("🔧 Maintenance tasks scheduled")
             
         except Exception as e:
@@ -346,19 +473,22 @@ class PrecisionReminderScheduler:
                 logger.warning(f"⚠️  Cannot calculate trigger time for reminder {reminder.id}")
                 return False
             
-            # Skip if trigger time is in the past
-            if trigger_datetime <= datetime.now(pytz.UTC):
-                logger.info(f"⏰ Skipping reminder {reminder.id} - trigger time is in the past")
-                return False
+            # Passed within the grace window (anything older was rejected): fire now
+            now_utc = datetime.now(pytz.UTC)
+            if trigger_datetime <= now_utc:
+                logger.info(f"⏰ Reminder {reminder.id} trigger time just passed - firing now")
+                trigger_datetime = now_utc
+            
+            # Beyond the window: the rolling window job materializes it later
+            if self._window_end is not None and trigger_datetime.timestamp() > self._window_end:
+                logger.info(f"🗓️  Reminder {reminder.id} at {trigger_datetime} is beyond the scheduling window")
+                return True
             
             # Create job ID
             job_id = f"reminder_{reminder.id}"
             
             # Get app config for the standalone function
-            app_config = {
-                'DATABASE_URL': self.app.config.get('DATABASE_URL'),
-                'SECRET_KEY': self.app.config.get('SECRET_KEY')
-            }
+            app_config = self._job_app_config()
             
             # Schedule the job using the standalone function
             self.scheduler.add_job(
@@ -452,8 +582,10 @@ class PrecisionReminderScheduler:
                 current_date = now_user_tz.date()
                 current_time = now_user_tz.time()
                 
-                # Check if time has passed today
-                if (trigger_date == current_date and trigger_time <= current_time):
+                # Check if time has passed today, beyond the grace window
+                if (trigger_date == current_date and
+                        datetime.combine(trigger_date, trigger_time) <= datetime.combine(current_date, current_time)
+                        - timedelta(seconds=PASSED_TRIGGER_GRACE_SECONDS)):
                     logger.info(f"⏰ Reminder time {trigger_time} has passed today, moving to tomorrow")
                     trigger_date = trigger_date + timedelta(days=1)
                     naive_trigger_datetime = datetime.combine(trigger_date, trigger_time)
@@ -485,8 +617,10 @@ class PrecisionReminderScheduler:
                 current_date = now_user_tz.date()
                 current_time = now_user_tz.time()
                 
-                # Check if time has passed today
-                if (trigger_date == current_date and trigger_time <= current_time):
+                # Check if time has passed today, beyond the grace window
+                if (trigger_date == current_date and
+                        datetime.combine(trigger_date, trigger_time) <= datetime.combine(current_date, current_time)
+                        - timedelta(seconds=PASSED_TRIGGER_GRACE_SECONDS)):
                     logger.info(f"⏰ Reminder time {trigger_time} has passed today, moving to tomorrow")
                     trigger_date = trigger_date + timedelta(days=1)
                     naive_trigger_datetime = datetime.combine(trigger_date, trigger_time)
@@ -531,13 +665,13 @@ class PrecisionReminderScheduler:
             utc_trigger_datetime = aware_trigger_datetime.astimezone(pytz.UTC)
             
             # Apply small buffer to ensure timely delivery
-            utc_trigger_datetime = utc_trigger_datetime - timedelta(seconds=30)
+            utc_trigger_datetime = utc_trigger_datetime - timedelta(seconds=TRIGGER_BUFFER_SECONDS)
             
             # Final validation - ensure it's in the future
             now_utc = datetime.now(pytz.UTC)
             if utc_trigger_datetime <= now_utc:
                 time_diff = (now_utc - utc_trigger_datetime).total_seconds()
-                if time_diff < 300:  # Less than 5 minutes in the past - allow it
+                if time_diff < PASSED_TRIGGER_GRACE_SECONDS + TRIGGER_BUFFER_SECONDS:  # Within the grace window - allow it
                     logger.warning(f"⚠️  Trigger time {utc_trigger_datetime} is {time_diff:.0f}s in the past, but allowing")
                 else:
                     logger.warning(f"❌ Trigger time {utc_trigger_datetime} is {time_diff:.0f}s in the past (now: {now_utc})")
@@ -620,8 +754,10 @@ class PrecisionReminderScheduler:
             # Create new reminder instance
             new_reminder = self._create_recurring_reminder(reminder, next_due_date)
             if new_reminder:
-                # Schedule the new reminder
+                # Schedule the new reminder and queue its follow-ups
+                from app.services.reminder_due_queue import sync_reminder
                 self.schedule_reminder(new_reminder)
+                sync_reminder(new_reminder)
                 logger.info(f"🔄 Scheduled next recurrence for reminder {reminder.id}")
             
         except Exception as e:
@@ -703,6 +839,8 @@ class PrecisionReminderScheduler:
                     'overdue_reminders': overdue_count,
                     'scheduled_jobs': scheduled_jobs,
                     'total_jobs': len(self.scheduler.get_jobs()),
+                    'schedule_window_hours': self.window_hours,
+                    'last_window_load': self._last_window_load,
                     'timestamp': datetime.now().isoformat()
                 }
                 
@@ -805,6 +943,139 @@ class PrecisionReminderScheduler:
             logger.error(f"❌ Error in timezone validation: {str(e)}")
             return {"status": "error", "error": str(e)}
 
+# ==================== BULK TRIGGER COMPUTATION ====================
+
+_timezone_cache: Dict[str, Any] = {}
+
+def _resolve_timezone(name: Optional[str]):
+    """pytz timezone for a name, or None when it is not a valid zone (cached)"""
+    if name not in _timezone_cache:
+        try:
+            _timezone_cache[name] = pytz.timezone(name)
+        except Exception:
+            _timezone_cache[name] = None
+    return _timezone_cache[name]
+
+def _metadata_timezone(extra_data) -> Optional[str]:
+    """The 'user_timezone' stored in a reminder's extra_data at creation, if any"""
+    if not extra_data:
+        return None
+    try:
+        metadata = json.loads(extra_data) if isinstance(extra_data, str) else extra_data
+    except ValueError:
+        return None
+    if isinstance(metadata, dict) and metadata.get('user_timezone'):
+        return metadata['user_timezone']
+    return None
+
+def compute_trigger_times(rows, start: float, end: float, move_passed: bool = True,
+                          grace_seconds: float = 0):
+    """
+    Vectorized equivalent of _calculate_trigger_time for many reminders
+    
+    Rows are grouped by their effective timezone. Within a group the local
+    trigger datetimes become NumPy arrays, the UTC offset is looked up once per
+    distinct local hour (DST shifts happen on the hour) and the UTC epochs are
+    computed in one pass.
+    
+    Args:
+        rows: Rows with id, due_date, due_time, reminder_date, reminder_time,
+            extra_data and timezone (the user's)
+        start: Keep triggers strictly after this UTC epoch
+        end: Keep triggers at or before this UTC epoch
+        move_passed: Move reminders whose time already passed today to tomorrow
+        grace_seconds: Reminders whose time passed less than this long before
+            start are neither moved nor dropped; their trigger is start
+    
+    Returns:
+        (triggers, moved, invalid_timezones): triggers is a list of
+        (reminder_id, utc_epoch) sorted by epoch; moved maps
+        (column, new_date) to the reminder ids whose date must be persisted;
+        invalid_timezones holds user timezone names that failed to resolve
+    """
+    groups: Dict[str, tuple] = {}
+    invalid_timezones = set()
+    
+    for row in rows:
+        tz_name = 'UTC'
+        if row.timezone:
+            if _resolve_timezone(row.timezone):
+                tz_name = row.timezone
+            else:
+                invalid_timezones.add(row.timezone)
+        metadata_tz = _metadata_timezone(row.extra_data)
+        if metadata_tz and _resolve_timezone(metadata_tz):
+            tz_name = metadata_tz
+        
+        uses_reminder_date = bool(row.reminder_date and row.reminder_time)
+        if uses_reminder_date:
+            trigger_date, trigger_time = row.reminder_date, row.reminder_time
+        else:
+            trigger_date, trigger_time = row.due_date, row.due_time or DEFAULT_TRIGGER_TIME
+        
+        ids, ordinals, seconds, flags = groups.setdefault(tz_name, ([], [], [], []))
+        ids.append(row.id)
+        ordinals.append(trigger_date.toordinal())
+        seconds.append(trigger_time.hour * 3600 + trigger_time.minute * 60
+                       + trigger_time.second + trigger_time.microsecond / 1e6)
+        flags.append(uses_reminder_date)
+    
+    server_today = date.today().toordinal()
+    moved: Dict[tuple, List[int]] = {}
+    trigger_ids, trigger_epochs = [], []
+    
+    for tz_name, (ids, ordinals, seconds, flags) in groups.items():
+        tz = _resolve_timezone(tz_name)
+        ids = np.asarray(ids, dtype=np.int64)
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        seconds = np.asarray(seconds, dtype=np.float64)
+        flags = np.asarray(flags, dtype=bool)
+        
+        # Time already passed today in the user's timezone: move to tomorrow
+        now_local = datetime.fromtimestamp(start, tz)
+        now_seconds = (now_local.hour * 3600 + now_local.minute * 60
+                       + now_local.second + now_local.microsecond / 1e6)
+        today = now_local.date().toordinal()
+        passed = (ordinals == today) & (seconds <= now_seconds - grace_seconds)
+        if move_passed and passed.any():
+            ordinals[passed] += 1
+            tomorrow = date.fromordinal(today + 1)
+            for column, mask in (('reminder_date', passed & flags), ('due_date', passed & ~flags)):
+                if mask.any():
+                    moved.setdefault((column, tomorrow), []).extend(ids[mask].tolist())
+        
+        # Naive local epochs, shifted by the zone's offset for each local hour
+        local_epochs = (ordinals - EPOCH_ORDINAL) * 86400 + seconds
+        if tz is pytz.UTC:
+            utc_epochs = local_epochs
+        else:
+            hours, inverse = np.unique(np.floor_divide(local_epochs, 3600), return_inverse=True)
+            offsets = np.array([
+                tz.localize(datetime(1970, 1, 1) + timedelta(hours=int(hour))).utcoffset().total_seconds()
+                for hour in hours
+            ])
+            utc_epochs = local_epochs - offsets[inverse.reshape(-1)]
+        utc_epochs = utc_epochs - TRIGGER_BUFFER_SECONDS
+        
+        keep = (ordinals >= server_today) & (utc_epochs <= end)
+        if grace_seconds:
+            # Just passed: fire immediately
+            keep &= utc_epochs > start - grace_seconds - TRIGGER_BUFFER_SECONDS
+            utc_epochs = np.maximum(utc_epochs, start)
+        else:
+            keep &= utc_epochs > start
+        trigger_ids.append(ids[keep])
+        trigger_epochs.append(utc_epochs[keep])
+    
+    if not trigger_ids:
+        return [], moved, invalid_timezones
+    
+    all_ids = np.concatenate(trigger_ids)
+    all_epochs = np.concatenate(trigger_epochs)
+    order = np.argsort(all_epochs, kind='stable')
+    triggers = list(zip(all_ids[order].tolist(), all_epochs[order].tolist()))
+    return triggers, moved, invalid_timezones
+
 # ==================== SERVICE INSTANCE ====================
 
 _precision_scheduler_instance = None
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Reminder Due Queue
+Event-driven reminder dispatch: pending reminders live in an in-memory min-heap
+keyed by their next fire time, and a single dispatcher thread sleeps until the
+head of the heap is due instead of polling the database.
+
+The database stays the source of truth - the heap is rebuilt at startup from
+one projected query over pending reminders (served by the status indexes) and
+kept in sync by the reminder routes whenever a reminder is created, edited,
+completed or deleted. Writers that do not call sync_reminder() - other
+services, the chat backends, other gunicorn workers with their own forked
+copy of the heap - are picked up by a periodic delta resync over rows created
+or updated since the previous one.
+"""
+
+import calendar
+import heapq
+import itertools
+import logging
+import threading
+import time as time_module
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import or_
+
+from app import db
+from app.models.health_models import HealthReminder, ReminderStatus
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Entry kinds: the primary reminder notification and the overdue follow-ups
+NOTIFY = 'notify'
+FOLLOWUP = 'followup'
+KINDS = (NOTIFY, FOLLOWUP)
+
+# should_send_notification() accepts a reminder this long after its time
+NOTIFY_WINDOW_SECONDS = 3600
+NOTIFY_WINDOW_NO_TZ_SECONDS = 21600
+
+# The delta resync re-reads rows touched this long before its previous run, to
+# cover writer clock skew and transactions that committed after that run read
+RESYNC_OVERLAP_SECONDS = 120
+
+# Columns needed to compute fire times - the rebuild never loads full rows
+_PROJECTION = (
+    HealthReminder.id,
+    HealthReminder.due_date,
+    HealthReminder.due_time,
+    HealthReminder.reminder_date,
+    HealthReminder.reminder_time,
+    HealthReminder.last_notification_sent,
+    HealthReminder.enable_followup_notifications,
+    HealthReminder.followup_notifications_stopped,
+    HealthReminder.current_followup_count,
+    HealthReminder.max_followup_count,
+    HealthReminder.next_followup_at,
+)
+
+
+# ==================== FIRE TIME CALCULATION ====================
+
+def _reminder_datetime(reminder) -> Optional[datetime]:
+    """Naive local send time, mirroring HealthReminder.get_reminder_datetime()"""
+    if reminder.reminder_date:
+        return datetime.combine(reminder.reminder_date, reminder.reminder_time or time(9, 0))
+    if reminder.due_date:
+        return datetime.combine(reminder.due_date, reminder.due_time or time(9, 0))
+    return None
+
+
+def _due_datetime(reminder) -> Optional[datetime]:
+    """Naive due time, mirroring HealthReminder.get_next_due_datetime()"""
+    if not reminder.due_date:
+        return None
+    return datetime.combine(reminder.due_date, reminder.due_time or time(9, 0))
+
+
+def notification_due_at(reminder, user_timezone: Optional[str], now: float) -> Optional[float]:
+    """
+    When the primary notification for a reminder should fire
+
+    Args:
+        reminder: HealthReminder or a row with the projected columns
+        user_timezone: The owner's IANA timezone, if any
+        now: Current UTC epoch seconds
+
+    Returns:
+        UTC epoch seconds, or None if already notified or past the send window
+    """
+    local_dt = _reminder_datetime(reminder)
+    if not local_dt:
+        return None
+
+    window = NOTIFY_WINDOW_NO_TZ_SECONDS
+    fire_at = calendar.timegm(local_dt.timetuple()) + local_dt.microsecond / 1e6
+    if user_timezone:
+        try:
+            aware = pytz.timezone(user_timezone).localize(local_dt)
+            fire_at = aware.timestamp()
+            window = NOTIFY_WINDOW_SECONDS
+        except Exception:
+            pass
+
+    # Already notified for this occurrence
+    last_sent = reminder.last_notification_sent
+    if last_sent and calendar.timegm(last_sent.timetuple()) >= fire_at - window:
+        return None
+
+    if fire_at + window < now:
+        return None
+    return max(fire_at, now)
+
+
+def followup_due_at(reminder) -> Optional[float]:
+    """
+    When the next follow-up for a reminder should fire
+
+    Mirrors HealthReminder.should_send_followup(), which compares naive times
+    against the server clock, so the result is the server-local epoch.
+
+    Returns:
+        Epoch seconds, or None if no follow-up is pending
+    """
+    if not reminder.enable_followup_notifications or reminder.followup_notifications_stopped:
+        return None
+    if (reminder.current_followup_count or 0) >= (reminder.max_followup_count or 0):
+        return None
+
+    due_dt = _due_datetime(reminder)
+    if not due_dt:
+        return None
+
+    if reminder.next_followup_at:
+        return max(due_dt, reminder.next_followup_at).timestamp()
+    if not reminder.current_followup_count:
+        return due_dt.timestamp()
+    return None
+
+
+# ==================== DUE-TIME HEAP ====================
+
+class ReminderDueQueue:
+    """
+    Thread-safe min-heap of (fire time, reminder id, kind)
+
+    Rescheduling and cancelling are lazy: the live sequence number for each
+    (reminder, kind) is kept in a map and stale heap entries are skipped when
+    they reach the top, so every operation is O(log n).
+    """
+
+    def __init__(self, clock: Callable[[], float] = time_module.time):
+        self._clock = clock
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._live: Dict[Tuple[int, str], int] = {}
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def load(self, entries: Iterable[Tuple[int, str, float]]):
+        """Replace the queue contents with (reminder_id, kind, fire_at) entries in O(n)"""
+        with self._condition:
+            self._heap = []
+            self._live = {}
+            for reminder_id, kind, fire_at in entries:
+                seq = next(self._seq)
+                self._heap.append((fire_at, seq, reminder_id, kind))
+                self._live[(reminder_id, kind)] = seq
+            heapq.heapify(self._heap)
+            self._condition.notify_all()
+
+    def schedule(self, reminder_id: int, kind: str, fire_at: Optional[float]):
+        """Add or move an entry; a None fire time removes it"""
+        with self._condition:
+            if fire_at is None:
+                self._live.pop((reminder_id, kind), None)
+                return
+
+            seq = next(self._seq)
+            self._live[(reminder_id, kind)] = seq
+            heapq.heappush(self._heap, (fire_at, seq, reminder_id, kind))
+            self._maybe_compact()
+
+            # Only wake the dispatcher if its current deadline moved earlier
+            if self._heap[0][1] == seq:
+                self._condition.notify_all()
+
+    def cancel(self, reminder_id: int, kinds: Iterable[str] = KINDS):
+        with self._condition:
+            for kind in kinds:
+                self._live.pop((reminder_id, kind), None)
+
+    def next_fire_at(self) -> Optional[float]:
+        with self._condition:
+            self._drop_stale_head()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, limit: int = 500) -> List[Tuple[int, str, float]]:
+        """Remove and return up to `limit` entries whose fire time has passed"""
+        with self._condition:
+            return self._pop_due_locked(self._clock(), limit)
+
+    def wait_for_due(self, max_wait: float, limit: int = 500) -> List[Tuple[int, str, float]]:
+        """
+        Block until the head entry is due, then pop due entries
+
+        Returns early with an empty list after `max_wait` seconds or when
+        `wake()` is called.
+        """
+        with self._condition:
+            now = self._clock()
+            self._drop_stale_head()
+            if self._heap and self._heap[0][0] <= now:
+                return self._pop_due_locked(now, limit)
+
+            timeout = max_wait
+            if self._heap:
+                timeout = min(max_wait, self._heap[0][0] - now)
+            self._condition.wait(timeout)
+            return self._pop_due_locked(self._clock(), limit)
+
+    def wake(self):
+        with self._condition:
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            self._drop_stale_head()
+            return {
+                'queued': len(self._live),
+                'heap_size': len(self._heap),
+                'next_fire_at': (
+                    datetime.utcfromtimestamp(self._heap[0][0]).isoformat() if self._heap else None
+                ),
+            }
+
+    def _pop_due_locked(self, now: float, limit: int) -> List[Tuple[int, str, float]]:
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            fire_at, seq, reminder_id, kind = heapq.heappop(self._heap)
+            if self._live.get((reminder_id, kind)) == seq:
+                del self._live[(reminder_id, kind)]
+                due.append((reminder_id, kind, fire_at))
+        return due
+
+    def _drop_stale_head(self):
+        while self._heap:
+            _, seq, reminder_id, kind = self._heap[0]
+            if self._live.get((reminder_id, kind)) == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self):
+        """Rebuild the heap once stale entries outnumber live ones"""
+        if len(self._heap) > 2 * len(self._live) + 1024:
+            self._heap = [
+                entry for entry in self._heap
+                if self._live.get((entry[2], entry[3])) == entry[1]
+            ]
+            heapq.heapify(self._heap)
+
+
+# ==================== DISPATCHER ====================
+
+class ReminderDispatcher:
+    """
+    Dispatcher thread draining a ReminderDueQueue
+
+    Due entries are re-validated against the database before sending (so a
+    reminder completed on another worker is skipped), loaded in one query per
+    batch, and follow-ups are rescheduled from the updated row. Between
+    wake-ups the thread resyncs rows created or updated in the database since
+    its last read.
+    """
+
+    def __init__(self, app, kinds: Iterable[str] = KINDS, batch_size: int = 500,
+                 max_idle_seconds: float = 300, resync_interval_seconds: float = 60):
+        """
+        Initialize the dispatcher
+
+        Args:
+            app: Flask app used for the dispatcher's app context
+            kinds: Entry kinds this dispatcher owns (NOTIFY and/or FOLLOWUP)
+            batch_size: Maximum reminders loaded and sent per wake-up
+            max_idle_seconds: Upper bound on a single sleep, as a guard against clock jumps
+            resync_interval_seconds: How often rows written outside sync_reminder() are picked up
+        """
+        self.app = app
+        self.kinds = set(kinds)
+        self.batch_size = batch_size
+        self.max_idle_seconds = max_idle_seconds
+        self.resync_interval_seconds = resync_interval_seconds
+        self.queue = ReminderDueQueue()
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'dispatched': 0, 'sent': 0, 'skipped': 0, 'failed': 0, 'max_lag_seconds': 0.0}
+        self._last_rebuild: Optional[Dict[str, Any]] = None
+        self._last_resync: Optional[Dict[str, Any]] = None
+        self._resync_stats = {'resyncs': 0, 'resynced_rows': 0, 'resync_errors': 0}
+        # Database-clock (naive UTC) watermark of the last full or delta read
+        self._synced_through: Optional[datetime] = None
+        self._next_resync_at = 0.0
+
+    def start(self):
+        if self.is_running:
+            return
+
+        self.rebuild()
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, name='reminder-dispatcher', daemon=True)
+        self._thread.start()
+        logger.info(f"🚀 Reminder dispatcher started for {sorted(self.kinds)} ({len(self.queue)} queued)")
+
+    def stop(self):
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self.queue.wake()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        logger.info("🛑 Reminder dispatcher stopped")
+
+    def rebuild(self):
+        """Reload the heap from a single projected query over pending reminders"""
+        started = time_module.perf_counter()
+        now = time_module.time()
+        read_at = datetime.utcnow()
+
+        with self.app.app_context():
+            rows = (db.session.query(*_PROJECTION, User.timezone)
+                    .outerjoin(User, User.id == HealthReminder.user_id)
+                    .filter(HealthReminder.status == ReminderStatus.PENDING)
+                    .yield_per(5000))
+            entries = list(self._entries_for_rows(rows, now))
+            db.session.remove()
+
+        self.queue.load(entries)
+        self._synced_through = read_at
+        self._next_resync_at = time_module.monotonic() + self.resync_interval_seconds
+        self._last_rebuild = {
+            'entries': len(entries),
+            'seconds': round(time_module.perf_counter() - started, 3),
+            'at': datetime.utcnow().isoformat(),
+        }
+        logger.info(f"📅 Rebuilt reminder due queue: {len(entries)} entries in {self._last_rebuild['seconds']}s")
+
+    def resync(self) -> int:
+        """
+        Apply reminders created or updated since the last read to the heap
+
+        Catches every write that bypassed sync_reminder() in this process.
+        Rows read at the previous run are read again within the overlap, which
+        is harmless: scheduling an entry again only replaces it.
+
+        Returns:
+            Number of rows applied
+        """
+        if self._synced_through is None:
+            self.rebuild()
+            return len(self.queue)
+
+        started = time_module.perf_counter()
+        now = time_module.time()
+        read_at = datetime.utcnow()
+        since = self._synced_through - timedelta(seconds=RESYNC_OVERLAP_SECONDS)
+        applied = 0
+
+        with self.app.app_context():
+            try:
+                # Raw SQL inserts from the chat services set created_at only
+                rows = (db.session.query(*_PROJECTION, HealthReminder.status, User.timezone)
+                        .outerjoin(User, User.id == HealthReminder.user_id)
+                        .filter(or_(HealthReminder.updated_at > since,
+                                    HealthReminder.created_at > since))
+                        .yield_per(1000))
+                for row in rows:
+                    if row.status != ReminderStatus.PENDING:
+                        self.queue.cancel(row.id, self.kinds)
+                    else:
+                        if NOTIFY in self.kinds:
+                            self.queue.schedule(row.id, NOTIFY, notification_due_at(row, row.timezone, now))
+                        if FOLLOWUP in self.kinds:
+                            self.queue.schedule(row.id, FOLLOWUP, followup_due_at(row))
+                    applied += 1
+            finally:
+                db.session.remove()
+
+        self._synced_through = read_at
+        self._resync_stats['resyncs'] += 1
+        self._resync_stats['resynced_rows'] += applied
+        self._last_resync = {
+            'rows': applied,
+            'seconds': round(time_module.perf_counter() - started, 3),
+            'at': read_at.isoformat(),
+        }
+        if applied:
+            logger.debug(f"🔄 Resynced {applied} reminders into the due queue")
+        return applied
+
+    def sync(self, reminder: HealthReminder, user_timezone: Optional[str] = None):
+        """Recompute a reminder's fire times after it was created or edited"""
+        if reminder.status != ReminderStatus.PENDING:
+            self.queue.cancel(reminder.id)
+            return
+
+        if user_timezone is None:
+            user = db.session.get(User, reminder.user_id)
+            user_timezone = user.timezone if user else None
+
+        now = time_module.time()
+        if NOTIFY in self.kinds:
+            self.queue.schedule(reminder.id, NOTIFY, notification_due_at(reminder, user_timezone, now))
+        if FOLLOWUP in self.kinds:
+            self.queue.schedule(reminder.id, FOLLOWUP, followup_due_at(reminder))
+
+    def dispatch_due(self) -> Dict[str, int]:
+        """Send everything that is due right now (manual trigger)"""
+        totals = {'sent': 0, 'skipped': 0, 'failed': 0}
+        while True:
+            due = self.queue.pop_due(self.batch_size)
+            if not due:
+                return totals
+            for name, count in self._dispatch(due).items():
+                totals[name] += count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'running': self.is_running,
+            'kinds': sorted(self.kinds),
+            'last_rebuild': self._last_rebuild,
+            'last_resync': self._last_resync,
+            'resync_interval_seconds': self.resync_interval_seconds,
+            **self.queue.get_stats(),
+            **self._stats,
+            **self._resync_stats,
+        }
+
+    def _entries_for_rows(self, rows, now: float):
+        for row in rows:
+            if NOTIFY in self.kinds:
+                fire_at = notification_due_at(row, row.timezone, now)
+                if fire_at is not None:
+                    yield row.id, NOTIFY, fire_at
+            if FOLLOWUP in self.kinds:
+                fire_at = followup_due_at(row)
+                if fire_at is not None:
+                    yield row.id, FOLLOWUP, fire_at
+
+    def _run(self):
+        while self.is_running:
+            try:
+                until_resync = self._next_resync_at - time_module.monotonic()
+                if until_resync <= 0:
+                    # Runs on this thread, so it never races a dispatch of the same rows
+                    self._next_resync_at = time_module.monotonic() + self.resync_interval_seconds
+                    try:
+                        self.resync()
+                    except Exception as e:
+                        self._resync_stats['resync_errors'] += 1
+                        logger.error(f"❌ Error resyncing reminder due queue: {str(e)}")
+                    continue
+
+                due = self.queue.wait_for_due(min(self.max_idle_seconds, until_resync), self.batch_size)
+                if due and self.is_running:
+                    self._dispatch(due)
+            except Exception as e:
+                logger.error(f"❌ Error in reminder dispatcher loop: {str(e)}")
+                time_module.sleep(5)
+
+    def _dispatch(self, due: List[Tuple[int, str, float]]) -> Dict[str, int]:
+        from app.services.followup_notification_service import get_followup_notification_service
+        from app.services.reminder_notification_service import get_notification_service
+
+        results = {'sent': 0, 'skipped': 0, 'failed': 0}
+        now = time_module.time()
+        self._stats['dispatched'] += len(due)
+        self._stats['max_lag_seconds'] = max(
+            self._stats['max_lag_seconds'], max(now - fire_at for _, _, fire_at in due)
+        )
+
+        with self.app.app_context():
+            try:
+                ids = {reminder_id for reminder_id, _, _ in due}
+                reminders = {
+                    r.id: r for r in
+                    db.session.query(HealthReminder).filter(HealthReminder.id.in_(ids)).all()
+                }
+                # Warm the identity map so should_send_notification()'s user lookups don't query
+                user_ids = {r.user_id for r in reminders.values()}
+                if user_ids:
+                    db.session.query(User).filter(User.id.in_(user_ids)).all()
+
+                notification_service = get_notification_service()
+                followup_service = get_followup_notification_service()
+                to_notify = []
+
+                for reminder_id, kind, _ in due:
+                    reminder = reminders.get(reminder_id)
+                    if not reminder or reminder.status != ReminderStatus.PENDING:
+                        results['skipped'] += 1
+                        continue
+
+                    try:
+                        if kind == NOTIFY:
+                            if reminder.should_send_notification():
+                                to_notify.append(reminder)
+                            else:
+                                results['skipped'] += 1
+                        else:
+                            if not reminder.should_send_followup():
+                                # Not yet (clock skew) or no longer eligible
+                                self.queue.schedule(reminder.id, FOLLOWUP, followup_due_at(reminder))
+                                results['skipped'] += 1
+                                continue
+                            sent = followup_service.send_followups([reminder])['followups_sent']
+                            results['sent' if sent else 'failed'] += 1
+                            self.queue.schedule(reminder.id, FOLLOWUP, followup_due_at(reminder))
+                    except Exception as e:
+                        results['failed'] += 1
+                        logger.error(f"❌ Error dispatching {kind} for reminder {reminder_id}: {str(e)}")
+
+                # Primary notifications go out as one concurrent batch
+                for result in notification_service.send_notifications_batch(to_notify):
+                    results['sent' if result.get('success') else 'failed'] += 1
+            finally:
+                db.session.remove()
+
+        for name, count in results.items():
+            self._stats[name] += count
+        if results['sent'] or results['failed']:
+            logger.info(f"🔔 Dispatched {len(due)} due reminder entries: {results}")
+        return results
+
+
+# ==================== SERVICE INSTANCE ====================
+
+_dispatcher_instance: Optional[ReminderDispatcher] = None
+
+def get_reminder_dispatcher() -> Optional[ReminderDispatcher]:
+    """Get the running dispatcher, if one was started in this process"""
+    return _dispatcher_instance
+
+def start_reminder_dispatcher(app, kinds: Iterable[str] = KINDS) -> ReminderDispatcher:
+    """
+    Start the process-wide dispatcher for the given entry kinds
+
+    A second caller asking for additional kinds widens the running dispatcher
+    and rebuilds its heap.
+    """
+    global _dispatcher_instance
+    kinds = set(kinds)
+
+    if _dispatcher_instance is None:
+        _dispatcher_instance = ReminderDispatcher(app, kinds)
+    elif not kinds <= _dispatcher_instance.kinds:
+        _dispatcher_instance.kinds |= kinds
+        if _dispatcher_instance.is_running:
+            _dispatcher_instance.rebuild()
+
+    _dispatcher_instance.start()
+    return _dispatcher_instance
+
+def stop_reminder_dispatcher():
+    if _dispatcher_instance:
+        _dispatcher_instance.stop()
+
+def sync_reminder(reminder: HealthReminder, user_timezone: Optional[str] = None):
+    """
+    Keep the due queue in step with a created, edited or completed reminder
+
+    Safe to call from request handlers: a no-op when no dispatcher runs in this
+    process (the dispatcher's delta resync picks the write up instead), and
+    errors are logged rather than raised.
+    """
+    if not _dispatcher_instance or not _dispatcher_instance.is_running:
+        return
+    try:
+        _dispatcher_instance.sync(reminder, user_timezone)
+    except Exception as e:
+        logger.error(f"❌ Error syncing reminder {reminder.id} with due queue: {str(e)}")
+
+def discard_reminder(reminder_id: int):
+    """Drop a deleted reminder from the due queue"""
+    if _dispatcher_instance:
+        _dispatcher_instance.queue.cancel(reminder_id)
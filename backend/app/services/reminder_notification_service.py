@@ -609,8 +609,174 @@ Mr. White - Your AI Pet Care Assistant
         
         return results
     
+    def send_notifications_batch(self, reminders: List[HealthReminder]) -> List[Dict[str, Any]]:
+        """
+        Send all enabled notifications for many reminders at once
+        
+        Same per-reminder result shape as send_all_notifications(), but every
+        channel of every reminder is handed to the notification dispatcher
+        together, users are loaded in one query and the notification rows and
+        reminder tracking are written in a single commit.
+        """
+        from app.services.fcm_service import FCMService, get_fcm_service
+        from app.services.notification_dispatch import (
+            EmailJob, PushJob, SmsJob, get_notification_dispatcher
+        )
+        
+        if not reminders:
+            return []
+        
+        results = {
+            reminder.id: {
+                'reminder_id': reminder.id,
+                'notifications_sent': [],
+                'notifications_failed': [],
+                'success': True
+            }
+            for reminder in reminders
+        }
+        
+        try:
+            user_ids = {reminder.user_id for reminder in reminders}
+            users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()}
+            by_id = {reminder.id: reminder for reminder in reminders}
+            from_email = current_app.config.get('SES_EMAIL_FROM') or current_app.config.get('MAIL_DEFAULT_SENDER', 'noreply@mrwhite.com')
+            click_action = f"{current_app.config.get('FRONTEND_URL')}/reminders"
+            fcm_available = None
+            
+            emails, pushes, sms_jobs, log_rows = [], [], [], []
+            
+            def record_failure(reminder, user, channel, recipient, error):
+                results[reminder.id]['notifications_failed'].append({'type': channel, 'error': error})
+                log_rows.append(self._notification_row(
+                    reminder.id, user.id, channel, NotificationStatus.FAILED, recipient, error_message=error
+                ))
+            
+            for reminder in reminders:
+                user = users.get(reminder.user_id)
+                if not user:
+                    results[reminder.id]['success'] = False
+                    results[reminder.id]['error'] = f"User {reminder.user_id} not found"
+                    continue
+                
+                if reminder.send_email and user.email:
+                    subject, html_content, text_content = self._create_reminder_email_content(reminder, user)
+                    emails.append(EmailJob(reminder.id, user.email, subject, html_content, text_content, from_email))
+                
+                if reminder.send_push:
+                    tokens = list(FCMService.extract_active_tokens(getattr(user, 'device_tokens', None)).values())
+                    if not getattr(user, 'push_notifications_enabled', True):
+                        record_failure(reminder, user, 'push', f"user_{user.id}", "Push notifications disabled by user")
+                    elif not tokens:
+                        record_failure(reminder, user, 'push', f"user_{user.id}",
+                                       "No device tokens registered - user needs to enable push notifications in browser")
+                    else:
+                        if fcm_available is None:
+                            fcm_available = get_fcm_service().is_available()
+                        if not fcm_available:
+                            record_failure(reminder, user, 'push', f"user_{user.id}", "FCM service not configured or unavailable")
+                        else:
+                            pushes.append(PushJob(
+                                key=reminder.id,
+                                tokens=tokens,
+                                title=f"🐾 {reminder.title}",
+                                body=self._create_push_notification_body(reminder),
+                                data={
+                                    'reminder_id': str(reminder.id),
+                                    'reminder_type': reminder.reminder_type.value,
+                                    'due_date': reminder.due_date.isoformat()
+                                },
+                                click_action=click_action
+                            ))
+                
+                if reminder.send_sms and getattr(user, 'phone_number', None):
+                    sms_jobs.append(SmsJob(reminder.id, user.phone_number, f"🐾 Mr. White Reminder: {reminder.title} is due!"))
+            
+            emails_by_key = {job.key: job for job in emails}
+            pushes_by_key = {job.key: job for job in pushes}
+            sms_by_key = {job.key: job for job in sms_jobs}
+            
+            for delivery in get_notification_dispatcher().dispatch(emails, pushes, sms_jobs):
+                reminder = by_id[delivery.key]
+                entry = {'type': delivery.channel, 'message' if delivery.success else 'error': delivery.detail}
+                results[reminder.id]['notifications_sent' if delivery.success else 'notifications_failed'].append(entry)
+                status = NotificationStatus.SENT if delivery.success else NotificationStatus.FAILED
+                
+                if delivery.channel == 'email':
+                    job = emails_by_key[delivery.key]
+                    row = self._notification_row(
+                        reminder.id, reminder.user_id, 'email', status, job.recipient,
+                        subject=job.subject if delivery.success else None,
+                        message=job.text if delivery.success else None,
+                        error_message=None if delivery.success else delivery.detail
+                    )
+                elif delivery.channel == 'push':
+                    job = pushes_by_key[delivery.key]
+                    row = self._notification_row(
+                        reminder.id, reminder.user_id, 'push', status, f"devices_{delivery.sent_count}",
+                        subject=job.title, message=job.body,
+                        error_message=f"Failed devices: {delivery.failed_count}" if delivery.failed_count else None
+                    )
+                else:
+                    job = sms_by_key[delivery.key]
+                    row = self._notification_row(
+                        reminder.id, reminder.user_id, 'sms', status, job.phone_number,
+                        subject=f"Reminder: {reminder.title}", message=job.message,
+                        error_message=None if delivery.success else delivery.detail
+                    )
+                log_rows.append(row)
+            
+            # Update reminder notification tracking and log every attempt in one commit
+            now = datetime.utcnow()
+            for reminder in reminders:
+                if reminder.user_id in users:
+                    reminder.last_notification_sent = now
+                    reminder.notification_attempts = (reminder.notification_attempts or 0) + 1
+            if log_rows:
+                db.session.bulk_insert_mappings(ReminderNotification, log_rows)
+            db.session.commit()
+            
+            for result in results.values():
+                if 'error' not in result:
+                    result['success'] = len(result['notifications_sent']) > 0
+            
+            sent = sum(len(r['notifications_sent']) for r in results.values())
+            failed = sum(len(r['notifications_failed']) for r in results.values())
+            logger.info(f"Notification batch completed for {len(reminders)} reminders: {sent} sent, {failed} failed")
+            
+        except Exception as e:
+            logger.error(f"Error sending notification batch: {str(e)}")
+            db.session.rollback()
+            for result in results.values():
+                result['success'] = False
+                result['error'] = str(e)
+        
+        return [results[reminder.id] for reminder in reminders]
+    
     # ==================== NOTIFICATION LOGGING ====================
     
+    @staticmethod
+    def _notification_row(reminder_id: int, user_id: int, notification_type: str,
+                          status: NotificationStatus, recipient: str,
+                          subject: Optional[str] = None, message: Optional[str] = None,
+                          error_message: Optional[str] = None) -> Dict[str, Any]:
+        """Column values for one reminder_notifications row"""
+        now = datetime.utcnow()
+        return {
+            'reminder_id': reminder_id,
+            'user_id': user_id,
+            'notification_type': notification_type,
+            'status': status,
+            'scheduled_at': now,
+            'sent_at': now if status == NotificationStatus.SENT else None,
+            'recipient': recipient,
+            'subject': subject,
+            'message': message,
+            'error_message': error_message,
+            'created_at': now,
+            'updated_at': now
+        }
+    
     def _log_notification(self, reminder_id: int, user_id: int, notification_type: str,
                          status: NotificationStatus, recipient: str,
                          subject: Optional[str] = None, message: Optional[str] = None,
@@ -619,18 +785,10 @@ Mr. White - Your AI Pet Care Assistant
         Log notification attempt to database
         """
         try:
-            # Create notification record with correct parameters
-            notification = ReminderNotification()
-            notification.reminder_id = reminder_id
-            notification.user_id = user_id
-            notification.notification_type = notification_type
-            notification.status = status
-            notification.scheduled_at = datetime.utcnow()
-            notification.sent_at = datetime.utcnow() if status == NotificationStatus.SENT else None
-            notification.recipient = recipient
-            notification.subject = subject
-            notification.message = message
-            notification.error_message = error_message
+            notification = ReminderNotification(**self._notification_row(
+                reminder_id, user_id, notification_type, status, recipient,
+                subject=subject, message=message, error_message=error_message
+            ))
             
             db.session.add(notification)
             db.session.commit()
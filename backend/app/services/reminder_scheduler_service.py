@@ -21,6 +21,10 @@ from app.models.health_models import (
 )
 from app.models.user import User
 from app.services.reminder_notification_service import get_notification_service
+from app.services.reminder_due_queue import (
+    ReminderDispatcher, get_reminder_dispatcher, start_reminder_dispatcher, stop_reminder_dispatcher,
+    sync_reminder
+)
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +66,11 @@ class ReminderSchedulerService:
             return
         
         try:
+            # Reminder notifications and follow-ups are event driven: the
+            # dispatcher sleeps until the next one is due
+            start_reminder_dispatcher(self.app)
+            
             # Schedule jobs
-            schedule.every(5).minutes.do(self.check_and_send_reminders)  # Check every 5 minutes
             schedule.every().hour.do(self.update_overdue_reminders)     # Update overdue status hourly
             schedule.every().day.at("09:00").do(self.process_recurring_reminders)  # Process recurring daily at 9 AM
             schedule.every().day.at("02:00").do(self.cleanup_old_notifications)   # Cleanup at 2 AM
@@ -84,6 +91,7 @@ class ReminderSchedulerService:
         try:
             self.is_running = False
             schedule.clear()
+            stop_reminder_dispatcher()
             
             if self.scheduler_thread and self.scheduler_thread.is_alive():
                 self.scheduler_thread.join(timeout=10)
@@ -111,67 +119,24 @@ class ReminderSchedulerService:
     
     def check_and_send_reminders(self):
         """
-        Check for due reminders and send notifications
+        Send every reminder notification and follow-up that is due now
+
+        Normally the due-queue dispatcher sends these the moment they come due;
+        this drains its queue immediately (manual trigger / CLI).
         """
         try:
             logger.info("🔍 Checking for due reminders...")
             
-            with self.app.app_context():
-                # Get current datetime
-                now = datetime.now()
-                
-                # Find reminders that should send notifications
-                due_reminders = db.session.query(HealthReminder).filter(
-                    and_(
-                        HealthReminder.status == ReminderStatus.PENDING,
-                        HealthReminder.reminder_date <= now.date(),
-                        or_(
-                            HealthReminder.reminder_time.is_(None),
-                            and_(
-                                HealthReminder.reminder_date == now.date(),
-                                HealthReminder.reminder_time <= now.time()
-                            ),
-                            HealthReminder.reminder_date < now.date()
-                        ),
-                        or_(
-                            HealthReminder.last_notification_sent.is_(None),
-                            HealthReminder.last_notification_sent < (now - timedelta(hours=1))
-                        )
-                    )
-                ).all()
-                
-                if not due_reminders:
-                    logger.info("No due reminders found")
-                    return
-                
-                logger.info(f"Found {len(due_reminders)} due reminders")
-                
-                # Process each reminder
-                sent_count = 0
-                failed_count = 0
-                
-                for reminder in due_reminders:
-                    try:
-                        # Check if reminder should actually send notification
-                        if not reminder.should_send_notification():
-                            continue
-                        
-                        # Send notifications
-                        result = self.notification_service.send_all_notifications(reminder)
-                        
-                        if result['success']:
-                            sent_count += 1
-                            logger.info(f"✅ Notifications sent for reminder {reminder.id}: {reminder.title}")
-                        else:
-                            failed_count += 1
-                            logger.warning(f"❌ Failed to send notifications for reminder {reminder.id}: {result.get('error', 'Unknown error')}")
-                    
-                    except Exception as e:
-                        failed_count += 1
-                        logger.error(f"Error processing reminder {reminder.id}: {str(e)}")
-                
-                logger.info(f"Reminder processing completed: {sent_count} sent, {failed_count} failed")
-                self.last_check = now
+            dispatcher = get_reminder_dispatcher()
+            if dispatcher is None or not dispatcher.is_running:
+                # Not started in this process: build a one-off queue
+                dispatcher = ReminderDispatcher(self.app)
+                dispatcher.rebuild()
+            
+            results = dispatcher.dispatch_due()
+            logger.info(f"Reminder processing completed: {results['sent']} sent, {results['failed']} failed")
+            self.last_check = datetime.now()
+            return results
         
         except Exception as e:
             logger.error(f"Error in check_and_send_reminders: {str(e)}")
@@ -248,6 +213,7 @@ class ReminderSchedulerService:
                     try:
                         new_reminder = self._create_next_recurrence(reminder)
                         if new_reminder:
+                            sync_reminder(new_reminder)
                             created_count += 1
                             logger.info(f"✅ Created next occurrence for reminder {reminder.id}")
                     except Exception as e:
@@ -359,11 +325,12 @@ class ReminderSchedulerService:
         """
         try:
             logger.info("🚀 Manual trigger: immediate reminder check")
-            self.check_and_send_reminders()
+            results = self.check_and_send_reminders()
             
             return {
                 'success': True,
                 'message': 'Immediate reminder check completed',
+                'results': results,
                 'timestamp': datetime.now().isoformat()
             }
         
@@ -380,6 +347,8 @@ class ReminderSchedulerService:
         Get current scheduler status
         """
         try:
+            dispatcher = get_reminder_dispatcher()
+            
             with self.app.app_context():
                 # Count pending reminders
                 pending_count = db.session.query(HealthReminder).filter(
@@ -403,6 +372,7 @@ class ReminderSchedulerService:
                     'overdue_reminders': overdue_count,
                     'recent_notifications_24h': recent_notifications,
                     'scheduled_jobs': len(schedule.jobs),
+                    'dispatcher': dispatcher.get_stats() if dispatcher else None,
                     'timestamp': datetime.now().isoformat()
                 }
         
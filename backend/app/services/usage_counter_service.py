@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Usage Counter Service
+Per-user daily, monthly and all-time usage counters for free-tier limit checks.
+
+Counters live in the usage_counters table, one row per (user, metric, period).
+They are bumped inside the same transaction that writes a message, document,
+care record or conversation (ORM after_insert / after_delete hooks doing an
+upsert), so a limit check is one primary-key lookup instead of five COUNT(*)
+queries. Periods roll over by key: today's row is 'd:YYYY-MM-DD', the month's
+'m:YYYY-MM', so a new day simply starts a new row.
+
+Writes that bypass the ORM (bulk deletes, raw SQL) or a failed counter update
+make the counters drift; a background reconciler periodically rewrites the
+current periods from the source tables and drops expired ones.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import case, event, func, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models.care_record import CareRecord, Document
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.models.usage_counter import UsageCounter
+
+logger = logging.getLogger(__name__)
+
+CHAT_MESSAGES = 'chat_messages'
+DOCUMENTS = 'documents'
+CARE_RECORDS = 'care_records'
+CONVERSATIONS = 'conversations'
+
+# Periods each metric is counted in (matches UsageTrackingService.FREE_LIMITS)
+METRIC_PERIODS = {
+    CHAT_MESSAGES: ('day', 'month'),
+    DOCUMENTS: ('month',),
+    CARE_RECORDS: ('month',),
+    CONVERSATIONS: ('total',),
+}
+
+# Arbitrary key for the Postgres advisory lock that keeps reconcilers from overlapping
+RECONCILE_LOCK_KEY = 7_314_002
+
+_counters = UsageCounter.__table__
+
+
+def period_keys(now: Optional[datetime] = None) -> Dict[str, str]:
+    """Counter period keys for the day, month and all time containing `now` (server local time)"""
+    now = now or datetime.now()
+    return {'day': f"d:{now:%Y-%m-%d}", 'month': f"m:{now:%Y-%m}", 'total': 'total'}
+
+
+def _upsert(connection):
+    """Dialect-specific INSERT supporting ON CONFLICT"""
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(_counters)
+
+
+# ==================== COUNTER WRITES ====================
+
+def increment_usage(connection, user_id: int, metric: str, amount: int = 1, now: Optional[datetime] = None):
+    """
+    Atomically add `amount` to every current-period counter of a metric
+
+    Args:
+        connection: Connection of the transaction writing the source row
+        user_id: Owner of the row
+        metric: One of the METRIC_PERIODS keys
+        amount: Increment (defaults to 1)
+        now: Clock override (defaults to server local time)
+    """
+    keys = period_keys(now)
+    stamp = datetime.now(timezone.utc)
+    stmt = _upsert(connection).values([
+        {'user_id': user_id, 'metric': metric, 'period': keys[period], 'count': amount, 'updated_at': stamp}
+        for period in METRIC_PERIODS[metric]
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'metric', 'period'],
+        set_={'count': _counters.c.count + stmt.excluded.count, 'updated_at': stmt.excluded.updated_at}
+    )
+    connection.execute(stmt)
+
+
+def decrement_usage(connection, user_id: int, metric: str, created_at: Optional[datetime] = None,
+                    now: Optional[datetime] = None):
+    """
+    Subtract one from the current-period counters a deleted row was counted in
+
+    Args:
+        connection: Connection of the transaction deleting the source row
+        user_id: Owner of the row
+        metric: One of the METRIC_PERIODS keys
+        created_at: When the row was written; periods it does not fall in are left alone
+        now: Clock override (defaults to server local time)
+    """
+    current = period_keys(now)
+    written = period_keys(created_at.replace(tzinfo=None)) if created_at else current
+    periods = [current[p] for p in METRIC_PERIODS[metric] if written[p] == current[p]]
+    if not periods:
+        return
+    connection.execute(
+        update(_counters)
+        .where(_counters.c.user_id == user_id,
+               _counters.c.metric == metric,
+               _counters.c.period.in_(periods))
+        .values(count=case((_counters.c.count > 0, _counters.c.count - 1), else_=0),
+                updated_at=datetime.now(timezone.utc))
+    )
+
+
+def _apply(connection, action, *args, **kwargs):
+    """Run a counter update in a savepoint so a failure never aborts the source write"""
+    try:
+        with connection.begin_nested():
+            action(connection, *args, **kwargs)
+    except Exception as e:
+        logger.warning(f"⚠️  Usage counter update failed, reconciliation will repair it: {str(e)}")
+
+
+def _message_owner(connection, message: Message) -> Optional[int]:
+    """User id of a message's conversation, without a query when the relationship is loaded"""
+    conversation = message.__dict__.get('conversation')
+    if conversation is not None:
+        return conversation.user_id
+    return connection.execute(
+        select(Conversation.user_id).where(Conversation.id == message.conversation_id)
+    ).scalar()
+
+
+@event.listens_for(Message, 'after_insert')
+def _count_message(mapper, connection, target):
+    if target.type != 'user':
+        return
+    user_id = _message_owner(connection, target)
+    if user_id:
+        _apply(connection, increment_usage, user_id, CHAT_MESSAGES)
+
+
+@event.listens_for(Document, 'after_insert')
+def _count_document(mapper, connection, target):
+    _apply(connection, increment_usage, target.user_id, DOCUMENTS)
+
+
+@event.listens_for(Document, 'after_delete')
+def _uncount_document(mapper, connection, target):
+    _apply(connection, decrement_usage, target.user_id, DOCUMENTS, target.created_at)
+
+
+@event.listens_for(CareRecord, 'after_insert')
+def _count_care_record(mapper, connection, target):
+    _apply(connection, increment_usage, target.user_id, CARE_RECORDS)
+
+
+@event.listens_for(CareRecord, 'after_delete')
+def _uncount_care_record(mapper, connection, target):
+    _apply(connection, decrement_usage, target.user_id, CARE_RECORDS, target.created_at)
+
+
+@event.listens_for(Conversation, 'after_insert')
+def _count_conversation(mapper, connection, target):
+    _apply(connection, increment_usage, target.user_id, CONVERSATIONS)
+
+
+@event.listens_for(Conversation, 'after_delete')
+def _uncount_conversation(mapper, connection, target):
+    _apply(connection, decrement_usage, target.user_id, CONVERSATIONS)
+
+
+# ==================== COUNTER READS ====================
+
+def get_usage_counts(user_id: int, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Current usage for a user in one indexed lookup
+
+    Returns:
+        Dict keyed like UsageTrackingService's 'usage' block
+    """
+    keys = period_keys(now)
+    rows = (db.session.query(UsageCounter.metric, UsageCounter.period, UsageCounter.count)
+            .filter(UsageCounter.user_id == user_id,
+                    UsageCounter.period.in_(list(keys.values())))
+            .all())
+    found = {(metric, period): count for metric, period, count in rows}
+    return {
+        'chat_messages_today': found.get((CHAT_MESSAGES, keys['day']), 0),
+        'chat_messages_this_month': found.get((CHAT_MESSAGES, keys['month']), 0),
+        'documents_this_month': found.get((DOCUMENTS, keys['month']), 0),
+        'care_records_this_month': found.get((CARE_RECORDS, keys['month']), 0),
+        'total_conversations': found.get((CONVERSATIONS, keys['total']), 0),
+    }
+
+
+# ==================== RECONCILIATION ====================
+
+def _source_counts(now: datetime) -> list:
+    """(metric, period key, owner column, grouped COUNT query) for every current counter"""
+    keys = period_keys(now)
+    day_start = datetime.combine(now.date(), datetime.min.time())
+    month_start = day_start.replace(day=1)
+
+    def user_messages(*window):
+        return (select(Conversation.user_id.label('user_id'), func.count(Message.id).label('count'))
+                .join(Message, Message.conversation_id == Conversation.id)
+                .where(Message.type == 'user', *window)
+                .group_by(Conversation.user_id))
+
+    def owned(model, *window):
+        return (select(model.user_id.label('user_id'), func.count(model.id).label('count'))
+                .where(*window)
+                .group_by(model.user_id))
+
+    return [
+        (CHAT_MESSAGES, keys['day'], Conversation.user_id, user_messages(
+            Message.created_at >= day_start, Message.created_at < day_start + timedelta(days=1))),
+        (CHAT_MESSAGES, keys['month'], Conversation.user_id, user_messages(Message.created_at >= month_start)),
+        (DOCUMENTS, keys['month'], Document.user_id, owned(Document, Document.created_at >= month_start)),
+        (CARE_RECORDS, keys['month'], CareRecord.user_id, owned(CareRecord, CareRecord.created_at >= month_start)),
+        (CONVERSATIONS, keys['total'], Conversation.user_id, owned(Conversation)),
+    ]
+
+
+def _acquire_reconcile_lock(session) -> bool:
+    """Transaction-scoped advisory lock so only one worker reconciles at a time"""
+    if session.get_bind().dialect.name != 'postgresql':
+        return True
+    return bool(session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': RECONCILE_LOCK_KEY}).scalar())
+
+
+def reconcile_usage_counters(user_id: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Rewrite current-period counters from the source tables and drop expired periods
+
+    Each counter is zeroed and then overwritten with the grouped COUNT in one
+    transaction, so readers never see a transient zero and increments racing
+    the rewrite wait on the row lock and land on top of the repaired value.
+
+    Args:
+        user_id: Limit the repair to one user (defaults to everyone)
+        now: Clock override (defaults to server local time)
+
+    Returns:
+        Dict with the rows rewritten per counter and the expired rows deleted
+    """
+    now = now or datetime.now()
+    stamp = datetime.now(timezone.utc)
+    results = {'rewritten': {}, 'expired_deleted': 0, 'skipped': False}
+
+    for metric, period, owner, counts in _source_counts(now):
+        if not _acquire_reconcile_lock(db.session):
+            db.session.rollback()
+            results['skipped'] = True
+            logger.info("⏭️  Usage counter reconciliation already running elsewhere")
+            return results
+
+        scope = [_counters.c.metric == metric, _counters.c.period == period]
+        if user_id is not None:
+            scope.append(_counters.c.user_id == user_id)
+            counts = counts.where(owner == user_id)
+        counts = counts.subquery()
+
+        try:
+            db.session.execute(update(_counters).where(*scope).values(count=0, updated_at=stamp))
+            stmt = _upsert(db.session.connection()).from_select(
+                ['user_id', 'metric', 'period', 'count', 'updated_at'],
+                select(counts.c.user_id, literal(metric), literal(period), counts.c.count, literal(stamp))
+                .where(counts.c.count > 0)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'metric', 'period'],
+                set_={'count': stmt.excluded.count, 'updated_at': stmt.excluded.updated_at}
+            )
+            result = db.session.execute(stmt)
+            db.session.commit()
+            results['rewritten'][f"{metric}@{period}"] = result.rowcount
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"❌ Error reconciling {metric}@{period} usage counters: {str(e)}")
+
+    try:
+        expired = db.session.query(UsageCounter).filter(UsageCounter.period.notin_(list(period_keys(now).values())))
+        if user_id is not None:
+            expired = expired.filter(UsageCounter.user_id == user_id)
+        results['expired_deleted'] = expired.delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"❌ Error deleting expired usage counters: {str(e)}")
+
+    logger.info(f"🧮 Reconciled usage counters: {results}")
+    return results
+
+
+class UsageCounterReconciler:
+    """Background thread that reconciles usage counters on an interval (first run at start)"""
+
+    def __init__(self, app, interval_seconds: float = 3600):
+        self.app = app
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_result: Dict[str, Any] = {}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='usage-counter-reconciler', daemon=True)
+        self._thread.start()
+        logger.info(f"🚀 Usage counter reconciler started (every {self.interval_seconds:.0f}s)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    self.last_result = reconcile_usage_counters()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f"❌ Usage counter reconciliation failed: {str(e)}")
+            self._stop.wait(self.interval_seconds)
+
+
+# ==================== SERVICE INSTANCE ====================
+
+_reconciler: Optional[UsageCounterReconciler] = None
+
+
+def start_usage_counter_reconciler(app) -> UsageCounterReconciler:
+    """Start the global reconciler (idempotent)"""
+    global _reconciler
+    if _reconciler is None:
+        minutes = app.config.get('USAGE_COUNTER_RECONCILE_MINUTES', 60)
+        _reconciler = UsageCounterReconciler(app, interval_seconds=minutes * 60)
+    _reconciler.start()
+    return _reconciler
+
+
+def stop_usage_counter_reconciler():
+    """Stop the global reconciler if it is running"""
+    if _reconciler:
+        _reconciler.stop()
@@ -3,9 +3,7 @@ from datetime import datetime, timedelta
 from flask import current_app
 from app import db
 from app.models.user import User
-from app.models.conversation import Conversation
-from app.models.message import Message
-from app.models.care_record import CareRecord, Document
+from app.services.usage_counter_service import get_usage_counts
 import logging
 
 class UsageTrackingService:
@@ -37,32 +35,18 @@ class UsageTrackingService:
                     'unlimited': True
                 }
             
-            today = datetime.now().date()
-            month_start = datetime.now().replace(day=1).date()
-            
-            # Chat message usage
-            daily_messages = self._count_daily_messages(user_id, today)
-            monthly_messages = self._count_monthly_messages(user_id, month_start)
-            
-            # Document usage
-            monthly_documents = self._count_monthly_documents(user_id, month_start)
-            
-            # Care records usage
-            monthly_care_records = self._count_monthly_care_records(user_id, month_start)
-            
-            # Total conversations
-            total_conversations = self._count_total_conversations(user_id)
+            # One lookup on the incrementally maintained counters
+            counts = get_usage_counts(user_id)
+            daily_messages = counts['chat_messages_today']
+            monthly_messages = counts['chat_messages_this_month']
+            monthly_documents = counts['documents_this_month']
+            monthly_care_records = counts['care_records_this_month']
+            total_conversations = counts['total_conversations']
             
             return {
                 'is_premium': False,
                 'unlimited': False,
-                'usage': {
-                    'chat_messages_today': daily_messages,
-                    'chat_messages_this_month': monthly_messages,
-                    'documents_this_month': monthly_documents,
-                    'care_records_this_month': monthly_care_records,
-                    'total_conversations': total_conversations
-                },
+                'usage': counts,
                 'limits': self.FREE_LIMITS,
                 'remaining': {
                     'chat_messages_today': max(0, self.FREE_LIMITS['chat_messages_per_day'] - daily_messages),
@@ -147,44 +131,6 @@ class UsageTrackingService:
         
         return True, f"You can create {remaining} more conversations"
     
-    def _count_daily_messages(self, user_id: int, date: datetime) -> int:
-        """Count messages sent by user today"""
-        start_datetime = datetime.combine(date, datetime.min.time())
-        end_datetime = start_datetime + timedelta(days=1)
-        
-        return Message.query.join(Conversation).filter(
-            Conversation.user_id == user_id,
-            Message.type == 'user',
-            Message.created_at >= start_datetime,
-            Message.created_at < end_datetime
-        ).count()
-    
-    def _count_monthly_messages(self, user_id: int, month_start: datetime) -> int:
-        """Count messages sent by user this month"""
-        return Message.query.join(Conversation).filter(
-            Conversation.user_id == user_id,
-            Message.type == 'user',
-            Message.created_at >= month_start
-        ).count()
-    
-    def _count_monthly_documents(self, user_id: int, month_start: datetime) -> int:
-        """Count documents uploaded by user this month"""
-        return Document.query.filter(
-            Document.user_id == user_id,
-            Document.created_at >= month_start
-        ).count()
-    
-    def _count_monthly_care_records(self, user_id: int, month_start: datetime) -> int:
-        """Count care records created by user this month"""
-        return CareRecord.query.filter(
-            CareRecord.user_id == user_id,
-            CareRecord.created_at >= month_start
-        ).count()
-    
-    def _count_total_conversations(self, user_id: int) -> int:
-        """Count total conversations created by user"""
-        return Conversation.query.filter_by(user_id=user_id).count()
-    
     def record_usage(self, user_id: int, action: str, metadata: dict = None):
         """Record usage action for analytics"""
         try:
@@ -1,6 +1,7 @@
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai.embeddings import OpenAIEmbeddings
+from shared.embedding_cache import cached_embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from pinecone import Pinecone
@@ -45,7 +46,7 @@ def store_document_vectors(user_id: int, documents: List[str], metadata: Dict[st
         current_app.logger.info(f"Storing {len(documents)} document chunks for user {user_id}")
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific namespace
         namespace = get_user_namespace(user_id)
@@ -102,7 +103,7 @@ def search_document_vectors(user_id: int, query: str, top_k: int = 10, filter_me
         current_app.logger.info(f"Searching document vectors for user {user_id}: {query}")
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific namespace
         namespace = get_user_namespace(user_id)
@@ -356,7 +357,7 @@ def process_document(file_path, result, file_ext, user_id):
         namespace = get_user_namespace(user_id)
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Upsert to Pinecone with user-specific namespace
         index_name = os.getenv("PINECONE_INDEX_NAME")
@@ -436,7 +437,7 @@ def store_in_vector_db(result, user_id, conversation_id, message_id):
         current_app.logger.info(f"Storing extracted text from {result['filename']} in Pinecone for user {user_id}")
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific namespace
         namespace = get_user_namespace(user_id)
@@ -509,7 +510,7 @@ def query_user_docs(query, user_id, top_k=None):
             
         # Initialize embeddings
         print(f"Querying Pinecone for: '{query}' for user_id: {user_id_str}")
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific namespace
         namespace = get_user_namespace(user_id_str)
@@ -571,7 +572,7 @@ def store_chat_message(user_id, message_content, message_id, message_type, conve
         print(f"Storing {message_type} message in Pinecone for user_id: {user_id}")
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific chat namespace
         namespace = get_chat_namespace(user_id)
@@ -640,7 +641,7 @@ def store_enhanced_chat_message(user_id: int, message_content: str, message_meta
         current_app.logger.info(f"Storing enhanced chat message for user {user_id}")
         
         # Initialize embeddings
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific chat namespace
         namespace = get_chat_namespace(user_id)
@@ -699,7 +700,7 @@ def query_chat_history(query, user_id, top_k=None):
             
         # Initialize embeddings
         print(f"Querying Pinecone for chat history: '{query}' in namespace for user_id: {user_id}")
-        embeddings = OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL'])
+        embeddings = cached_embeddings(OpenAIEmbeddings(model=current_app.config['OPENAI_EMBEDDING_MODEL']))
         
         # Get user-specific chat namespace
         namespace = get_chat_namespace(user_id)
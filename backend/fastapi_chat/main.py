@@ -17,7 +17,7 @@ from fastapi import FastAPI, HTTPException, Depends, Request, UploadFile, File,
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.security import HTTPBearer
-from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 import uvicorn
 import redis.asyncio as redis
 
@@ -470,6 +470,9 @@ async def unified_upload_endpoint(
             background_tasks=background_tasks
         )
         
+        # Answers cached before this upload may not reflect the new documents
+        await chat_service.invalidate_semantic_cache(current_user["id"])
+        
         return {
             "success": response.get("success", True),
             "content": response.get("content", f"Successfully processed {len(files)} files"),
@@ -678,6 +681,8 @@ async def upload_care_document(
             description=description
         )
         
+        await chat_service.invalidate_semantic_cache(current_user["id"])
+        
         return {
             "success": True,
             "document": result
@@ -836,6 +841,8 @@ async def delete_care_document(
             document_id=document_id
         )
         
+        await chat_service.invalidate_semantic_cache(current_user["id"])
+        
         return {
             "success": True,
             "message": "Document deleted successfully"
@@ -1427,22 +1434,28 @@ async def health_chat(
 async def get_conversations(
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(require_auth_async)
 ):
-    """Get user's conversations with async pagination"""
+    """Get user's conversations, newest first; pass next_cursor back as cursor for the next page"""
     try:
-        conversations = await chat_service.get_user_conversations(
+        page = await chat_service.get_user_conversation_page(
             user_id=current_user["id"],
-            limit=limit,
+            limit=max(1, min(limit, 200)),
+            cursor=cursor,
             offset=offset
         )
         
         return {
             "success": True,
-            "conversations": conversations,
-            "total": len(conversations)
+            "conversations": page["conversations"],
+            "total": len(page["conversations"]),
+            "next_cursor": page["next_cursor"],
+            "has_more": page["has_more"]
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Conversations retrieval error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve conversations")
@@ -1450,20 +1463,49 @@ async def get_conversations(
 @app.get("/api/conversations/{conversation_id}")
 async def get_conversation(
     conversation_id: int,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    stream: bool = False,
     current_user: Dict[str, Any] = Depends(require_auth_async)
 ):
-    """Get specific conversation with messages"""
+    """
+    Get specific conversation with messages
+
+    - ?limit=&before=&after= returns one page; before/after are message-id cursors
+      (before_cursor / after_cursor from the previous page)
+    - ?stream=true returns every message as NDJSON, serialized as rows are fetched
+    - no parameters returns the whole conversation in one JSON body (legacy)
+    """
     try:
-        conversation_data = await chat_service.get_conversation_with_messages(
-            conversation_id=conversation_id,
-            user_id=current_user["id"]
-        )
+        if stream:
+            lines = await chat_service.open_conversation_stream(
+                conversation_id=conversation_id,
+                user_id=current_user["id"]
+            )
+            return StreamingResponse(lines, media_type="application/x-ndjson")
+        
+        if limit is not None or before is not None or after is not None:
+            conversation_data = await chat_service.get_conversation_messages_page(
+                conversation_id=conversation_id,
+                user_id=current_user["id"],
+                limit=max(1, min(limit or 50, 200)),
+                before=before,
+                after=after
+            )
+        else:
+            conversation_data = await chat_service.get_conversation_with_messages(
+                conversation_id=conversation_id,
+                user_id=current_user["id"]
+            )
         
         return {
             "success": True,
             "data": conversation_data
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Get conversation error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve conversation")
@@ -1782,6 +1824,7 @@ async def get_smart_prompt_stats(
         return {
             "success": True,
             "smart_prompt_stats": smart_stats,
+            "intent_cache": smart_intent_router.get_intent_cache_stats() if smart_intent_router else {"enabled": False},
             "migration_status": {
                 "smart_prompts_enabled": chat_service.ab_test_enabled,
                 "smart_prompt_coverage": f"{chat_service.smart_prompt_ratio * 100}%",
@@ -593,45 +593,173 @@ RATE_LIMITS = {
     }
 }
 
+# Token buckets for every window of a user, checked and consumed atomically.
+# KEYS: one hash per window. ARGV: cost, then (capacity, window_ms) per key.
+# Buckets refill continuously at capacity/window; the request is admitted only
+# if every bucket holds `cost` tokens. Returns {allowed, retry_after_ms,
+# remaining_1, remaining_2, ...}. Uses the server clock so all app instances agree.
+RATE_LIMIT_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local cost = tonumber(ARGV[1])
+
+local tokens = {}
+local allowed = 1
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    local rate = capacity / window
+
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if level == nil then
+        level = capacity
+    else
+        level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    end
+    tokens[i] = level
+
+    if level < cost then
+        allowed = 0
+        retry_after = math.max(retry_after, math.ceil((cost - level) / rate))
+    end
+end
+
+local result = {allowed, retry_after}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    local level = tokens[i]
+    if allowed == 1 then
+        level = level - cost
+    end
+    redis.call('HSET', key, 'tokens', tostring(level), 'ts', now)
+    redis.call('PEXPIRE', key, window)
+    result[#result + 1] = math.floor(level)
+end
+return result
+"""
+
+RATE_LIMIT_WINDOWS = {
+    "minute": ("requests_per_minute", 60),
+    "hour": ("requests_per_hour", 3600)
+}
+
+# The old INCR limiter kept string counters under rate_limit:{window}:{user_id};
+# the buckets are hashes, so they need their own keys to avoid WRONGTYPE errors
+# while old counters are still live (and while old and new instances overlap).
+RATE_LIMIT_KEY_PREFIX = "rate_limit:v2"
+
+
+class AsyncRateLimiter:
+    """
+    Single-round-trip rate limiter over Redis token buckets
+    
+    All windows of a user are checked and consumed by one Lua script call, so
+    concurrent requests can never overshoot a limit. Users that Redis has just
+    rejected are also rejected locally until their retry-after passes, which
+    sheds obvious over-limit bursts without touching Redis.
+    """
+    
+    # Bound on locally remembered rejections before expired ones are pruned
+    MAX_LOCAL_BLOCKS = 10000
+    
+    def __init__(self, redis_client, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.redis = redis_client
+        self.limits = limits or RATE_LIMITS
+        self._script = redis_client.register_script(RATE_LIMIT_LUA)
+        self._blocked_until: Dict[Tuple[Any, Tuple[str, ...]], float] = {}
+        self.stats = {"allowed": 0, "rejected": 0, "rejected_locally": 0}
+    
+    async def acquire(
+        self,
+        user_id: Any,
+        subscription_tier: str = "free",
+        windows: Tuple[str, ...] = ("minute", "hour"),
+        cost: int = 1
+    ) -> Dict[str, Any]:
+        """
+        Check and consume `cost` requests from every window in one call
+        
+        Returns:
+            {"allowed": bool, "retry_after": seconds, "remaining": {window: n}}
+        """
+        block_key = (user_id, windows)
+        blocked_until = self._blocked_until.get(block_key)
+        if blocked_until is not None:
+            wait = blocked_until - time.monotonic()
+            if wait > 0:
+                self.stats["rejected"] += 1
+                self.stats["rejected_locally"] += 1
+                return {"allowed": False, "retry_after": wait, "remaining": {}}
+            del self._blocked_until[block_key]
+        
+        tier_limits = self.limits.get(subscription_tier, self.limits["free"])
+        keys = []
+        args = [cost]
+        for window in windows:
+            limit_name, window_seconds = RATE_LIMIT_WINDOWS[window]
+            keys.append(f"{RATE_LIMIT_KEY_PREFIX}:{window}:{user_id}")
+            args.extend([tier_limits[limit_name], window_seconds * 1000])
+        
+        result = await self._script(keys=keys, args=args)
+        allowed = bool(int(result[0]))
+        retry_after = int(result[1]) / 1000
+        remaining = {window: int(count) for window, count in zip(windows, result[2:])}
+        
+        if allowed:
+            self.stats["allowed"] += 1
+        else:
+            self.stats["rejected"] += 1
+            self._remember_block(block_key, retry_after)
+        
+        return {"allowed": allowed, "retry_after": retry_after, "remaining": remaining}
+    
+    def _remember_block(self, block_key: Tuple[Any, Tuple[str, ...]], retry_after: float) -> None:
+        now = time.monotonic()
+        if len(self._blocked_until) >= self.MAX_LOCAL_BLOCKS:
+            self._blocked_until = {
+                key: until for key, until in self._blocked_until.items() if until > now
+            }
+        if len(self._blocked_until) < self.MAX_LOCAL_BLOCKS:
+            self._blocked_until[block_key] = now + retry_after
+
+
+# One limiter (and registered script) per Redis client
+_rate_limiters: Dict[int, AsyncRateLimiter] = {}
+
+
+def get_rate_limiter(redis_client) -> AsyncRateLimiter:
+    """Get the rate limiter bound to a Redis client"""
+    limiter = _rate_limiters.get(id(redis_client))
+    if limiter is None or limiter.redis is not redis_client:
+        limiter = AsyncRateLimiter(redis_client)
+        _rate_limiters[id(redis_client)] = limiter
+    return limiter
+
+
 async def check_rate_limit_async(
     current_user: Dict[str, Any],
     redis_client,
-    window: str = "minute"
+    window: Optional[str] = None
 ) -> bool:
-    """Check if user is within rate limits"""
+    """
+    Check if user is within rate limits, consuming one request if so
+    
+    Args:
+        window: "minute" or "hour" to check a single window; by default both
+            windows are checked and consumed together in one round trip
+    """
     try:
         user_id = current_user["id"]
         subscription_tier = current_user.get("subscription_tier", "free")
+        windows = (window,) if window else ("minute", "hour")
         
-        # Get rate limits for user tier
-        limits = RATE_LIMITS.get(subscription_tier, RATE_LIMITS["free"])
-        
-        if window == "minute":
-            limit = limits["requests_per_minute"]
-            key = f"rate_limit:minute:{user_id}"
-            ttl = 60
-        else:  # hour
-            limit = limits["requests_per_hour"]
-            key = f"rate_limit:hour:{user_id}"
-            ttl = 3600
-        
-        # Check current count
-        current_count = await redis_client.get(key)
-        if current_count is None:
-            current_count = 0
-        else:
-            current_count = int(current_count)
-        
-        if current_count >= limit:
-            return False
-        
-        # Increment counter
-        pipe = redis_client.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, ttl)
-        await pipe.execute()
-        
-        return True
+        result = await get_rate_limiter(redis_client).acquire(user_id, subscription_tier, windows)
+        return result["allowed"]
         
     except Exception as e:
         logger.error(f"Rate limiting service unavailable: {str(e)}")
@@ -4,7 +4,8 @@ Compatible with existing Flask database structure
 """
 
 import os
-from typing import Dict, Any, List, Optional, Union
+import base64
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 
@@ -13,13 +14,20 @@ load_dotenv()
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, Float, JSON, text
 from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy.dialects.postgresql import JSONB
 
 from pydantic import BaseModel, Field, validator, model_validator
 from typing_extensions import Annotated
 
+# Shared history buffer lives in backend/shared
+import sys
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.append(_BACKEND_ROOT)
+from shared.history_buffer import get_history_buffer
+
 # SQLAlchemy setup for async
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
@@ -445,6 +453,27 @@ async def async_init_db():
 
 # ==================== ASYNC DATABASE HELPERS ====================
 
+# Free-tier usage counters shared with the Flask app (app/services/usage_counter_service.py);
+# period keys must match its period_keys(): 'd:YYYY-MM-DD', 'm:YYYY-MM', 'total'
+_USAGE_COUNTER_UPSERT = """
+    INSERT INTO usage_counters (user_id, metric, period, count, updated_at)
+    SELECT c.user_id, :metric, p.period, 1, NOW()
+    FROM conversations c CROSS JOIN (SELECT unnest(CAST(:periods AS VARCHAR[])) AS period) p
+    WHERE c.id = :conversation_id
+    ON CONFLICT (user_id, metric, period)
+    DO UPDATE SET count = usage_counters.count + 1, updated_at = EXCLUDED.updated_at
+"""
+
+async def _increment_usage_counter(session: AsyncSession, conversation_id: int, metric: str, periods: List[str]):
+    """Bump the owner's usage counters in the caller's transaction; never fails the write"""
+    try:
+        async with session.begin_nested():
+            await session.execute(text(_USAGE_COUNTER_UPSERT), {
+                "metric": metric, "periods": periods, "conversation_id": conversation_id
+            })
+    except Exception as e:
+        print(f"⚠️  Usage counter update failed, reconciliation will repair it: {e}")
+
 async def create_conversation_async(
     session: AsyncSession, 
     user_id: int, 
@@ -458,6 +487,8 @@ async def create_conversation_async(
         thread_id=thread_id
     )
     session.add(conversation)
+    await session.flush()
+    await _increment_usage_counter(session, conversation.id, "conversations", ["total"])
     await session.commit()
     await session.refresh(conversation)
     return conversation
@@ -489,8 +520,15 @@ async def create_message_async(
             )
             session.add(attachment)
     
+    if message_type == 'user':
+        now = datetime.now()
+        await _increment_usage_counter(
+            session, conversation_id, "chat_messages", [f"d:{now:%Y-%m-%d}", f"m:{now:%Y-%m}"]
+        )
+    
     await session.commit()
     await session.refresh(message)
+    get_history_buffer("fastapi_chat").append(conversation_id, _history_entry(message))
     return message
 
 # ==================== OPTIMIZED ASYNC QUERY FUNCTIONS ====================
@@ -519,6 +557,132 @@ async def get_user_conversations_optimized(
     result = await session.execute(query)
     return result.scalars().all()
 
+# Conversation list: one round trip for a page of summaries. The page is picked
+# first (index range scan on ix_conversations_user_updated_id), then each row gets
+# its message count, a last-message preview and - only for untitled conversations -
+# the first user message, via LATERAL lookups on ix_messages_conversation_created_id.
+_CONVERSATION_SUMMARIES_SQL = """
+    SELECT c.id, c.title, c.is_bookmarked, c.created_at, c.updated_at,
+           COALESCE(stats.message_count, 0) AS message_count,
+           last_message.preview AS last_message,
+           first_user_message.preview AS first_user_message
+    FROM (
+        SELECT id, title, is_bookmarked, created_at, updated_at
+        FROM conversations
+        WHERE user_id = :user_id {keyset}
+        ORDER BY updated_at DESC, id DESC
+        LIMIT :limit OFFSET :offset
+    ) c
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS message_count FROM messages m WHERE m.conversation_id = c.id
+    ) stats ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT left(m.content, :preview_chars) AS preview
+        FROM messages m
+        WHERE m.conversation_id = c.id
+        ORDER BY m.created_at DESC, m.id DESC
+        LIMIT 1
+    ) last_message ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT left(ltrim(m.content), 60) AS preview
+        FROM messages m
+        WHERE m.conversation_id = c.id AND m.type = 'user'
+          AND (c.title IS NULL OR c.title IN ('', 'New Conversation'))
+        ORDER BY m.created_at, m.id
+        LIMIT 1
+    ) first_user_message ON TRUE
+    ORDER BY c.updated_at DESC, c.id DESC
+"""
+_CONVERSATION_KEYSET = "AND (updated_at, id) < (:cursor_updated_at, :cursor_id)"
+
+def encode_conversation_cursor(updated_at: datetime, conversation_id: int) -> str:
+    """Opaque cursor for the conversation after which the next page starts"""
+    return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{conversation_id}".encode()).decode()
+
+def decode_conversation_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_conversation_cursor; raises ValueError for a malformed cursor"""
+    try:
+        updated_at, conversation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), int(conversation_id)
+    except Exception:
+        raise ValueError("Invalid conversation cursor")
+
+async def get_user_conversation_summaries(
+    session: AsyncSession,
+    user_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    preview_chars: int = 200
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    OPTIMIZED: One page of a user's conversations as summary rows (no Message objects loaded)
+
+    Newest first, keyset-paginated on (updated_at, id): pass the returned cursor
+    to get the next page. offset is only honoured without a cursor, for old clients.
+
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page
+    """
+    params = {"user_id": user_id, "limit": limit + 1, "offset": 0, "preview_chars": preview_chars}
+    keyset = ""
+    if cursor:
+        params["cursor_updated_at"], params["cursor_id"] = decode_conversation_cursor(cursor)
+        keyset = _CONVERSATION_KEYSET
+    else:
+        params["offset"] = max(0, offset)
+
+    result = await session.execute(text(_CONVERSATION_SUMMARIES_SQL.format(keyset=keyset)), params)
+    rows = [dict(row) for row in result.mappings()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last["updated_at"] is not None:
+            next_cursor = encode_conversation_cursor(last["updated_at"], last["id"])
+    return rows, next_cursor
+
+def _history_entry(message: Message) -> Dict[str, Any]:
+    return {"id": message.id, "type": message.type, "content": message.content}
+
+async def get_conversation_tail_async(
+    session: AsyncSession,
+    conversation_id: int,
+    user_id: int,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    OPTIMIZED: Last `limit` messages of a conversation (oldest first) as history entries
+
+    Served from the in-process history buffer when the conversation is seeded;
+    otherwise one index range scan on (conversation_id, created_at) - no
+    attachments, no conversation row - whose result seeds the buffer.
+    """
+    from sqlalchemy import select, desc
+
+    buffer = get_history_buffer("fastapi_chat")
+    cached = buffer.get(conversation_id, limit, owner_id=user_id)
+    if cached is not None:
+        return cached
+
+    token = buffer.begin_load()
+    query = select(Message.id, Message.type, Message.content).join(
+        Conversation, Message.conversation_id == Conversation.id
+    ).where(
+        Message.conversation_id == conversation_id,
+        Conversation.user_id == user_id
+    ).order_by(
+        desc(Message.created_at), desc(Message.id)
+    ).limit(max(limit, buffer.max_messages))
+
+    result = await session.execute(query)
+    entries = [{"id": row.id, "type": row.type, "content": row.content} for row in result]
+    entries.reverse()
+    if entries:  # an empty result may just mean "not this user's conversation"
+        buffer.seed(conversation_id, entries, token, owner_id=user_id)
+    return entries[-limit:] if limit > 0 else []
+
 async def get_conversation_with_messages_optimized(
     session: AsyncSession,
     conversation_id: int,
@@ -541,6 +705,136 @@ async def get_conversation_with_messages_optimized(
     result = await session.execute(query)
     return result.scalar_one_or_none()
 
+# Message pages: keyset on (created_at, id) over ix_messages_conversation_created_id.
+# Cursors are plain message ids; the cursor row is resolved inside the conversation,
+# so a cursor from another conversation matches nothing.
+_MESSAGE_PAGE_COLUMNS = (
+    "id", "content", "type", "created_at", "is_bookmarked", "liked", "disliked"
+)
+
+async def get_conversation_header_async(
+    session: AsyncSession,
+    conversation_id: int,
+    user_id: int
+) -> Optional[Dict[str, Any]]:
+    """Conversation row without messages, or None if it is not this user's"""
+    from sqlalchemy import select
+
+    query = select(
+        Conversation.id, Conversation.title, Conversation.created_at,
+        Conversation.updated_at, Conversation.is_bookmarked
+    ).where(
+        Conversation.id == conversation_id,
+        Conversation.user_id == user_id
+    )
+    row = (await session.execute(query)).mappings().first()
+    return dict(row) if row else None
+
+async def _get_attachments_by_message(
+    session: AsyncSession,
+    message_ids: List[int]
+) -> Dict[int, List[Attachment]]:
+    """Attachments of a batch of messages in one query, grouped by message id"""
+    from sqlalchemy import select
+
+    grouped: Dict[int, List[Attachment]] = {}
+    if not message_ids:
+        return grouped
+    result = await session.execute(
+        select(Attachment).where(Attachment.message_id.in_(message_ids)).order_by(Attachment.id)
+    )
+    for attachment in result.scalars():
+        grouped.setdefault(attachment.message_id, []).append(attachment)
+    return grouped
+
+async def get_conversation_message_page(
+    session: AsyncSession,
+    conversation_id: int,
+    limit: int = 50,
+    before: Optional[int] = None,
+    after: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    OPTIMIZED: One page of a conversation's messages (oldest first) with attachments
+
+    Without a cursor this is the newest page. `before` walks back towards the
+    start of the conversation, `after` forward towards the newest message.
+    Ownership is NOT checked here - call get_conversation_header_async first.
+
+    Returns:
+        (messages, has_more) - has_more refers to the direction being walked
+    Raises:
+        ValueError: both cursors given, or the cursor is not a message of this conversation
+    """
+    from sqlalchemy import select, tuple_
+
+    if before is not None and after is not None:
+        raise ValueError("Pass either before or after, not both")
+
+    columns = [getattr(Message, name) for name in _MESSAGE_PAGE_COLUMNS]
+    query = select(*columns).where(Message.conversation_id == conversation_id)
+    key = tuple_(Message.created_at, Message.id)
+
+    cursor_id = before if before is not None else after
+    if cursor_id is not None:
+        cursor = (await session.execute(
+            select(Message.created_at, Message.id).where(
+                Message.id == cursor_id,
+                Message.conversation_id == conversation_id
+            )
+        )).first()
+        if cursor is None:
+            raise ValueError("Invalid message cursor")
+        bound = tuple_(cursor.created_at, cursor.id)
+        query = query.where(key < bound) if before is not None else query.where(key > bound)
+
+    # Walking forward reads ascending; the newest page and walking back read descending
+    if after is not None:
+        query = query.order_by(Message.created_at, Message.id)
+    else:
+        query = query.order_by(Message.created_at.desc(), Message.id.desc())
+
+    result = await session.execute(query.limit(limit + 1))
+    rows = [dict(row) for row in result.mappings()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is None:
+        rows.reverse()
+
+    attachments = await _get_attachments_by_message(session, [row["id"] for row in rows])
+    for row in rows:
+        row["attachments"] = attachments.get(row["id"], [])
+    return rows, has_more
+
+async def iter_conversation_messages(
+    session: AsyncSession,
+    conversation_id: int,
+    batch_size: int = 200
+):
+    """
+    OPTIMIZED: Stream every message of a conversation (oldest first) with attachments
+
+    Rows come off a server-side cursor `batch_size` at a time and attachments are
+    loaded per batch, so memory is bounded by the batch, not the conversation.
+    Ownership is NOT checked here - call get_conversation_header_async first.
+    """
+    from sqlalchemy import select
+
+    columns = [getattr(Message, name) for name in _MESSAGE_PAGE_COLUMNS]
+    query = select(*columns).where(
+        Message.conversation_id == conversation_id
+    ).order_by(
+        Message.created_at, Message.id
+    ).execution_options(yield_per=batch_size)
+
+    result = await session.stream(query)
+    async for partition in result.mappings().partitions(batch_size):
+        rows = [dict(row) for row in partition]
+        attachments = await _get_attachments_by_message(session, [row["id"] for row in rows])
+        for row in rows:
+            row["attachments"] = attachments.get(row["id"], [])
+            yield row
+
 async def get_bookmarked_conversations_optimized(
     session: AsyncSession,
     user_id: int,
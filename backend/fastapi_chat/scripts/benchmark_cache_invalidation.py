@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Invalidation latency benchmark for AsyncCacheService
+
+Grows a scratch Redis database to increasing keyspace sizes (filler keys plus
+tagged per-user conversation caches) and times invalidating one user's
+conversation caches three ways:
+
+    tags  - invalidate_user_conversations (tag set + pipelined UNLINK)
+    scan  - delete_pattern (incremental SCAN)
+    keys  - the previous KEYS + DEL implementation
+
+Tag invalidation should stay flat as the keyspace grows; the other two grow
+linearly with it, and KEYS blocks the server for the whole duration.
+
+Usage (needs a Redis you can flush; defaults to db 15 on localhost):
+    REDIS_URL=redis://localhost:6379/15 python scripts/benchmark_cache_invalidation.py --flush
+    python scripts/benchmark_cache_invalidation.py --flush --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+# Add fastapi_chat to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import redis.asyncio as redis
+
+from services.shared.async_cache_service import AsyncCacheService
+
+FILLER_BATCH = 10000
+
+
+async def fill_keyspace(client: redis.Redis, start: int, stop: int) -> None:
+    """Add untagged filler keys `filler:{start}` .. `filler:{stop - 1}`"""
+    for batch_start in range(start, stop, FILLER_BATCH):
+        pipe = client.pipeline(transaction=False)
+        for i in range(batch_start, min(batch_start + FILLER_BATCH, stop)):
+            pipe.set(f"filler:{i}", "x", ex=3600)
+        await pipe.execute()
+
+
+async def cache_user(cache: AsyncCacheService, user_id: int, pages: int) -> None:
+    """Cache `pages` conversation list pages for one user"""
+    conversations = [{"id": i, "title": f"Conversation {i}"} for i in range(20)]
+    await asyncio.gather(*[
+        cache.cache_user_conversations(user_id, conversations, limit=20, offset=page * 20)
+        for page in range(pages)
+    ])
+
+
+async def legacy_delete_pattern(client: redis.Redis, pattern: str) -> int:
+    """The previous implementation: KEYS then DEL"""
+    keys = await client.keys(pattern)
+    if keys:
+        return await client.delete(*keys)
+    return 0
+
+
+async def time_ms(coro) -> float:
+    started = time.perf_counter()
+    deleted = await coro
+    elapsed = (time.perf_counter() - started) * 1000
+    assert deleted, "benchmark invalidated nothing"
+    return elapsed
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    await client.ping()
+
+    if await client.dbsize():
+        if not args.flush:
+            print(f"❌ {args.redis_url} is not empty; pass --flush to clear it for the benchmark")
+            return
+        await client.flushdb()
+
+    cache = AsyncCacheService(client)
+    next_user = 0
+    filled = 0
+
+    print("=" * 70)
+    print("📊 CACHE INVALIDATION BENCHMARK (ms per user invalidation, median)")
+    print("=" * 70)
+    print(f"   {'keyspace':>10}  {'tags':>9}  {'scan':>9}  {'keys':>9}")
+
+    for size in sorted(args.sizes):
+        await fill_keyspace(client, filled, size)
+        filled = size
+
+        timings = {"tags": [], "scan": [], "keys": []}
+        for method in timings:
+            for _ in range(args.repeats if method == "tags" else args.slow_repeats):
+                user_id = next_user
+                next_user += 1
+                await cache_user(cache, user_id, args.pages)
+
+                if method == "tags":
+                    coro = cache.invalidate_user_conversations(user_id)
+                elif method == "scan":
+                    coro = cache.delete_pattern(f"conversations:user:{user_id}:*")
+                else:
+                    coro = legacy_delete_pattern(client, f"conversations:user:{user_id}:*")
+                timings[method].append(await time_ms(coro))
+
+        medians: List[float] = [statistics.median(timings[m]) for m in ("tags", "scan", "keys")]
+        keyspace = await client.dbsize()
+        print(f"   {keyspace:>10,}  {medians[0]:>9.2f}  {medians[1]:>9.2f}  {medians[2]:>9.2f}")
+
+    print("=" * 70)
+    if args.flush:
+        await client.flushdb()
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/15"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Filler keyspace sizes")
+    parser.add_argument("--pages", type=int, default=10, help="Cached conversation pages per user")
+    parser.add_argument("--repeats", type=int, default=50, help="Tag invalidations per size")
+    parser.add_argument("--slow-repeats", type=int, default=5, help="SCAN / KEYS invalidations per size")
+    parser.add_argument("--flush", action="store_true", help="Flush the target database before and after")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Conversation list benchmark: eager-loaded conversations vs summary rows
+
+Seeds a benchmark user with --conversations conversations of --messages
+messages each (1k x 500 by default) in a scratch database, then times a page
+of the sidebar list two ways:
+
+    eager    - get_user_conversations_optimized (every Message and Attachment of
+               the page loaded to count them and read the last one)
+    summary  - get_user_conversation_summaries (one query, count + preview per row)
+
+and, for the summary query, walking every page with the keyset cursor versus
+the equivalent OFFSET pages (whose cost grows with the page number).
+
+Usage (needs a database with the app schema you can write to):
+    DATABASE_URL=postgresql://localhost/mrwhite_bench python scripts/benchmark_conversation_list.py --indexes
+    python scripts/benchmark_conversation_list.py --conversations 200 --messages 100 --cleanup
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+# Add fastapi_chat to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+
+from models import AsyncSessionLocal, get_user_conversations_optimized, get_user_conversation_summaries
+
+SEED_CONVERSATIONS = """
+    INSERT INTO conversations (user_id, title, is_bookmarked, created_at, updated_at)
+    SELECT :user_id,
+           CASE WHEN g % 5 = 0 THEN 'New Conversation' ELSE 'Benchmark conversation ' || g END,
+           false, NOW() - g * INTERVAL '1 hour', NOW() - g * INTERVAL '1 minute'
+    FROM generate_series(1, :count) g
+"""
+SEED_MESSAGES = """
+    INSERT INTO messages (conversation_id, content, type, created_at, liked, disliked, is_bookmarked)
+    SELECT c.id, repeat('How is my dog doing today? ', 12) || s,
+           CASE WHEN s % 2 = 1 THEN 'user' ELSE 'ai' END,
+           c.created_at + s * INTERVAL '1 second', false, false, false
+    FROM conversations c CROSS JOIN generate_series(1, :count) s
+    WHERE c.user_id = :user_id
+"""
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_conversations_user_updated_id ON conversations (user_id, updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_messages_conversation_created_id ON messages (conversation_id, created_at, id)",
+]
+
+
+async def seed(conversations: int, messages: int) -> int:
+    """Create (or reuse) the benchmark user and fill it with conversations"""
+    username = f"bench_conversations_{conversations}x{messages}"
+    async with AsyncSessionLocal() as session:
+        user_id = (await session.execute(
+            text("SELECT id FROM users WHERE username = :username"), {"username": username}
+        )).scalar()
+        if user_id:
+            return user_id
+
+        user_id = (await session.execute(text(
+            "INSERT INTO users (username, email, password_hash) VALUES (:username, :email, 'x') RETURNING id"
+        ), {"username": username, "email": f"{username}@bench.invalid"})).scalar()
+        started = time.perf_counter()
+        await session.execute(text(SEED_CONVERSATIONS), {"user_id": user_id, "count": conversations})
+        await session.execute(text(SEED_MESSAGES), {"user_id": user_id, "count": messages})
+        await session.commit()
+        await session.execute(text("ANALYZE conversations"))
+        await session.execute(text("ANALYZE messages"))
+        await session.commit()
+        print(f"   Seeded {conversations:,} conversations x {messages} messages in {time.perf_counter() - started:.1f} s")
+        return user_id
+
+
+async def cleanup(user_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(
+            "DELETE FROM messages WHERE conversation_id IN (SELECT id FROM conversations WHERE user_id = :user_id)"
+        ), {"user_id": user_id})
+        await session.execute(text("DELETE FROM conversations WHERE user_id = :user_id"), {"user_id": user_id})
+        await session.execute(text("DELETE FROM users WHERE id = :user_id"), {"user_id": user_id})
+        await session.commit()
+
+
+async def timed(call: Callable[[], Awaitable], repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(label: str, latencies: List[float]):
+    print(f"   {label:<22} median {statistics.median(latencies) * 1000:9.1f} ms   "
+          f"max {max(latencies) * 1000:9.1f} ms")
+
+
+async def main(args: argparse.Namespace) -> None:
+    print("=" * 70)
+    print("📊 CONVERSATION LIST BENCHMARK")
+    print("=" * 70)
+
+    if args.indexes:
+        async with AsyncSessionLocal() as session:
+            for statement in INDEXES:
+                await session.execute(text(statement))
+            await session.commit()
+
+    user_id = await seed(args.conversations, args.messages)
+
+    async def eager_page():
+        async with AsyncSessionLocal() as session:
+            conversations = await get_user_conversations_optimized(session, user_id, args.page_size, 0)
+            return [(len(c.messages), c.messages[-1].content if c.messages else "") for c in conversations]
+
+    async def summary_page():
+        async with AsyncSessionLocal() as session:
+            return await get_user_conversation_summaries(session, user_id, limit=args.page_size)
+
+    print(f"   First page of {args.page_size}:")
+    report("eager", await timed(eager_page, args.repeat))
+    report("summary", await timed(summary_page, args.repeat))
+
+    async def walk_cursor():
+        cursor, pages = None, 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                _, cursor = await get_user_conversation_summaries(session, user_id, limit=args.page_size, cursor=cursor)
+            pages += 1
+            if not cursor:
+                return pages
+
+    async def walk_offset():
+        offset = 0
+        while True:
+            async with AsyncSessionLocal() as session:
+                _, more = await get_user_conversation_summaries(session, user_id, limit=args.page_size, offset=offset)
+            offset += args.page_size
+            if not more:
+                return offset // args.page_size
+
+    pages = await walk_cursor()
+    print(f"   All {pages} pages:")
+    report("summary, keyset", await timed(walk_cursor, max(1, args.repeat // 5)))
+    report("summary, offset", await timed(walk_offset, max(1, args.repeat // 5)))
+    print("=" * 70)
+
+    if args.cleanup:
+        await cleanup(user_id)
+        print("   🧹 Benchmark data removed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=1000, help="Conversations for the benchmark user")
+    parser.add_argument("--messages", type=int, default=500, help="Messages per conversation")
+    parser.add_argument("--page-size", type=int, default=50, help="Conversations per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per measurement")
+    parser.add_argument("--indexes", action="store_true", help="Create the summary indexes first")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the benchmark user's data afterwards")
+    asyncio.run(main(parser.parse_args()))
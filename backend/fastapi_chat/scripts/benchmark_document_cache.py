@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the ServiceOrchestrator document cache
+
+Measures per-operation cost of get (hit), get (miss), put with eviction and
+TTL expiry at increasing cache sizes, for the LRUTTLCache and for the previous
+list-based LRU. Constant-time operations show flat numbers across sizes.
+
+Usage:
+    python scripts/benchmark_document_cache.py
+    python scripts/benchmark_document_cache.py --sizes 1000 10000 --ops 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+# Add fastapi_chat to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.lru_ttl_cache import LRUTTLCache
+
+
+class ListLRUCache:
+    """The previous orchestrator implementation: dict + list recency order"""
+
+    def __init__(self, max_entries: int, max_memory_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Any] = {}
+        self._order: List[str] = []
+        self._memory = 0
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry and time.time() - entry[0] < self.ttl_seconds:
+            if key in self._order:
+                self._order.remove(key)
+            self._order.append(key)
+            return entry[1]
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        size = len(str(value).encode('utf-8'))
+        while self._order and (
+            len(self._entries) >= self.max_entries
+            or self._memory + size > self.max_memory_bytes
+        ):
+            lru_key = self._order.pop(0)
+            self._memory -= self._entries.pop(lru_key)[2]
+        self._entries[key] = (time.time(), value, size)
+        self._order.append(key)
+        self._memory += size
+
+
+def make_result(i: int) -> Dict[str, Any]:
+    """Document-result shaped payload (~20 KB of extracted text)"""
+    return {
+        "success": True,
+        "content": f"Extracted text of document {i}. " * 600,
+        "metadata": {"filename": f"doc_{i}.pdf", "pages": i % 40, "chunks": list(range(10))},
+        "service_used": "document",
+    }
+
+
+def per_op_us(fn: Callable[[int], Any], ops: int) -> float:
+    started = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - started) / ops * 1e6
+
+
+def bench(name: str, factory: Callable[[int], Any], size: int, ops: int) -> Dict[str, float]:
+    cache = factory(size)
+    payloads = [make_result(i) for i in range(64)]
+    for i in range(size):
+        cache.put(f"key:{i}", payloads[i % 64])
+
+    hit_keys = [f"key:{random.randrange(size)}" for _ in range(ops)]
+    results = {
+        "get_hit": per_op_us(lambda i: cache.get(hit_keys[i]), ops),
+        "get_miss": per_op_us(lambda i: cache.get(f"missing:{i}"), ops),
+        # Cache is full, so every put evicts the LRU entry
+        "put_evict": per_op_us(lambda i: cache.put(f"new:{i}", payloads[i % 64]), ops),
+    }
+    print(
+        f"   {name:<14} {size:>7,}  "
+        f"{results['get_hit']:>9.2f}  {results['get_miss']:>9.2f}  {results['put_evict']:>10.2f}"
+    )
+    return results
+
+
+def bench_expiry(size: int) -> float:
+    """Time to expire a full cache through the timer wheel, per entry"""
+    now = [0.0]
+    cache = LRUTTLCache(
+        max_entries=size,
+        max_memory_bytes=1 << 40,
+        ttl_seconds=60,
+        clock=lambda: now[0]
+    )
+    payload = make_result(0)
+    for i in range(size):
+        now[0] = i * 60 / size  # Spread expiries over the TTL
+        cache.put(f"key:{i}", payload)
+
+    now[0] = 200.0
+    started = time.perf_counter()
+    cache.get("trigger")
+    elapsed = time.perf_counter() - started
+    assert len(cache) == 0
+    return elapsed / size * 1e6
+
+
+def main(args: argparse.Namespace) -> None:
+    random.seed(7)
+    ttl = 1800
+
+    print("=" * 70)
+    print("📊 DOCUMENT CACHE MICROBENCHMARK (µs per operation)")
+    print("=" * 70)
+    print(f"   {'cache':<14} {'entries':>7}  {'get hit':>9}  {'get miss':>9}  {'put+evict':>10}")
+
+    for size in args.sizes:
+        bench(
+            "LRUTTLCache",
+            lambda n: LRUTTLCache(max_entries=n, max_memory_bytes=1 << 40, ttl_seconds=ttl),
+            size, args.ops
+        )
+        if not args.skip_baseline:
+            bench(
+                "list LRU",
+                lambda n: ListLRUCache(max_entries=n, max_memory_bytes=1 << 40, ttl_seconds=ttl),
+                size, min(args.ops, 2000)
+            )
+
+    print("-" * 70)
+    for size in args.sizes:
+        print(f"   TTL expiry via timer wheel @ {size:>7,} entries: {bench_expiry(size):.2f} µs/entry")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Cache sizes")
+    parser.add_argument("--ops", type=int, default=50000, help="Operations per measurement")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only benchmark LRUTTLCache")
+    main(parser.parse_args())
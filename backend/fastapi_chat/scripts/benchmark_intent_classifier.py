@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark and parity check for SmartIntentRouter classification
+
+Runs a corpus of chat messages through the previous per-pattern `re.findall`
+loop and through the compiled matcher, reports messages/sec for both and
+fails if any label, score or match list differs. The ML step is timed with
+the lexicon sentiment scorer and, when textblob is installed, with TextBlob,
+and the ML labels of the two are compared.
+
+Usage:
+    python scripts/benchmark_intent_classifier.py
+    python scripts/benchmark_intent_classifier.py --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+# Add fastapi_chat to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.shared.async_smart_intent_router import SmartIntentRouter
+
+CORPUS = [
+    "Remind me to walk Max tomorrow at 8am",
+    "remind me to walk max!",
+    "Please set a reminder for Bella's rabies vaccine next week",
+    "Can you create a reminder to give Luna her medication in 3 days?",
+    "Don't forget the vet visit on Oct 12 at 10:30",
+    "Max has an appointment on 10/2, please note that",
+    "Schedule grooming for 5 pm this friday",
+    "I need a reminder for heartworm medicine every month",
+    "Keep track of his checkup next month",
+    "My dog is bleeding and not breathing, help!",
+    "EMERGENCY my puppy swallowed chocolate and is vomiting blood",
+    "She collapsed and is unconscious, what do I do?!",
+    "I think he ate something toxic, he is choking",
+    "My dog has been limping and coughing since yesterday",
+    "Why is my dog not eating or drinking much lately?",
+    "What medication is safe for joint pain in older dogs?",
+    "He has diarrhea and low energy, should I see a vet?",
+    "Her appetite changed and she lost weight",
+    "Hello!",
+    "hi there, how are you?",
+    "Thanks so much, that was really helpful",
+    "Good morning Mr White",
+    "Thank you, you're the best",
+    "Can you help me with something?",
+    "I want to write a book about my dog",
+    "Please edit chapter 3 and change the first paragraph",
+    "Generate a draft page about our trip to the beach",
+    "Update the document with his new photos",
+    "What is the best food for a golden retriever puppy?",
+    "How do I teach my dog to sit?",
+    "Explain why dogs eat grass",
+    "Tell me about separation anxiety",
+    "Where can I find statistics on dog bites?",
+    "Describe the signs of heatstroke in dogs",
+    "And what about cats?",
+    "Also, another question",
+    "tell me more",
+    "continue",
+    "then what?",
+    "He is fully vaccinated and has been on a balanced diet with daily walks since puppyhood",
+    "Medical history: was treated for an ear infection, fully recovered after two weeks",
+    "Current diet: kibble twice a day. Current exercise: two daily walks",
+    "She is a 4 year old lab who loves to swim",
+    "My dog seems sad and lethargic, I'm worried",
+    "This is terrible, he is in so much pain",
+    "Everything is fine, he is happy and healthy now",
+    "Set up a reminder at 9:00 for feeding",
+    "Time for his vaccination, schedule it please",
+    "Make a note that Rocky's checkup is on 2nd Nov",
+    "record this: she weighed 22 kg at the vet today",
+    "what's up",
+    "ok",
+    "",
+]
+
+
+def legacy_classify(intent_patterns: Dict[str, List[str]], message: str) -> Dict[str, Any]:
+    """The previous SmartIntentRouter._classify_by_patterns loop"""
+    message_lower = message.lower()
+    intent_scores = {}
+    for intent, patterns in intent_patterns.items():
+        score = 0
+        matches = []
+        pattern_count = 0
+        for pattern in patterns:
+            pattern_matches = re.findall(pattern, message_lower, re.IGNORECASE)
+            if pattern_matches:
+                score += len(pattern_matches) * 0.3
+                matches.extend(pattern_matches)
+                pattern_count += 1
+        if pattern_count > 1:
+            score += 0.4 if intent == "reminder" else 0.2
+        if score > 0:
+            intent_scores[intent] = {"score": min(score, 1.0), "matches": matches, "pattern_count": pattern_count}
+
+    if intent_scores:
+        best_intent = max(intent_scores.keys(), key=lambda x: intent_scores[x]["score"])
+        return {"intent": best_intent, "confidence": intent_scores[best_intent]["score"], "all_scores": intent_scores}
+    return {"intent": "chat_general", "confidence": 0.3, "all_scores": {}}
+
+
+def build_corpus(repeat: int) -> List[str]:
+    """The fixed corpus plus shuffled two-sentence combinations of it"""
+    rng = random.Random(7)
+    combined = [f"{rng.choice(CORPUS)} {rng.choice(CORPUS)}" for _ in range(len(CORPUS) * 4)]
+    return (CORPUS + combined) * repeat
+
+
+def throughput(fn: Callable[[str], Any], messages: List[str]) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return len(messages) / (time.perf_counter() - started)
+
+
+def check_pattern_parity(router: SmartIntentRouter, messages: List[str]) -> int:
+    mismatches = 0
+    for message in messages:
+        expected = legacy_classify(router.intent_patterns, message)
+        actual = asyncio.run(router._classify_by_patterns(message))
+        if (expected["intent"], expected["confidence"], expected["all_scores"]) != (
+            actual["intent"], actual["confidence"], actual["all_scores"]
+        ):
+            mismatches += 1
+            print(f"   ❌ {message!r}: {expected['intent']} ({expected['confidence']:.2f}) "
+                  f"!= {actual['intent']} ({actual['confidence']:.2f})")
+    return mismatches
+
+
+def main(args: argparse.Namespace) -> None:
+    router = SmartIntentRouter(redis_client=None)
+    unique = list(dict.fromkeys(build_corpus(1)))
+    messages = build_corpus(args.repeat)
+
+    print("=" * 70)
+    print(f"📊 INTENT CLASSIFIER BENCHMARK ({len(messages):,} messages)")
+    print("=" * 70)
+
+    legacy_rate = throughput(lambda m: legacy_classify(router.intent_patterns, m), messages)
+    compiled_rate = throughput(lambda m: router.pattern_matcher.score(m.lower()), messages)
+    print(f"   pattern scan, per-pattern findall : {legacy_rate:>12,.0f} msg/s")
+    print(f"   pattern scan, compiled matcher    : {compiled_rate:>12,.0f} msg/s  ({compiled_rate / legacy_rate:.1f}x)")
+
+    lexicon_rate = throughput(router.sentiment_analyzer, messages)
+    print(f"   sentiment, lexicon scorer         : {lexicon_rate:>12,.0f} msg/s")
+    try:
+        from textblob import TextBlob
+    except ImportError:
+        TextBlob = None
+        print("   sentiment, TextBlob               : not installed, skipped")
+    if TextBlob is not None:
+        textblob_rate = throughput(lambda m: TextBlob(m).sentiment, messages[:len(unique) * 5])
+        print(f"   sentiment, TextBlob               : {textblob_rate:>12,.0f} msg/s")
+
+    print("-" * 70)
+    mismatches = check_pattern_parity(router, unique)
+    print(f"   pattern parity: {len(unique) - mismatches}/{len(unique)} messages identical")
+
+    if TextBlob is not None:
+        lexicon_labels = [asyncio.run(router._classify_with_ml(m))["intent"] for m in unique if m]
+        analyzer = router.sentiment_analyzer
+        router.sentiment_analyzer = lambda m: TextBlob(m).sentiment
+        textblob_labels = [asyncio.run(router._classify_with_ml(m))["intent"] for m in unique if m]
+        router.sentiment_analyzer = analyzer
+        agree = sum(a == b for a, b in zip(lexicon_labels, textblob_labels))
+        print(f"   ML label agreement with TextBlob: {agree}/{len(lexicon_labels)}")
+    print("=" * 70)
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50, help="Times the corpus is replayed for timing")
+    main(parser.parse_args())
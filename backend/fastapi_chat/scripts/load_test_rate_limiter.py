@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test for the Redis rate limiter
+
+Fires N simultaneous requests for one user and checks that exactly the tier
+limit is admitted - for the minute window, for the hour window and for both
+together - then repeats the burst with the previous GET + INCR limiter to show
+how far it overshoots. A second burst shows rejections served by the local
+pre-check without touching Redis.
+
+Usage (needs a Redis you can flush; defaults to db 15 on localhost):
+    REDIS_URL=redis://localhost:6379/15 python scripts/load_test_rate_limiter.py --flush
+    python scripts/load_test_rate_limiter.py --flush --concurrency 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, Tuple
+
+# Add fastapi_chat to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("SECRET_KEY", "load-test")
+
+import redis.asyncio as redis
+
+from middleware.async_middleware import AsyncRateLimiter
+
+SCENARIOS = {
+    # name: (limits, windows, expected admitted)
+    "minute window": ({"free": {"requests_per_minute": 30, "requests_per_hour": 500}}, ("minute",), 30),
+    "hour window": ({"free": {"requests_per_minute": 5000, "requests_per_hour": 200}}, ("hour",), 200),
+    "minute + hour": ({"free": {"requests_per_minute": 100, "requests_per_hour": 80}}, ("minute", "hour"), 80),
+}
+
+
+async def legacy_check(client: redis.Redis, user_id: str, limit: int) -> bool:
+    """The previous limiter: GET, compare, then INCR + EXPIRE"""
+    key = f"rate_limit:legacy:{user_id}"
+    current = int(await client.get(key) or 0)
+    if current >= limit:
+        return False
+    pipe = client.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, 60)
+    await pipe.execute()
+    return True
+
+
+async def burst(limiter: AsyncRateLimiter, user_id: str, windows: Tuple[str, ...], concurrency: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        limiter.acquire(user_id, "free", windows) for _ in range(concurrency)
+    ])
+    return {
+        "admitted": sum(1 for r in results if r["allowed"]),
+        "elapsed_ms": (time.perf_counter() - started) * 1000
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = redis.from_url(args.redis_url, decode_responses=True, max_connections=args.concurrency)
+    await client.ping()
+
+    if await client.dbsize():
+        if not args.flush:
+            print(f"❌ {args.redis_url} is not empty; pass --flush to clear it for the load test")
+            return
+        await client.flushdb()
+
+    print("=" * 70)
+    print(f"📊 RATE LIMITER LOAD TEST ({args.concurrency} concurrent requests per burst)")
+    print("=" * 70)
+
+    failures = 0
+    for name, (limits, windows, expected) in SCENARIOS.items():
+        limiter = AsyncRateLimiter(client, limits)
+        user_id = f"load-test-{name.replace(' ', '-')}"
+
+        first = await burst(limiter, user_id, windows, args.concurrency)
+        redis_calls_before = limiter.stats["rejected"] - limiter.stats["rejected_locally"]
+        second = await burst(limiter, user_id, windows, args.concurrency)
+        local = limiter.stats["rejected_locally"]
+
+        ok = first["admitted"] == expected and second["admitted"] == 0
+        failures += not ok
+        print(
+            f"   {'✅' if ok else '❌'} {name:<14} admitted {first['admitted']:>4} / expected {expected:<4} "
+            f"({first['elapsed_ms']:.0f} ms); second burst admitted {second['admitted']}, "
+            f"{local} rejected locally, {redis_calls_before} by Redis"
+        )
+
+    legacy_user = "load-test-legacy"
+    legacy = await asyncio.gather(*[legacy_check(client, legacy_user, 30) for _ in range(args.concurrency)])
+    print(f"   ⚠️  legacy GET+INCR  admitted {sum(legacy):>4} / limit 30")
+    print("=" * 70)
+
+    if args.flush:
+        await client.flushdb()
+    await client.aclose()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/15"))
+    parser.add_argument("--concurrency", type=int, default=1000, help="Simultaneous requests per burst")
+    parser.add_argument("--flush", action="store_true", help="Flush the target database before and after")
+    asyncio.run(main(parser.parse_args()))
@@ -4,9 +4,11 @@ Handles general conversational AI interactions
 """
 
 import os
+import re
 import time
 import json
 import uuid
+import hashlib
 import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Tuple
@@ -22,10 +24,12 @@ from fastapi import BackgroundTasks
 from models import (
     AsyncSessionLocal, User, Conversation, Message, Attachment, Document,
     ChatResponse, ConversationCreateRequest,
-    get_user_conversations_optimized, get_conversation_with_messages_optimized,
+    get_user_conversation_summaries, get_conversation_header_async,
+    get_conversation_message_page, iter_conversation_messages,
     get_bookmarked_conversations_optimized, get_bookmarked_messages_optimized,
     create_conversation_async, create_message_async
 )
+from shared.history_buffer import get_history_buffer
 
 from services.shared.async_pinecone_service import AsyncPineconeService
 from services.shared.async_langgraph_service import AsyncLangGraphService
@@ -89,12 +93,18 @@ class ChatService:
         
         # Initialize semantic caching and request deduplication
         if cache_service:
-            self.semantic_cache = SemanticResponseCache(cache_service)
+            self.semantic_cache = SemanticResponseCache(
+                cache_service,
+                embed_fn=getattr(vector_service, "_get_embeddings", None),
+                similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+            )
             self.request_deduplicator = RequestDeduplicator(cache_service)
         else:
             self.semantic_cache = None
             self.request_deduplicator = None
         
+        self.semantic_cache_ttl = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+        
         # AI configuration - Pure AWS Bedrock only (no fallbacks)
         self.ai_pool = None  # AWS Bedrock-only AI pool (no fallbacks)
         self.chat_model = "gpt-4"  # Maps to Claude 3 Sonnet in Bedrock
@@ -234,71 +244,6 @@ class ChatService:
         """Async context manager exit"""
         pass
 
-    async def get_conversation_with_messages(
-        self,
-        conversation_id: int,
-        user_id: int
-    ) -> Dict[str, Any]:
-        """
-        Get specific conversation with messages
-        """
-        try:
-            # Cache miss or no cache service - query database
-            from models import get_conversation_with_messages_optimized
-            
-            async with AsyncSessionLocal() as session:
-                # Single query loads conversation + messages + attachments
-                conversation = await get_conversation_with_messages_optimized(
-                    session, conversation_id, user_id
-                )
-                
-                if not conversation:
-                    raise ValueError("Conversation not found or access denied")
-                
-                message_data = []
-                # Ensure messages are sorted by creation time (chronological order)
-                sorted_messages = sorted(conversation.messages, key=lambda m: m.created_at)
-                for msg in sorted_messages:
-                    message_data.append({
-                        "id": msg.id,
-                        "content": msg.content,
-                        "sender": getattr(msg, "sender", None),
-                        "timestamp": msg.created_at.isoformat() + 'Z' if msg.created_at else None,
-                        "message_type": msg.type if msg.type in ['user', 'ai'] else 'ai',
-                        "is_bookmarked": msg.is_bookmarked or False,
-                        "attachments": [
-                            {
-                                "id": att.id,
-                                "file_type": att.type,      # Map type to file_type for frontend compatibility
-                                "file_name": att.name,      # Map name to file_name for frontend compatibility
-                                "file_path": att.url,       # Map url to file_path for frontend compatibility  
-                                "file_size": 0              # Default file_size since it's not stored in this model
-                            }
-                            for att in msg.attachments
-                        ] if msg.attachments else []
-                    })
-                
-                result = {
-                    "id": conversation.id,
-                    "title": conversation.title,
-                    "created_at": conversation.created_at.isoformat() if conversation.created_at else None,
-                    "updated_at": conversation.updated_at.isoformat() if conversation.updated_at else None,
-                    "is_bookmarked": conversation.is_bookmarked or False,
-                    "messages": message_data,
-                    "total_messages": len(message_data)
-                }
-                
-                # Cache the result if cache service available
-                if self.cache_service:
-                    await self.cache_service.cache_conversation_with_messages(conversation_id, result)
-                    
-                logger.info(f"✅ Retrieved conversation {conversation_id} with {len(message_data)} messages")
-                return result
-                
-        except Exception as e:
-            logger.error(f"Get conversation with messages error: {str(e)}")
-            raise e
-
     async def process_chat_message(
         self,
         user_id: int,
@@ -423,6 +368,18 @@ class ChatService:
             # Phase 1: Build user context efficiently
             user_context = await self._build_user_context_smart(user_id, conversation_id)
             
+            # Phase 1.1: Semantic cache - repeated standalone questions skip the LLM
+            cache_fingerprint = None
+            if self._is_semantic_cacheable(message, files, attachments):
+                cache_fingerprint = self._semantic_cache_fingerprint(user_context)
+                cached = await self.semantic_cache.get_semantic_response(
+                    user_id, message, context="smart_chat", fingerprint=cache_fingerprint
+                )
+                if cached:
+                    return await self._respond_from_semantic_cache(
+                        user_id, conversation_id, message, cached, user_context, attachments, start_time
+                    )
+            
             # Phase 1.25: Add common knowledge (Anahata book content) to context
             user_context = await self._add_common_knowledge_to_context(message, user_context)
             
@@ -448,6 +405,16 @@ class ChatService:
                 user_id, conversation_id, message, ai_response, None, attachments
             )
             
+            # Phase 4.5: Index the answer for semantically similar questions
+            if cache_fingerprint is not None:
+                await self.semantic_cache.cache_semantic_response(
+                    user_id, message, ai_response,
+                    context="smart_chat",
+                    ttl=self.semantic_cache_ttl,
+                    metadata={"response_type": prompt_context.response_type.value},
+                    fingerprint=cache_fingerprint
+                )
+            
             # Phase 5: Background optimization tracking
             if background_tasks:
                 background_tasks.add_task(
@@ -506,6 +473,94 @@ class ChatService:
                     "processing_time": time.time() - start_time
                 }
     
+    # Messages referring to the current time must never be answered from cache
+    _TIME_SENSITIVE_PATTERN = re.compile(r"\b(today|tonight|tomorrow|yesterday|now|right now|currently|this (morning|evening|week))\b")
+    _QUESTION_START_PATTERN = re.compile(r"^(how|what|why|when|where|which|who|is|are|can|could|should|do|does|will|would)\b")
+    
+    def _is_semantic_cacheable(
+        self,
+        message: str,
+        files: Optional[List[Dict[str, Any]]],
+        attachments: Optional[List[Dict[str, Any]]]
+    ) -> bool:
+        """
+        Whether a smart-prompt answer may be served from / stored in the
+        semantic cache: standalone, general questions without files or
+        retrieved documents, which the smart prompt answers from the message
+        and the user's profile alone
+        """
+        if not self.semantic_cache or files or attachments:
+            return False
+        
+        text = message.strip().lower()
+        word_count = len(text.split())
+        if word_count < 3 or word_count > 60:
+            return False
+        if self._TIME_SENSITIVE_PATTERN.search(text):
+            return False
+        
+        return text.endswith("?") or bool(self._QUESTION_START_PATTERN.match(text))
+    
+    def _semantic_cache_fingerprint(self, user_context: Dict[str, Any]) -> str:
+        """Digest of the profile data a smart-prompt answer depends on"""
+        relevant = {
+            "pets": user_context.get("pets", []),
+            "username": user_context.get("username"),
+            "subscription_tier": user_context.get("subscription_tier")
+        }
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    
+    async def _respond_from_semantic_cache(
+        self,
+        user_id: int,
+        conversation_id: int,
+        message: str,
+        cached: Dict[str, Any],
+        user_context: Dict[str, Any],
+        attachments: Optional[List[Dict[str, Any]]],
+        start_time: float
+    ) -> ChatResponse:
+        """Persist and return a cached answer without calling the LLM"""
+        ai_response = cached["response"]
+        logger.info(
+            f"🎯 Semantic cache hit for user {user_id} "
+            f"(similarity {cached['similarity_score']:.3f}): '{message[:50]}...'"
+        )
+        
+        await self._process_user_message_for_pet_questions(user_id, message, user_context)
+        conversation_data = await self._store_conversation_in_postgresql(
+            user_id, conversation_id, message, ai_response, None, attachments
+        )
+        self.smart_routing_stats["cache_hits"] += 1
+        self.smart_routing_stats["ai_calls_saved"] += 1
+        
+        return ChatResponse(
+            success=True,
+            content=ai_response,
+            conversation_id=conversation_data["conversation_id"],
+            message_id=conversation_data["message_id"],
+            context_info={
+                "smart_prompts_used": True,
+                "semantic_cache_hit": True,
+                "similarity_score": cached["similarity_score"],
+                "pets_addressed": len(user_context.get("pets", []))
+            },
+            sources_used=[],
+            processing_time=time.time() - start_time
+        )
+    
+    async def invalidate_semantic_cache(self, user_id: int) -> int:
+        """Drop a user's semantically cached answers (documents or dog profiles changed)"""
+        if not self.semantic_cache:
+            return 0
+        return await self.semantic_cache.invalidate_user(user_id)
+    
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Semantic response cache hit rate and similarity distribution"""
+        if not self.semantic_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.semantic_cache.get_stats()}
+    
     async def _build_user_context_smart(self, user_id: int, conversation_id: int) -> Dict[str, Any]:
         """Build lightweight user context for smart prompts (reduced complexity)"""
         try:
@@ -1660,49 +1715,76 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """Get user's conversations with pagination"""
+        page = await self.get_user_conversation_page(user_id, limit=limit, offset=offset)
+        return page["conversations"]
+
+    async def get_user_conversation_page(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the user's conversation list (summaries only, newest first)
+
+        Args:
+            user_id: Owner of the conversations
+            limit: Page size
+            cursor: next_cursor from the previous page (keyset pagination)
+            offset: Legacy offset pagination, ignored when a cursor is given
+
+        Returns:
+            {"conversations": [...], "next_cursor": str or None, "has_more": bool}
+        """
         try:
-            # Use optimized PostgreSQL query
             async with AsyncSessionLocal() as session:
-                conversations_result = await get_user_conversations_optimized(
-                    session, user_id, limit, offset
+                rows, next_cursor = await get_user_conversation_summaries(
+                    session, user_id, limit=limit, cursor=cursor, offset=offset
                 )
-                conversations = conversations_result or []
             
             # Format conversations for response
             formatted_conversations = []
-            for conv in conversations:
+            for row in rows:
                 # Generate title from first user message if title is "New Conversation" or empty
-                title = conv.title
+                title = row["title"]
                 if not title or title == "New Conversation":
-                    title = self._generate_conversation_title(conv)
+                    title = self._title_from_first_message(row["id"], row["first_user_message"])
                 
-                formatted_conv = {
-                    "id": conv.id,  # Frontend expects 'id', not 'conversation_id'
-                    "conversation_id": conv.id,  # Keep for backward compatibility
+                formatted_conversations.append({
+                    "id": row["id"],  # Frontend expects 'id', not 'conversation_id'
+                    "conversation_id": row["id"],  # Keep for backward compatibility
                     "title": title,
-                    "created_at": conv.created_at.isoformat() if conv.created_at else None,
-                    "updated_at": conv.updated_at.isoformat() if conv.updated_at else None,
-                    "message_count": len(conv.messages) if hasattr(conv, 'messages') else 0,
-                    "is_bookmarked": conv.is_bookmarked or False,
-                    "last_message": conv.messages[-1].content if hasattr(conv, 'messages') and conv.messages else "",
+                    "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                    "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
+                    "message_count": row["message_count"],
+                    "is_bookmarked": row["is_bookmarked"] or False,
+                    "last_message": row["last_message"] or "",
                     "context": "chat"  # Default context for conversations
-                }
-                formatted_conversations.append(formatted_conv)
-            
-            # Apply offset for pagination
-            if offset > 0:
-                formatted_conversations = formatted_conversations[offset:]
-            
-            # Apply limit
-            if limit > 0:
-                formatted_conversations = formatted_conversations[:limit]
+                })
             
             logger.info(f"✅ Retrieved {len(formatted_conversations)} conversations for user {user_id}")
-            return formatted_conversations
+            return {
+                "conversations": formatted_conversations,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"❌ Failed to get user conversations: {str(e)}")
             raise e
 
+    def _title_from_first_message(self, conversation_id: int, content: Optional[str]) -> str:
+        """Title an untitled conversation after its first user message"""
+        content = (content or "").strip()
+        if not content:
+            return f"Conversation {conversation_id}"
+        # Truncate to reasonable length and add ellipsis if needed
+        if len(content) > 50:
+            return content[:47] + "..."
+        return content
+
     
     def _generate_conversation_title(self, conversation) -> str:
         """Generate a meaningful title from the first user message"""
@@ -1819,67 +1901,156 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
             logger.error(f"❌ Failed to toggle conversation bookmark: {str(e)}")
             raise e
     
+    def _format_message(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        """Frontend shape of a message row from the message page/stream loaders"""
+        return {
+            "id": msg["id"],  # Frontend expects 'id', not 'message_id'
+            "message_id": msg["id"],  # Keep for backward compatibility
+            "content": msg["content"],
+            "message_type": msg["type"] or "user",
+            "timestamp": msg["created_at"].isoformat() + 'Z' if msg["created_at"] else None,
+            "attachments": [
+                {
+                    "id": att.id,
+                    "file_type": att.type,      # Map type to file_type for frontend compatibility
+                    "file_name": att.name,      # Map name to file_name for frontend compatibility
+                    "file_path": att.url,       # Map url to file_path for frontend compatibility  
+                    "file_size": 0              # Default file_size since it's not stored in this model
+                }
+                for att in msg["attachments"]
+            ],
+            "is_bookmarked": msg["is_bookmarked"] or False,
+            "liked": msg["liked"] or False,
+            "disliked": msg["disliked"] or False
+        }
+
+    def _format_conversation_header(self, conversation: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "conversation_id": conversation["id"],
+            "title": conversation["title"] or "New Conversation",
+            "created_at": conversation["created_at"].isoformat() + 'Z' if conversation["created_at"] else None,
+            "updated_at": conversation["updated_at"].isoformat() + 'Z' if conversation["updated_at"] else None,
+            "is_bookmarked": conversation["is_bookmarked"] or False,
+            "context": "chat"
+        }
+
+    async def _get_conversation_header(self, session: AsyncSession, conversation_id: int, user_id: int) -> Dict[str, Any]:
+        conversation = await get_conversation_header_async(session, conversation_id, user_id)
+        if not conversation:
+            raise ValueError(f"Conversation {conversation_id} not found or access denied")
+        return self._format_conversation_header(conversation)
+
     async def get_conversation_with_messages(
         self,
         conversation_id: int,
         user_id: int
     ) -> Dict[str, Any]:
-        """Get specific conversation with its messages"""
+        """Get specific conversation with all of its messages (unpaginated, legacy clients)"""
         try:
-            # Use optimized PostgreSQL query that already includes messages
             async with AsyncSessionLocal() as session:
-                conversation = await get_conversation_with_messages_optimized(
-                    session, conversation_id, user_id
-                )
-                
-                if not conversation:
-                    raise ValueError(f"Conversation {conversation_id} not found or access denied")
-                
-                # Ensure messages are sorted by creation time (chronological order)
-                messages = sorted(conversation.messages, key=lambda m: m.created_at)
-            
-            # Format messages
-            formatted_messages = []
-            for msg in messages:
-                formatted_msg = {
-                    "id": msg.id,  # Frontend expects 'id', not 'message_id'
-                    "message_id": msg.id,  # Keep for backward compatibility
-                    "content": msg.content,
-                    "message_type": getattr(msg, "type", "user"),
-                    "timestamp": msg.created_at.isoformat() + 'Z' if msg.created_at else None,
-                    "attachments": [
-                        {
-                            "id": att.id,
-                            "file_type": att.type,      # Map type to file_type for frontend compatibility
-                            "file_name": att.name,      # Map name to file_name for frontend compatibility
-                            "file_path": att.url,       # Map url to file_path for frontend compatibility  
-                            "file_size": 0              # Default file_size since it's not stored in this model
-                        }
-                        for att in msg.attachments
-                    ] if hasattr(msg, 'attachments') and msg.attachments else [],
-                    "is_bookmarked": msg.is_bookmarked or False,
-                    "liked": msg.liked or False,
-                    "disliked": msg.disliked or False
-                }
-                formatted_messages.append(formatted_msg)
+                header = await self._get_conversation_header(session, conversation_id, user_id)
+                formatted_messages = [
+                    self._format_message(msg)
+                    async for msg in iter_conversation_messages(session, conversation_id)
+                ]
             
             return {
-                "conversation": {
-                    "conversation_id": conversation.id,
-                    "title": conversation.title or "New Conversation",
-                    "created_at": conversation.created_at.isoformat() + 'Z' if conversation.created_at else None,
-                    "updated_at": conversation.updated_at.isoformat() + 'Z' if conversation.updated_at else None,
-                    "is_bookmarked": conversation.is_bookmarked or False,
-                    "context": "chat"
-                },
+                "conversation": header,
                 "messages": formatted_messages
             }
             
         except Exception as e:
             logger.error(f"❌ Failed to get conversation with messages: {str(e)}")
             raise e
-    
 
+    async def get_conversation_messages_page(
+        self,
+        conversation_id: int,
+        user_id: int,
+        limit: int = 50,
+        before: Optional[int] = None,
+        after: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a conversation with one page of its messages (oldest first within the page)
+
+        Args:
+            conversation_id: Conversation to read
+            user_id: Owner of the conversation
+            limit: Page size
+            before: Message id; return the messages just older than it
+            after: Message id; return the messages just newer than it
+
+        Returns:
+            {"conversation": {...}, "messages": [...], "has_more": bool,
+             "before_cursor": id or None, "after_cursor": id or None}
+            Pass before_cursor as `before` to page back, after_cursor as `after` to poll forward.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                # Ownership is checked on every request: cached pages are keyed per conversation only
+                header = await self._get_conversation_header(session, conversation_id, user_id)
+                
+                page = None
+                if before is not None and self.cache_service:
+                    page = await self.cache_service.get_conversation_page(conversation_id, limit, before)
+                
+                if page is None:
+                    rows, has_more = await get_conversation_message_page(
+                        session, conversation_id, limit=limit, before=before, after=after
+                    )
+                    messages = [self._format_message(row) for row in rows]
+                    page = {
+                        "messages": messages,
+                        "has_more": has_more,
+                        "before_cursor": messages[0]["id"] if messages else before,
+                        "after_cursor": messages[-1]["id"] if messages else after
+                    }
+                    if before is not None and self.cache_service:
+                        await self.cache_service.cache_conversation_page(conversation_id, limit, before, page)
+            
+            logger.info(f"✅ Retrieved {len(page['messages'])} messages of conversation {conversation_id}")
+            return {"conversation": header, **page}
+            
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to get conversation messages page: {str(e)}")
+            raise e
+
+    async def open_conversation_stream(
+        self,
+        conversation_id: int,
+        user_id: int,
+        batch_size: int = 200
+    ):
+        """
+        Check access, then return an async iterator of NDJSON lines for the whole conversation
+
+        The first line is {"type": "conversation", ...}, then one {"type": "message", ...}
+        per message, then {"type": "end", "total_messages": n}. Rows are serialized as they
+        come off the database cursor, so memory stays flat for any conversation length.
+        Access is checked before returning so a missing conversation fails before streaming.
+        """
+        async with AsyncSessionLocal() as session:
+            header = await self._get_conversation_header(session, conversation_id, user_id)
+        
+        async def lines():
+            total = 0
+            yield json.dumps({"type": "conversation", **header}) + "\n"
+            try:
+                async with AsyncSessionLocal() as session:
+                    async for msg in iter_conversation_messages(session, conversation_id, batch_size):
+                        total += 1
+                        yield json.dumps({"type": "message", **self._format_message(msg)}) + "\n"
+            except Exception as e:
+                # Headers are already sent - report the failure in-band
+                logger.error(f"❌ Conversation stream failed after {total} messages: {str(e)}")
+                yield json.dumps({"type": "error", "detail": "Failed to stream conversation"}) + "\n"
+                return
+            yield json.dumps({"type": "end", "total_messages": total}) + "\n"
+        
+        return lines()
     
     async def delete_conversation(
         self,
@@ -1903,6 +2074,9 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
                 # Delete conversation (messages cascade deleted automatically)
                 await session.delete(conversation)
                 await session.commit()
+            get_history_buffer("fastapi_chat").invalidate(conversation_id)
+            if self.cache_service:
+                await self.cache_service.invalidate_conversation(conversation_id, user_id)
             
             logger.info(f"✅ Deleted conversation {conversation_id} for user {user_id}")
             return True
@@ -1996,6 +2170,9 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
                 await session.commit()
                 new_bookmark = message.is_bookmarked
             
+            if self.cache_service:
+                await self.cache_service.invalidate_conversation_pages(message.conversation_id)
+            
             logger.info(f"✅ Toggled bookmark for message {message_id}")
             return {"is_bookmarked": new_bookmark}
             
@@ -2046,6 +2223,9 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
                 # Refresh the message to get updated data
                 await session.refresh(message)
             
+            if self.cache_service:
+                await self.cache_service.invalidate_conversation_pages(message.conversation_id)
+            
             logger.info(f"✅ Added {reaction_type} reaction to message {message_id}")
             return {
                 "reaction_type": reaction_type, 
@@ -2099,6 +2279,10 @@ IMPORTANT: When referencing this information, establish that Anahata is the auth
                 # Commit the changes
                 await session.commit()
                 
+                history_buffer = get_history_buffer("fastapi_chat")
+                for conversation_id in conversation_ids:
+                    history_buffer.invalidate(conversation_id)
+                
                 logger.info(f"✅ Successfully deleted all conversations for user {user_id}")
                 return True, f'Successfully deleted {len(conversations)} conversations and their messages'
                 
@@ -22,6 +22,7 @@ from services.chat.chat_service import ChatService
 from services.health_ai.health_service import HealthAIService
 from services.document.document_service import DocumentService
 from services.reminder.reminder_service import ReminderService
+from utils.lru_ttl_cache import LRUTTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -59,19 +60,16 @@ class ServiceOrchestrator:
         # Unified dog knowledge manager (unused - kept for backward compatibility)
         self.unified_dog_manager = None
         
-        # Optimized document cache with LRU eviction and statistics
-        self._document_cache = {}
+        # Document result cache: O(1) LRU with timer-wheel TTL expiry
         self._document_cache_ttl = 1800  # 30 minutes
-        self._document_cache_access_order = []  # For LRU eviction
-        self._document_cache_stats = {
-            "hits": 0,
-            "misses": 0,
-            "evictions": 0,
-            "memory_usage": 0,  # Approximate bytes
-            "total_requests": 0
-        }
         self._max_cache_entries = 500  # Reduced from 1000 for better memory management
         self._max_cache_memory = 50 * 1024 * 1024  # 50MB limit
+        self._document_cache = LRUTTLCache(
+            max_entries=self._max_cache_entries,
+            max_memory_bytes=self._max_cache_memory,
+            ttl_seconds=self._document_cache_ttl
+        )
+        self._document_cache_requests = 0
         
         # Orchestrator performance tracking
         self.orchestration_stats = {
@@ -2002,10 +2000,8 @@ Please answer the user's question based on this document content."""
         }
         
         # Also reset document cache statistics (but keep cache contents)
-        self._document_cache_stats["hits"] = 0
-        self._document_cache_stats["misses"] = 0
-        self._document_cache_stats["evictions"] = 0
-        self._document_cache_stats["total_requests"] = 0
+        self._document_cache.reset_stats()
+        self._document_cache_requests = 0
 
     async def get_comprehensive_service_stats(self) -> Dict[str, Any]:
         """Get comprehensive statistics from all services"""
@@ -2013,6 +2009,7 @@ Please answer the user's question based on this document content."""
             # Gather stats from all services
             orchestration_stats = self.get_orchestration_stats()
             chat_stats = self.chat_service.get_parallel_processing_stats()
+            chat_stats["semantic_cache"] = self.chat_service.get_semantic_cache_stats()
             health_stats = await self.health_service.get_parallel_processing_stats()
             document_stats = self.document_service.get_processing_stats()
             reminder_stats = self.reminder_service.get_reminder_stats()
@@ -2627,128 +2624,39 @@ Please answer the user's question based on this document content."""
 
     def _get_cached_document_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """
-        Get cached document result with optimized LRU tracking and statistics
+        Get cached document result (O(1) lookup and LRU touch)
         """
         try:
-            self._document_cache_stats["total_requests"] += 1
-            cached_entry = self._document_cache.get(cache_key)
-            
-            if cached_entry:
-                timestamp, result, size = cached_entry
-                
-                # Check if still valid
-                if time.time() - timestamp < self._document_cache_ttl:
-                    # Update LRU order (move to end = most recently used)
-                    if cache_key in self._document_cache_access_order:
-                        self._document_cache_access_order.remove(cache_key)
-                    self._document_cache_access_order.append(cache_key)
-                    
-                    # Update statistics
-                    self._document_cache_stats["hits"] += 1
-                    
-                    logger.debug(f"📄 Document cache HIT: {cache_key[:50]}...")
-                    return result
-                else:
-                    # Remove expired entry
-                    self._remove_cache_entry(cache_key)
+            self._document_cache_requests += 1
+            result = self._document_cache.get(cache_key)
             
-            # Cache miss
-            self._document_cache_stats["misses"] += 1
-            logger.debug(f"📄 Document cache MISS: {cache_key[:50]}...")
-            return None
+            if result is not None:
+                logger.debug(f"📄 Document cache HIT: {cache_key[:50]}...")
+            else:
+                logger.debug(f"📄 Document cache MISS: {cache_key[:50]}...")
+            return result
             
         except Exception as e:
             logger.debug(f"Cache retrieval error: {e}")
-            self._document_cache_stats["misses"] += 1
             return None
 
     def _cache_document_result(self, cache_key: str, result: Dict[str, Any]) -> None:
         """
-        Cache document result with intelligent LRU eviction and memory management
+        Cache document result; the cache evicts LRU entries to stay within
+        its entry and memory limits
         """
         try:
             if not result:
                 return
             
-            # Estimate memory size of result (rough approximation)
-            result_size = len(str(result).encode('utf-8'))
-            
-            # Check memory limits before adding
-            if (self._document_cache_stats["memory_usage"] + result_size > self._max_cache_memory or 
-                len(self._document_cache) >= self._max_cache_entries):
-                self._evict_cache_entries(result_size)
-            
-            # Add to cache
-            self._document_cache[cache_key] = (time.time(), result, result_size)
-            self._document_cache_access_order.append(cache_key)
-            self._document_cache_stats["memory_usage"] += result_size
-            
-            logger.debug(f"📄 Cached document result: {cache_key[:50]}... (size: {result_size} bytes)")
+            if self._document_cache.put(cache_key, result):
+                logger.debug(f"📄 Cached document result: {cache_key[:50]}...")
+            else:
+                logger.debug(f"📄 Document result too large to cache: {cache_key[:50]}...")
             
         except Exception as e:
             logger.debug(f"Cache storage error: {e}")
 
-    def _remove_cache_entry(self, cache_key: str) -> None:
-        """Remove a single cache entry and update tracking"""
-        try:
-            if cache_key in self._document_cache:
-                _, _, size = self._document_cache[cache_key]
-                del self._document_cache[cache_key]
-                self._document_cache_stats["memory_usage"] -= size
-                
-                if cache_key in self._document_cache_access_order:
-                    self._document_cache_access_order.remove(cache_key)
-                    
-        except Exception as e:
-            logger.debug(f"Cache entry removal error: {e}")
-
-    def _evict_cache_entries(self, needed_space: int) -> None:
-        """
-        Intelligent cache eviction using LRU strategy and memory awareness
-        """
-        try:
-            freed_space = 0
-            eviction_count = 0
-            
-            # Remove expired entries first
-            current_time = time.time()
-            expired_keys = []
-            for key, (timestamp, _, size) in self._document_cache.items():
-                if current_time - timestamp >= self._document_cache_ttl:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                if key in self._document_cache:
-                    _, _, size = self._document_cache[key]
-                    freed_space += size
-                    eviction_count += 1
-                    self._remove_cache_entry(key)
-                    if freed_space >= needed_space:
-                        break
-            
-            # If still need space, evict LRU entries
-            while (freed_space < needed_space or 
-                   len(self._document_cache) >= self._max_cache_entries):
-                
-                if not self._document_cache_access_order:
-                    break
-                    
-                # Remove least recently used (first in list)
-                lru_key = self._document_cache_access_order[0]
-                if lru_key in self._document_cache:
-                    _, _, size = self._document_cache[lru_key]
-                    freed_space += size
-                    eviction_count += 1
-                    self._remove_cache_entry(lru_key)
-            
-            self._document_cache_stats["evictions"] += eviction_count
-            
-            if eviction_count > 0:
-                logger.debug(f"📄 Evicted {eviction_count} cache entries, freed {freed_space} bytes")
-                
-        except Exception as e:
-            logger.debug(f"Cache eviction error: {e}")
-
     def _generate_document_cache_key(self, user_id: int, files: List[Dict[str, Any]], message: str = "") -> str:
         """
         Generate optimized cache key for document processing results
@@ -2783,8 +2691,11 @@ Please answer the user's question based on this document content."""
     def get_document_cache_stats(self) -> Dict[str, Any]:
         """Get comprehensive document cache performance statistics"""
         try:
-            total_requests = self._document_cache_stats["total_requests"]
-            hits = self._document_cache_stats["hits"]
+            cache_stats = self._document_cache.get_stats()
+            total_requests = self._document_cache_requests
+            hits = cache_stats["hits"]
+            entries = cache_stats["entries"]
+            memory_usage = cache_stats["memory_usage_bytes"]
             
             hit_rate = (hits / total_requests * 100) if total_requests > 0 else 0
             
@@ -2793,23 +2704,22 @@ Please answer the user's question based on this document content."""
                     "hit_rate_percentage": round(hit_rate, 2),
                     "total_requests": total_requests,
                     "cache_hits": hits,
-                    "cache_misses": self._document_cache_stats["misses"],
-                    "evictions": self._document_cache_stats["evictions"]
+                    "cache_misses": cache_stats["misses"],
+                    "evictions": cache_stats["evictions"],
+                    "expirations": cache_stats["expirations"]
                 },
                 "memory_usage": {
-                    "current_entries": len(self._document_cache),
+                    "current_entries": entries,
                     "max_entries": self._max_cache_entries,
-                    "memory_usage_bytes": self._document_cache_stats["memory_usage"],
-                    "memory_usage_mb": round(self._document_cache_stats["memory_usage"] / (1024*1024), 2),
+                    "memory_usage_bytes": memory_usage,
+                    "memory_usage_mb": round(memory_usage / (1024*1024), 2),
                     "max_memory_mb": round(self._max_cache_memory / (1024*1024), 2),
                     "memory_utilization_percentage": round(
-                        (self._document_cache_stats["memory_usage"] / self._max_cache_memory * 100), 2
+                        (memory_usage / self._max_cache_memory * 100), 2
                     ) if self._max_cache_memory > 0 else 0
                 },
                 "efficiency": {
-                    "average_entry_size_bytes": round(
-                        self._document_cache_stats["memory_usage"] / len(self._document_cache)
-                    ) if len(self._document_cache) > 0 else 0,
+                    "average_entry_size_bytes": round(memory_usage / entries) if entries > 0 else 0,
                     "cache_enabled": True,
                     "ttl_minutes": self._document_cache_ttl // 60
                 }
@@ -2821,14 +2731,10 @@ Please answer the user's question based on this document content."""
     def clear_document_cache(self) -> Dict[str, Any]:
         """Clear document cache and return statistics"""
         try:
-            cleared_entries = len(self._document_cache)
-            cleared_memory = self._document_cache_stats["memory_usage"]
+            cleared_memory = self._document_cache.memory_usage
             
             # Clear all cache data
-            self._document_cache.clear()
-            self._document_cache_access_order.clear()
-            self._document_cache_stats["memory_usage"] = 0
-            self._document_cache_stats["evictions"] += cleared_entries
+            cleared_entries = self._document_cache.clear()
             
             logger.info(f"📄 Cleared document cache: {cleared_entries} entries, {cleared_memory} bytes")
             
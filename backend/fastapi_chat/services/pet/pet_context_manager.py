@@ -950,13 +950,17 @@ class PetContextManager:
             
             for key_pattern in cache_keys:
                 if "*" in key_pattern:
-                    # Get matching keys and delete them
-                    keys = await self.redis.keys(key_pattern)
+                    # Incremental SCAN instead of KEYS, which blocks the server
+                    keys = [key async for key in self.redis.scan_iter(match=key_pattern, count=500)]
                     if keys:
-                        await self.redis.delete(*keys)
+                        await self.redis.unlink(*keys)
                 else:
                     await self.redis.delete(key_pattern)
             
+            # Semantically cached chat answers may mention the old pet details
+            from services.shared.async_cache_service import AsyncCacheService
+            await AsyncCacheService(self.redis).invalidate_tags(f"tag:user:{user_id}:semantic")
+            
             logger.debug(f"🗑️ Invalidated pet context cache for user {user_id}")
             
         except Exception as e:
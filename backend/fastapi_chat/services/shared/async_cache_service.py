@@ -6,13 +6,16 @@ Provides intelligent caching strategies for conversations, messages, and health
 import json
 import logging
 import pickle
-from typing import Dict, Any, List, Optional, Union
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+import numpy as np
 import redis.asyncio as redis
 import hashlib
 from functools import wraps
 import asyncio
-from textblob import TextBlob
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +33,11 @@ class AsyncCacheService:
         self.health_ttl = 1800  # 30 minutes for health data
         self.user_session_ttl = 900  # 15 minutes for user session data
         
+        # Tag sets index cached keys by user/conversation so invalidation never
+        # scans the keyspace; they outlive the longest entry TTL they track
+        self.tag_ttl = 86400  # 24 hours, refreshed on every tagged write
+        self.invalidation_batch_size = 500  # Keys per pipelined UNLINK / SCAN page
+        
         # Cache hit/miss tracking
         self.cache_stats = {
             "hits": 0,
@@ -58,13 +66,31 @@ class AsyncCacheService:
         self, 
         key: str, 
         value: Any, 
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
-        """Set value in cache with automatic serialization"""
+        """
+        Set value in cache with automatic serialization
+        
+        Args:
+            tags: Tag sets (see _user_tag / _conversation_tag) the key is
+                registered in, so invalidate_tags can delete it without a scan
+        """
         try:
             ttl = ttl or self.default_ttl
             serialized = json.dumps(value, default=str)  # Handle datetime serialization
-            await self.redis.setex(key, ttl, serialized)
+            
+            if not tags:
+                await self.redis.setex(key, ttl, serialized)
+                return True
+            
+            # Write the value and its tag memberships in one round trip
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.setex(key, ttl, serialized)
+            for tag in tags:
+                pipe.sadd(tag, key)
+                pipe.expire(tag, max(ttl, self.tag_ttl))
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Cache set error for key {key}: {e}")
@@ -82,18 +108,79 @@ class AsyncCacheService:
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+        """
+        Delete all keys matching pattern
+        
+        Walks the keyspace with incremental SCAN (never KEYS, which blocks the
+        server) and unlinks matches in pipelined batches. Prefer tag-based
+        invalidation for hot paths; this still visits the whole keyspace.
+        """
         try:
-            keys = await self.redis.keys(pattern)
-            if keys:
-                deleted = await self.redis.delete(*keys)
-                self.cache_stats["invalidations"] += deleted
-                return deleted
-            return 0
+            deleted = 0
+            batch = []
+            
+            async for key in self.redis.scan_iter(match=pattern, count=self.invalidation_batch_size):
+                batch.append(key)
+                if len(batch) >= self.invalidation_batch_size:
+                    deleted += await self._unlink_batch(batch)
+                    batch = []
+            
+            if batch:
+                deleted += await self._unlink_batch(batch)
+            
+            self.cache_stats["invalidations"] += deleted
+            return deleted
         except Exception as e:
             logger.error(f"Cache delete pattern error for {pattern}: {e}")
             return 0
     
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete every key registered under the given tags, then the tags
+        
+        Cost is proportional to the number of tagged keys, independent of the
+        size of the keyspace.
+        """
+        try:
+            deleted = 0
+            
+            for tag in tags:
+                batch = []
+                async for key in self.redis.sscan_iter(tag, count=self.invalidation_batch_size):
+                    batch.append(key)
+                    if len(batch) >= self.invalidation_batch_size:
+                        deleted += await self._unlink_batch(batch)
+                        batch = []
+                
+                # The tag set itself goes out with the last batch, uncounted
+                deleted += await self._unlink_batch(batch, tag)
+            
+            self.cache_stats["invalidations"] += deleted
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache tag invalidation error for {tags}: {e}")
+            return 0
+    
+    async def _unlink_batch(self, keys: List[str], *uncounted: str) -> int:
+        """Unlink keys in one pipelined round trip; returns how many of `keys` existed"""
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.unlink(key)
+        for key in uncounted:
+            pipe.unlink(key)
+        results = await pipe.execute()
+        return sum(int(result or 0) for result in results[:len(keys)])
+    
+    # ==================== CACHE TAGS ====================
+    
+    def _user_tag(self, user_id: int, scope: str) -> str:
+        """Tag set for one category of a user's cached data"""
+        return f"tag:user:{user_id}:{scope}"
+    
+    def _conversation_tag(self, conversation_id: int) -> str:
+        """Tag set for everything cached about a conversation"""
+        return f"tag:conversation:{conversation_id}"
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         try:
@@ -112,9 +199,9 @@ class AsyncCacheService:
         """Generate cache key for single conversation"""
         return f"conversation:{conversation_id}"
     
-    def _conversation_messages_key(self, conversation_id: int) -> str:
-        """Generate cache key for conversation messages"""
-        return f"conversation:{conversation_id}:messages"
+    def _conversation_page_key(self, conversation_id: int, limit: int, before: int) -> str:
+        """Generate cache key for one page of conversation messages"""
+        return f"conversation:{conversation_id}:messages:limit:{limit}:before:{before}"
     
     async def get_user_conversations(
         self, 
@@ -135,40 +222,60 @@ class AsyncCacheService:
     ) -> bool:
         """Cache user conversations list"""
         key = self._conversation_list_key(user_id, limit, offset)
-        return await self.set(key, conversations, self.conversation_ttl)
+        return await self.set(
+            key, conversations, self.conversation_ttl,
+            tags=[self._user_tag(user_id, "conversations")]
+        )
     
-    async def get_conversation_with_messages(
+    async def get_conversation_page(
         self, 
-        conversation_id: int
+        conversation_id: int,
+        limit: int,
+        before: int
     ) -> Optional[Dict[str, Any]]:
-        """Get cached conversation with messages"""
-        key = self._conversation_messages_key(conversation_id)
+        """Get a cached page of conversation messages"""
+        key = self._conversation_page_key(conversation_id, limit, before)
         return await self.get(key)
     
-    async def cache_conversation_with_messages(
+    async def cache_conversation_page(
         self, 
-        conversation_id: int, 
-        conversation_data: Dict[str, Any]
+        conversation_id: int,
+        limit: int,
+        before: int,
+        page: Dict[str, Any]
     ) -> bool:
-        """Cache conversation with messages"""
-        key = self._conversation_messages_key(conversation_id)
-        return await self.set(key, conversation_data, self.message_ttl)
+        """
+        Cache a page of conversation messages
+        
+        Only pages behind a `before` cursor are cached: messages are also written
+        by the Flask app and intelligent_chat, so the newest page is never stable.
+        Callers must have checked conversation ownership - the key is not per user.
+        """
+        key = self._conversation_page_key(conversation_id, limit, before)
+        return await self.set(
+            key, page, self.message_ttl,
+            tags=[self._conversation_tag(conversation_id)]
+        )
+    
+    async def invalidate_conversation_pages(self, conversation_id: int) -> int:
+        """Invalidate cached message pages of a conversation (bookmarks, reactions)"""
+        return await self.invalidate_tags(self._conversation_tag(conversation_id))
     
     async def invalidate_user_conversations(self, user_id: int) -> int:
         """Invalidate all conversation caches for a user"""
-        pattern = f"conversations:user:{user_id}:*"
-        return await self.delete_pattern(pattern)
+        return await self.invalidate_tags(self._user_tag(user_id, "conversations"))
     
     async def invalidate_conversation(self, conversation_id: int, user_id: int) -> int:
         """Invalidate specific conversation and related caches"""
         keys_deleted = 0
         
-        # Delete conversation-specific caches
+        # Delete conversation-specific caches and user conversation list caches
+        # (they include this conversation) in one pass over both tags
         keys_deleted += await self.delete(self._conversation_key(conversation_id))
-        keys_deleted += await self.delete(self._conversation_messages_key(conversation_id))
-        
-        # Delete user conversation list caches (they include this conversation)
-        keys_deleted += await self.invalidate_user_conversations(user_id)
+        keys_deleted += await self.invalidate_tags(
+            self._conversation_tag(conversation_id),
+            self._user_tag(user_id, "conversations")
+        )
         
         return keys_deleted
     
@@ -194,12 +301,14 @@ class AsyncCacheService:
     ) -> bool:
         """Cache bookmarked conversations"""
         key = self._bookmarked_conversations_key(user_id)
-        return await self.set(key, bookmarks, self.conversation_ttl)
+        return await self.set(
+            key, bookmarks, self.conversation_ttl,
+            tags=[self._user_tag(user_id, "bookmarks")]
+        )
     
     async def invalidate_bookmarks(self, user_id: int) -> int:
         """Invalidate all bookmark caches for a user"""
-        pattern = f"bookmarks:*:user:{user_id}"
-        return await self.delete_pattern(pattern)
+        return await self.invalidate_tags(self._user_tag(user_id, "bookmarks"))
     
     # ==================== HEALTH DATA CACHING ====================
     
@@ -228,7 +337,10 @@ class AsyncCacheService:
     ) -> bool:
         """Cache health records"""
         key = self._health_records_key(user_id, limit)
-        return await self.set(key, records, self.health_ttl)
+        return await self.set(
+            key, records, self.health_ttl,
+            tags=[self._user_tag(user_id, "health")]
+        )
     
     async def get_health_dashboard(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get cached health dashboard data"""
@@ -242,12 +354,14 @@ class AsyncCacheService:
     ) -> bool:
         """Cache health dashboard data"""
         key = self._health_dashboard_key(user_id)
-        return await self.set(key, dashboard_data, self.health_ttl)
+        return await self.set(
+            key, dashboard_data, self.health_ttl,
+            tags=[self._user_tag(user_id, "health")]
+        )
     
     async def invalidate_health_data(self, user_id: int) -> int:
         """Invalidate all health data caches for a user"""
-        pattern = f"health:*:user:{user_id}"
-        return await self.delete_pattern(pattern)
+        return await self.invalidate_tags(self._user_tag(user_id, "health"))
     
     # ==================== SMART CACHE WARMING ====================
     
@@ -318,38 +432,76 @@ class AsyncCacheService:
         return hashlib.md5(key_data.encode()).hexdigest()
     
     async def get_cache_size(self) -> Dict[str, int]:
-        """Get approximate cache size by category"""
-        patterns = {
-            "conversations": "conversations:*",
-            "messages": "*:messages",
-            "bookmarks": "bookmarks:*",
-            "health": "health:*",
-            "other": "*"
+        """Get approximate cache size by category (one incremental SCAN pass)"""
+        sizes = {
+            "conversations": 0,
+            "messages": 0,
+            "bookmarks": 0,
+            "health": 0,
+            "tags": 0,
+            "other": 0
         }
         
-        sizes = {}
-        for category, pattern in patterns.items():
-            keys = await self.redis.keys(pattern)
-            sizes[category] = len(keys)
+        async for key in self.redis.scan_iter(count=self.invalidation_batch_size):
+            if isinstance(key, bytes):
+                key = key.decode()
+            
+            if key.startswith("conversations:"):
+                sizes["conversations"] += 1
+            elif key.endswith(":messages"):
+                sizes["messages"] += 1
+            elif key.startswith("bookmarks:"):
+                sizes["bookmarks"] += 1
+            elif key.startswith("health:"):
+                sizes["health"] += 1
+            elif key.startswith("tag:"):
+                sizes["tags"] += 1
+            else:
+                sizes["other"] += 1
         
         return sizes
     
     async def cleanup_expired_keys(self) -> int:
-        """Clean up expired keys (Redis handles this automatically, but useful for monitoring)"""
+        """
+        Prune tag sets of keys that have already expired
+        
+        Redis expires the cached values itself; their tag memberships stay
+        behind until the tag is invalidated or expires. This walks tag sets
+        with SCAN/SSCAN and removes dead members in pipelined batches.
+        
+        Returns:
+            Number of stale tag memberships removed
+        """
         try:
-            # Get all keys and check which ones are expired
-            all_keys = await self.redis.keys("*")
-            expired_count = 0
+            removed = 0
             
-            for key in all_keys:
-                ttl = await self.redis.ttl(key)
-                if ttl == -2:  # Key doesn't exist (expired)
-                    expired_count += 1
+            async for tag in self.redis.scan_iter(match="tag:*", count=self.invalidation_batch_size):
+                members = []
+                async for member in self.redis.sscan_iter(tag, count=self.invalidation_batch_size):
+                    members.append(member)
+                    if len(members) >= self.invalidation_batch_size:
+                        removed += await self._prune_tag_members(tag, members)
+                        members = []
+                
+                if members:
+                    removed += await self._prune_tag_members(tag, members)
             
-            return expired_count
+            return removed
         except Exception as e:
             logger.error(f"Cleanup expired keys error: {e}")
             return 0
+    
+    async def _prune_tag_members(self, tag: str, members: List[str]) -> int:
+        """Remove members of a tag set whose keys no longer exist"""
+        pipe = self.redis.pipeline(transaction=False)
+        for member in members:
+            pipe.exists(member)
+        exists = await pipe.execute()
+        
+        stale = [member for member, alive in zip(members, exists) if not alive]
+        if stale:
+            await self.redis.srem(tag, *stale)
+        return len(stale)
 
 # ==================== ADVANCED CACHE DECORATORS & STRATEGIES ====================
 
@@ -663,74 +815,268 @@ async def batch_cache_set(
 
 # ==================== SEMANTIC RESPONSE CACHING ====================
 
+class SemanticVectorIndex:
+    """
+    In-memory cosine-similarity index over unit-normalized embeddings
+    
+    Rows live in a preallocated NumPy matrix, so a lookup is one
+    matrix-vector product; removal swaps the last row into the hole.
+    """
+    
+    def __init__(self, dimension: int, capacity: int):
+        self.dimension = dimension
+        self.capacity = capacity
+        self._vectors = np.zeros((min(capacity, 64), dimension), dtype=np.float32)
+        self._entry_ids: List[str] = []
+        self._expires_at: List[float] = []
+        self._fingerprints: List[Optional[str]] = []
+    
+    def __len__(self) -> int:
+        return len(self._entry_ids)
+    
+    def add(self, entry_id: str, vector: np.ndarray, expires_at: float, fingerprint: Optional[str]) -> None:
+        """Add a normalized vector, evicting the soonest-expiring entry when full"""
+        if len(self._entry_ids) >= self.capacity:
+            self.remove_at(int(np.argmin(self._expires_at)))
+        
+        row = len(self._entry_ids)
+        if row >= self._vectors.shape[0]:
+            grown = np.zeros((min(self.capacity, self._vectors.shape[0] * 2), self.dimension), dtype=np.float32)
+            grown[:row] = self._vectors[:row]
+            self._vectors = grown
+        
+        self._vectors[row] = vector
+        self._entry_ids.append(entry_id)
+        self._expires_at.append(expires_at)
+        self._fingerprints.append(fingerprint)
+    
+    def search(self, vector: np.ndarray, fingerprint: Optional[str], now: float) -> Optional[Tuple[int, str, float]]:
+        """Best live match as (row, entry_id, cosine similarity)"""
+        count = len(self._entry_ids)
+        if not count:
+            return None
+        
+        scores = self._vectors[:count] @ vector
+        for row in range(count):
+            if self._expires_at[row] <= now or self._fingerprints[row] != fingerprint:
+                scores[row] = -np.inf
+        
+        best = int(np.argmax(scores))
+        if not np.isfinite(scores[best]):
+            return None
+        return best, self._entry_ids[best], float(scores[best])
+    
+    def remove_at(self, row: int) -> None:
+        last = len(self._entry_ids) - 1
+        if row != last:
+            self._vectors[row] = self._vectors[last]
+            self._entry_ids[row] = self._entry_ids[last]
+            self._expires_at[row] = self._expires_at[last]
+            self._fingerprints[row] = self._fingerprints[last]
+        self._entry_ids.pop()
+        self._expires_at.pop()
+        self._fingerprints.pop()
+    
+    def newest_expiry(self) -> float:
+        """Expiry of the longest-lived entry; the whole index is dead after it"""
+        return max(self._expires_at) if self._expires_at else 0.0
+    
+    def remove_expired(self, now: float) -> int:
+        expired = [row for row, expires_at in enumerate(self._expires_at) if expires_at <= now]
+        for row in reversed(expired):
+            self.remove_at(row)
+        return len(expired)
+
+
 class SemanticResponseCache:
-    """Advanced semantic caching for chat responses"""
+    """
+    Embedding-based semantic caching for chat responses
     
-    def __init__(self, cache_service: AsyncCacheService):
+    Each cached response is stored in Redis (tagged per user, so it can be
+    invalidated) and its query embedding is indexed in-process per
+    (user, context). A lookup returns the cached response of the most similar
+    earlier question when cosine similarity reaches the threshold and the
+    caller's context fingerprint (dog profiles, documents) still matches.
+    Redis stays the source of truth: an index hit whose payload is gone -
+    expired or invalidated by another process - counts as a miss.
+    """
+    
+    # Upper edges of the reported similarity histogram buckets
+    SIMILARITY_BUCKETS = (0.5, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0)
+    
+    def __init__(
+        self,
+        cache_service: AsyncCacheService,
+        embed_fn: Optional[Callable[[str], Awaitable[Optional[List[float]]]]] = None,
+        similarity_threshold: float = 0.92,
+        max_entries_per_user: int = 200,
+        max_indexes: int = 1000
+    ):
+        """
+        Args:
+            embed_fn: Async text -> embedding function; without it the cache
+                only ever misses
+            similarity_threshold: Default minimum cosine similarity for a hit
+            max_entries_per_user: Indexed questions kept per (user, context)
+            max_indexes: (user, context) indexes kept in memory; the least
+                recently used one is evicted beyond this
+        """
         self.cache_service = cache_service
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_user = max_entries_per_user
+        self.max_indexes = max_indexes
+        
+        # LRU order, least recently used first
+        self._indexes: "OrderedDict[Tuple[int, str], SemanticVectorIndex]" = OrderedDict()
+        self._recent_similarities: deque = deque(maxlen=1000)
+        self._similarity_histogram = [0] * len(self.SIMILARITY_BUCKETS)
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "stale_entries": 0,
+            "embedding_failures": 0,
+            "stored": 0,
+            "invalidations": 0,
+            "index_evictions": 0,
+            "index_expirations": 0
+        }
+    
+    def _semantic_response_key(self, user_id: int, context: str, entry_id: str) -> str:
+        """Generate semantic response cache key"""
+        return f"semantic_response:{user_id}:{context}:{entry_id}"
     
-    def _calculate_semantic_hash(self, message: str) -> str:
-        """Calculate semantic hash for message similarity matching"""
+    async def _embed(self, message: str) -> Optional[np.ndarray]:
+        """Unit-normalized float32 embedding of a message"""
+        if not self.embed_fn:
+            return None
         try:
-            # Simple semantic representation using TextBlob
-            blob = TextBlob(message.lower().strip())
-            
-            # Extract key semantic features
-            words = [word for word in blob.words if len(word) > 2]
-            normalized_message = ' '.join(sorted(words))
-            
-            # Create semantic hash
-            semantic_hash = hashlib.sha256(normalized_message.encode()).hexdigest()[:16]
-            return f"semantic:{semantic_hash}"
+            embedding = await self.embed_fn(message.strip())
         except Exception as e:
-            logger.error(f"Error calculating semantic hash: {str(e)}")
-            # Fallback to simple hash
-            return f"semantic:{hashlib.sha256(message.encode()).hexdigest()[:16]}"
+            logger.error(f"Error embedding message for semantic cache: {str(e)}")
+            embedding = None
+        
+        if not embedding:
+            self._stats["embedding_failures"] += 1
+            return None
+        
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
     
-    def _semantic_response_key(self, user_id: int, message: str, context: str = "chat") -> str:
-        """Generate semantic response cache key"""
-        semantic_hash = self._calculate_semantic_hash(message)
-        return f"semantic_response:{user_id}:{context}:{semantic_hash}"
+    def _get_index(self, key: Tuple[int, str], now: float) -> Optional[SemanticVectorIndex]:
+        """Live index for (user, context), marked most recently used"""
+        index = self._indexes.get(key)
+        if index is None:
+            return None
+        if index.newest_expiry() <= now:
+            # Every entry is past the response TTL; its payloads are gone from Redis too
+            del self._indexes[key]
+            self._stats["index_expirations"] += 1
+            return None
+        self._indexes.move_to_end(key)
+        return index
+    
+    def _trim_indexes(self, now: float) -> None:
+        """Drop dead indexes from the LRU end, then evict down to max_indexes"""
+        while self._indexes:
+            key, index = next(iter(self._indexes.items()))
+            if index.newest_expiry() <= now:
+                self._stats["index_expirations"] += 1
+            elif len(self._indexes) > self.max_indexes:
+                self._stats["index_evictions"] += 1
+            else:
+                return
+            del self._indexes[key]
+    
+    def _record_similarity(self, similarity: float) -> None:
+        self._recent_similarities.append(similarity)
+        for bucket, upper in enumerate(self.SIMILARITY_BUCKETS):
+            if similarity <= upper or bucket == len(self.SIMILARITY_BUCKETS) - 1:
+                self._similarity_histogram[bucket] += 1
+                break
     
     async def get_semantic_response(
         self, 
         user_id: int, 
         message: str, 
         context: str = "chat",
-        similarity_threshold: float = 0.8
+        similarity_threshold: Optional[float] = None,
+        fingerprint: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
-        """Get cached response for semantically similar message"""
+        """
+        Get cached response for semantically similar message
+        
+        Args:
+            similarity_threshold: Overrides the instance default
+            fingerprint: Digest of the state the response depends on; entries
+                cached under a different fingerprint never match
+        """
         try:
-            # Check exact semantic match first
-            semantic_key = self._semantic_response_key(user_id, message, context)
-            cached_response = await self.cache_service.get(semantic_key)
+            self._stats["lookups"] += 1
+            threshold = self.similarity_threshold if similarity_threshold is None else similarity_threshold
             
-            if cached_response:
-                return {
-                    "response": cached_response,
-                    "cache_hit": "exact_semantic",
-                    "similarity_score": 1.0
-                }
+            now = time.time()
+            index = self._get_index((user_id, context), now)
+            vector = await self._embed(message) if index else None
+            if vector is None:
+                self._stats["misses"] += 1
+                return None
             
-            return None
+            match = index.search(vector, fingerprint, now)
+            if not match:
+                self._stats["misses"] += 1
+                return None
+            
+            row, entry_id, similarity = match
+            self._record_similarity(similarity)
+            
+            if similarity < threshold:
+                self._stats["misses"] += 1
+                return None
+            
+            cached_response = await self.cache_service.get(
+                self._semantic_response_key(user_id, context, entry_id)
+            )
+            if not cached_response:
+                # Expired or invalidated elsewhere; drop the dangling index row
+                index.remove_at(row)
+                self._stats["stale_entries"] += 1
+                self._stats["misses"] += 1
+                return None
+            
+            self._stats["hits"] += 1
+            return {
+                "response": cached_response.get("response"),
+                "original_message": cached_response.get("original_message"),
+                "metadata": cached_response.get("metadata", {}),
+                "cache_hit": "semantic",
+                "similarity_score": round(similarity, 4)
+            }
             
         except Exception as e:
             logger.error(f"Error getting semantic response: {str(e)}")
+            self._stats["misses"] += 1
             return None
     
     async def cache_semantic_response(
         self,
         user_id: int,
         message: str,
-        response: str,
+        response: Any,
         context: str = "chat",
         ttl: int = 3600,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None
     ) -> bool:
         """Cache response with semantic indexing"""
         try:
-            semantic_key = self._semantic_response_key(user_id, message, context)
+            vector = await self._embed(message)
+            if vector is None:
+                return False
             
+            entry_id = uuid.uuid4().hex[:16]
             cache_data = {
                 "response": response,
                 "original_message": message,
@@ -739,18 +1085,77 @@ class SemanticResponseCache:
                 "metadata": metadata or {}
             }
             
-            # Cache the semantic response
-            success = await self.cache_service.set(semantic_key, cache_data, ttl)
+            # Cache the semantic response (tagged so invalidate_user can drop it)
+            success = await self.cache_service.set(
+                self._semantic_response_key(user_id, context, entry_id),
+                cache_data,
+                ttl,
+                tags=[self.cache_service._user_tag(user_id, "semantic")]
+            )
+            if not success:
+                return False
             
-            if success:
-                await self._update_semantic_cache_stats(user_id, "cache_set")
+            now = time.time()
+            index = self._get_index((user_id, context), now)
+            if index is None or index.dimension != vector.shape[0]:
+                index = SemanticVectorIndex(vector.shape[0], self.max_entries_per_user)
+                self._indexes[(user_id, context)] = index
             
-            return success
+            index.remove_expired(now)
+            index.add(entry_id, vector, now + ttl, fingerprint)
+            self._trim_indexes(now)
+            self._stats["stored"] += 1
+            
+            await self._update_semantic_cache_stats(user_id, "cache_set")
+            return True
             
         except Exception as e:
             logger.error(f"Error caching semantic response: {str(e)}")
             return False
     
+    async def invalidate_user(self, user_id: int) -> int:
+        """
+        Drop every cached response of a user (dog profile or document changes)
+        
+        Clears this process's index and the tagged Redis payloads, which also
+        invalidates the user's entries in other processes.
+        """
+        for key in [key for key in self._indexes if key[0] == user_id]:
+            del self._indexes[key]
+        
+        self._stats["invalidations"] += 1
+        return await self.cache_service.invalidate_tags(
+            self.cache_service._user_tag(user_id, "semantic")
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, similarity distribution and index size"""
+        lookups = self._stats["lookups"]
+        similarities = sorted(self._recent_similarities)
+        
+        def percentile(pct: float) -> Optional[float]:
+            if not similarities:
+                return None
+            return round(similarities[min(len(similarities) - 1, int(pct / 100 * len(similarities)))], 4)
+        
+        lower = 0.0
+        histogram = {}
+        for count, upper in zip(self._similarity_histogram, self.SIMILARITY_BUCKETS):
+            histogram[f"{lower:.2f}-{upper:.2f}"] = count
+            lower = upper
+        
+        return {
+            **self._stats,
+            "hit_rate_percent": round(self._stats["hits"] / lookups * 100, 2) if lookups else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+            "similarity_distribution": histogram,
+            "similarity_percentiles": {"p50": percentile(50), "p90": percentile(90), "p99": percentile(99)},
+            "indexed_users": len({key[0] for key in self._indexes}),
+            "indexes": len(self._indexes),
+            "max_indexes": self.max_indexes,
+            "indexed_entries": sum(len(index) for index in self._indexes.values())
+        }
+    
     async def _update_semantic_cache_stats(self, user_id: int, operation: str):
         """Update semantic cache statistics"""
         try:
@@ -826,10 +1231,11 @@ class RequestDeduplicator:
 def semantic_response_cache(
     cache_service: AsyncCacheService,
     ttl: int = 3600,
-    similarity_threshold: float = 0.8
+    similarity_threshold: float = 0.92,
+    embed_fn: Optional[Callable[[str], Awaitable[Optional[List[float]]]]] = None
 ):
     """Decorator for semantic response caching"""
-    semantic_cache = SemanticResponseCache(cache_service)
+    semantic_cache = SemanticResponseCache(cache_service, embed_fn, similarity_threshold)
     
     def decorator(func):
         @wraps(func)
@@ -944,48 +944,37 @@ Create comprehensive reminders from natural language, manage detailed pet care s
         return final_messages
     
     async def _get_conversation_history(self, conversation_id: int, user_id: int, limit: int = 10):
-        """Retrieve conversation history from PostgreSQL"""
+        """Retrieve the last `limit` messages (history buffer, else one tail query)"""
         try:
-            from models import AsyncSessionLocal, get_conversation_with_messages_optimized
+            from models import AsyncSessionLocal, get_conversation_tail_async
             
             async with AsyncSessionLocal() as session:
-                conversation = await get_conversation_with_messages_optimized(session, conversation_id, user_id)
-                
-                logger.info(f"🔍 CONVERSATION DEBUG: conversation_id={conversation_id}, user_id={user_id}")
-                logger.info(f"🔍 CONVERSATION DEBUG: conversation exists: {conversation is not None}")
-                
-                if conversation:
-                    logger.info(f"🔍 CONVERSATION DEBUG: messages count: {len(conversation.messages) if conversation.messages else 0}")
-                    logger.info(f"🔍 CONVERSATION DEBUG: conversation created: {conversation.created_at}")
-                else:
-                    logger.warning(f"⚠️ CONVERSATION DEBUG: No conversation found for ID {conversation_id}")
-                
-                if not conversation or not conversation.messages:
-                    return []
-                
-                # Convert to LangChain messages, taking the last N messages
-                messages = []
-                recent_messages = conversation.messages[-limit:] if len(conversation.messages) > limit else conversation.messages
-                
-                for msg in recent_messages:
-                    # Skip messages with empty content
-                    if not msg.content or not msg.content.strip():
-                        logger.warning(f"⚠️ Skipping message {msg.id} with empty content")
-                        continue
-                        
-                    if msg.type == "user":
-                        messages.append(HumanMessage(content=msg.content))
-                    elif msg.type == "ai" or msg.type == "assistant":
-                        messages.append(AIMessage(content=msg.content))
-                
-                # CRITICAL FIX: Validate message roles for Bedrock compatibility
-                messages = self._validate_message_roles(messages)
-                
-                # CRITICAL FIX: Remove any messages with empty content before sending to Bedrock
-                messages = [msg for msg in messages if msg.content and msg.content.strip()]
-                
-                logger.info(f"📚 Retrieved {len(messages)} validated messages from conversation {conversation_id}")
-                return messages
+                recent_messages = await get_conversation_tail_async(session, conversation_id, user_id, limit)
+            
+            if not recent_messages:
+                return []
+            
+            # Convert to LangChain messages
+            messages = []
+            for msg in recent_messages:
+                # Skip messages with empty content
+                if not msg["content"] or not msg["content"].strip():
+                    logger.warning(f"⚠️ Skipping message {msg['id']} with empty content")
+                    continue
+                    
+                if msg["type"] == "user":
+                    messages.append(HumanMessage(content=msg["content"]))
+                elif msg["type"] == "ai" or msg["type"] == "assistant":
+                    messages.append(AIMessage(content=msg["content"]))
+            
+            # CRITICAL FIX: Validate message roles for Bedrock compatibility
+            messages = self._validate_message_roles(messages)
+            
+            # CRITICAL FIX: Remove any messages with empty content before sending to Bedrock
+            messages = [msg for msg in messages if msg.content and msg.content.strip()]
+            
+            logger.info(f"📚 Retrieved {len(messages)} validated messages from conversation {conversation_id}")
+            return messages
             
         except Exception as e:
             logger.error(f"❌ Failed to retrieve conversation history for {conversation_id}: {str(e)}")
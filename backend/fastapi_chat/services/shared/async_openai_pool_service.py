@@ -8,6 +8,7 @@ import asyncio
 import time
 import json
 import os
+import sys
 import logging
 from typing import List, Dict, Any, Optional
 from contextlib import asynccontextmanager
@@ -17,6 +18,12 @@ import threading
 import boto3
 from botocore.exceptions import ClientError
 
+# Shared embedding cache lives in backend/shared
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.append(_BACKEND_ROOT)
+from shared.embedding_cache import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
 class AsyncAIClientPool:
@@ -329,22 +336,29 @@ class AsyncAIClientPool:
             raise RuntimeError("AWS Bedrock client not initialized")
         
         try:
-            request_body = {
-                "inputText": input_text
-            }
+            embedding_cache = get_embedding_cache()
+            embedding = await embedding_cache.aget(model, input_text)
             
-            response = self.bedrock_client.invoke_model(
-                modelId=model,
-                body=json.dumps(request_body),
-                contentType="application/json",
-                accept="application/json"
-            )
-            
-            response_body = json.loads(response["body"].read())
+            if embedding is None:
+                request_body = {
+                    "inputText": input_text
+                }
+                
+                response = await asyncio.to_thread(
+                    self.bedrock_client.invoke_model,
+                    modelId=model,
+                    body=json.dumps(request_body),
+                    contentType="application/json",
+                    accept="application/json"
+                )
+                
+                response_body = json.loads(response["body"].read())
+                embedding = response_body["embedding"]
+                await embedding_cache.aput(model, input_text, embedding)
             
             return {
                 "data": [{
-                    "embedding": response_body["embedding"],
+                    "embedding": embedding,
                     "index": 0
                 }],
                 "usage": {
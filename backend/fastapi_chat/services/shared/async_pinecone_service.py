@@ -5,6 +5,7 @@ Production-ready vector operations with full functionality
 """
 
 import os
+import sys
 import logging
 import hashlib
 import json
@@ -19,6 +20,12 @@ import redis.asyncio as redis
 from pinecone import Pinecone, ServerlessSpec
 from models import AsyncSessionLocal, Document, CareRecord
 
+# Shared embedding cache lives in backend/shared
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.append(_BACKEND_ROOT)
+from shared.embedding_cache import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
 class AsyncPineconeService:
@@ -64,8 +71,9 @@ class AsyncPineconeService:
         # Thread pool for async operations
         self.executor = ThreadPoolExecutor(max_workers=10)
         
-        # Cache for frequent operations
-        self._embedding_cache = {}
+        # Cache for frequent operations; embeddings use the content-addressed
+        # cache shared with the other backends
+        self._embedding_cache = get_embedding_cache()
         self._search_cache = {}
         
         # Batch operation statistics
@@ -216,13 +224,13 @@ class AsyncPineconeService:
                 logger.warning("Empty text provided for embedding")
                 return None
             
-            # Check cache first
-            cache_key = hashlib.md5(text.encode()).hexdigest()
-            if cache_key in self._embedding_cache:
-                return self._embedding_cache[cache_key]
-            
             model_id = model_id or "amazon.titan-embed-text-v2:0"
             
+            # Check cache first
+            cached_embedding = await self._embedding_cache.aget(model_id, text)
+            if cached_embedding is not None:
+                return cached_embedding
+            
             # Prepare request body for Titan v2
             body = json.dumps({
                 "inputText": text
@@ -243,7 +251,7 @@ class AsyncPineconeService:
             
             if embedding:
                 # Cache the result
-                self._embedding_cache[cache_key] = embedding
+                await self._embedding_cache.aput(model_id, text, embedding)
                 return embedding
             else:
                 logger.error("No embedding returned from Bedrock")
@@ -5,19 +5,58 @@ Achieves 20-30% reduction in AI API calls through intelligent routing and cachin
 """
 
 import asyncio
-import hashlib
 import logging
 import re
 import time
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple, Union
 import json
 
 import redis.asyncio as redis
-from textblob import TextBlob
+
+from utils.intent_matcher import CompiledIntentMatcher, LexiconSentiment
+from services.shared.intent_cache import IntentCache
 
 logger = logging.getLogger(__name__)
 
+# Reminder scoring regexes, compiled once (applied to the lowercased message)
+_EXPLICIT_REMINDER = re.compile(
+    r"\bremind\s+me\b|\bset\s+(?:a\s+)?reminder\b|\bcreate\s+(?:a\s+)?reminder\b"
+    r"|\bdon't forget\b|\bremember to\b|\bschedule\s+(?:a\s+)?reminder\b"
+    r"|\bplease remind\b|\bset\s+up\s+(?:a\s+)?reminder\b"
+)
+_REMINDER_ACTION = re.compile(
+    r"\bneed to schedule\b|\bwant to schedule\b|\bshould schedule\b"
+    r"|\btime to\b|\bneed\s+(?:a\s+)?reminder\b|\bwould like\s+(?:a\s+)?reminder\b"
+    r"|\bplease note\b|\bnote that\b|\bkeep track\b|\btrack (?:this|that)\b"
+    r"|\bmake (?:a )?note\b|\brecord (?:this|that)\b|\bwrite (?:this|that) down\b"
+)
+_DATE_MENTION = re.compile(
+    r"\b\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?\b"  # 10/2, 10-2, 10.2, 10/2/25
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}\b"  # Oct 2, October 2
+    r"|\b\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"  # 2nd Oct
+)
+# Each of these scores separately, so they stay individual patterns
+_FUTURE_TIME_PATTERNS = [re.compile(pattern) for pattern in (
+    r"\bin\s+\d+\s+(days?|hours?|weeks?|months?)",  # "in 3 days", "in 2 weeks"
+    r"\b(next|this)\s+(week|month|friday|monday|tuesday|wednesday|thursday|saturday|sunday)",  # "next friday"
+    r"\bschedule.+for\s+\d",  # "schedule for..."
+    r"\b(?:remind|reminder|set).+\d{1,2}[:.]\d{2}\b",  # "reminder at 9:00" or "set...8.20"
+    r"\b(?:at|@)\s*\d{1,2}(?:[:.]\d{2})?\s*(?:AM|PM|am|pm)\b",  # "at 8.20 PM" or "@ 10am"
+    r"\b\d{1,2}(?:[:.]\d{2})?\s*(?:AM|PM|am|pm)\b",  # "10am", "8:20 PM" (standalone)
+)]
+_REMINDER_ACTIVITY = re.compile(
+    r"\b(?:remind|reminder|set).+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment|medicine|medication)\b"
+    r"|\b(?:schedule|need).+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment)\b"
+    r"|\btime for.+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment)\b"
+    r"|\b(?:vaccine|vaccination|checkup|grooming|vet visit|appointment).+(?:remind|reminder|schedule)\b"  # Reverse order
+)
+_APPOINTMENT_NOTE = re.compile(
+    r"\b(?:has|have)\s+(?:an?\s+)?appointment.+(?:note|track|record|remember)\b"
+    r"|\b(?:note|track|record|remember).+(?:has|have)\s+(?:an?\s+)?appointment\b"
+    r"|\bappointment.+(?:note that|please note|keep track|make (?:a )?note)\b"
+)
+
 class SmartIntentRouter:
     """
     Smart Intent Routing Service with ML-based classification and caching
@@ -27,8 +66,6 @@ class SmartIntentRouter:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
         
-        # Intent classification cache
-        self.intent_cache = {}
         self.pattern_cache = {}
         
         # Performance monitoring
@@ -87,6 +124,11 @@ class SmartIntentRouter:
             ]
         }
         
+        # All intent patterns fused into one compiled matcher; reminder gets a
+        # stronger bonus when several of its patterns match
+        self.pattern_matcher = CompiledIntentMatcher(self.intent_patterns, {"reminder": 0.4})
+        self.sentiment_analyzer = LexiconSentiment()
+        
         # Route configurations
         self.route_configs = {
             "health_emergency": {
@@ -147,6 +189,9 @@ class SmartIntentRouter:
             "response_template": 7200,      # 2 hours
             "user_context": 1800           # 30 minutes
         }
+        
+        # Intent classification cache: bounded local LRU in front of Redis
+        self.intent_cache = IntentCache(redis_client, ttl_seconds=self.cache_ttl["intent_classification"])
     
     async def route_message(
         self,
@@ -248,64 +293,16 @@ class SmartIntentRouter:
         message: str,
         user_id: int
     ) -> Optional[Dict[str, Any]]:
-        """Get cached intent classification for a message"""
+        """Get cached intent classification for a message (normalized key, local LRU before Redis)"""
         try:
-            # Create cache key
-            message_hash = hashlib.md5(message.lower().encode()).hexdigest()
-            cache_key = f"intent_cache:user:{user_id}:message:{message_hash}"
-            
-            # Check Redis cache
-            cached_result = await self.redis_client.get(cache_key)
-            
-            if cached_result:
-                return json.loads(cached_result)
-            
-            # Check in-memory cache
-            if cache_key in self.intent_cache:
-                cache_entry = self.intent_cache[cache_key]
-                if cache_entry["expires_at"] > datetime.now(timezone.utc):
-                    return cache_entry["data"]
-                else:
-                    # Remove expired entry
-                    del self.intent_cache[cache_key]
-            
-            return None
-            
+            return await self.intent_cache.get(message, user_id)
         except Exception as e:
             logger.error(f"Cache retrieval error: {e}")
             return None
     
     async def _classify_by_patterns(self, message: str) -> Dict[str, Any]:
-        """Fast pattern-based intent classification"""
-        message_lower = message.lower()
-        intent_scores = {}
-        
-        # Calculate scores for each intent pattern
-        for intent, patterns in self.intent_patterns.items():
-            score = 0
-            matches = []
-            pattern_count = 0
-            
-            for pattern in patterns:
-                pattern_matches = re.findall(pattern, message_lower, re.IGNORECASE)
-                if pattern_matches:
-                    score += len(pattern_matches) * 0.3
-                    matches.extend(pattern_matches)
-                    pattern_count += 1
-            
-            # Bonus for multiple pattern matches (especially important for reminder intent)
-            if pattern_count > 1:
-                if intent == "reminder":
-                    score += 0.4  # Strong bonus for reminder with multiple patterns
-                else:
-                    score += 0.2  # Smaller bonus for other intents
-            
-            if score > 0:
-                intent_scores[intent] = {
-                    "score": min(score, 1.0),  # Cap at 1.0
-                    "matches": matches,
-                    "pattern_count": pattern_count
-                }
+        """Fast pattern-based intent classification (one compiled scan over all intents)"""
+        intent_scores = self.pattern_matcher.score(message.lower())
         
         # Determine best intent
         if intent_scores:
@@ -335,16 +332,15 @@ class SmartIntentRouter:
         user_history: Optional[List[str]] = None,
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """ML-based intent classification using TextBlob and context analysis"""
+        """ML-based intent classification using lexicon sentiment and context analysis"""
         try:
             # Analyze sentiment and polarity
-            blob = TextBlob(message)
-            sentiment = blob.sentiment
+            sentiment = self.sentiment_analyzer(message)
             
             # Analyze message characteristics
             word_count = len(message.split())
-            question_indicators = len(re.findall(r'\?', message))
-            exclamation_indicators = len(re.findall(r'!', message))
+            question_indicators = message.count('?')
+            exclamation_indicators = message.count('!')
             
             # Context analysis
             has_health_context = bool(context and context.get("health_records"))
@@ -414,7 +410,7 @@ class SmartIntentRouter:
         sentiment_score = abs(sentiment.polarity) * 0.2 if sentiment.polarity < -0.3 else 0
         
         # Exclamation marks indicate urgency
-        urgency_score = len(re.findall(r'!', message)) * 0.1
+        urgency_score = message.count('!') * 0.1
         
         return min(emergency_score + sentiment_score + urgency_score, 1.0)
     
@@ -459,89 +455,27 @@ class SmartIntentRouter:
             logger.debug(f"🚫 Message appears to be providing information ({info_matches} indicators), reducing reminder score")
             return 0.1  # Very low score for informational messages
         
-        # Core reminder words (high weight) - MORE FLEXIBLE patterns
-        explicit_reminder_patterns = [
-            r"\bremind\s+me\b", r"\bset\s+(?:a\s+)?reminder\b", r"\bcreate\s+(?:a\s+)?reminder\b",
-            r"\bdon't forget\b", r"\bremember to\b", r"\bschedule\s+(?:a\s+)?reminder\b", 
-            r"\bplease remind\b", r"\bset\s+up\s+(?:a\s+)?reminder\b"
-        ]
-        explicit_reminder_score = 0
-        for pattern in explicit_reminder_patterns:
-            if re.search(pattern, message_lower):
-                explicit_reminder_score += 0.5
-                break  # Only count once to avoid double-counting
-        
-        # Action-oriented reminder words (medium weight) - MORE FLEXIBLE
-        action_patterns = [
-            r"\bneed to schedule\b", r"\bwant to schedule\b", r"\bshould schedule\b",
-            r"\btime to\b", r"\bneed\s+(?:a\s+)?reminder\b", r"\bwould like\s+(?:a\s+)?reminder\b",
-            r"\bplease note\b", r"\bnote that\b", r"\bkeep track\b", r"\btrack (?:this|that)\b",
-            r"\bmake (?:a )?note\b", r"\brecord (?:this|that)\b", r"\bwrite (?:this|that) down\b"
-        ]
-        action_score = 0
-        for pattern in action_patterns:
-            if re.search(pattern, message_lower):
-                action_score += 0.4
-                break
+        # Core reminder words (high weight), counted once
+        explicit_reminder_score = 0.5 if _EXPLICIT_REMINDER.search(message_lower) else 0
+        
+        # Action-oriented reminder words (medium weight), counted once
+        action_score = 0.4 if _REMINDER_ACTION.search(message_lower) else 0
         
         # Future time indicators (high weight) - INCLUDE "today" and more
         future_time_words = ["tomorrow", "today", "tonight", "next week", "next month", "later", "this friday", "next appointment", "this evening", "this morning"]
         future_time_score = sum(1 for word in future_time_words if word in message_lower) * 0.4
         
         # Date pattern recognition (for formats like 10/2, 10-2, Oct 2, etc.)
-        date_patterns = [
-            r"\b\d{1,2}[\/\-\.]\d{1,2}(?:[\/\-\.]\d{2,4})?\b",  # 10/2, 10-2, 10.2, 10/2/25
-            r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}\b",  # Oct 2, October 2
-            r"\b\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"  # 2nd Oct
-        ]
-        date_pattern_score = 0
-        for pattern in date_patterns:
-            if re.search(pattern, message_lower):
-                date_pattern_score = 0.3
-                break
+        date_pattern_score = 0.3 if _DATE_MENTION.search(message_lower) else 0
         
         # Time patterns (high weight) - MORE FLEXIBLE for any reminder context
-        future_time_patterns = [
-            r"\bin\s+\d+\s+(days?|hours?|weeks?|months?)",  # "in 3 days", "in 2 weeks"
-            r"\b(next|this)\s+(week|month|friday|monday|tuesday|wednesday|thursday|saturday|sunday)",  # "next friday"  
-            r"\bschedule.+for\s+\d",  # "schedule for..."
-            r"\b(?:remind|reminder|set).+\d{1,2}[:.]\d{2}\b",  # "reminder at 9:00" or "set...8.20"
-            r"\b(?:at|@)\s*\d{1,2}(?:[:.]\d{2})?\s*(?:AM|PM|am|pm)\b",  # "at 8.20 PM" or "@ 10am"
-            r"\b\d{1,2}(?:[:.]\d{2})?\s*(?:AM|PM|am|pm)\b",  # "10am", "8:20 PM" (standalone)
-        ]
+        pattern_score = sum(0.3 for pattern in _FUTURE_TIME_PATTERNS if pattern.search(message_lower))
         
-        pattern_score = 0
-        for pattern in future_time_patterns:
-            if re.search(pattern, message_lower):
-                pattern_score += 0.3
-        
-        # Activity words in reminder context (medium weight) - MORE FLEXIBLE
-        activity_context_patterns = [
-            r"\b(?:remind|reminder|set).+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment|medicine|medication)\b",
-            r"\b(?:schedule|need).+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment)\b",  
-            r"\btime for.+(?:vaccine|vaccination|checkup|grooming|vet visit|appointment)\b",
-            r"\b(?:vaccine|vaccination|checkup|grooming|vet visit|appointment).+(?:remind|reminder|schedule)\b",  # Reverse order
-        ]
-        
-        # Appointment context patterns (when combined with note/track requests)
-        appointment_note_patterns = [
-            r"\b(?:has|have)\s+(?:an?\s+)?appointment.+(?:note|track|record|remember)\b",
-            r"\b(?:note|track|record|remember).+(?:has|have)\s+(?:an?\s+)?appointment\b",
-            r"\bappointment.+(?:note that|please note|keep track|make (?:a )?note)\b",
-        ]
+        # Activity words in reminder context (medium weight), counted once
+        activity_score = 0.3 if _REMINDER_ACTIVITY.search(message_lower) else 0
         
-        activity_score = 0
-        for pattern in activity_context_patterns:
-            if re.search(pattern, message_lower):
-                activity_score += 0.3
-                break  # Only count once
-        
-        # Check for appointment + note patterns (special case for appointment tracking)
-        appointment_note_score = 0
-        for pattern in appointment_note_patterns:
-            if re.search(pattern, message_lower):
-                appointment_note_score = 0.4  # High score for appointment tracking requests
-                break
+        # Appointment + note/track requests (special case for appointment tracking)
+        appointment_note_score = 0.4 if _APPOINTMENT_NOTE.search(message_lower) else 0
         
         total_score = explicit_reminder_score + action_score + future_time_score + date_pattern_score + min(pattern_score, 0.6) + min(activity_score, 0.4) + appointment_note_score
         
@@ -608,30 +542,11 @@ class SmartIntentRouter:
     ):
         """Cache intent classification result"""
         try:
-            message_hash = hashlib.md5(message.lower().encode()).hexdigest()
-            cache_key = f"intent_cache:user:{user_id}:message:{message_hash}"
-            
-            # Add timestamp to the result
-            cached_data = {
-                **classification_result,
-                "cached_at": datetime.now(timezone.utc).isoformat(),
-                "cache_key": cache_key
-            }
-            
-            # Cache in Redis
-            await self.redis_client.setex(
-                cache_key,
-                self.cache_ttl["intent_classification"],
-                json.dumps(cached_data)
+            cached_data = await self.intent_cache.set(
+                message, user_id, classification_result,
+                cached_at=datetime.now(timezone.utc).isoformat()
             )
-            
-            # Cache in memory
-            self.intent_cache[cache_key] = {
-                "data": cached_data,
-                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.cache_ttl["intent_classification"])
-            }
-            
-            logger.debug(f"Cached intent classification: {cache_key}")
+            logger.debug(f"Cached intent classification: {cached_data['cache_key']}")
             
         except Exception as e:
             logger.error(f"Cache storage error: {e}")
@@ -748,33 +663,18 @@ class SmartIntentRouter:
             "average_classification_time": 0.0
         }
     
+    def get_intent_cache_stats(self) -> Dict[str, Any]:
+        """Intent cache hit rates per tier and local LRU occupancy"""
+        return self.intent_cache.get_stats()
+    
     async def clear_intent_cache(self, user_id: Optional[int] = None):
         """Clear intent cache for a user or all users"""
         try:
-            if user_id:
-                # Clear specific user's cache
-                pattern = f"intent_cache:user:{user_id}:*"
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
-                
-                # Clear from in-memory cache
-                keys_to_remove = [k for k in self.intent_cache.keys() if f"user:{user_id}:" in k]
-                for key in keys_to_remove:
-                    del self.intent_cache[key]
-                
-                logger.info(f"Cleared intent cache for user {user_id}")
-            else:
-                # Clear all cache
-                pattern = "intent_cache:*"
-                keys = await self.redis_client.keys(pattern)
-                if keys:
-                    await self.redis_client.delete(*keys)
-                
-                self.intent_cache.clear()
+            cleared = await self.intent_cache.clear(user_id)
+            if not user_id:
                 self.pattern_cache.clear()
-                
-                logger.info("Cleared all intent cache")
+            
+            logger.info(f"Cleared {cleared} intent cache entries for {f'user {user_id}' if user_id else 'all users'}")
                 
         except Exception as e:
             logger.error(f"Cache clearing error: {e}")
@@ -806,6 +706,7 @@ async def get_smart_intent_router(redis_client: redis.Redis) -> SmartIntentRoute
     
     if smart_intent_router is None:
         smart_intent_router = SmartIntentRouter(redis_client)
+        smart_intent_router.intent_cache.start_sweeper()
         logger.info("🎯 Smart Intent Router initialized")
     
     return smart_intent_router
@@ -813,5 +714,7 @@ async def get_smart_intent_router(redis_client: redis.Redis) -> SmartIntentRoute
 def close_smart_intent_router():
     """Close global smart intent router instance"""
     global smart_intent_router
+    if smart_intent_router is not None:
+        smart_intent_router.intent_cache.stop_sweeper()
     smart_intent_router = None
     logger.info("🎯 Smart Intent Router closed") 
\ No newline at end of file
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Intent Classification Cache
+Two-tier cache for SmartIntentRouter: a bounded in-process LRU in front of Redis
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from utils.lru_ttl_cache import LRUTTLCache
+
+logger = logging.getLogger(__name__)
+
+# Normalization: the same request phrased with different case, punctuation,
+# spacing, numbers or dates shares one cache key
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "`": "'"})
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_DATE = re.compile(
+    r"\b\d{1,4}[/\-.]\d{1,2}(?:[/\-.]\d{2,4})?\b"        # 10/2, 2025-10-02, 10.2.25
+    rf"|\b{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?\b"         # oct 2, october 2nd
+    rf"|\b\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}"  # 2nd oct, 2 of october
+)
+_TIME = re.compile(r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b")
+_NUMBER = re.compile(r"\b(?!911\b)\d+(?:st|nd|rd|th)?\b")  # 911 is an emergency keyword
+_PUNCTUATION = re.compile(r"[^\w\s'<>]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Canonical form of a message for intent cache keys
+
+    "Remind me to walk Max at 9am!" and "remind me  to walk max at 10 AM"
+    both become "remind me to walk max at <time>".
+    """
+    text = unicodedata.normalize("NFKC", message).translate(_APOSTROPHES).lower()
+    text = _DATE.sub(" <date> ", text)
+    text = _TIME.sub(" <time> ", text)
+    text = _NUMBER.sub(" <num> ", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class IntentCache:
+    """
+    Intent classification cache: bounded in-process LRU first, Redis second
+
+    Results that depend only on the message text (pattern classification) are
+    stored under a key shared by all users; results that also used the user's
+    history or context (ML classification) are stored per user. A background
+    sweeper drops expired local entries so idle keys do not hold memory until
+    they are next touched.
+    """
+
+    # Classification methods whose result depends only on the message
+    SHARED_METHODS = frozenset({"pattern_based"})
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis],
+        ttl_seconds: int = 3600,
+        max_entries: int = 10000,
+        max_memory_bytes: int = 16 * 1024 * 1024,
+        sweep_interval_seconds: float = 60.0
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._local = LRUTTLCache(
+            max_entries=max_entries,
+            max_memory_bytes=max_memory_bytes,
+            ttl_seconds=ttl_seconds
+        )
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats = {
+            "lookups": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "swept": 0,
+            "errors": 0
+        }
+
+    # ==================== KEYS ====================
+
+    def _keys(self, message: str, user_id: int) -> Tuple[str, str]:
+        digest = hashlib.md5(normalize_message(message).encode()).hexdigest()
+        return f"intent_cache:shared:{digest}", f"intent_cache:user:{user_id}:message:{digest}"
+
+    # ==================== LOOKUP / STORE ====================
+
+    async def get(self, message: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Cached classification for a message: local LRU, then one Redis round trip"""
+        self._stats["lookups"] += 1
+        shared_key, user_key = self._keys(message, user_id)
+
+        for key in (shared_key, user_key):
+            cached = self._local.get(key)
+            if cached is not None:
+                self._stats["local_hits"] += 1
+                self._stats["shared_hits"] += key == shared_key
+                return cached
+
+        if self.redis_client is not None:
+            try:
+                for key, raw in zip((shared_key, user_key), await self.redis_client.mget(shared_key, user_key)):
+                    if raw:
+                        cached = json.loads(raw)
+                        self._local.put(key, cached)
+                        self._stats["redis_hits"] += 1
+                        self._stats["shared_hits"] += key == shared_key
+                        return cached
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Intent cache Redis lookup error: {e}")
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, message: str, user_id: int, classification: Dict[str, Any], cached_at: str) -> Dict[str, Any]:
+        """Store a classification in both tiers; returns the stored payload"""
+        shared_key, user_key = self._keys(message, user_id)
+        key = shared_key if classification.get("method") in self.SHARED_METHODS else user_key
+        cached_data = {**classification, "cached_at": cached_at, "cache_key": key}
+
+        self._local.put(key, cached_data)
+        self._stats["stores"] += 1
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.setex(key, self.ttl_seconds, json.dumps(cached_data))
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Intent cache Redis store error: {e}")
+        return cached_data
+
+    async def clear(self, user_id: Optional[int] = None) -> int:
+        """
+        Drop cached classifications of one user, or everything when user_id is None
+
+        Shared entries hold no user data and survive a per-user clear.
+        Redis keys are found with incremental SCAN, never KEYS.
+        """
+        prefix = f"intent_cache:user:{user_id}:" if user_id else "intent_cache:"
+        cleared = 0
+        for key in self._local.keys():
+            if key.startswith(prefix):
+                self._local.pop(key)
+                cleared += 1
+
+        if self.redis_client is not None:
+            batch: List[str] = []
+            async for key in self.redis_client.scan_iter(match=prefix + "*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    cleared += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                cleared += await self.redis_client.unlink(*batch)
+        return cleared
+
+    # ==================== SWEEPER ====================
+
+    def start_sweeper(self) -> None:
+        """Start the background expiry sweep on the running event loop (idempotent)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_forever())
+
+    def stop_sweeper(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                self._stats["swept"] += self._local.purge_expired()
+            except Exception as e:
+                logger.error(f"Intent cache sweep error: {e}")
+
+    # ==================== METRICS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rates per tier plus local LRU occupancy"""
+        lookups = self._stats["lookups"]
+        hits = self._stats["local_hits"] + self._stats["redis_hits"]
+        local = self._local.get_stats()
+        return {
+            **self._stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "local_hit_rate": self._stats["local_hits"] / lookups if lookups else 0.0,
+            "redis_hit_rate": self._stats["redis_hits"] / lookups if lookups else 0.0,
+            "shared_hit_ratio": self._stats["shared_hits"] / hits if hits else 0.0,
+            "local_entries": local["entries"],
+            "local_max_entries": self._local.max_entries,
+            "local_memory_bytes": local["memory_usage_bytes"],
+            "local_evictions": local["evictions"],
+            "local_expirations": local["expirations"],
+            "sweeper_running": self._sweeper is not None and not self._sweeper.done()
+        }
+
+    def reset_stats(self) -> None:
+        for name in self._stats:
+            self._stats[name] = 0
+        self._local.reset_stats()
@@ -0,0 +1,251 @@
+"""
+Compiled Intent Matcher for FastAPI Chat Service
+
+Scores a message against every intent's keyword regexes in one scan. Keyword
+patterns of the form \\b(alt|alt|...)\\b are fused into a single trie-shaped
+regex matched at each word start; the few patterns that are real regexes
+(`set.*reminder`, ...) are precompiled and run on their own. Counts and matches
+are identical to running `re.findall` per pattern.
+
+Also provides LexiconSentiment, a dependency-free replacement for TextBlob's
+polarity/subjectivity used by the smart intent router.
+"""
+
+import re
+from collections import namedtuple
+from itertools import product
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# \b( ... )\b around a body of plain words and simple (?:..) groups
+_KEYWORD_PATTERN = re.compile(r"^\\b\((.*)\)\\b$")
+_LITERAL = re.compile(r"^[a-z0-9' ]+$")
+_SIMPLE_GROUP = re.compile(r"\(\?:([a-z0-9' |]+)\)(\?)?")
+
+
+def _expand_alternative(alternative: str) -> Optional[List[str]]:
+    """
+    Expand one alternative into the literal strings it matches, in the order the
+    regex engine would try them; None if it is not a simple literal
+
+    `make (?:a )?note` -> ["make a note", "make note"]
+    """
+    parts: List[List[str]] = []
+    position = 0
+    for group in _SIMPLE_GROUP.finditer(alternative):
+        parts.append([alternative[position:group.start()]])
+        options = group.group(1).split("|")
+        parts.append(options + [""] if group.group(2) else options)
+        position = group.end()
+    parts.append([alternative[position:]])
+
+    literals = ["".join(choice) for choice in product(*parts)]
+    if not all(_LITERAL.match(literal) for literal in literals):
+        return None
+    return literals
+
+
+def _literal_alternatives(pattern: str) -> Optional[List[str]]:
+    """Literal strings of a \\b(alt|...)\\b keyword pattern, or None for any other regex"""
+    match = _KEYWORD_PATTERN.match(pattern)
+    if not match:
+        return None
+    body = match.group(1)
+    # Split on top-level '|' only
+    alternatives, depth, start = [], 0, 0
+    for index, char in enumerate(body):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            alternatives.append(body[start:index])
+            start = index + 1
+        if depth < 0:
+            return None
+    alternatives.append(body[start:])
+
+    literals: List[str] = []
+    for alternative in alternatives:
+        expanded = _expand_alternative(alternative)
+        if expanded is None:
+            return None
+        literals.extend(expanded)
+    return literals
+
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Regex matching any of `words`, longest first at a given position
+
+    Shared prefixes are factored out so the engine walks a trie instead of
+    trying every word; a shorter word is only tried when a longer one fails.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return render(trie)
+
+
+def _bounded_prefix(prefix: str, word: str) -> bool:
+    """True if `prefix` matches at the start of `word` followed by a word boundary"""
+    return re.match(r"\b" + re.escape(prefix) + r"\b", word) is not None
+
+
+class CompiledIntentMatcher:
+    """
+    One-pass scorer for a {intent: [regex, ...]} table
+
+    `score()` returns the same per-intent result as the router's original loop:
+    0.3 per findall match, a bonus when more than one pattern of an intent
+    matched, capped at 1.0.
+    """
+
+    def __init__(self, intent_patterns: Dict[str, List[str]], multi_pattern_bonus: Dict[str, float] = None):
+        self.intent_patterns = intent_patterns
+        self.multi_pattern_bonus = multi_pattern_bonus or {}
+
+        # pattern slot = (intent, index within the intent)
+        self._slots: List[Tuple[str, int]] = []
+        self._regex_slots: List[Tuple[int, Pattern]] = []
+        slot_alternatives: Dict[int, List[str]] = {}
+        for intent, patterns in intent_patterns.items():
+            for index, pattern in enumerate(patterns):
+                slot = len(self._slots)
+                self._slots.append((intent, index))
+                literals = _literal_alternatives(pattern)
+                if literals is None:
+                    self._regex_slots.append((slot, re.compile(pattern, re.IGNORECASE)))
+                else:
+                    slot_alternatives[slot] = literals
+
+        keywords = sorted({word for literals in slot_alternatives.values() for word in literals})
+
+        # For the longest keyword found at a position, every slot that matches
+        # there too and what it matches: the first of its alternatives that is
+        # a word-bounded prefix of that keyword (findall's leftmost-first choice)
+        self._hits: Dict[str, List[Tuple[int, str]]] = {}
+        for keyword in keywords:
+            hits = []
+            for slot, literals in slot_alternatives.items():
+                for literal in literals:
+                    if _bounded_prefix(literal, keyword):
+                        hits.append((slot, literal))
+                        break
+            self._hits[keyword] = hits
+
+        self._scanner = re.compile(r"(?=\b(" + _trie_regex(keywords) + r")\b)") if keywords else None
+
+    def score(self, message_lower: str) -> Dict[str, Dict]:
+        """
+        Score a lowercased message
+
+        Returns:
+            {intent: {"score", "matches", "pattern_count"}} for intents with a match
+        """
+        slot_matches: Dict[int, List[str]] = {}
+
+        if self._scanner is not None:
+            # findall never overlaps matches of the same pattern: track where each slot's last match ended
+            slot_end: Dict[int, int] = {}
+            for found in self._scanner.finditer(message_lower):
+                start = found.start()
+                for slot, literal in self._hits[found.group(1)]:
+                    if start >= slot_end.get(slot, 0):
+                        slot_end[slot] = start + len(literal)
+                        slot_matches.setdefault(slot, []).append(literal)
+
+        for slot, compiled in self._regex_slots:
+            found = compiled.findall(message_lower)
+            if found:
+                slot_matches[slot] = found
+
+        intent_scores: Dict[str, Dict] = {}
+        for slot in sorted(slot_matches):
+            intent, _ = self._slots[slot]
+            entry = intent_scores.setdefault(intent, {"score": 0.0, "matches": [], "pattern_count": 0})
+            entry["score"] += len(slot_matches[slot]) * 0.3
+            entry["matches"].extend(slot_matches[slot])
+            entry["pattern_count"] += 1
+
+        for intent, entry in intent_scores.items():
+            if entry["pattern_count"] > 1:
+                entry["score"] += self.multi_pattern_bonus.get(intent, 0.2)
+            entry["score"] = min(entry["score"], 1.0)
+        return intent_scores
+
+
+Sentiment = namedtuple("Sentiment", ["polarity", "subjectivity"])
+
+# word -> (polarity, subjectivity); values follow the TextBlob/Pattern lexicon
+# for the words that show up in pet-care chat
+_SENTIMENT_LEXICON: Dict[str, Tuple[float, float]] = {
+    "amazing": (0.6, 0.9), "awesome": (1.0, 1.0), "beautiful": (0.85, 1.0), "best": (1.0, 0.3),
+    "better": (0.5, 0.5), "cute": (0.5, 1.0), "excellent": (1.0, 1.0), "fantastic": (0.4, 0.9),
+    "fine": (0.4167, 0.5), "fun": (0.3, 0.2), "glad": (0.5, 1.0), "good": (0.7, 0.6),
+    "great": (0.8, 0.75), "happy": (0.8, 1.0), "healthy": (0.5, 0.5), "helpful": (0.5, 0.5),
+    "love": (0.5, 0.6), "lovely": (0.5, 0.75), "nice": (0.6, 1.0), "ok": (0.5, 0.5),
+    "okay": (0.5, 0.5), "perfect": (1.0, 1.0), "playful": (0.4, 0.4), "sweet": (0.35, 0.65),
+    "thank": (0.2, 0.2), "thanks": (0.2, 0.2), "well": (0.2, 0.3), "wonderful": (1.0, 1.0),
+    "abnormal": (-0.5, 0.5), "afraid": (-0.6, 0.9), "aggressive": (-0.4, 0.6), "anxious": (-0.25, 0.9),
+    "awful": (-1.0, 1.0), "bad": (-0.7, 0.6667), "broken": (-0.4, 0.4), "critical": (-0.5, 0.6),
+    "dangerous": (-0.6, 0.9), "dead": (-0.2, 0.4), "dying": (-0.6, 0.7), "emergency": (-0.3, 0.4),
+    "hurt": (-0.5, 0.6), "hurting": (-0.5, 0.6), "horrible": (-1.0, 1.0), "ill": (-0.5, 0.8),
+    "lethargic": (-0.5, 0.6), "nervous": (-0.3, 0.7), "pain": (-0.6, 0.6), "painful": (-0.7, 0.9),
+    "panic": (-0.5, 0.8), "poor": (-0.4, 0.6), "sad": (-0.5, 1.0), "scared": (-0.6, 0.9),
+    "serious": (-0.3333, 0.6667), "severe": (-0.7, 0.8), "sick": (-0.7143, 0.8571), "terrible": (-1.0, 1.0),
+    "toxic": (-0.6, 0.7), "unwell": (-0.6, 0.8), "upset": (-0.5, 0.7), "weak": (-0.375, 0.5),
+    "worried": (-0.5, 0.8), "worse": (-0.4, 0.6), "worst": (-1.0, 1.0), "wrong": (-0.5, 0.9),
+}
+_NEGATIONS = frozenset({"not", "no", "never", "isn't", "aren't", "wasn't", "don't", "doesn't", "didn't", "can't", "won't"})
+_INTENSIFIERS = {"very": 1.3, "really": 1.3, "so": 1.3, "extremely": 1.5, "super": 1.3, "too": 1.2}
+_TOKEN = re.compile(r"[a-z']+")
+
+
+class LexiconSentiment:
+    """
+    Lexicon sentiment scorer with the TextBlob `.sentiment` interface
+
+    One regex tokenization and a dict lookup per token; a preceding negation
+    flips and damps a word (x -0.5) and an intensifier scales it, as in
+    TextBlob's pattern analyzer. Polarity is the mean over scored words.
+    """
+
+    def __init__(self, lexicon: Dict[str, Tuple[float, float]] = None):
+        self.lexicon = lexicon or _SENTIMENT_LEXICON
+
+    def __call__(self, text: str) -> Sentiment:
+        polarity_total = 0.0
+        subjectivity_total = 0.0
+        scored = 0
+        modifier = 1.0
+        for token in _TOKEN.findall(text.lower()):
+            entry = self.lexicon.get(token)
+            if entry is not None:
+                polarity_total += max(-1.0, min(1.0, entry[0] * modifier))
+                subjectivity_total += min(1.0, entry[1] * abs(modifier))
+                scored += 1
+                modifier = 1.0
+            elif token in _NEGATIONS:
+                modifier = -0.5
+            elif token in _INTENSIFIERS:
+                modifier *= _INTENSIFIERS[token]
+            else:
+                modifier = 1.0
+
+        if not scored:
+            return Sentiment(0.0, 0.0)
+        return Sentiment(polarity_total / scored, subjectivity_total / scored)
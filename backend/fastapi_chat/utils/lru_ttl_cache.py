@@ -0,0 +1,245 @@
+"""
+LRU + TTL Cache Utility for FastAPI Chat Service
+
+In-process cache with O(1) get/put/evict built on an OrderedDict, TTL expiry
+driven by a hashed timer wheel and incremental size accounting. Used by the
+ServiceOrchestrator for document results; it is not thread-safe and expects
+to be used from a single event loop.
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fixed per-object overhead used by estimate_size (roughly a small CPython object)
+_OBJECT_OVERHEAD = 48
+
+
+def estimate_size(value: Any, max_depth: int = 6) -> int:
+    """
+    Approximate the memory footprint of a JSON-like value in bytes
+
+    Walks dicts, lists, tuples and sets once, charging string/bytes by length
+    and a fixed overhead per object; unlike `len(str(value))` it never builds
+    an intermediate serialization, so its cost depends on the number of
+    objects rather than the amount of text they hold.
+    """
+    value_type = type(value)
+    if value_type is str or value_type is bytes or value_type is bytearray:
+        return _OBJECT_OVERHEAD + len(value)
+    if max_depth <= 0:
+        return _OBJECT_OVERHEAD
+
+    if value_type is dict:
+        size = _OBJECT_OVERHEAD
+        for key, child in value.items():
+            size += estimate_size(key, max_depth - 1) + estimate_size(child, max_depth - 1)
+        return size
+    if value_type in (list, tuple, set, frozenset):
+        size = _OBJECT_OVERHEAD
+        for child in value:
+            size += estimate_size(child, max_depth - 1)
+        return size
+
+    return _OBJECT_OVERHEAD
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel tracking when keys expire
+
+    Keys are bucketed by expiry tick; advancing the wheel visits only the
+    buckets whose tick has passed, so expiring N keys costs O(N) regardless of
+    how many keys are live.
+    """
+
+    def __init__(self, horizon_seconds: float, resolution_seconds: float = 1.0):
+        self.resolution = resolution_seconds
+        self.slot_count = max(1, int(math.ceil(horizon_seconds / resolution_seconds)) + 1)
+        self._slots: List[Set[Any]] = [set() for _ in range(self.slot_count)]
+        self._key_slots: Dict[Any, int] = {}
+        self._current_tick: Optional[int] = None
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.resolution)
+
+    def schedule(self, key: Any, expires_at: float) -> None:
+        """Schedule (or reschedule) a key to expire at `expires_at`"""
+        self.cancel(key)
+        slot = self._tick(expires_at) % self.slot_count
+        self._slots[slot].add(key)
+        self._key_slots[key] = slot
+
+    def cancel(self, key: Any) -> None:
+        slot = self._key_slots.pop(key, None)
+        if slot is not None:
+            self._slots[slot].discard(key)
+
+    def advance(self, now: float) -> List[Any]:
+        """Return keys in buckets whose tick has passed; callers confirm expiry"""
+        now_tick = self._tick(now)
+        if now_tick == self._current_tick:
+            return []
+        if self._current_tick is None:
+            self._current_tick = now_tick
+            return []
+
+        due: List[Any] = []
+        # At most one full rotation, even after a long idle period
+        steps = min(now_tick - self._current_tick, self.slot_count)
+        for offset in range(steps):
+            slot = (self._current_tick + offset) % self.slot_count
+            if self._slots[slot]:
+                due.extend(self._slots[slot])
+        self._current_tick = now_tick
+        return due
+
+    def clear(self) -> None:
+        for slot in self._slots:
+            slot.clear()
+        self._key_slots.clear()
+
+
+class LRUTTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and memory accounting
+
+    Bounded by both entry count and estimated bytes; the least recently used
+    entries are evicted first, expired entries are dropped by the timer wheel
+    or lazily on access.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_memory_bytes: int,
+        ttl_seconds: float,
+        wheel_resolution_seconds: float = 1.0,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._clock = clock
+
+        # key -> (expires_at, value, size); order = LRU (oldest first)
+        self._entries: "OrderedDict[Any, Tuple[float, Any, int]]" = OrderedDict()
+        self._wheel = TimerWheel(ttl_seconds, wheel_resolution_seconds)
+        self._memory_usage = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Any) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    @property
+    def memory_usage(self) -> int:
+        return self._memory_usage
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return a live value and mark it most recently used"""
+        now = self._clock()
+        self._expire(now)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return default
+
+        if entry[0] <= now:
+            self._drop(key)
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: Any, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Insert or replace a value
+
+        Returns:
+            False if the value alone exceeds the memory budget and was not cached
+        """
+        now = self._clock()
+        self._expire(now)
+
+        size = self._sizeof(value)
+        if size > self.max_memory_bytes:
+            return False
+
+        if key in self._entries:
+            self._drop(key)
+
+        while self._entries and (
+            len(self._entries) >= self.max_entries
+            or self._memory_usage + size > self.max_memory_bytes
+        ):
+            lru_key = next(iter(self._entries))
+            self._drop(lru_key)
+            self._stats["evictions"] += 1
+
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._entries[key] = (expires_at, value, size)
+        self._wheel.schedule(key, expires_at)
+        self._memory_usage += size
+        return True
+
+    def keys(self) -> List[Any]:
+        """Snapshot of the current keys, least recently used first"""
+        return list(self._entries)
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now instead of on the next access; returns how many"""
+        before = len(self._entries)
+        self._expire(self._clock())
+        return before - len(self._entries)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._drop(key)
+        return entry[1]
+
+    def clear(self) -> int:
+        """Drop every entry; returns how many were removed"""
+        cleared = len(self._entries)
+        self._entries.clear()
+        self._wheel.clear()
+        self._memory_usage = 0
+        return cleared
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "memory_usage_bytes": self._memory_usage,
+        }
+
+    def reset_stats(self) -> None:
+        for name in self._stats:
+            self._stats[name] = 0
+
+    def _drop(self, key: Any) -> None:
+        _, _, size = self._entries.pop(key)
+        self._wheel.cancel(key)
+        self._memory_usage -= size
+
+    def _expire(self, now: float) -> None:
+        for key in self._wheel.advance(now):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._drop(key)
+                self._stats["expirations"] += 1
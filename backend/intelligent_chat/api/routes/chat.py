@@ -19,6 +19,7 @@ from services.chat_service import ChatService
 from services.health_chat_service import HealthChatService
 from services.wayofdog_chat_service import WayOfDogChatService
 from services.credit_service import IntelligentChatCreditService
+from services.conversation_history import forget_conversations
 from models.conversation import Message, Conversation
 from middleware.auth import require_auth
 from sqlalchemy import select, delete, func
@@ -446,6 +447,7 @@ async def clear_chat(
         )
         
         await db.commit()
+        forget_conversations([request.conversation_id])
         logger.info(f"✅ Deleted {messages_count} messages and related data from conversation {request.conversation_id}")
         
         # 5. Clear Pinecone memories
@@ -2,11 +2,15 @@
 Document Upload API Routes
 """
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
+import asyncio
+import json
 import logging
 
 from middleware.auth import require_auth
 from services.document_service import DocumentService
+from services.document_job_queue import get_document_queue
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -20,11 +24,19 @@ ALLOWED_EXTENSIONS = {
     'jpg', 'jpeg', 'png', 'bmp', 'gif', 'tiff'
 }
 
+# Terminal processing states in ic_documents
+FINAL_STATUSES = {'completed', 'failed'}
+
+# Poll interval and lifetime of the SSE progress stream
+STATUS_POLL_SECONDS = 1.0
+STATUS_STREAM_TIMEOUT_SECONDS = 600
+
 
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
     conversation_id: Optional[int] = Form(None),
+    background: bool = Form(False),
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """
@@ -38,6 +50,9 @@ async def upload_document(
     5. Return document metadata
     
     Frontend shows loading state during this process.
+    
+    With background=true the document is queued and returned immediately with
+    status "pending"; follow it via /status/{id} or /status/{id}/events.
     """
     try:
         user_id = current_user["id"]
@@ -104,6 +119,19 @@ async def upload_document(
         if file_size == 0:
             raise HTTPException(status_code=400, detail="File is empty")
         
+        if background:
+            doc_id = await _enqueue_document(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                file_content=file_content,
+                filename=filename,
+                content_type=file.content_type or 'application/octet-stream'
+            )
+            return {
+                "success": True,
+                "document": _pending_document(doc_id, filename, file_ext, file_size, conversation_id)
+            }
+        
         # Process document
         document_service = DocumentService()
         result = await document_service.upload_and_process_document(
@@ -132,11 +160,14 @@ async def upload_document(
 async def batch_upload_documents(
     files: List[UploadFile] = File(...),
     conversation_id: int = Form(...),
+    background: bool = Form(False),
     current_user: Dict[str, Any] = Depends(require_auth)
 ):
     """
     Upload multiple documents at once
     Maximum 5 documents per request
+    
+    With background=true every valid file is queued and returned as "pending".
     """
     try:
         user_id = current_user["id"]
@@ -182,6 +213,17 @@ async def batch_upload_documents(
                     })
                     continue
                 
+                if background:
+                    doc_id = await _enqueue_document(
+                        user_id=user_id,
+                        conversation_id=conversation_id,
+                        file_content=file_content,
+                        filename=filename,
+                        content_type=file.content_type or 'application/octet-stream'
+                    )
+                    results.append(_pending_document(doc_id, filename, file_ext, file_size, conversation_id))
+                    continue
+                
                 # Process
                 result = await document_service.upload_and_process_document(
                     user_id=user_id,
@@ -192,6 +234,11 @@ async def batch_upload_documents(
                 )
                 results.append(result)
                 
+            except HTTPException as e:
+                errors.append({
+                    "filename": file.filename,
+                    "error": e.detail
+                })
             except Exception as e:
                 logger.error(f"Failed to process {file.filename}: {e}")
                 errors.append({
@@ -222,39 +269,12 @@ async def get_document_status(
 ):
     """Get processing status of a document"""
     try:
-        from sqlalchemy import text
-        from models.base import AsyncSessionLocal
+        status = await _fetch_document_status(document_id, current_user["id"])
         
-        user_id = current_user["id"]
+        if not status:
+            raise HTTPException(status_code=404, detail="Document not found")
         
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("""
-                    SELECT id, filename, file_type, file_size, s3_url,
-                           processing_status, error_message, chunk_count,
-                           pinecone_vectors_stored, created_at
-                    FROM ic_documents
-                    WHERE id = :doc_id AND user_id = :user_id
-                """),
-                {"doc_id": document_id, "user_id": user_id}
-            )
-            row = result.first()
-            
-            if not row:
-                raise HTTPException(status_code=404, detail="Document not found")
-            
-            return {
-                "id": row[0],
-                "filename": row[1],
-                "file_type": row[2],
-                "file_size": row[3],
-                "s3_url": row[4],
-                "status": row[5],
-                "error": row[6],
-                "chunk_count": row[7],
-                "vectors_stored": row[8],
-                "created_at": row[9].isoformat() if row[9] else None
-            }
+        return status
             
     except HTTPException:
         raise
@@ -263,6 +283,147 @@ async def get_document_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/status/{document_id}/events")
+async def stream_document_status(
+    document_id: int,
+    current_user: Dict[str, Any] = Depends(require_auth)
+):
+    """
+    Stream processing progress as Server-Sent Events
+    
+    Emits a `status` event whenever the status or stage changes and closes
+    once the document is completed or failed.
+    """
+    user_id = current_user["id"]
+    
+    status = await _fetch_document_status(document_id, user_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    async def generate():
+        current = status
+        last_sent = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STATUS_STREAM_TIMEOUT_SECONDS
+        
+        try:
+            while True:
+                snapshot = (current["status"], current["stage"], current["chunk_count"])
+                if snapshot != last_sent:
+                    yield f"event: status\ndata: {json.dumps(current)}\n\n"
+                    last_sent = snapshot
+                
+                if current["status"] in FINAL_STATUSES:
+                    break
+                
+                if loop.time() >= deadline:
+                    yield f"event: timeout\ndata: {json.dumps({'id': document_id})}\n\n"
+                    break
+                
+                await asyncio.sleep(STATUS_POLL_SECONDS)
+                current = await _fetch_document_status(document_id, user_id)
+                if not current:
+                    yield f"event: error\ndata: {json.dumps({'error': 'Document not found'})}\n\n"
+                    break
+                    
+        except Exception as e:
+            logger.error(f"Document status stream failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+async def _enqueue_document(
+    user_id: int,
+    conversation_id: Optional[int],
+    file_content: bytes,
+    filename: str,
+    content_type: str
+) -> int:
+    """Queue a validated upload for background processing"""
+    try:
+        return await get_document_queue().submit(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            file_content=file_content,
+            filename=filename,
+            content_type=content_type
+        )
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Document processing is busy, please try again shortly"
+        )
+
+
+def _pending_document(
+    doc_id: int,
+    filename: str,
+    file_type: str,
+    file_size: int,
+    conversation_id: Optional[int]
+) -> Dict[str, Any]:
+    """Response payload for a document that was queued, not yet processed"""
+    return {
+        "id": doc_id,
+        "filename": filename,
+        "file_type": file_type,
+        "file_size": file_size,
+        "conversation_id": conversation_id,
+        "status": "pending",
+        "stage": "queued",
+        "status_url": f"/api/v2/documents/status/{doc_id}",
+        "events_url": f"/api/v2/documents/status/{doc_id}/events"
+    }
+
+
+async def _fetch_document_status(document_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Database status of a document merged with the worker's in-memory stage"""
+    from sqlalchemy import text
+    from models.base import AsyncSessionLocal
+    
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("""
+                SELECT id, filename, file_type, file_size, s3_url,
+                       processing_status, error_message, chunk_count,
+                       pinecone_vectors_stored, created_at
+                FROM ic_documents
+                WHERE id = :doc_id AND user_id = :user_id
+            """),
+            {"doc_id": document_id, "user_id": user_id}
+        )
+        row = result.first()
+    
+    if not row:
+        return None
+    
+    progress = get_document_queue().get_progress(document_id) or {}
+    
+    return {
+        "id": row[0],
+        "filename": row[1],
+        "file_type": row[2],
+        "file_size": row[3],
+        "s3_url": row[4],
+        "status": row[5],
+        "stage": progress.get("stage", row[5]),
+        "attempts": progress.get("attempts"),
+        "error": row[6],
+        "chunk_count": row[7],
+        "vectors_stored": row[8],
+        "created_at": row[9].isoformat() if row[9] else None
+    }
+
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
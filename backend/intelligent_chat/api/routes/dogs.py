@@ -23,6 +23,7 @@ from schemas.dog_profile import (
 from services.s3_service import s3_service
 from services.vision_service import vision_service
 from services.document_service import DocumentService
+from services.conversation_history import remember_message
 
 logger = logging.getLogger(__name__)
 
@@ -387,6 +388,7 @@ async def delete_dog_profile(
         conversation = conv_result.scalar_one_or_none()
         
         # If there's an active conversation, inject a system context message
+        system_msg = None
         if conversation:
             from models.conversation import Message
             from datetime import datetime
@@ -407,6 +409,10 @@ async def delete_dog_profile(
         
         await db.commit()
         
+        # Buffered chat history must include the note, or the model keeps seeing the old tail
+        if system_msg is not None:
+            remember_message(system_msg)
+        
         logger.info(f"✅ Deleted dog profile {dog_id} ({dog_name}) for user {user_id}")
         
         return DogProfileDeleteResponse(
@@ -44,6 +44,9 @@ class Settings(BaseSettings):
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
     PINECONE_ENVIRONMENT: str = os.getenv("PINECONE_ENVIRONMENT", "")
     PINECONE_INDEX_NAME: str = "dog-project"  # Shared index with fastapi_chat, separate namespaces
+    PINECONE_UPSERT_BATCH_SIZE: int = 100  # Max vectors per upsert request
+    PINECONE_UPSERT_MAX_BYTES: int = 2 * 1024 * 1024  # Pinecone caps upsert requests at 2 MB
+    PINECONE_UPSERT_CONCURRENCY: int = 4  # Upsert batches in flight at once
     
     # Pinecone Namespaces
     @property
@@ -65,6 +68,9 @@ class Settings(BaseSettings):
     # Embedding Configuration
     EMBEDDING_DIMENSION: int = 1024  # For Titan embeddings
     EMBEDDING_MAX_TOKENS: int = 8192
+    EMBEDDING_MAX_CONCURRENCY: int = 16  # Concurrent Bedrock embedding requests
+    EMBEDDING_MAX_RETRIES: int = 3  # Retries for throttling/transient errors
+    EMBEDDING_RETRY_BASE_DELAY: float = 0.25  # seconds, doubled per retry
     
     # Chunking Configuration
     CHUNK_SIZE: int = 1000  # tokens
@@ -78,6 +84,13 @@ class Settings(BaseSettings):
     WAYOFDOG_MODE_TOP_K: int = 8
     RERANK_TOP_N: int = 5
     HEALTH_MODE_RERANK_TOP_N: int = 7  # More chunks for medical queries
+    MEMORY_SOURCE_TIMEOUTS: dict = {  # seconds per retrieval source before it is skipped
+        "conversations": 1.5,
+        "documents": 2.0,
+        "conversation_documents": 2.0,
+        "book": 1.0,
+        "default": 2.0,
+    }
     
     # Credit System
     CREDITS_PER_MESSAGE: float = 0.01
@@ -96,6 +109,13 @@ class Settings(BaseSettings):
     ALLOWED_IMAGE_TYPES: list = ["jpg", "jpeg", "png", "gif", "webp"]
     MAX_FILE_SIZE: int = 25 * 1024 * 1024  # 25 MB
     
+    # Background Document Processing
+    DOCUMENT_WORKER_CONCURRENCY: int = 3  # Documents processed at once per API process
+    DOCUMENT_QUEUE_MAX_SIZE: int = 100  # Queued uploads before new ones are rejected
+    DOCUMENT_JOB_MAX_RETRIES: int = 2  # Extra attempts for transient failures
+    DOCUMENT_JOB_RETRY_BASE_DELAY: float = 2.0  # Seconds, doubled per attempt
+    DOCUMENT_PROGRESS_TTL_SECONDS: int = 300  # How long finished stages stay queryable
+    
     # Voice Configuration
     VOICE_MAX_DURATION_SECONDS: int = 120  # 2 minutes
     VOICE_TRANSCRIPTION_MODEL: str = "whisper-1"  # or AWS Transcribe
@@ -103,6 +123,8 @@ class Settings(BaseSettings):
     # Streaming Configuration
     ENABLE_STREAMING: bool = True
     STREAM_CHUNK_SIZE: int = 50  # characters
+    STREAM_MAX_CONCURRENT: int = 64  # Worker threads reading Bedrock streams
+    STREAM_QUEUE_MAX_EVENTS: int = 64  # Buffered events per stream before backpressure
     
     # Conversation Configuration
     MAX_CONTEXT_MESSAGES: int = 20  # Last N messages for context
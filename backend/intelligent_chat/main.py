@@ -28,6 +28,9 @@ from api.routes.reminders import router as reminders_router
 from api.routes.feedback import router as feedback_router
 from api.routes.system_message import router as system_message_router
 from config.settings import settings
+from services.memory_service import MemoryService
+from services.document_job_queue import get_document_queue
+from services.credit_service import IntelligentChatCreditService
 
 # Configure logging
 logging.basicConfig(
@@ -81,7 +84,9 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "intelligent_chat",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "retrieval_latency": MemoryService.get_source_latency_stats(),
+        "document_queue": get_document_queue().get_stats()
     }
 
 # Startup event
@@ -92,6 +97,7 @@ async def startup_event():
     logger.info(f"✅ Environment: {settings.ENVIRONMENT}")
     logger.info(f"✅ Database: Connected")
     logger.info(f"✅ Pinecone Namespace: intelligent-chat")
+    get_document_queue().start()
     logger.info("✅ All systems ready!")
 
 # Shutdown event
@@ -99,6 +105,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Intelligent Chat API shutting down...")
+    await get_document_queue().stop()
+    await IntelligentChatCreditService.close()
 
 # Run with uvicorn when executed directly
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the intelligent chat credit check
+
+Compares three ways of checking and deducting credits for a chat message:
+  per-call   - the old path: a new aiohttp session (new TCP connection) per POST to Flask
+  pooled     - the http backend: one shared keep-alive session
+  in-process - the native backend: no HTTP hop at all
+
+The Flask endpoint is a local stub whose handler waits --db-ms to stand in for
+the deduction query, so the numbers isolate the cost of the hop itself. Pass
+--database-url and --user-id to time the real native deduction against a
+scratch database instead (this spends that user's credits).
+
+Usage:
+    python scripts/benchmark_credit_check.py --requests 500 --concurrency 20
+    python scripts/benchmark_credit_check.py --database-url postgresql://localhost/mrwhite_test --user-id 1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import aiohttp
+from aiohttp import web
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def start_stub_flask(port: int, db_delay: float) -> web.AppRunner:
+    """Serve a stand-in for POST /api/credit-system/check-and-deduct"""
+    async def check_and_deduct(request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(db_delay)
+        return web.json_response({"success": True, "message": "Success. 2 credits deducted ($0.02).",
+                                  "cost": 2, "credits_deducted": 2})
+
+    app = web.Application()
+    app.router.add_post("/api/credit-system/check-and-deduct", check_and_deduct)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def timed(call: Callable[[], Awaitable], requests: int, concurrency: int) -> List[float]:
+    """Run `requests` calls, `concurrency` at a time, and return each call's latency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+    return latencies
+
+
+def report(label: str, latencies: List[float], elapsed: float):
+    print(f"   {label:<12} p50 {statistics.median(latencies) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:7.2f} ms   {len(latencies) / elapsed:8.0f} checks/s")
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DATABASE_URL", "postgresql://localhost/unused")
+
+    from services.credit_service import IntelligentChatCreditService
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    runner = await start_stub_flask(args.port, args.db_ms / 1000)
+    payload = {"user_id": 1, "action": "chat_message_basic", "metadata": {"mode": "normal"}}
+
+    async def per_call():
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"{base_url}/api/credit-system/check-and-deduct", json=payload,
+                                    timeout=aiohttp.ClientTimeout(total=10)) as response:
+                await response.json()
+
+    pooled_service = IntelligentChatCreditService()
+    pooled_service.flask_base_url = base_url
+    pooled_service.backend = "http"
+
+    async def pooled():
+        ok, message, _ = await pooled_service.check_and_deduct_credits(1, None)
+        assert ok, message
+
+    if args.database_url and args.user_id:
+        native_service = IntelligentChatCreditService()
+        native_service.backend = "native"
+        native_label = "in-process"
+
+        async def in_process():
+            await native_service.check_and_deduct_credits(args.user_id, None)
+    else:
+        native_label = "in-process*"
+
+        async def in_process():
+            await asyncio.sleep(args.db_ms / 1000)
+
+    print("=" * 70)
+    print("📊 CREDIT CHECK LATENCY BENCHMARK")
+    print("=" * 70)
+    print(f"   Requests: {args.requests} ({args.concurrency} concurrent), stub DB work {args.db_ms} ms")
+    for label, call in (("per-call", per_call), ("pooled", pooled), (native_label, in_process)):
+        await timed(call, min(args.requests, 20), args.concurrency)  # warm up
+        started = time.perf_counter()
+        latencies = await timed(call, args.requests, args.concurrency)
+        report(label, latencies, time.perf_counter() - started)
+    if native_label.endswith("*"):
+        print("   * stub DB work only; pass --database-url/--user-id to time the real deduction")
+    print("=" * 70)
+
+    await IntelligentChatCreditService.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="Credit checks per mode")
+    parser.add_argument("--concurrency", type=int, default=20, help="Checks in flight at once")
+    parser.add_argument("--db-ms", type=float, default=2.0, help="Stub deduction time inside the Flask handler")
+    parser.add_argument("--port", type=int, default=5099, help="Port for the stub Flask endpoint")
+    parser.add_argument("--database-url", help="Scratch database for the real native deduction")
+    parser.add_argument("--user-id", type=int, help="User to charge when --database-url is given")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for StreamingService
+
+Runs N simultaneous chat streams against a local stub of the Bedrock runtime
+(no AWS calls) and reports time-to-first-token, p99 inter-token latency and the
+worst event-loop stall observed while the streams were running.
+
+Usage:
+    python scripts/benchmark_streaming.py --streams 50 --tokens 200 --token-delay-ms 5
+    python scripts/benchmark_streaming.py --streams 50 --slow-readers 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.streaming_service import StreamingService
+from utils.bedrock_stream import BedrockStreamPump
+
+
+class StubBedrockRuntime:
+    """Blocking stand-in for boto3's bedrock-runtime streaming API"""
+
+    def __init__(self, tokens: int, token_delay: float, connect_delay: float):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.connect_delay = connect_delay
+
+    def _event(self, payload: Dict) -> Dict:
+        return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+    def _events(self):
+        yield self._event({"type": "message_start"})
+        for i in range(self.tokens):
+            # Blocking sleep, like a socket read on a real boto3 event stream
+            time.sleep(self.token_delay)
+            yield self._event({
+                "type": "content_block_delta",
+                "delta": {"type": "text_delta", "text": f"tok{i} "}
+            })
+        yield self._event({"type": "message_stop", "stop_reason": "end_turn"})
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        time.sleep(self.connect_delay)
+        return {"body": self._events()}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_stream(service: StreamingService, read_delay: float) -> Dict[str, List[float]]:
+    """Consume one stream and record token arrival times"""
+    started = time.perf_counter()
+    arrivals = []
+
+    async for sse in service.stream_chat_response([{"role": "user", "content": "hi"}]):
+        if '"type":"token"' in sse:
+            arrivals.append(time.perf_counter())
+            if read_delay:
+                await asyncio.sleep(read_delay)
+
+    ttft = (arrivals[0] - started) if arrivals else float("nan")
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    return {"ttft": [ttft], "gaps": gaps, "tokens": [len(arrivals)]}
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the worst delay between scheduled and actual wake-ups of the loop"""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - expected)
+    return worst
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = StubBedrockRuntime(
+        tokens=args.tokens,
+        token_delay=args.token_delay_ms / 1000,
+        connect_delay=args.connect_delay_ms / 1000
+    )
+    pump = BedrockStreamPump(
+        max_concurrent_streams=max(args.streams, 1),
+        max_queue_size=args.queue_size
+    )
+    service = StreamingService(bedrock_runtime=stub, stream_pump=pump)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(stop))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_stream(service, args.slow_read_ms / 1000 if i < args.slow_readers else 0.0)
+        for i in range(args.streams)
+    ])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    worst_lag = await lag_task
+    pump.shutdown()
+
+    ttfts = [r["ttft"][0] for r in results]
+    gaps = [g for r in results for g in r["gaps"]]
+    total_tokens = sum(r["tokens"][0] for r in results)
+
+    print("=" * 70)
+    print("📊 STREAMING CONCURRENCY BENCHMARK")
+    print("=" * 70)
+    print(f"   Streams:              {args.streams} ({args.slow_readers} slow readers)")
+    print(f"   Tokens per stream:    {args.tokens} @ {args.token_delay_ms} ms")
+    print(f"   Wall time:            {elapsed:.2f} s")
+    print(f"   Tokens delivered:     {total_tokens:,} ({total_tokens / elapsed:,.0f}/s)")
+    print(f"   TTFT p50 / p99:       {statistics.median(ttfts) * 1000:.1f} / {percentile(ttfts, 99) * 1000:.1f} ms")
+    print(f"   Inter-token p50/p99:  {statistics.median(gaps) * 1000:.2f} / {percentile(gaps, 99) * 1000:.2f} ms")
+    print(f"   Worst loop stall:     {worst_lag * 1000:.1f} ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=50, help="Concurrent streams")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per stream")
+    parser.add_argument("--token-delay-ms", type=float, default=5.0, help="Stub delay between tokens")
+    parser.add_argument("--connect-delay-ms", type=float, default=50.0, help="Stub delay before the stream opens")
+    parser.add_argument("--queue-size", type=int, default=64, help="Per-stream event queue size")
+    parser.add_argument("--slow-readers", type=int, default=0, help="Streams whose reader sleeps per token")
+    parser.add_argument("--slow-read-ms", type=float, default=20.0, help="Per-token sleep of slow readers")
+    asyncio.run(main(parser.parse_args()))
@@ -18,6 +18,7 @@ from models.dog_profile import DogProfile
 from models.document import Document, VetReport
 from models.user_preference import UserPreference
 from services.memory_service import MemoryService
+from services.conversation_history import forget_conversations
 
 logger = logging.getLogger(__name__)
 
@@ -169,6 +170,7 @@ class AccountDeletionService:
             
             # Commit all database deletions
             await db.commit()
+            forget_conversations(conversation_ids)
             logger.info(f"✅ All database deletions committed for user {user_id}")
             
             # 13. Clear Pinecone vectors (all namespaces + user-specific + S3)
@@ -15,6 +15,7 @@ from models.credit import CreditUsage
 from models.preference import UserPreference
 from services.streaming_service import StreamingService
 from services.memory_service import MemoryService
+from services.conversation_history import get_recent_history, remember_message
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -220,6 +221,7 @@ class BaseChatService:
         db.add(message)
         await db.commit()
         await db.refresh(message)
+        remember_message(message)
         
         # Link documents to this message
         if document_ids:
@@ -257,18 +259,9 @@ class BaseChatService:
         context = {}
         
         # 1. Retrieve conversation history
-        result = await db.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .where(Message.is_deleted == False)
-            .order_by(Message.created_at.desc())
-            .limit(self.max_context_messages)
+        context["conversation_history"] = await get_recent_history(
+            db, conversation_id, self.max_context_messages
         )
-        messages = result.scalars().all()
-        context["conversation_history"] = [
-            {"role": msg.role, "content": msg.content}
-            for msg in reversed(messages)
-        ]
         
         # 2. Retrieve relevant memories (mode-specific - can be overridden)
         retrieved_memories = await self._retrieve_memories(
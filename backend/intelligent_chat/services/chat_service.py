@@ -14,6 +14,7 @@ from models.credit import CreditUsage
 from models.preference import UserPreference
 from services.streaming_service import StreamingService
 from services.memory_service import MemoryService
+from services.conversation_history import get_recent_history, remember_message
 from services.agent_state_service import AgentStateService
 from agents import ReminderAgent
 from agents.tools.reminder_query_tool import query_user_reminders, REMINDER_QUERY_TOOL
@@ -326,6 +327,7 @@ class ChatService:
         db.add(message)
         await db.commit()
         await db.refresh(message)
+        remember_message(message)
         
         # Link documents to this message
         if document_ids:
@@ -364,18 +366,9 @@ class ChatService:
         context = {}
         
         # 1. Retrieve conversation history (last N messages)
-        result = await db.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .where(Message.is_deleted == False)
-            .order_by(Message.created_at.desc())
-            .limit(self.max_context_messages)
+        context["conversation_history"] = await get_recent_history(
+            db, conversation_id, self.max_context_messages
         )
-        messages = result.scalars().all()
-        context["conversation_history"] = [
-            {"role": msg.role, "content": msg.content}
-            for msg in reversed(messages)
-        ]
         
         # 2. If documents are attached to THIS message, fetch them directly FIRST
         if attached_document_ids:
@@ -0,0 +1,67 @@
+"""
+Conversation history for chat context
+
+The model only sees the last MAX_CONTEXT_MESSAGES messages of a conversation.
+They are kept in an in-process ring buffer (backend/shared/history_buffer.py)
+that every stored message is appended to, so repeat turns of a conversation
+build their context without querying ic_messages; the first turn (or one after
+eviction/expiry) loads the tail with a single query and seeds the buffer.
+"""
+import os
+import sys
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.conversation import Message
+
+# Shared history buffer lives in backend/shared
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.append(_BACKEND_ROOT)
+from shared.history_buffer import ConversationHistoryBuffer, get_history_buffer
+
+
+def history_buffer() -> ConversationHistoryBuffer:
+    return get_history_buffer("intelligent_chat")
+
+
+def remember_message(message: Message):
+    """Append a just-committed message to its conversation's buffered history"""
+    if not message.is_deleted:
+        history_buffer().append(message.conversation_id, {"role": message.role, "content": message.content})
+
+
+def forget_conversations(conversation_ids: List[int]):
+    """Drop buffered history after messages were deleted"""
+    buffer = history_buffer()
+    for conversation_id in conversation_ids:
+        buffer.invalidate(conversation_id)
+
+
+async def get_recent_history(db: AsyncSession, conversation_id: int, limit: int) -> List[Dict[str, str]]:
+    """
+    Last `limit` non-deleted messages of a conversation, oldest first
+
+    Returns:
+        [{"role": ..., "content": ...}]
+    """
+    buffer = history_buffer()
+    cached = buffer.get(conversation_id, limit)
+    if cached is not None:
+        return cached
+
+    token = buffer.begin_load()
+    result = await db.execute(
+        select(Message.role, Message.content)
+        .where(Message.conversation_id == conversation_id)
+        .where(Message.is_deleted == False)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(max(limit, buffer.max_messages))
+    )
+    history = [{"role": row.role, "content": row.content} for row in result]
+    history.reverse()
+    if history:
+        buffer.seed(conversation_id, history, token)
+    return history[-limit:] if limit > 0 else []
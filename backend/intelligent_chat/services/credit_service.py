@@ -1,18 +1,62 @@
 """
 Credit System Service for Intelligent Chat
-Handles credit deduction by calling Flask backend API
+Checks and deducts credits directly in the shared users table
+
+The deduction is the same conditional UPDATE the Flask credit ledger runs
+(balance, daily/monthly usage and the credit_transactions row in one
+statement), issued through AsyncSessionLocal so a chat message no longer pays
+for an HTTP round trip to Flask. Set INTELLIGENT_CHAT_CREDIT_BACKEND=http to
+route through the Flask API instead; that path reuses one pooled keep-alive
+session.
 """
+import asyncio
+import json
 import logging
 import aiohttp
 import os
+from datetime import date, datetime
 from typing import Dict, Any, Optional, Tuple
 
+from sqlalchemy import text
+
+from models.base import AsyncSessionLocal
+
 logger = logging.getLogger(__name__)
 
+# One statement: debit only if the balance covers it (and the plan allows the
+# action), bump the usage counters, and write the ledger row for the debit.
+_DEDUCT_SQL = text("""
+    WITH debited AS (
+        UPDATE users
+        SET credits_balance = credits_balance - :cost,
+            credits_used_today = CASE
+                WHEN last_credit_reset_date = :today THEN COALESCE(credits_used_today, 0) + :cost
+                ELSE :cost
+            END,
+            last_credit_reset_date = :today,
+            credits_used_this_month = COALESCE(credits_used_this_month, 0) + :cost
+        WHERE id = :user_id
+          AND credits_balance >= :cost
+          AND (CAST(:free_action AS BOOLEAN) OR (is_premium AND subscription_status = 'active'))
+        RETURNING id, credits_balance
+    ), ledger AS (
+        INSERT INTO credit_transactions (user_id, amount, transaction_type, transaction_metadata, created_at, updated_at)
+        SELECT id, -CAST(:cost AS INTEGER), 'usage', CAST(:metadata AS TEXT),
+               CAST(:now AS TIMESTAMP), CAST(:now AS TIMESTAMP)
+        FROM debited
+    )
+    SELECT credits_balance FROM debited
+""")
+
+_USER_CREDITS_SQL = text(
+    "SELECT credits_balance, is_premium, subscription_status FROM users WHERE id = :user_id"
+)
+
+
 class IntelligentChatCreditService:
     """
     Credit system for intelligent chat with different costs based on mode and features
-    Uses Flask backend API for credit operations
+    Deducts in-process through the shared database (Flask API fallback available)
     """
     
     # Credit costs for intelligent chat
@@ -24,9 +68,25 @@ class IntelligentChatCreditService:
         "health_with_document": 8,   # $0.08 - Health mode + document upload
     }
     
+    # Costs Flask charges for the mapped actions (CreditSystemService.CREDIT_COSTS)
+    FLASK_ACTION_COSTS = {
+        "chat_message_basic": 2,
+        "chat_message_health": 8,
+        "health_assessment": 15,
+        "document_upload": 8,
+    }
+
+    # Actions free users may spend credits on (CreditSystemService.FREE_TIER_ACTIONS)
+    FREE_TIER_ACTIONS = ("chat_message_basic", "document_upload")
+
+    # Shared Flask API session for the http backend
+    _http_session: Optional[aiohttp.ClientSession] = None
+    _http_session_lock = asyncio.Lock()
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.flask_base_url = os.getenv("FLASK_BASE_URL", "http://localhost:5001")
+        self.backend = os.getenv("INTELLIGENT_CHAT_CREDIT_BACKEND", "native").lower()
     
     async def check_and_deduct_credits(
         self, 
@@ -44,7 +104,7 @@ class IntelligentChatCreditService:
             active_mode: Current chat mode (health, wayofdog, or None for normal)
             has_documents: Whether documents were uploaded
             metadata: Additional metadata for the transaction
-            cookies: Request cookies for authentication
+            cookies: Request cookies for authentication (http backend only)
             
         Returns:
             Tuple of (success: bool, message: str, credits_deducted: int)
@@ -56,7 +116,7 @@ class IntelligentChatCreditService:
             # Map intelligent chat modes to Flask credit actions
             flask_action = self._map_to_flask_action(active_mode, has_documents)
             
-            # Prepare metadata for Flask backend
+            # Prepare metadata for the ledger
             flask_metadata = {
                 "mode": active_mode or "normal",
                 "has_documents": has_documents,
@@ -66,31 +126,109 @@ class IntelligentChatCreditService:
             if metadata:
                 flask_metadata.update(metadata)
             
-            # Call Flask backend to check and deduct credits
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.flask_base_url}/api/credit-system/check-and-deduct",
-                    json={
-                        "user_id": user_id,
-                        "action": flask_action,
-                        "metadata": flask_metadata
-                    },
-                    cookies=cookies or {},
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return True, result.get("message", "Success"), credit_cost
-                    elif response.status == 402:
-                        error_data = await response.json()
-                        return False, error_data.get("message", "Insufficient credits"), 0
-                    else:
-                        error_text = await response.text()
-                        return False, f"Credit system error: {error_text}", 0
+            if self.backend == "http":
+                return await self._deduct_via_flask(user_id, flask_action, flask_metadata, cookies, credit_cost)
+            return await self._deduct_native(user_id, flask_action, flask_metadata)
             
         except Exception as e:
             self.logger.error(f"Error checking/deducting credits: {str(e)}")
             return False, "Credit system error", 0
+
+    async def _deduct_native(self, user_id: int, action: str, metadata: Dict) -> Tuple[bool, str, int]:
+        """
+        Check and deduct in one round trip to the database
+
+        Charges what Flask charges for the mapped action, so both paths bill the same.
+        """
+        cost = self.FLASK_ACTION_COSTS.get(action, 3)
+        now = datetime.utcnow()
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_DEDUCT_SQL, {
+                "user_id": user_id,
+                "cost": cost,
+                "today": date.today(),
+                "now": now,
+                "free_action": action in self.FREE_TIER_ACTIONS,
+                "metadata": json.dumps({"action": action, "metadata": metadata}),
+            })
+            balance = result.scalar()
+
+            if balance is not None:
+                await session.commit()
+                return True, f"Success. {cost} credits deducted (${cost/100:.2f}).", cost
+
+            # Nothing was charged; read the user only to explain why
+            await session.rollback()
+            user = (await session.execute(_USER_CREDITS_SQL, {"user_id": user_id})).first()
+
+        return False, self._denial_message(user, cost), 0
+
+    def _denial_message(self, user, cost: int) -> str:
+        """Same wording as Flask's CreditSystemService._denial_message"""
+        if not user:
+            return "User not found"
+
+        if user.is_premium and user.subscription_status == 'active':
+            available_credits = user.credits_balance
+            shortage = cost - available_credits
+            return f"Insufficient credits. Need {cost} credits (${cost/100:.2f}), have {available_credits} (${available_credits/100:.2f}). Purchase {shortage} more credits to continue."
+
+        return "Upgrade to Elite Pack for full access to all features and monthly credit allowance."
+
+    async def _deduct_via_flask(
+        self,
+        user_id: int,
+        action: str,
+        metadata: Dict,
+        cookies: Optional[Dict],
+        credit_cost: int
+    ) -> Tuple[bool, str, int]:
+        """Check and deduct through the Flask credit API"""
+        session = await self._get_http_session()
+        async with session.post(
+            f"{self.flask_base_url}/api/credit-system/check-and-deduct",
+            json={
+                "user_id": user_id,
+                "action": action,
+                "metadata": metadata
+            },
+            cookies=cookies or {},
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return True, result.get("message", "Success"), result.get("credits_deducted", credit_cost)
+            elif response.status == 402:
+                error_data = await response.json()
+                return False, error_data.get("message", "Insufficient credits"), 0
+            else:
+                error_text = await response.text()
+                return False, f"Credit system error: {error_text}", 0
+
+    @classmethod
+    async def _get_http_session(cls) -> aiohttp.ClientSession:
+        """
+        Get the shared keep-alive session for Flask API calls
+
+        Cookies are per request (passed to each call), so the session keeps no
+        cookie jar and users' auth cookies are never shared.
+        """
+        if cls._http_session is None or cls._http_session.closed:
+            async with cls._http_session_lock:
+                if cls._http_session is None or cls._http_session.closed:
+                    cls._http_session = aiohttp.ClientSession(
+                        connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60),
+                        cookie_jar=aiohttp.DummyCookieJar()
+                    )
+        return cls._http_session
+
+    @classmethod
+    async def close(cls):
+        """Close the shared Flask API session (called on shutdown)"""
+        if cls._http_session is not None and not cls._http_session.closed:
+            await cls._http_session.close()
+        cls._http_session = None
     
     def _calculate_credit_cost(self, active_mode: Optional[str], has_documents: bool) -> int:
         """
@@ -130,21 +268,26 @@ class IntelligentChatCreditService:
     
     async def get_user_credits(self, user_id: int, cookies: Optional[Dict] = None) -> Optional[int]:
         """
-        Get user's current credit balance from Flask backend
+        Get user's current credit balance
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.flask_base_url}/api/credit-system/user/{user_id}/credits",
-                    cookies=cookies or {},
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("credits_balance", 0)
-                    else:
-                        self.logger.error(f"Failed to get user credits: {response.status}")
-                        return None
+            if self.backend != "http":
+                async with AsyncSessionLocal() as session:
+                    user = (await session.execute(_USER_CREDITS_SQL, {"user_id": user_id})).first()
+                return user.credits_balance if user else None
+
+            session = await self._get_http_session()
+            async with session.get(
+                f"{self.flask_base_url}/api/credit-system/user/{user_id}/credits",
+                cookies=cookies or {},
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get("credits_balance", 0)
+                else:
+                    self.logger.error(f"Failed to get user credits: {response.status}")
+                    return None
         except Exception as e:
             self.logger.error(f"Error getting user credits: {str(e)}")
             return None
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Background Document Processing Queue
+
+Uploads only create the `ic_documents` row on the request path; the S3 upload,
+text extraction and Pinecone indexing run on in-process worker tasks. Workers
+drive the existing `pending → processing → completed/failed` states and publish
+a finer-grained stage for the status/SSE endpoints.
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import (
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from config.settings import settings
+from services.document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+# Exceptions worth another attempt: network blips, timeouts, throttling.
+# Not bare OSError - a missing temp dir or full disk fails the same way again.
+_TRANSIENT_EXCEPTIONS = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    EndpointConnectionError,
+    ConnectTimeoutError,
+    ReadTimeoutError,
+    ConnectionClosedError,
+)
+_SHUTDOWN_ERROR = "Processing was interrupted by a server restart. Please re-upload the document."
+_TRANSIENT_ERROR_CODES = {
+    "ThrottlingException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "RequestTimeout",
+    "SlowDown",
+    "ServiceUnavailable",
+}
+
+
+@dataclass
+class DocumentJob:
+    """A queued document with everything needed to process it"""
+    doc_id: int
+    user_id: int
+    conversation_id: Optional[int]
+    file_content: bytes
+    filename: str
+    content_type: str
+    dog_profile_id: Optional[int] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class DocumentProcessingQueue:
+    """In-process job queue with a fixed pool of worker tasks"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        document_service: Optional[DocumentService] = None
+    ):
+        """
+        Initialize the queue
+
+        Args:
+            concurrency: Documents processed at once
+            max_retries: Extra attempts for transient failures
+            document_service: Service running the pipeline
+        """
+        self.concurrency = concurrency or settings.DOCUMENT_WORKER_CONCURRENCY
+        self.max_retries = settings.DOCUMENT_JOB_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = settings.DOCUMENT_JOB_RETRY_BASE_DELAY
+        self.document_service = document_service or DocumentService()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Jobs a worker has picked up and not finished yet
+        self._active: Dict[int, DocumentJob] = {}
+        # doc_id -> {"stage", "attempts", "error", "updated_at"}; entries are
+        # dropped a while after the job finishes, the DB stays the source of truth
+        self._progress: Dict[int, Dict[str, Any]] = {}
+        self._stats = {"enqueued": 0, "completed": 0, "failed": 0, "retries": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    def start(self) -> None:
+        """Start worker tasks on the running event loop (idempotent)"""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=settings.DOCUMENT_QUEUE_MAX_SIZE)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"document-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"📄 Document processing queue started with {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        """
+        Cancel workers and fail every unfinished job
+
+        File bytes only live in this process, so a job that did not finish
+        can never be resumed; its row is marked `failed` (asking for a
+        re-upload) instead of being left `pending`/`processing` forever.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        unfinished = list(self._active.values())
+        self._active.clear()
+        while self._queue is not None and not self._queue.empty():
+            unfinished.append(self._queue.get_nowait())
+            self._queue.task_done()
+
+        for job in unfinished:
+            await self.document_service.mark_document_failed(job.doc_id, _SHUTDOWN_ERROR)
+            self._set_progress(job.doc_id, "failed", error=_SHUTDOWN_ERROR)
+            self._stats["failed"] += 1
+
+        if unfinished:
+            logger.warning(f"⚠️  Failed {len(unfinished)} unfinished documents on shutdown")
+        logger.info("🛑 Document processing queue stopped")
+
+    async def submit(
+        self,
+        user_id: int,
+        conversation_id: Optional[int],
+        file_content: bytes,
+        filename: str,
+        content_type: str,
+        dog_profile_id: Optional[int] = None
+    ) -> int:
+        """
+        Create the document row and queue it for processing
+
+        Returns:
+            Document ID (status: pending)
+
+        Raises:
+            asyncio.QueueFull: The backlog is at DOCUMENT_QUEUE_MAX_SIZE
+        """
+        self.start()
+        if self._queue.full():
+            raise asyncio.QueueFull()
+
+        doc_id = await self.document_service.create_document_record(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            file_size=len(file_content),
+            filename=filename,
+            content_type=content_type,
+            dog_profile_id=dog_profile_id
+        )
+
+        self._queue.put_nowait(DocumentJob(
+            doc_id=doc_id,
+            user_id=user_id,
+            conversation_id=conversation_id,
+            file_content=file_content,
+            filename=filename,
+            content_type=content_type,
+            dog_profile_id=dog_profile_id
+        ))
+        self._set_progress(doc_id, "queued")
+        self._stats["enqueued"] += 1
+
+        logger.info(f"📥 Queued document {doc_id} ({self._queue.qsize()} waiting)")
+        return doc_id
+
+    def get_progress(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        """In-memory stage of a document handled by this process, if known"""
+        return self._progress.get(doc_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, worker count and job counters"""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "workers": self.concurrency,
+            "running": self.running,
+            **self._stats,
+        }
+
+    def _set_progress(self, doc_id: int, stage: str, **extra: Any) -> None:
+        entry = self._progress.setdefault(doc_id, {"attempts": 0, "error": None})
+        entry.update(stage=stage, updated_at=time.time(), **extra)
+
+    def _forget_later(self, doc_id: int) -> None:
+        """Keep the final stage around briefly for late SSE subscribers"""
+        loop = asyncio.get_running_loop()
+        loop.call_later(settings.DOCUMENT_PROGRESS_TTL_SECONDS, self._progress.pop, doc_id, None)
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, _TRANSIENT_EXCEPTIONS):
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(response, dict):
+            return response.get("Error", {}).get("Code") in _TRANSIENT_ERROR_CODES
+        return False
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            self._active[job.doc_id] = job
+            try:
+                await self._run_job(job)
+                self._active.pop(job.doc_id, None)
+            except asyncio.CancelledError:
+                # Left in _active for stop() to mark failed
+                raise
+            except Exception as e:
+                self._active.pop(job.doc_id, None)
+                logger.error(f"❌ Document worker {worker_id} crashed on {job.doc_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: DocumentJob) -> None:
+        async def on_progress(stage: str) -> None:
+            self._set_progress(job.doc_id, stage)
+
+        while True:
+            job.attempts += 1
+            self._set_progress(job.doc_id, "processing", attempts=job.attempts)
+
+            try:
+                result = await self.document_service.process_document(
+                    doc_id=job.doc_id,
+                    user_id=job.user_id,
+                    conversation_id=job.conversation_id,
+                    file_content=job.file_content,
+                    filename=job.filename,
+                    content_type=job.content_type,
+                    dog_profile_id=job.dog_profile_id,
+                    on_progress=on_progress
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._is_transient(e) and job.attempts <= self.max_retries:
+                    delay = self.retry_base_delay * (2 ** (job.attempts - 1))
+                    delay += random.uniform(0, delay / 2)
+                    self._stats["retries"] += 1
+                    self._set_progress(job.doc_id, "retrying", error=str(e))
+                    logger.warning(
+                        f"⚠️  Document {job.doc_id} attempt {job.attempts} failed ({e}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                logger.error(f"❌ Document {job.doc_id} failed after {job.attempts} attempts: {e}")
+                await self.document_service.mark_document_failed(job.doc_id, str(e))
+                self._set_progress(job.doc_id, "failed", error=str(e))
+                self._stats["failed"] += 1
+                break
+
+            if result.get("status") == "failed":
+                self._set_progress(job.doc_id, "failed", error=result.get("error"))
+                self._stats["failed"] += 1
+            else:
+                self._set_progress(job.doc_id, "completed", error=None)
+                self._stats["completed"] += 1
+                waited = time.time() - job.enqueued_at
+                logger.info(f"✅ Document {job.doc_id} processed ({waited:.1f}s since upload)")
+            break
+
+        # Release the file bytes as soon as the job is done
+        job.file_content = b""
+        self._forget_later(job.doc_id)
+
+
+# Shared queue so every request in this process feeds the same worker pool
+_document_queue: Optional[DocumentProcessingQueue] = None
+
+
+def get_document_queue() -> DocumentProcessingQueue:
+    """Get the process-wide document processing queue"""
+    global _document_queue
+    if _document_queue is None:
+        _document_queue = DocumentProcessingQueue()
+    return _document_queue
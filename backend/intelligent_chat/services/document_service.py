@@ -3,7 +3,7 @@ Document Service
 Handles document upload, processing, chunking, and Pinecone storage
 """
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable
 from datetime import datetime
 from pathlib import Path
 import tempfile
@@ -91,45 +91,134 @@ class DocumentService:
         Returns:
             Document metadata including status
         """
-        doc_id = None
-        temp_file_path = None
+        doc_id = await self.create_document_record(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            file_size=len(file_content),
+            filename=filename,
+            content_type=content_type,
+            dog_profile_id=dog_profile_id
+        )
         
         try:
-            # Determine file type
-            file_ext = Path(filename).suffix.lower().lstrip('.')
-            file_size = len(file_content)
-            
-            # Create document record first (status: pending)
+            return await self.process_document(
+                doc_id=doc_id,
+                user_id=user_id,
+                conversation_id=conversation_id,
+                file_content=file_content,
+                filename=filename,
+                content_type=content_type,
+                dog_profile_id=dog_profile_id
+            )
+        except Exception as e:
+            logger.error(f"Document processing failed: {e}", exc_info=True)
+            await self.mark_document_failed(doc_id, str(e))
+            raise
+    
+    async def create_document_record(
+        self,
+        user_id: int,
+        conversation_id: Optional[int],
+        file_size: int,
+        filename: str,
+        content_type: str,
+        dog_profile_id: Optional[int] = None
+    ) -> int:
+        """
+        Create the ic_documents row for an upload (status: pending)
+        
+        Returns:
+            Document ID
+        """
+        file_ext = Path(filename).suffix.lower().lstrip('.')
+        
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                text("""
+                    INSERT INTO ic_documents 
+                    (user_id, conversation_id, filename, file_type, file_size, 
+                     mime_type, s3_key, s3_url, processing_status, created_at, uploaded_at,
+                     is_vet_report, dog_profile_id)
+                    VALUES (:user_id, :conversation_id, :filename, :file_type, :file_size,
+                            :mime_type, '', '', 'pending', :now, :now,
+                            :is_vet_report, :dog_profile_id)
+                    RETURNING id
+                """),
+                {
+                    "user_id": user_id,
+                    "conversation_id": conversation_id,
+                    "filename": filename,
+                    "file_type": file_ext,
+                    "file_size": file_size,
+                    "mime_type": content_type,
+                    "is_vet_report": dog_profile_id is not None,
+                    "dog_profile_id": dog_profile_id,
+                    "now": datetime.utcnow()
+                }
+            )
+            doc_id = result.scalar_one()
+            await session.commit()
+        
+        logger.info(f"Created document record {doc_id} for user {user_id}")
+        return doc_id
+    
+    async def mark_document_failed(self, doc_id: int, error: str) -> None:
+        """Mark a document as failed with an error message"""
+        try:
             async with AsyncSessionLocal() as session:
-                result = await session.execute(
+                await session.execute(
                     text("""
-                        INSERT INTO ic_documents 
-                        (user_id, conversation_id, filename, file_type, file_size, 
-                         mime_type, s3_key, s3_url, processing_status, created_at, uploaded_at,
-                         is_vet_report, dog_profile_id)
-                        VALUES (:user_id, :conversation_id, :filename, :file_type, :file_size,
-                                :mime_type, '', '', 'pending', :now, :now,
-                                :is_vet_report, :dog_profile_id)
-                        RETURNING id
+                        UPDATE ic_documents 
+                        SET processing_status = 'failed',
+                            error_message = :error,
+                            updated_at = :now
+                        WHERE id = :doc_id
                     """),
-                    {
-                        "user_id": user_id,
-                        "conversation_id": conversation_id,
-                        "filename": filename,
-                        "file_type": file_ext,
-                        "file_size": file_size,
-                        "mime_type": content_type,
-                        "is_vet_report": dog_profile_id is not None,
-                        "dog_profile_id": dog_profile_id,
-                        "now": datetime.utcnow()
-                    }
+                    {"error": error, "doc_id": doc_id, "now": datetime.utcnow()}
                 )
-                doc_id = result.scalar_one()
                 await session.commit()
-            
-            logger.info(f"Created document record {doc_id} for user {user_id}")
+        except Exception as update_err:
+            logger.error(f"Failed to update error status: {update_err}")
+    
+    async def process_document(
+        self,
+        doc_id: int,
+        user_id: int,
+        conversation_id: Optional[int],
+        file_content: bytes,
+        filename: str,
+        content_type: str,
+        dog_profile_id: Optional[int] = None,
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the processing pipeline for an existing document row:
+        S3 upload, text extraction, chunking and Pinecone storage
+        
+        Exceptions propagate without marking the document failed, so callers
+        can retry; the extraction-error path marks it failed itself.
+        
+        Args:
+            doc_id: ic_documents ID from create_document_record
+            on_progress: Optional async callback receiving the current stage
+                ("uploading", "extracting", "indexing", "completed", "failed")
+        
+        Returns:
+            Document metadata including status
+        """
+        temp_file_path = None
+        
+        async def report(stage: str) -> None:
+            if on_progress:
+                await on_progress(stage)
+        
+        try:
+            # Determine file type
+            file_ext = Path(filename).suffix.lower().lstrip('.')
+            file_size = len(file_content)
             
             # Upload to S3
+            await report("uploading")
             s3_key = f"intelligent-chat/documents/{user_id}/{conversation_id}/{doc_id}_{filename}"
             s3_url = await self.s3_service.upload_file(
                 file_content=file_content,
@@ -153,6 +242,7 @@ class DocumentService:
                 await session.commit()
             
             # Download to temp file for text extraction
+            await report("extracting")
             with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_ext}") as tmp:
                 tmp.write(file_content)
                 temp_file_path = tmp.name
@@ -179,6 +269,7 @@ class DocumentService:
                     )
                     await session.commit()
                 
+                await report("failed")
                 return {
                     "id": doc_id,
                     "filename": filename,
@@ -202,12 +293,13 @@ class DocumentService:
             logger.info(f"Extracted {len(extracted_text)} chars from document {doc_id}")
             
             # Chunk and store in Pinecone
+            await report("indexing")
             if extracted_text and len(extracted_text.strip()) > 0:
                 chunks = self._chunk_text(extracted_text, filename)
                 
                 # Store in Pinecone using user-specific namespace for better isolation
                 user_namespace = self.get_user_documents_namespace(user_id)
-                pinecone_ids = []
+                metadatas = []
                 
                 for i, chunk in enumerate(chunks):
                     metadata = {
@@ -230,15 +322,17 @@ class DocumentService:
                         metadata["dog_profile_id"] = dog_profile_id
                         metadata["is_vet_report"] = True
                     
-                    vector_id = await self.memory_service.store_memory(
-                        user_id=user_id,
-                        conversation_id=conversation_id,
-                        content=chunk,
-                        role="document",
-                        metadata=metadata,
-                        namespace=user_namespace
-                    )
-                    pinecone_ids.append(vector_id)
+                    metadatas.append(metadata)
+                
+                # Embed all chunks concurrently and upsert in batches
+                pinecone_ids = await self.memory_service.store_memories_batch(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    contents=chunks,
+                    role="document",
+                    metadatas=metadatas,
+                    namespace=user_namespace
+                )
                 
                 # Update with Pinecone info
                 async with AsyncSessionLocal() as session:
@@ -280,6 +374,7 @@ class DocumentService:
                     )
                     await session.commit()
             
+            await report("completed")
             return {
                 "id": doc_id,
                 "filename": filename,
@@ -290,29 +385,6 @@ class DocumentService:
                 "chunk_count": len(chunks) if extracted_text else 0
             }
             
-        except Exception as e:
-            logger.error(f"Document processing failed: {e}", exc_info=True)
-            
-            # Mark as failed if we have doc_id
-            if doc_id:
-                try:
-                    async with AsyncSessionLocal() as session:
-                        await session.execute(
-                            text("""
-                                UPDATE ic_documents 
-                                SET processing_status = 'failed',
-                                    error_message = :error,
-                                    updated_at = :now
-                                WHERE id = :doc_id
-                            """),
-                            {"error": str(e), "doc_id": doc_id, "now": datetime.utcnow()}
-                        )
-                        await session.commit()
-                except Exception as update_err:
-                    logger.error(f"Failed to update error status: {update_err}")
-            
-            raise
-        
         finally:
             # Clean up temp file
             if temp_file_path and os.path.exists(temp_file_path):
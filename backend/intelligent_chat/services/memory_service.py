@@ -4,7 +4,8 @@ Implements Anthropic's contextual retrieval approach
 """
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Awaitable
 from datetime import datetime, timedelta
 
 from utils.pinecone_client import PineconeClient
@@ -13,6 +14,9 @@ from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-source retrieval latency, aggregated across all MemoryService instances
+_source_latency_stats: Dict[str, Dict[str, float]] = {}
+
 
 class MemoryService:
     """Service for intelligent memory retrieval and management"""
@@ -28,6 +32,7 @@ class MemoryService:
         self.wayofdog_mode_top_k = settings.WAYOFDOG_MODE_TOP_K
         self.rerank_top_n = settings.RERANK_TOP_N
         self.health_mode_rerank_top_n = settings.HEALTH_MODE_RERANK_TOP_N
+        self.source_timeouts = settings.MEMORY_SOURCE_TIMEOUTS
     
     async def retrieve_memories(
         self,
@@ -341,16 +346,18 @@ class MemoryService:
             doc_top_k = top_k // 2
             conv_top_k = top_k // 2
         
-        # Search multiple namespaces
-        conversations = await self.pinecone.query_vectors(
-            query_vector=query_embedding,
-            namespace=self.pinecone.namespace_conversations,
-            top_k=conv_top_k,
-            filter={"user_id": user_id}
-        )
+        # Fan out to all sources concurrently; each one gets its own timeout
+        # budget and degrades to no results instead of holding up the others
+        sources = {
+            "conversations": self.pinecone.query_vectors(
+                query_vector=query_embedding,
+                namespace=self.pinecone.namespace_conversations,
+                top_k=conv_top_k,
+                filter={"user_id": user_id}
+            )
+        }
         
         # Search user-specific documents namespace (skip if documents are explicitly attached)
-        documents = []
         if not skip_document_search:
             user_documents_namespace = f"user_{user_id}_docs"
             logger.info(f"🔍 Searching documents in namespace: {user_documents_namespace}")
@@ -367,80 +374,46 @@ class MemoryService:
                 doc_filter["file_type"] = {"$in": ["jpg", "jpeg", "png", "gif", "webp", "bmp", "tiff"]}
                 logger.info(f"🖼️ Filtering for image file types only")
             
-            documents = await self.pinecone.query_vectors(
+            sources["documents"] = self.pinecone.query_vectors(
                 query_vector=query_embedding,
                 namespace=user_documents_namespace,
                 top_k=doc_top_k,
                 filter=doc_filter
             )
-            logger.info(f"📄 Found {len(documents)} document chunks from semantic search")
         else:
             logger.info(f"⏭️ Skipping document semantic search (documents explicitly attached to message)")
         
         # 🔥 NEW: If user is asking for "images/documents I shared", get ALL from conversation history
         if is_reference_query and conversation_id:
             logger.info(f"🔍 User asking for previously shared items - retrieving ALL from conversation {conversation_id}")
-            from sqlalchemy import text
-            from models.base import AsyncSessionLocal
-            
-            async with AsyncSessionLocal() as session:
-                # Get all unique document IDs from this conversation
-                result = await session.execute(
-                    text("""
-                        SELECT DISTINCT d.id, d.filename, d.file_type, d.s3_url, 
-                               d.extracted_text, d.created_at
-                        FROM ic_documents d
-                        JOIN ic_message_documents md ON d.id = md.document_id
-                        JOIN ic_messages m ON md.message_id = m.id
-                        WHERE m.conversation_id = :conversation_id
-                          AND m.user_id = :user_id
-                        ORDER BY d.created_at DESC
-                    """),
-                    {"conversation_id": conversation_id, "user_id": user_id}
-                )
-                
-                conversation_docs = []
-                for row in result:
-                    doc_id, filename, file_type, s3_url, extracted_text, created_at = row
-                    
-                    # Only include images if it's an image query
-                    if is_image_query and file_type not in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'tiff']:
-                        continue
-                    
-                    conversation_docs.append({
-                        "text": f"[Document: {filename}]\n\n{extracted_text or ''}",
-                        "metadata": {
-                            "document_id": doc_id,
-                            "filename": filename,
-                            "file_type": file_type,
-                            "s3_url": s3_url,
-                            "user_id": user_id,
-                            "source_type": "document",
-                            "created_at": created_at.isoformat() if created_at else None
-                        },
-                        "score": 0.95,  # High score since user explicitly asked
-                        "priority_boost": 1.2  # Boost priority
-                    })
-                
-                logger.info(f"📎 Found {len(conversation_docs)} previously attached documents in conversation")
-                
-                # Prepend conversation docs to the semantic search results
-                documents = conversation_docs + documents
+            sources["conversation_documents"] = self._get_conversation_documents(
+                user_id, conversation_id, is_image_query
+            )
         
         # If query is dog-related, also search book content (low priority)
-        book_memories = []
         if is_dog_related:
-            from config.settings import settings
             book_namespace = f"book-content-{settings.ENVIRONMENT}"
             
             logger.info(f"🐕 Dog-related query detected - searching book content")
             
-            book_memories = await self.pinecone.query_vectors(
+            sources["book"] = self.pinecone.query_vectors(
                 query_vector=query_embedding,
                 namespace=book_namespace,
                 top_k=3  # Only 3 book chunks (low priority)
             )
-            logger.info(f"📖 Found {len(book_memories)} book chunks")
+        
+        results = await self._fan_out(sources)
+        
+        conversations = results.get("conversations", [])
+        book_memories = results.get("book", [])
+        
+        # Prepend previously attached conversation docs to the semantic search results
+        documents = results.get("conversation_documents", []) + results.get("documents", [])
+        logger.info(
+            f"📄 Found {len(results.get('documents', []))} document chunks from semantic search, "
+            f"{len(results.get('conversation_documents', []))} previously attached documents, "
+            f"{len(book_memories)} book chunks"
+        )
         
         # Combine all memories with priority weighting
         all_memories = []
@@ -466,6 +439,141 @@ class MemoryService:
         logger.info(f"✅ Retrieved {len(reranked)} general memories (conversations: {len(conversations)}, docs: {len(documents)}, book: {len(book_memories)})")
         return reranked
     
+    async def _get_conversation_documents(
+        self,
+        user_id: int,
+        conversation_id: int,
+        is_image_query: bool
+    ) -> List[Dict[str, Any]]:
+        """Get every document previously attached in a conversation"""
+        from sqlalchemy import text
+        from models.base import AsyncSessionLocal
+        
+        async with AsyncSessionLocal() as session:
+            # Get all unique document IDs from this conversation
+            result = await session.execute(
+                text("""
+                    SELECT DISTINCT d.id, d.filename, d.file_type, d.s3_url, 
+                           d.extracted_text, d.created_at
+                    FROM ic_documents d
+                    JOIN ic_message_documents md ON d.id = md.document_id
+                    JOIN ic_messages m ON md.message_id = m.id
+                    WHERE m.conversation_id = :conversation_id
+                      AND m.user_id = :user_id
+                    ORDER BY d.created_at DESC
+                """),
+                {"conversation_id": conversation_id, "user_id": user_id}
+            )
+            
+            conversation_docs = []
+            for row in result:
+                doc_id, filename, file_type, s3_url, extracted_text, created_at = row
+                
+                # Only include images if it's an image query
+                if is_image_query and file_type not in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'tiff']:
+                    continue
+                
+                conversation_docs.append({
+                    "text": f"[Document: {filename}]\n\n{extracted_text or ''}",
+                    "metadata": {
+                        "document_id": doc_id,
+                        "filename": filename,
+                        "file_type": file_type,
+                        "s3_url": s3_url,
+                        "user_id": user_id,
+                        "source_type": "document",
+                        "created_at": created_at.isoformat() if created_at else None
+                    },
+                    "score": 0.95,  # High score since user explicitly asked
+                    "priority_boost": 1.2  # Boost priority
+                })
+            
+            return conversation_docs
+    
+    async def _fan_out(
+        self,
+        sources: Dict[str, Awaitable[List[Dict[str, Any]]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run retrieval sources concurrently, each under its own timeout budget
+        
+        A source that times out or fails contributes no results; the latency
+        and outcome of every source is recorded.
+        
+        Args:
+            sources: Source name -> awaitable returning a list of memories
+        
+        Returns:
+            Source name -> memories (empty list for failed/timed-out sources)
+        """
+        async def run(name: str, awaitable: Awaitable[List[Dict[str, Any]]]):
+            timeout = self.source_timeouts.get(name, self.source_timeouts.get("default"))
+            started = time.perf_counter()
+            status = "ok"
+            memories: List[Dict[str, Any]] = []
+            try:
+                memories = await asyncio.wait_for(awaitable, timeout=timeout)
+            except asyncio.TimeoutError:
+                status = "timeout"
+                logger.warning(f"⏱️ Memory source '{name}' exceeded {timeout}s budget, continuing without it")
+            except Exception as e:
+                status = "error"
+                logger.error(f"❌ Memory source '{name}' failed: {str(e)}")
+            
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._record_source_latency(name, latency_ms, status)
+            return name, memories or [], latency_ms, status
+        
+        outcomes = await asyncio.gather(*[run(name, aw) for name, aw in sources.items()])
+        
+        logger.info(
+            "⏱️ Memory sources: " + ", ".join(
+                f"{name}={latency_ms:.0f}ms" + ("" if status == "ok" else f" ({status})")
+                for name, _, latency_ms, status in outcomes
+            )
+        )
+        return {name: memories for name, memories, _, _ in outcomes}
+    
+    @staticmethod
+    def _record_source_latency(name: str, latency_ms: float, status: str) -> None:
+        """Aggregate per-source latency and outcome counters"""
+        stats = _source_latency_stats.setdefault(name, {
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "last_ms": 0.0,
+            "timeouts": 0,
+            "errors": 0
+        })
+        stats["count"] += 1
+        stats["total_ms"] += latency_ms
+        stats["max_ms"] = max(stats["max_ms"], latency_ms)
+        stats["last_ms"] = latency_ms
+        if status == "timeout":
+            stats["timeouts"] += 1
+        elif status == "error":
+            stats["errors"] += 1
+    
+    @staticmethod
+    def get_source_latency_stats() -> Dict[str, Dict[str, float]]:
+        """
+        Get per-source retrieval latency
+        
+        Returns:
+            Source name -> count, avg/max/last latency in ms, timeouts, errors
+        """
+        return {
+            name: {
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+                "max_ms": round(stats["max_ms"], 1),
+                "last_ms": round(stats["last_ms"], 1),
+                "timeouts": stats["timeouts"],
+                "errors": stats["errors"]
+            }
+            for name, stats in _source_latency_stats.items()
+        }
+    
     async def _rerank_memories(
         self,
         query: str,
@@ -726,6 +834,88 @@ class MemoryService:
             logger.error(f"❌ Failed to store memory: {str(e)}")
             raise
     
+    async def store_memories_batch(
+        self,
+        user_id: int,
+        conversation_id: Optional[int],
+        contents: List[str],
+        role: str,
+        metadatas: List[Dict[str, Any]],
+        namespace: str
+    ) -> List[str]:
+        """
+        Store many memories at once: embeds all contents concurrently and
+        upserts them in size-bounded batches (same vectors as store_memory)
+        
+        Document chunks get a deterministic ID (document_id + chunk_index),
+        so a retried upload overwrites its earlier vectors instead of
+        duplicating them.
+        
+        Args:
+            user_id: User ID
+            conversation_id: Conversation ID
+            contents: Contents to store (e.g. chunk texts)
+            role: Role type (e.g., "document", "user", "assistant")
+            metadatas: Metadata per content, same order as contents
+            namespace: Pinecone namespace to use
+        
+        Returns:
+            Vector IDs, in input order
+        
+        Raises:
+            Exception if any content could not be embedded (nothing is upserted)
+        """
+        if not contents:
+            return []
+        
+        # Contextual retrieval for documents, as in store_memory
+        texts = []
+        for content, metadata in zip(contents, metadatas):
+            if role == "document" and metadata.get("filename"):
+                context = f"Document: {metadata.get('filename', 'Unknown')}, Type: {metadata.get('file_type', 'Unknown')}"
+                texts.append(f"{context}\n\n{content}")
+            else:
+                texts.append(content)
+        
+        results = await self.embeddings.generate_embeddings_batch(texts)
+        failed = [r for r in results if not r.ok]
+        if failed:
+            raise Exception(
+                f"Failed to embed {len(failed)}/{len(contents)} chunks "
+                f"(first error at chunk {failed[0].index}: {failed[0].error})"
+            )
+        
+        created_at = datetime.utcnow()
+        vectors = []
+        for content, metadata, result in zip(contents, metadatas, results):
+            vector_id = f"{role}_{metadata.get('document_id', '')}_{metadata.get('chunk_index', 0)}"
+            if not metadata.get("document_id"):
+                vector_id = f"{vector_id}_{created_at.timestamp()}"
+            
+            vector_metadata = {
+                "user_id": user_id,
+                "role": role,
+                "text": content[:1000],  # Store preview
+                "created_at": created_at.isoformat(),
+            }
+            
+            # Only add conversation_id if it exists (Pinecone rejects null values)
+            if conversation_id:
+                vector_metadata["conversation_id"] = conversation_id
+            
+            vector_metadata.update(metadata)
+            
+            vectors.append({
+                "id": vector_id,
+                "values": result.embedding,
+                "metadata": vector_metadata
+            })
+        
+        await self.pinecone.upsert_vectors_batched(vectors=vectors, namespace=namespace)
+        
+        logger.info(f"✅ Stored {len(vectors)} memories in {namespace}")
+        return [vector["id"] for vector in vectors]
+    
     async def clear_conversation_memories(
         self,
         user_id: int,
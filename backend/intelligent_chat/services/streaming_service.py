@@ -1,6 +1,7 @@
 """
 Streaming response service using Server-Sent Events (SSE)
 """
+import asyncio
 import json
 import logging
 from typing import AsyncGenerator, Dict, Any, Optional
@@ -9,6 +10,7 @@ from botocore.exceptions import ClientError
 
 from config.settings import settings
 from schemas.chat import StreamChunk
+from utils.bedrock_stream import BedrockStreamPump, get_stream_pump
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +18,21 @@ logger = logging.getLogger(__name__)
 class StreamingService:
     """Service for streaming AI responses using SSE"""
     
-    def __init__(self):
-        """Initialize streaming service with Bedrock client"""
-        self.bedrock_runtime = boto3.client(
+    def __init__(self, bedrock_runtime=None, stream_pump: Optional[BedrockStreamPump] = None):
+        """
+        Initialize streaming service with Bedrock client
+        
+        Args:
+            bedrock_runtime: Optional pre-built bedrock-runtime client (e.g. a local stub)
+            stream_pump: Optional pump; defaults to the process-wide one
+        """
+        self.bedrock_runtime = bedrock_runtime or boto3.client(
             'bedrock-runtime',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
             region_name=settings.AWS_REGION
         )
+        self.stream_pump = stream_pump or get_stream_pump()
         self.model_id = settings.BEDROCK_MODEL_ID
         self.max_tokens = settings.BEDROCK_MAX_TOKENS
         self.temperature = settings.BEDROCK_TEMPERATURE
@@ -63,87 +72,84 @@ class StreamingService:
             if tools:
                 request_body["tools"] = tools
             
-            # Invoke model with streaming
-            response = self.bedrock_runtime.invoke_model_with_response_stream(
-                modelId=self.model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=json.dumps(request_body)
-            )
-            
-            # Send initial metadata
-            if metadata:
-                chunk = StreamChunk(
-                    type="metadata",
-                    content=None,
-                    metadata=metadata,
-                    error=None
+            # Invoke model with streaming; the blocking boto3 stream is read on a
+            # worker thread and handed over through a bounded queue
+            def open_stream():
+                return self.bedrock_runtime.invoke_model_with_response_stream(
+                    modelId=self.model_id,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=json.dumps(request_body)
                 )
-                yield f"data: {chunk.model_dump_json()}\n\n"
             
-            # Stream tokens
-            stream = response.get('body')
             full_content = ""
             tool_use_blocks = []
+            metadata_sent = False
             
-            if stream:
-                for event in stream:
-                    chunk_data = event.get('chunk')
-                    if chunk_data:
-                        chunk_json = json.loads(chunk_data.get('bytes').decode())
+            async for chunk_json in self.stream_pump.iter_events(open_stream):
+                # Send initial metadata once the stream is open
+                if metadata and not metadata_sent:
+                    metadata_sent = True
+                    chunk = StreamChunk(
+                        type="metadata",
+                        content=None,
+                        metadata=metadata,
+                        error=None
+                    )
+                    yield f"data: {chunk.model_dump_json()}\n\n"
+                
+                # Handle different event types
+                if chunk_json.get('type') == 'content_block_start':
+                    # Check if this is a tool_use block
+                    content_block = chunk_json.get('content_block', {})
+                    if content_block.get('type') == 'tool_use':
+                        tool_use_blocks.append({
+                            'id': content_block.get('id'),
+                            'name': content_block.get('name'),
+                            'input': {}
+                        })
+                
+                elif chunk_json.get('type') == 'content_block_delta':
+                    delta = chunk_json.get('delta', {})
+                    if delta.get('type') == 'text_delta':
+                        text = delta.get('text', '')
+                        full_content += text
                         
-                        # Handle different event types
-                        if chunk_json.get('type') == 'content_block_start':
-                            # Check if this is a tool_use block
-                            content_block = chunk_json.get('content_block', {})
-                            if content_block.get('type') == 'tool_use':
-                                tool_use_blocks.append({
-                                    'id': content_block.get('id'),
-                                    'name': content_block.get('name'),
-                                    'input': {}
-                                })
-                        
-                        elif chunk_json.get('type') == 'content_block_delta':
-                            delta = chunk_json.get('delta', {})
-                            if delta.get('type') == 'text_delta':
-                                text = delta.get('text', '')
-                                full_content += text
-                                
-                                # Send token chunk
-                                chunk = StreamChunk(
-                                    type="token",
-                                    content=text,
-                                    metadata=None,
-                                    error=None
-                                )
-                                yield f"data: {chunk.model_dump_json()}\n\n"
-                            
-                            elif delta.get('type') == 'input_json_delta':
-                                # Accumulate tool input
-                                if tool_use_blocks:
-                                    partial_json = delta.get('partial_json', '')
-                                    # Note: input will be complete in content_block_stop
-                        
-                        elif chunk_json.get('type') == 'content_block_stop':
-                            # Tool use block is complete
-                            if tool_use_blocks:
-                                # The last tool in the list is now complete
-                                pass
-                        
-                        elif chunk_json.get('type') == 'message_stop':
-                            # Send completion metadata
-                            stop_reason = chunk_json.get('stop_reason', 'end_turn')
-                            chunk = StreamChunk(
-                                type="done",
-                                content=full_content,
-                                metadata={
-                                    "stop_reason": stop_reason,
-                                    "total_tokens": len(full_content.split()),  # Rough estimate
-                                    "tool_calls": tool_use_blocks if tool_use_blocks else None
-                                },
-                                error=None
-                            )
-                            yield f"data: {chunk.model_dump_json()}\n\n"
+                        # Send token chunk
+                        chunk = StreamChunk(
+                            type="token",
+                            content=text,
+                            metadata=None,
+                            error=None
+                        )
+                        yield f"data: {chunk.model_dump_json()}\n\n"
+                    
+                    elif delta.get('type') == 'input_json_delta':
+                        # Accumulate tool input
+                        if tool_use_blocks:
+                            partial_json = delta.get('partial_json', '')
+                            # Note: input will be complete in content_block_stop
+                
+                elif chunk_json.get('type') == 'content_block_stop':
+                    # Tool use block is complete
+                    if tool_use_blocks:
+                        # The last tool in the list is now complete
+                        pass
+                
+                elif chunk_json.get('type') == 'message_stop':
+                    # Send completion metadata
+                    stop_reason = chunk_json.get('stop_reason', 'end_turn')
+                    chunk = StreamChunk(
+                        type="done",
+                        content=full_content,
+                        metadata={
+                            "stop_reason": stop_reason,
+                            "total_tokens": len(full_content.split()),  # Rough estimate
+                            "tool_calls": tool_use_blocks if tool_use_blocks else None
+                        },
+                        error=None
+                    )
+                    yield f"data: {chunk.model_dump_json()}\n\n"
             
             logger.info(f"✅ Streaming completed, total content length: {len(full_content)}")
             
@@ -197,15 +203,20 @@ class StreamingService:
             if system_prompt:
                 request_body["system"] = system_prompt
             
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=json.dumps(request_body)
+            # boto3 is sync, run in executor so the event loop keeps serving streams
+            loop = asyncio.get_running_loop()
+            response_body = await loop.run_in_executor(
+                None,
+                lambda: json.loads(
+                    self.bedrock_runtime.invoke_model(
+                        modelId=self.model_id,
+                        contentType="application/json",
+                        accept="application/json",
+                        body=json.dumps(request_body)
+                    )['body'].read()
+                )
             )
             
-            response_body = json.loads(response['body'].read())
-            
             content = ""
             for content_block in response_body.get('content', []):
                 if content_block.get('type') == 'text':
@@ -3,14 +3,17 @@ Utility services for Intelligent Chat System
 """
 from .s3_client import S3Client
 from .pinecone_client import PineconeClient
-from .embeddings import EmbeddingService
+from .embeddings import EmbeddingService, EmbeddingResult
 from .chunking import ChunkingService
+from .bedrock_stream import BedrockStreamPump
 
 __all__ = [
     "S3Client",
     "PineconeClient",
     "EmbeddingService",
+    "EmbeddingResult",
     "ChunkingService",
+    "BedrockStreamPump",
 ]
 
 
@@ -0,0 +1,177 @@
+"""
+Async pump for Bedrock response streams
+
+boto3 only offers a blocking event stream for `invoke_model_with_response_stream`.
+The pump opens and reads that stream on a dedicated worker thread and hands the
+decoded events to the event loop through a bounded asyncio.Queue, so the loop is
+never blocked and a slow SSE reader holds back the worker instead of letting
+events pile up in memory.
+"""
+import asyncio
+import concurrent.futures
+import json
+import logging
+import threading
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentinel put on the queue once the worker has finished reading the stream
+_STREAM_END = object()
+
+# How often a worker blocked on a full queue re-checks for consumer cancellation
+_PUT_POLL_SECONDS = 0.5
+
+
+class _StreamFailure:
+    """Wraps an exception raised on the worker so it can be re-raised on the loop"""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BedrockStreamPump:
+    """Reads blocking Bedrock event streams on worker threads with backpressure"""
+
+    def __init__(
+        self,
+        max_concurrent_streams: Optional[int] = None,
+        max_queue_size: Optional[int] = None
+    ):
+        """
+        Initialize the pump
+
+        Args:
+            max_concurrent_streams: Worker threads available for open streams
+            max_queue_size: Decoded events buffered per stream before the worker blocks
+        """
+        self.max_concurrent_streams = max_concurrent_streams or settings.STREAM_MAX_CONCURRENT
+        self.max_queue_size = max_queue_size or settings.STREAM_QUEUE_MAX_EVENTS
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrent_streams,
+            thread_name_prefix="bedrock-stream"
+        )
+        self._active_streams = 0
+
+    @property
+    def active_streams(self) -> int:
+        """Number of streams currently being pumped"""
+        return self._active_streams
+
+    async def iter_events(
+        self,
+        open_stream: Callable[[], Dict[str, Any]]
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Iterate decoded chunk events of a Bedrock response stream
+
+        Args:
+            open_stream: Blocking callable returning the
+                `invoke_model_with_response_stream` response; it is called on
+                the worker thread so connection setup does not block the loop
+
+        Yields:
+            Decoded JSON payload of each `chunk` event
+
+        Raises:
+            Whatever `open_stream` or the stream itself raised on the worker
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        cancelled = threading.Event()
+
+        def put(item: Any) -> bool:
+            """Blocking put from the worker; returns False once the consumer is gone"""
+            try:
+                future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            except RuntimeError:
+                # Event loop already closed
+                return False
+
+            while True:
+                try:
+                    future.result(timeout=_PUT_POLL_SECONDS)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return False
+                except concurrent.futures.CancelledError:
+                    return False
+
+        def pump() -> None:
+            stream = None
+            try:
+                response = open_stream()
+                stream = response.get('body')
+
+                for event in stream or ():
+                    if cancelled.is_set():
+                        break
+
+                    chunk_data = event.get('chunk')
+                    if not chunk_data:
+                        continue
+
+                    if not put(json.loads(chunk_data.get('bytes').decode())):
+                        break
+            except Exception as e:
+                put(_StreamFailure(e))
+            finally:
+                close = getattr(stream, 'close', None)
+                if cancelled.is_set() and callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+                if not cancelled.is_set():
+                    put(_STREAM_END)
+
+        self._active_streams += 1
+        worker = loop.run_in_executor(self.executor, pump)
+
+        try:
+            while True:
+                item = await queue.get()
+
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, _StreamFailure):
+                    raise item.error
+
+                yield item
+        finally:
+            self._active_streams -= 1
+
+            if not worker.done():
+                # Consumer stopped early (client disconnect); release the worker
+                cancelled.set()
+                while not queue.empty():
+                    queue.get_nowait()
+                worker.add_done_callback(self._log_worker_failure)
+
+    @staticmethod
+    def _log_worker_failure(future: asyncio.Future) -> None:
+        """Surface unexpected worker errors for abandoned streams"""
+        if not future.cancelled() and future.exception():
+            logger.warning(f"⚠️  Abandoned Bedrock stream worker failed: {future.exception()}")
+
+    def shutdown(self) -> None:
+        """Stop accepting new streams and release worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared pump so every StreamingService instance draws from one bounded thread pool
+_default_pump: Optional[BedrockStreamPump] = None
+
+
+def get_stream_pump() -> BedrockStreamPump:
+    """Get the process-wide Bedrock stream pump"""
+    global _default_pump
+    if _default_pump is None:
+        _default_pump = BedrockStreamPump()
+    return _default_pump
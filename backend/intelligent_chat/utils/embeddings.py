@@ -1,31 +1,176 @@
 """
 Embedding generation service using AWS Bedrock
 """
+import asyncio
 import logging
 import json
-from typing import List, Union
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
 
 from config.settings import settings
 
+# Shared embedding cache lives in backend/shared
+_BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if _BACKEND_ROOT not in sys.path:
+    sys.path.append(_BACKEND_ROOT)
+from shared.embedding_cache import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
+# Bedrock error codes worth retrying with backoff
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+}
+
+
+@dataclass
+class EmbeddingResult:
+    """Outcome of embedding one text in a batch"""
+    index: int
+    embedding: Optional[List[float]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    
+    @property
+    def ok(self) -> bool:
+        return self.embedding is not None
+
 
 class EmbeddingService:
     """Service for generating embeddings using AWS Bedrock"""
     
     def __init__(self):
         """Initialize Bedrock client"""
+        self.max_concurrency = settings.EMBEDDING_MAX_CONCURRENCY
         self.bedrock_runtime = boto3.client(
             'bedrock-runtime',
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            # One pooled connection per concurrent request
+            config=Config(max_pool_connections=self.max_concurrency)
         )
         self.model_id = settings.BEDROCK_EMBEDDING_MODEL_ID
         self.dimension = settings.EMBEDDING_DIMENSION
         self.max_tokens = settings.EMBEDDING_MAX_TOKENS
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES
+        self.retry_base_delay = settings.EMBEDDING_RETRY_BASE_DELAY
+        
+        # boto3 is sync; embedding calls run on this pool so the loop is never blocked
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="bedrock-embed"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Content-addressed cache shared with the other backends
+        self.cache = get_embedding_cache()
+        
+        # Throughput metrics
+        self._in_flight = 0
+        self._texts_embedded = 0
+        self._texts_failed = 0
+        self._retries = 0
+        self._requests = 0
+        self._request_seconds = 0.0
+        self._last_batch: Dict[str, Any] = {}
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit shared by single and batch calls (created lazily on the running loop)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    def _truncate(self, text: str) -> str:
+        """Truncate text to the model's rough character budget"""
+        if len(text) > self.max_tokens * 4:  # Rough character estimate
+            text = text[:self.max_tokens * 4]
+            logger.warning(f"⚠️  Text truncated to {self.max_tokens * 4} characters")
+        return text
+    
+    def _invoke_embedding(self, text: str) -> List[float]:
+        """Blocking Bedrock call; runs on the embedding executor"""
+        # Prepare request body for Titan embeddings
+        request_body = {
+            "inputText": text
+        }
+        
+        # Invoke model
+        response = self.bedrock_runtime.invoke_model(
+            modelId=self.model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=json.dumps(request_body)
+        )
+        
+        # Parse response
+        response_body = json.loads(response['body'].read())
+        embedding = response_body.get('embedding')
+        
+        if not embedding:
+            raise Exception("No embedding returned from model")
+        
+        return embedding
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether a failed embedding call is worth retrying"""
+        if isinstance(error, ClientError):
+            return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+        return isinstance(error, (BotoConnectionError, ReadTimeoutError))
+    
+    async def _embed_with_retry(self, text: str) -> EmbeddingResult:
+        """
+        Embed one text under the concurrency limit, retrying transient errors
+        with exponential backoff and jitter
+        
+        Returns:
+            EmbeddingResult with either the embedding or the final error
+        """
+        loop = asyncio.get_running_loop()
+        result = EmbeddingResult(index=-1)
+        
+        for attempt in range(self.max_retries + 1):
+            result.attempts = attempt + 1
+            
+            async with self.semaphore:
+                self._in_flight += 1
+                started = time.perf_counter()
+                try:
+                    result.embedding = await loop.run_in_executor(
+                        self.executor, self._invoke_embedding, text
+                    )
+                    result.error = None
+                    return result
+                except Exception as e:
+                    result.error = str(e)
+                    if not self._is_retryable(e) or attempt == self.max_retries:
+                        return result
+                finally:
+                    self._in_flight -= 1
+                    self._requests += 1
+                    self._request_seconds += time.perf_counter() - started
+            
+            # Back off outside the semaphore so other texts keep flowing
+            self._retries += 1
+            delay = self.retry_base_delay * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+        
+        return result
     
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -37,69 +182,115 @@ class EmbeddingService:
         Returns:
             Embedding vector (1024 dimensions for Titan)
         """
-        # Truncate if too long
-        if len(text) > self.max_tokens * 4:  # Rough character estimate
-            text = text[:self.max_tokens * 4]
-            logger.warning(f"⚠️  Text truncated to {self.max_tokens * 4} characters")
+        text = self._truncate(text)
         
-        try:
-            # Prepare request body for Titan embeddings
-            request_body = {
-                "inputText": text
-            }
-            
-            # Invoke model
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=json.dumps(request_body)
-            )
-            
-            # Parse response
-            response_body = json.loads(response['body'].read())
-            embedding = response_body.get('embedding')
-            
-            if not embedding:
-                raise Exception("No embedding returned from model")
-            
-            logger.debug(f"✅ Generated embedding (dim={len(embedding)})")
-            return embedding
-            
-        except ClientError as e:
-            logger.error(f"❌ Bedrock embedding failed: {str(e)}")
-            raise Exception(f"Failed to generate embedding: {str(e)}")
-        except Exception as e:
-            logger.error(f"❌ Embedding generation error: {str(e)}")
-            raise
+        cached = await self.cache.aget(self.model_id, text)
+        if cached is not None:
+            return cached
+        
+        result = await self._embed_with_retry(text)
+        
+        if not result.ok:
+            self._texts_failed += 1
+            logger.error(f"❌ Bedrock embedding failed after {result.attempts} attempt(s): {result.error}")
+            raise Exception(f"Failed to generate embedding: {result.error}")
+        
+        self._texts_embedded += 1
+        await self.cache.aput(self.model_id, text, result.embedding)
+        logger.debug(f"✅ Generated embedding (dim={len(result.embedding)})")
+        return result.embedding
     
-    async def generate_embeddings_batch(self, texts: List[str], batch_size: int = 10) -> List[List[float]]:
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None
+    ) -> List[EmbeddingResult]:
         """
-        Generate embeddings for multiple texts
+        Generate embeddings for multiple texts concurrently
+        
+        Texts already in the embedding cache are served from it; for the rest,
+        up to `batch_size` (default EMBEDDING_MAX_CONCURRENCY) requests are in
+        flight at once and each text is retried independently on transient errors.
         
         Args:
             texts: List of input texts
-            batch_size: Number of texts to process at once
+            batch_size: Maximum concurrent requests for this batch
         
         Returns:
-            List of embedding vectors
+            One EmbeddingResult per input text, in input order. Failed texts
+            carry `error` and no embedding instead of a zero vector.
         """
-        embeddings = []
+        if not texts:
+            return []
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            
-            for text in batch:
-                try:
-                    embedding = await self.generate_embedding(text)
-                    embeddings.append(embedding)
-                except Exception as e:
-                    logger.error(f"❌ Failed to generate embedding for text {i}: {str(e)}")
-                    # Use zero vector as fallback
-                    embeddings.append([0.0] * self.dimension)
+        limit = asyncio.Semaphore(batch_size or self.max_concurrency)
+        started = time.perf_counter()
+        
+        texts = [self._truncate(text) for text in texts]
+        cached = await self.cache.aget_many(self.model_id, texts)
+        
+        async def embed(index: int, text: str) -> EmbeddingResult:
+            if cached[index] is not None:
+                return EmbeddingResult(index=index, embedding=cached[index])
+            async with limit:
+                result = await self._embed_with_retry(text)
+            result.index = index
+            return result
+        
+        results = await asyncio.gather(*[embed(i, text) for i, text in enumerate(texts)])
+        
+        fresh = [r for r in results if r.ok and r.attempts]
+        if fresh:
+            await self.cache.aput_many(
+                self.model_id,
+                [texts[r.index] for r in fresh],
+                [r.embedding for r in fresh]
+            )
+        
+        elapsed = time.perf_counter() - started
+        succeeded = sum(1 for r in results if r.ok)
+        failed = len(results) - succeeded
+        self._texts_embedded += len(fresh)
+        self._texts_failed += failed
+        self._last_batch = {
+            "texts": len(texts),
+            "cache_hits": len(texts) - sum(1 for r in results if r.attempts),
+            "succeeded": succeeded,
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+            "texts_per_sec": round(len(texts) / elapsed, 2) if elapsed > 0 else 0.0
+        }
         
-        logger.info(f"✅ Generated {len(embeddings)} embeddings")
-        return embeddings
+        if failed:
+            logger.error(
+                f"❌ {failed}/{len(texts)} embeddings failed: "
+                f"{[(r.index, r.error) for r in results if not r.ok][:5]}"
+            )
+        logger.info(
+            f"✅ Generated {succeeded}/{len(texts)} embeddings in {elapsed:.2f}s "
+            f"({self._last_batch['texts_per_sec']} texts/sec)"
+        )
+        return results
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get embedding throughput metrics
+        
+        Returns:
+            Dict with in-flight count, lifetime counters and last batch throughput
+        """
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "texts_embedded": self._texts_embedded,
+            "texts_failed": self._texts_failed,
+            "retries": self._retries,
+            "avg_request_ms": round(
+                self._request_seconds / self._requests * 1000, 1
+            ) if self._requests else 0.0,
+            "last_batch": self._last_batch,
+            "cache": self.cache.get_stats()
+        }
     
     async def generate_contextual_embedding(self, chunk: str, context: str) -> List[float]:
         """
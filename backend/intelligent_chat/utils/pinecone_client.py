@@ -2,6 +2,7 @@
 Pinecone Client for vector database operations
 """
 import logging
+import json
 from typing import List, Dict, Any, Optional
 from pinecone import Pinecone, ServerlessSpec
 import asyncio
@@ -87,6 +88,79 @@ class PineconeClient:
             logger.error(f"❌ Failed to upsert vectors: {str(e)}")
             raise
     
+    @staticmethod
+    def _estimate_vector_bytes(vector: Dict[str, Any]) -> int:
+        """Approximate serialized size of one vector in an upsert request"""
+        # ~12 bytes per float in the JSON/gRPC payload plus id and metadata
+        return (
+            len(vector.get("values") or []) * 12
+            + len(str(vector.get("id", "")))
+            + len(json.dumps(vector.get("metadata") or {}, default=str))
+        )
+    
+    def _split_upsert_batches(
+        self,
+        vectors: List[Dict[str, Any]],
+        max_batch_size: int,
+        max_batch_bytes: int
+    ) -> List[List[Dict[str, Any]]]:
+        """Split vectors into batches bounded by count and request size"""
+        batches = []
+        current = []
+        current_bytes = 0
+        
+        for vector in vectors:
+            size = self._estimate_vector_bytes(vector)
+            if current and (len(current) >= max_batch_size or current_bytes + size > max_batch_bytes):
+                batches.append(current)
+                current = []
+                current_bytes = 0
+            current.append(vector)
+            current_bytes += size
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def upsert_vectors_batched(
+        self,
+        vectors: List[Dict[str, Any]],
+        namespace: str,
+        max_batch_size: Optional[int] = None,
+        max_batch_bytes: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Upsert many vectors in size-bounded batches, several batches in flight at once
+        
+        Args:
+            vectors: List of dicts with id, values, metadata
+            namespace: Namespace to upsert into
+            max_batch_size: Max vectors per request (default PINECONE_UPSERT_BATCH_SIZE)
+            max_batch_bytes: Max approximate request size (default PINECONE_UPSERT_MAX_BYTES)
+        
+        Returns:
+            Dict with upserted and batch counts
+        """
+        if not vectors:
+            return {"upserted_count": 0, "batches": 0}
+        
+        batches = self._split_upsert_batches(
+            vectors,
+            max_batch_size or settings.PINECONE_UPSERT_BATCH_SIZE,
+            max_batch_bytes or settings.PINECONE_UPSERT_MAX_BYTES
+        )
+        semaphore = asyncio.Semaphore(settings.PINECONE_UPSERT_CONCURRENCY)
+        
+        async def upsert_batch(batch: List[Dict[str, Any]]) -> int:
+            async with semaphore:
+                result = await self.upsert_vectors(vectors=batch, namespace=namespace)
+                return result["upserted_count"]
+        
+        counts = await asyncio.gather(*[upsert_batch(batch) for batch in batches])
+        
+        logger.info(f"✅ Upserted {sum(counts)} vectors in {len(batches)} batches to namespace '{namespace}'")
+        return {"upserted_count": sum(counts), "batches": len(batches)}
+    
     async def query_vectors(
         self,
         query_vector: List[float],
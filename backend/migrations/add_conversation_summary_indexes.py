@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration script to index conversations and messages for the summary list
+
+The conversation list pages through a user's conversations on
+(updated_at, id) and reads each conversation's last message; with these
+composite indexes both are index range scans instead of sorts.
+"""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    'ix_conversations_user_updated_id': 'conversations (user_id, updated_at, id)',
+    'ix_messages_conversation_created_id': 'messages (conversation_id, created_at, id)',
+}
+
+def run_migration():
+    """Create the indexes if they do not exist yet"""
+    try:
+        logger.info("Starting migration: Adding conversation summary indexes")
+
+        for name, definition in INDEXES.items():
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+            logger.info(f"Added {name}")
+        db.session.commit()
+
+    except Exception as e:
+        logger.error(f"Migration failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        run_migration()
+        logger.info("Migration completed successfully")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+# Add the parent directory to the path so we can import app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import text
+
+def add_generation_plan_field():
+    """Add generation_plan field to enhanced_books table if it doesn't exist"""
+    app = create_app()
+    with app.app_context():
+        # Check if the column already exists
+        check_query = text("""
+        SELECT EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name='enhanced_books' AND column_name='generation_plan'
+        );
+        """)
+
+        result = db.session.execute(check_query).scalar()
+
+        if not result:
+            # Chapter plan of an unfinished generation, resumed by the next run
+            add_column_query = text("""
+            ALTER TABLE enhanced_books
+            ADD COLUMN generation_plan JSON;
+            """)
+
+            db.session.execute(add_column_query)
+            db.session.commit()
+            print("✅ Added generation_plan column to enhanced_books table")
+        else:
+            print("⏭️ generation_plan column already exists in enhanced_books table")
+
+if __name__ == "__main__":
+    add_generation_plan_field()
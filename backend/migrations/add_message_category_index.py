@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Migration script to index message_categories by (book_id, message_id)
+
+Book categorization skips messages already categorized for the book with a
+NOT EXISTS lookup per message; without this index every lookup scans the
+book's categories.
+"""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_migration():
+    """Create the index if it does not exist yet"""
+    try:
+        logger.info("Starting migration: Adding (book_id, message_id) index to message_categories table")
+        
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_message_categories_book_message ON message_categories (book_id, message_id)"
+        ))
+        db.session.commit()
+        logger.info("Successfully added ix_message_categories_book_message")
+        
+    except Exception as e:
+        logger.error(f"Migration failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        run_migration()
+        logger.info("Migration completed successfully")
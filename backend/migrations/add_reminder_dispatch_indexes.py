@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the reminder dispatch indexes to health_reminders
+
+The due-queue dispatcher rebuilds its heap from pending reminders at startup
+and the follow-up sweep filters pending reminders by next_followup_at; the
+precision scheduler loads pending reminders by reminder_date or due_date inside
+its scheduling window. All lead with status so none scans the whole table.
+The dispatcher's periodic resync looks up recently created or updated rows by
+created_at / updated_at.
+"""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEXES = [
+    ("ix_health_reminders_status_reminder_date", "status, reminder_date"),
+    ("ix_health_reminders_status_due_date", "status, due_date"),
+    ("ix_health_reminders_status_next_followup_at", "status, next_followup_at"),
+    ("ix_health_reminders_updated_at", "updated_at"),
+    ("ix_health_reminders_created_at", "created_at"),
+]
+
+def run_migration():
+    """Create the dispatch indexes if they do not exist yet"""
+    try:
+        logger.info("Starting migration: Adding reminder dispatch indexes to health_reminders table")
+        
+        for name, columns in INDEXES:
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON health_reminders ({columns})"))
+            logger.info(f"Index {name} ({columns}) is in place")
+        
+        db.session.commit()
+        logger.info("Successfully added reminder dispatch indexes")
+        
+    except Exception as e:
+        logger.error(f"Migration failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        run_migration()
+        logger.info("Migration completed successfully")
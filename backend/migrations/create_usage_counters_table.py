@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the usage_counters table and seed it
+
+Free-tier limit checks read per-user daily/monthly/all-time counters instead of
+counting messages, documents, care records and conversations on every request.
+The counters are seeded from the source tables so existing usage is honoured
+from the first request after deploy.
+"""
+
+import os
+import sys
+import logging
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.models.usage_counter import UsageCounter
+from app.services.usage_counter_service import reconcile_usage_counters
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_migration():
+    """Create usage_counters if it does not exist, then seed the current periods"""
+    try:
+        logger.info("Starting migration: Creating usage_counters table")
+
+        UsageCounter.__table__.create(db.engine, checkfirst=True)
+        logger.info("Table usage_counters is in place")
+
+        results = reconcile_usage_counters()
+        logger.info(f"Seeded usage counters: {results['rewritten']}")
+
+    except Exception as e:
+        logger.error(f"Migration failed: {str(e)}")
+        db.session.rollback()
+        raise
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        run_migration()
+        logger.info("Migration completed successfully")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""
+Benchmark Reminder Notification Fan-out
+---------------------------------------
+Sends a burst of reminder notifications (email + push per reminder) through
+local stub transports that simulate network latency, and compares:
+
+    serial   - the previous path: per reminder, a fresh SMTP connection
+               (connect, STARTTLS, login, send, quit) then one FCM call
+    pipeline - NotificationDispatcher: pooled SMTP connections, concurrent
+               per-channel workers, pushes merged into multicast calls
+
+The per-channel rate limits are disabled by default to show raw throughput;
+pass --email-rate / --push-rate to see the limiter hold a quota.
+
+Usage:
+    python scripts/benchmark_notification_fanout.py
+    python scripts/benchmark_notification_fanout.py --reminders 2000 --email-rate 14
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.notification_dispatch import (
+    EmailJob, PushJob, NotificationDispatcher, SMTPConnectionPool, build_mime_message
+)
+
+
+class StubSMTP:
+    """smtplib.SMTP stand-in: sleeps instead of talking to a server"""
+
+    handshake_latency = 0.05
+    send_latency = 0.02
+    connections = 0
+    messages = 0
+    _lock = threading.Lock()
+
+    def __init__(self, host, port, timeout=None):
+        time.sleep(self.handshake_latency)
+        with StubSMTP._lock:
+            StubSMTP.connections += 1
+
+    def starttls(self):
+        time.sleep(self.handshake_latency)
+
+    def login(self, username, password):
+        time.sleep(self.handshake_latency)
+
+    def sendmail(self, from_email, recipients, message):
+        time.sleep(self.send_latency)
+        with StubSMTP._lock:
+            StubSMTP.messages += 1
+
+    def quit(self):
+        pass
+
+
+class StubFCM:
+    """FCMService.send_multicast_notification stand-in"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send_multicast_notification(self, tokens, title, body, data=None, click_action=None):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        return {'success_count': len(tokens), 'failure_count': 0, 'failed_tokens': []}
+
+
+def make_jobs(count, devices, shared_content):
+    emails, pushes = [], []
+    for i in range(count):
+        emails.append(EmailJob(
+            key=i,
+            recipient=f"user{i}@example.com",
+            subject=f"🐾 Mr. White Reminder: Reminder {i} - 🔔 DUE TODAY",
+            html=f"<p>Reminder {i}</p>" * 50,
+            text=f"Reminder {i}\n" * 20,
+            from_email="no-reply@example.com"
+        ))
+        # Shared content models a broadcast-style reminder that can be multicast
+        title = "🐾 Heartworm pill" if shared_content else f"🐾 Reminder {i}"
+        data = {} if shared_content else {'reminder_id': str(i)}
+        pushes.append(PushJob(
+            key=i,
+            tokens=[f"token-{i}-{d}" for d in range(devices)],
+            title=title,
+            body="Due today! Tap to view details",
+            data=data,
+            click_action="https://example.com/reminders"
+        ))
+    return emails, pushes
+
+
+def run_serial(emails, pushes, fcm):
+    started = time.perf_counter()
+    for email, push in zip(emails, pushes):
+        conn = StubSMTP("smtp.stub", 587)
+        conn.starttls()
+        conn.login("user", "password")
+        conn.sendmail(email.from_email, [email.recipient], build_mime_message(email))
+        conn.quit()
+        fcm.send_multicast_notification(push.tokens, push.title, push.body, push.data, push.click_action)
+    return time.perf_counter() - started
+
+
+def run_pipeline(emails, pushes, fcm, args):
+    pool = SMTPConnectionPool("smtp.stub", 587, "user", "password",
+                              size=args.email_connections, smtp_factory=StubSMTP)
+
+    def send_email(job):
+        pool.send(job.from_email, [job.recipient], build_mime_message(job))
+        return "Email sent successfully via SMTP"
+
+    dispatcher = NotificationDispatcher(
+        send_email=send_email,
+        send_multicast=fcm.send_multicast_notification,
+        rates={'email': args.email_rate, 'push': args.push_rate},
+        concurrency={'email': args.email_connections, 'push': args.push_concurrency}
+    )
+    started = time.perf_counter()
+    results = dispatcher.dispatch(emails, pushes)
+    elapsed = time.perf_counter() - started
+    dispatcher.shutdown()
+    pool.close()
+    assert all(r.success for r in results), "stub transports should never fail"
+    return elapsed, pool.connections_opened
+
+
+def main(args):
+    StubSMTP.handshake_latency = args.smtp_handshake_ms / 1000
+    StubSMTP.send_latency = args.smtp_send_ms / 1000
+
+    print("=" * 70)
+    print(f"📊 NOTIFICATION FAN-OUT BENCHMARK ({args.reminders:,} reminders, email + push)")
+    print("=" * 70)
+
+    for shared in (False, True):
+        emails, pushes = make_jobs(args.reminders, args.devices, shared)
+        label = "shared push content" if shared else "per-reminder push content"
+
+        serial_fcm = StubFCM(args.fcm_ms / 1000)
+        serial_count = min(args.reminders, args.serial_sample)
+        serial = run_serial(emails[:serial_count], pushes[:serial_count], serial_fcm)
+        serial_rate = serial_count / serial
+
+        fcm = StubFCM(args.fcm_ms / 1000)
+        elapsed, connections = run_pipeline(emails, pushes, fcm, args)
+        rate = args.reminders / elapsed
+
+        print(f"   {label}:")
+        print(f"      serial:   {serial_rate:8.1f} reminders/s  (sampled {serial_count}, "
+              f"{serial_count} SMTP connections, {serial_fcm.calls} FCM calls)")
+        print(f"      pipeline: {rate:8.1f} reminders/s  ({elapsed:.2f}s, "
+              f"{connections} SMTP connections, {fcm.calls} FCM calls)")
+        print(f"      speedup:  {rate / serial_rate:8.1f}x")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reminders', type=int, default=2000, help='Reminders in the burst')
+    parser.add_argument('--devices', type=int, default=2, help='Push devices per user')
+    parser.add_argument('--serial-sample', type=int, default=100, help='Reminders timed on the serial path')
+    parser.add_argument('--smtp-handshake-ms', type=float, default=50, help='Latency of connect, STARTTLS and login each')
+    parser.add_argument('--smtp-send-ms', type=float, default=20, help='Latency of one SMTP send')
+    parser.add_argument('--fcm-ms', type=float, default=80, help='Latency of one FCM call')
+    parser.add_argument('--email-connections', type=int, default=4, help='Pooled SMTP connections')
+    parser.add_argument('--push-concurrency', type=int, default=8, help='Concurrent FCM calls')
+    parser.add_argument('--email-rate', type=float, default=0, help='Emails per second (0 = unlimited)')
+    parser.add_argument('--push-rate', type=float, default=0, help='FCM calls per second (0 = unlimited)')
+    main(parser.parse_args())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Benchmark Precision Scheduler Cold Start
+----------------------------------------
+Builds N synthetic pending reminders (spread over the next --days days across
+timezones, some with creation-time timezone metadata) and times the two ways
+PrecisionReminderScheduler can turn them into APScheduler jobs:
+
+    per-row - the previous path: one trigger-time computation (timezone
+              resolution + localize) and one add_job per reminder, all of them
+    bulk    - compute_trigger_times grouped by timezone, then jobs only for
+              the next --window hours, queued before the scheduler starts
+
+The per-row timing leaves out the User query the old path issued per reminder,
+so the real gap is wider. The bulk trigger times are checked against the
+per-row ones.
+
+Usage:
+    python scripts/benchmark_reminder_scheduling.py
+    python scripts/benchmark_reminder_scheduling.py --reminders 200000 --window 12
+"""
+
+import os
+import sys
+import random
+import argparse
+import time
+from datetime import datetime, timedelta, time as dt_time
+from types import SimpleNamespace
+
+import pytz
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.memory import MemoryJobStore
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.precision_reminder_scheduler import (
+    compute_trigger_times, TRIGGER_BUFFER_SECONDS, DEFAULT_TRIGGER_TIME
+)
+
+TIMEZONES = [None, 'UTC', 'America/New_York', 'America/Los_Angeles', 'Europe/London',
+             'Asia/Kolkata', 'Australia/Sydney', 'Not/AZone']
+
+
+def noop(reminder_id, app_config):
+    pass
+
+
+def make_rows(count, days):
+    now = datetime.utcnow()
+    rows = []
+    for reminder_id in range(1, count + 1):
+        local = now + timedelta(seconds=random.random() * days * 86400)
+        has_reminder_time = random.random() < 0.7
+        metadata_tz = random.choice(TIMEZONES[1:-1]) if random.random() < 0.2 else None
+        rows.append(SimpleNamespace(
+            id=reminder_id,
+            timezone=random.choice(TIMEZONES),
+            due_date=local.date(),
+            due_time=dt_time(local.hour, local.minute) if random.random() < 0.8 else None,
+            reminder_date=local.date() if has_reminder_time else None,
+            reminder_time=dt_time(local.hour, local.minute) if has_reminder_time else None,
+            extra_data={'user_timezone': metadata_tz, 'timezone_aware_creation': True} if metadata_tz else None,
+        ))
+    return rows
+
+
+def per_row_trigger(row, now):
+    """The old _calculate_trigger_time, minus the DB access"""
+    user_tz = pytz.UTC
+    if row.timezone:
+        try:
+            user_tz = pytz.timezone(row.timezone)
+        except Exception:
+            pass
+    if row.extra_data and row.extra_data.get('user_timezone'):
+        try:
+            user_tz = pytz.timezone(row.extra_data['user_timezone'])
+        except Exception:
+            pass
+    if row.reminder_date and row.reminder_time:
+        trigger_date, trigger_time = row.reminder_date, row.reminder_time
+    else:
+        trigger_date, trigger_time = row.due_date, row.due_time or DEFAULT_TRIGGER_TIME
+    now_local = datetime.fromtimestamp(now, user_tz)
+    if trigger_date == now_local.date() and trigger_time <= now_local.time():
+        trigger_date += timedelta(days=1)
+    if trigger_date < datetime.now().date():
+        return None
+    aware = user_tz.localize(datetime.combine(trigger_date, trigger_time))
+    return aware.timestamp() - TRIGGER_BUFFER_SECONDS
+
+
+def new_scheduler():
+    return BackgroundScheduler(jobstores={'default': MemoryJobStore()}, timezone=pytz.UTC)
+
+
+def run(args):
+    random.seed(42)
+    rows = make_rows(args.reminders, args.days)
+    app_config = {'DATABASE_URL': None, 'SECRET_KEY': None}
+
+    # Previous path: every pending reminder becomes a job
+    scheduler = new_scheduler()
+    scheduler.start()
+    started = time.perf_counter()
+    now = time.time()
+    expected = {}
+    for row in rows:
+        fire_at = per_row_trigger(row, now)
+        if fire_at is None or fire_at <= now:
+            continue
+        expected[row.id] = fire_at
+        scheduler.add_job(noop, 'date', run_date=datetime.fromtimestamp(fire_at, pytz.UTC),
+                          args=[row.id, app_config], id=f"reminder_{row.id}", replace_existing=True)
+    per_row_seconds = time.perf_counter() - started
+    per_row_jobs = len(scheduler.get_jobs())
+    scheduler.shutdown(wait=False)
+
+    # Bulk path: vectorized trigger times, jobs for the window only
+    scheduler = new_scheduler()
+    started = time.perf_counter()
+    now = time.time()
+    window_end = now + args.window * 3600
+    triggers, moved, invalid = compute_trigger_times(rows, now, window_end)
+    compute_seconds = time.perf_counter() - started
+    for reminder_id, fire_at in triggers:
+        scheduler.add_job(noop, 'date', run_date=datetime.fromtimestamp(fire_at, pytz.UTC),
+                          args=[reminder_id, app_config], id=f"reminder_{reminder_id}", replace_existing=True)
+    scheduler.start()
+    bulk_seconds = time.perf_counter() - started
+    bulk_jobs = len(scheduler.get_jobs())
+    scheduler.shutdown(wait=False)
+
+    # Every bulk trigger inside the window must match the per-row computation
+    in_window = {rid: fire_at for rid, fire_at in expected.items() if fire_at <= window_end}
+    mismatched = sum(1 for rid, fire_at in triggers if abs(in_window.get(rid, -1) - fire_at) > 1e-3)
+    missing = len(set(in_window) - {rid for rid, _ in triggers})
+
+    print("=" * 70)
+    print(f"📊 PRECISION SCHEDULER COLD START ({args.reminders:,} pending reminders over {args.days} days)")
+    print("=" * 70)
+    print(f"   per-row: {per_row_seconds:7.2f}s  {per_row_jobs:,} jobs")
+    print(f"   bulk:    {bulk_seconds:7.2f}s  {bulk_jobs:,} jobs in a {args.window}h window "
+          f"(trigger times {compute_seconds * 1000:.0f} ms)")
+    print(f"   speedup: {per_row_seconds / bulk_seconds:7.1f}x")
+    print("-" * 70)
+    print(f"   moved to tomorrow: {sum(len(ids) for ids in moved.values()):,}, invalid timezones: {sorted(invalid)}")
+    print(f"   {'✅' if not mismatched and not missing else '❌'} trigger times vs per-row: "
+          f"{mismatched} mismatched, {missing} missing")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reminders', type=int, default=100000, help='Pending reminders to schedule')
+    parser.add_argument('--days', type=int, default=90, help='Days over which reminders are spread')
+    parser.add_argument('--window', type=int, default=24, help='Scheduling window in hours')
+    run(parser.parse_args())
@@ -0,0 +1,18 @@
+"""
+Code shared by the Flask app, fastapi_chat and intelligent_chat backends
+"""
+from .embedding_cache import (
+    EmbeddingCache,
+    CachedEmbeddings,
+    cached_embeddings,
+    get_embedding_cache,
+    make_cache_key,
+)
+
+__all__ = [
+    "EmbeddingCache",
+    "CachedEmbeddings",
+    "cached_embeddings",
+    "get_embedding_cache",
+    "make_cache_key",
+]
@@ -0,0 +1,428 @@
+"""
+Content-addressed embedding cache shared by the Flask app, fastapi_chat and intelligent_chat
+
+Entries are keyed by (model_id, sha256 of the normalized text) and stored as
+packed float32 bytes in two tiers:
+
+- an in-process LRU (bounded by entry count) for hot queries, and
+- an on-disk SQLite store (bounded by total bytes, least-recently-used
+  eviction) that every backend process on the host shares, so a text embedded
+  by one service is a hit for all the others and survives restarts.
+
+Configuration (environment):
+    EMBEDDING_CACHE_ENABLED         "false" disables both tiers
+    EMBEDDING_CACHE_PATH            SQLite file (default: <tmp>/mrwhite_embedding_cache.sqlite3)
+    EMBEDDING_CACHE_MEMORY_ENTRIES  LRU capacity (default 10000)
+    EMBEDDING_CACHE_MAX_MB          Disk tier size bound (default 512)
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from langchain_core.embeddings import Embeddings as _EmbeddingsBase
+except ImportError:  # langchain is optional for callers that only use the cache directly
+    _EmbeddingsBase = object
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Only refresh a disk entry's access time when it is older than this, so hot
+# reads don't turn into writes
+_TOUCH_INTERVAL_SECONDS = 3600
+
+# Re-check the disk tier size after this many writes
+_EVICTION_CHECK_EVERY = 200
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for hashing: Unicode NFC, collapsed whitespace, stripped"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_cache_key(model_id: str, text: str) -> str:
+    """Content address of an embedding: model id plus normalized text hash"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_id}:{digest}"
+
+
+def pack_embedding(embedding: Sequence[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes (4 bytes per dimension)"""
+    packed = array("f", embedding)
+    if packed.itemsize != 4:
+        raise ValueError("float32 array type is not 4 bytes on this platform")
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_embedding(data: bytes) -> List[float]:
+    """Unpack float32 bytes produced by pack_embedding"""
+    values = array("f")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + SQLite) embedding cache, safe to use from threads and event loops"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.enabled = enabled if enabled is not None else (
+            os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "false"
+        )
+        self.path = path or os.getenv(
+            "EMBEDDING_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "mrwhite_embedding_cache.sqlite3")
+        )
+        self.memory_entries = memory_entries or int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "10000"))
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._local = threading.local()
+        self._disk_available = self.enabled
+        self._writes_since_eviction = 0
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "disk_errors": 0
+        }
+
+        if self.enabled:
+            self._init_disk()
+
+    # ==================== DISK TIER ====================
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Per-thread SQLite connection"""
+        if not self._disk_available:
+            return None
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_disk(self) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = self._connection()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vec BLOB NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed_at)")
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache disk tier disabled ({self.path}): {e}")
+            self._disk_available = False
+
+    def _disk_get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        conn = self._connection()
+        if conn is None or not keys:
+            return {}
+
+        found: Dict[str, bytes] = {}
+        try:
+            # SQLite's default variable limit is 999
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                    [(now, key, now - _TOUCH_INTERVAL_SECONDS) for key in found]
+                )
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"⚠️ Embedding cache disk read failed: {e}")
+        return found
+
+    def _disk_put_many(self, items: Dict[str, bytes]) -> None:
+        conn = self._connection()
+        if conn is None or not items:
+            return
+
+        try:
+            now = time.time()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec, accessed_at) VALUES (?, ?, ?)",
+                [(key, data, now) for key, data in items.items()]
+            )
+            conn.execute("COMMIT")
+
+            self._writes_since_eviction += len(items)
+            if self._writes_since_eviction >= _EVICTION_CHECK_EVERY:
+                self._writes_since_eviction = 0
+                self._evict_disk(conn)
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"⚠️ Embedding cache disk write failed: {e}")
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def _evict_disk(self, conn: sqlite3.Connection) -> None:
+        """Drop least-recently-used entries until the store is back under 90% of its bound"""
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vec)), 0), COUNT(*) FROM embeddings").fetchone()
+        used_bytes, count = total
+        if used_bytes <= self.max_disk_bytes or not count:
+            return
+
+        target = int(self.max_disk_bytes * 0.9)
+        avg_size = used_bytes / count
+        to_delete = int((used_bytes - target) / avg_size) + 1
+
+        conn.execute(
+            """
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?
+            )
+            """,
+            (to_delete,)
+        )
+        self.stats["evictions"] += to_delete
+        logger.info(f"🧹 Embedding cache evicted {to_delete} entries from disk tier")
+
+    # ==================== MEMORY TIER ====================
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._memory_lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+            return data
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        with self._memory_lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # ==================== PUBLIC API ====================
+
+    def get_many(self, model_id: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for texts (blocking; use aget_many from async code)
+
+        Returns:
+            One embedding or None per text, in input order
+        """
+        if not self.enabled:
+            return [None] * len(texts)
+
+        keys = [make_cache_key(model_id, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, key in enumerate(keys):
+            data = self._memory_get(key)
+            if data is not None:
+                self.stats["memory_hits"] += 1
+                results[i] = unpack_embedding(data)
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            found = self._disk_get_many(list(missing))
+            for key, positions in missing.items():
+                data = found.get(key)
+                if data is None:
+                    self.stats["misses"] += len(positions)
+                    continue
+                self.stats["disk_hits"] += len(positions)
+                self._memory_put(key, data)
+                embedding = unpack_embedding(data)
+                for i in positions:
+                    results[i] = embedding
+
+        return results
+
+    def put_many(self, model_id: str, texts: Sequence[str], embeddings: Sequence[Optional[Sequence[float]]]) -> None:
+        """Store embeddings for texts (blocking; use aput_many from async code). None entries are skipped"""
+        if not self.enabled:
+            return
+
+        items: Dict[str, bytes] = {}
+        for text, embedding in zip(texts, embeddings):
+            if not embedding:
+                continue
+            key = make_cache_key(model_id, text)
+            data = pack_embedding(embedding)
+            self._memory_put(key, data)
+            items[key] = data
+
+        self.stats["writes"] += len(items)
+        self._disk_put_many(items)
+
+    def get(self, model_id: str, text: str) -> Optional[List[float]]:
+        """Look up a single embedding"""
+        return self.get_many(model_id, [text])[0]
+
+    def put(self, model_id: str, text: str, embedding: Sequence[float]) -> None:
+        """Store a single embedding"""
+        self.put_many(model_id, [text], [embedding])
+
+    async def aget_many(self, model_id: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Async lookup; memory hits are served inline, disk lookups run in a worker thread"""
+        if not self.enabled:
+            return [None] * len(texts)
+
+        keys = [make_cache_key(model_id, text) for text in texts]
+        with self._memory_lock:
+            all_in_memory = all(key in self._memory for key in keys)
+        if all_in_memory:
+            return self.get_many(model_id, texts)
+        return await asyncio.to_thread(self.get_many, model_id, texts)
+
+    async def aput_many(self, model_id: str, texts: Sequence[str], embeddings: Sequence[Optional[Sequence[float]]]) -> None:
+        """Async store; the disk write runs in a worker thread"""
+        if self.enabled:
+            await asyncio.to_thread(self.put_many, model_id, texts, embeddings)
+
+    async def aget(self, model_id: str, text: str) -> Optional[List[float]]:
+        return (await self.aget_many(model_id, [text]))[0]
+
+    async def aput(self, model_id: str, text: str, embedding: Sequence[float]) -> None:
+        await self.aput_many(model_id, [text], [embedding])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        with self._memory_lock:
+            memory_size = len(self._memory)
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": memory_size,
+            "memory_capacity": self.memory_entries,
+            "disk_path": self.path if self._disk_available else None,
+            "disk_max_bytes": self.max_disk_bytes
+        }
+
+
+class CachedEmbeddings(_EmbeddingsBase):
+    """LangChain-compatible wrapper that serves embed_query/embed_documents from the shared cache"""
+
+    def __init__(self, embeddings: Any, model_id: str, cache: Optional[EmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.cache = cache or get_embedding_cache()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(self.model_id, texts)
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self.model_id, [texts[i] for i in missing], fresh)
+            for i, embedding in zip(missing, fresh):
+                cached[i] = embedding
+
+        return cached
+
+    def embed_query(self, text: str) -> List[float]:
+        embedding = self.cache.get(self.model_id, text)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self.cache.put(self.model_id, text, embedding)
+        return embedding
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = await self.cache.aget_many(self.model_id, texts)
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+
+        if missing:
+            fresh = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await self.cache.aput_many(self.model_id, [texts[i] for i in missing], fresh)
+            for i, embedding in zip(missing, fresh):
+                cached[i] = embedding
+
+        return cached
+
+    async def aembed_query(self, text: str) -> List[float]:
+        embedding = await self.cache.aget(self.model_id, text)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(text)
+            await self.cache.aput(self.model_id, text, embedding)
+        return embedding
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped model's attributes (model, dimensions, ...)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+
+def cached_embeddings(embeddings: Any, model_id: Optional[str] = None) -> CachedEmbeddings:
+    """
+    Wrap a LangChain embeddings model with the shared cache
+
+    Args:
+        embeddings: e.g. OpenAIEmbeddings(...)
+        model_id: Cache namespace; derived from the model's name and dimensions if omitted
+    """
+    if model_id is None:
+        model_name = getattr(embeddings, "model", None) or getattr(embeddings, "model_id", None) or type(embeddings).__name__
+        dimensions = getattr(embeddings, "dimensions", None)
+        model_id = f"{model_name}:{dimensions}" if dimensions else str(model_name)
+    return CachedEmbeddings(embeddings, model_id)
+
+
+# Process-wide cache instance
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
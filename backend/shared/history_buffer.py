@@ -0,0 +1,176 @@
+"""
+In-process ring buffer of recent messages per conversation
+
+Chat services only ever need the last N messages of a conversation as model
+context. The first turn of a conversation loads that tail from Postgres and
+seeds the buffer; every message the service stores afterwards is appended, so
+repeat turns read their history from memory without a query.
+
+Correctness rules:
+
+- Appends to a conversation that was never seeded are ignored (the buffer
+  does not know what came before them); the next read loads from the database.
+- A seed is refused if a message was appended to that conversation while the
+  tail was being loaded, so a slow load can never overwrite newer history.
+- Deleting or editing messages must call invalidate(); other processes that
+  write the same conversations (other workers, admin tools, scripts) are
+  covered only by the TTL, which is why it defaults to under a minute -
+  long enough to serve a burst of turns, short enough to bound staleness.
+
+Configuration (environment):
+    HISTORY_BUFFER_ENABLED          "false" disables the buffer (every read loads)
+    HISTORY_BUFFER_MESSAGES         Messages kept per conversation (default 50)
+    HISTORY_BUFFER_CONVERSATIONS    Conversations kept, least recently used evicted (default 5000)
+    HISTORY_BUFFER_TTL_SECONDS      Reload a conversation after this long (default 45)
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _ConversationTail:
+    __slots__ = ("owner_id", "messages", "loaded_at")
+
+    def __init__(self, owner_id: Optional[int], messages: Deque[Dict[str, Any]], loaded_at: float):
+        self.owner_id = owner_id
+        self.messages = messages
+        self.loaded_at = loaded_at
+
+
+class ConversationHistoryBuffer:
+    """Bounded per-conversation ring buffers of message dicts (oldest first)"""
+
+    def __init__(
+        self,
+        max_messages: int = 50,
+        max_conversations: int = 5000,
+        ttl_seconds: float = 45,
+        enabled: bool = True
+    ):
+        self.max_messages = max_messages
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._tails: "OrderedDict[int, _ConversationTail]" = OrderedDict()
+        # Write stamp of the latest append per conversation; bounded, with the
+        # newest evicted stamp kept as a floor so eviction stays conservative
+        self._writes: "OrderedDict[int, int]" = OrderedDict()
+        self._evicted_write_floor = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def begin_load(self) -> int:
+        """Token to pass to seed() - take it before querying the database"""
+        with self._lock:
+            return self._clock
+
+    def get(self, conversation_id: int, limit: int, owner_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Last `limit` messages of a conversation, oldest first
+
+        Returns:
+            The messages, or None when the buffer cannot answer (not seeded,
+            expired, owned by another user or limit above capacity)
+        """
+        if not self.enabled or limit > self.max_messages:
+            return None
+        with self._lock:
+            tail = self._tails.get(conversation_id)
+            if tail is None or time.monotonic() - tail.loaded_at > self.ttl_seconds:
+                if tail is not None:
+                    del self._tails[conversation_id]
+                self.misses += 1
+                return None
+            if owner_id is not None and tail.owner_id is not None and tail.owner_id != owner_id:
+                self.misses += 1
+                return None
+            self._tails.move_to_end(conversation_id)
+            self.hits += 1
+            messages = list(tail.messages)[-limit:] if limit > 0 else []
+        return [dict(message) for message in messages]
+
+    def seed(self, conversation_id: int, messages: List[Dict[str, Any]], token: int,
+             owner_id: Optional[int] = None) -> bool:
+        """
+        Store a conversation's tail as loaded from the database (oldest first)
+
+        Pass the last max_messages rows (or all of them, if fewer). Refused when
+        the conversation was appended to after `token` was taken.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._writes.get(conversation_id, self._evicted_write_floor) > token:
+                return False
+            self._tails[conversation_id] = _ConversationTail(
+                owner_id, deque(messages[-self.max_messages:], maxlen=self.max_messages), time.monotonic()
+            )
+            self._tails.move_to_end(conversation_id)
+            while len(self._tails) > self.max_conversations:
+                self._tails.popitem(last=False)
+            return True
+
+    def append(self, conversation_id: int, message: Dict[str, Any]):
+        """Record a newly stored message (only kept if the conversation is seeded)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._mark_write(conversation_id)
+            tail = self._tails.get(conversation_id)
+            if tail is not None:
+                tail.messages.append(message)
+
+    def invalidate(self, conversation_id: int):
+        """Forget a conversation after its messages were deleted or edited"""
+        with self._lock:
+            self._mark_write(conversation_id)
+            self._tails.pop(conversation_id, None)
+
+    def _mark_write(self, conversation_id: int):
+        self._clock += 1
+        self._writes[conversation_id] = self._clock
+        self._writes.move_to_end(conversation_id)
+        while len(self._writes) > self.max_conversations * 4:
+            _, stamp = self._writes.popitem(last=False)
+            self._evicted_write_floor = max(self._evicted_write_floor, stamp)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "conversations": len(self._tails),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_buffers: Dict[str, ConversationHistoryBuffer] = {}
+_buffers_lock = threading.Lock()
+
+
+def get_history_buffer(namespace: str) -> ConversationHistoryBuffer:
+    """Process-wide buffer for one conversation table (e.g. 'fastapi_chat', 'intelligent_chat')"""
+    buffer = _buffers.get(namespace)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.get(namespace)
+            if buffer is None:
+                buffer = ConversationHistoryBuffer(
+                    max_messages=int(os.getenv("HISTORY_BUFFER_MESSAGES", "50")),
+                    max_conversations=int(os.getenv("HISTORY_BUFFER_CONVERSATIONS", "5000")),
+                    ttl_seconds=float(os.getenv("HISTORY_BUFFER_TTL_SECONDS", "45")),
+                    enabled=os.getenv("HISTORY_BUFFER_ENABLED", "true").lower() != "false",
+                )
+                _buffers[namespace] = buffer
+                logger.info(f"🧠 History buffer '{namespace}': {buffer.max_messages} messages x "
+                            f"{buffer.max_conversations} conversations, ttl {buffer.ttl_seconds:.0f}s")
+    return buffer
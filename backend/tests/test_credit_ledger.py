@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for the credit ledger
+
+Many threads spend credits for one user at the same time through
+CreditSystemService.check_and_deduct_credits. The balance must never go
+negative, exactly floor(balance / cost) requests may succeed, and the ledger
+must hold one usage row per success. Also checks that a ledger row the
+database rejects does not block the rows around it, and prints deduction
+throughput.
+
+Runs against TEST_DATABASE_URL (use a scratch Postgres database to exercise
+real row contention) or a temporary SQLite file by default:
+    python tests/test_credit_ledger.py
+    TEST_DATABASE_URL=postgresql://localhost/mrwhite_test python -m pytest tests/test_credit_ledger.py -s
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db
+from app.models.user import User
+from app.models.credit_transaction import CreditTransaction
+from app.services.credit_system_service import CreditSystemService
+from app.services.credit_ledger import CreditLedger
+
+STARTING_BALANCE = 1000
+CHAT_COST = CreditSystemService.CREDIT_COSTS['chat_message_basic']
+CONCURRENT_REQUESTS = 800
+
+
+def create_app():
+    """Create a minimal Flask app bound to a scratch database"""
+    app = Flask(__name__)
+    database_url = os.getenv('TEST_DATABASE_URL')
+    if not database_url:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/credit_ledger.db"
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        User.__table__.create(db.engine, checkfirst=True)
+        CreditTransaction.__table__.create(db.engine, checkfirst=True)
+    return app
+
+
+def make_user(app, balance, premium=False):
+    with app.app_context():
+        user = User(username=f"ledger-{time.time_ns()}", email=f"ledger-{time.time_ns()}@example.com",
+                    password_hash='x', credits_balance=balance, credits_used_today=0,
+                    credits_used_this_month=0, is_premium=premium,
+                    subscription_status='active' if premium else None)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def fresh_service(app):
+    service = CreditSystemService()
+    service.ledger = CreditLedger(app)
+    return service
+
+
+def user_state(app, user_id):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        rows = CreditTransaction.query.filter_by(user_id=user_id).all()
+        return user.credits_balance, user.credits_used_today, rows
+
+
+def test_concurrent_deductions_never_overdraw():
+    app = create_app()
+    user_id = make_user(app, STARTING_BALANCE)
+    service = fresh_service(app)
+    start = threading.Barrier(16)
+
+    def spend(_):
+        with app.app_context():
+            try:
+                start.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                pass
+            return service.check_and_deduct_credits(user_id, 'chat_message_basic')[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(spend, range(CONCURRENT_REQUESTS)))
+    elapsed = time.perf_counter() - started
+    service.ledger.stop()
+
+    successes = sum(results)
+    balance, used_today, rows = user_state(app, user_id)
+    usage_rows = [row for row in rows if row.transaction_type == 'usage']
+
+    print(f"\n💳 {CONCURRENT_REQUESTS} concurrent deductions in {elapsed:.2f}s "
+          f"({CONCURRENT_REQUESTS / elapsed:.0f} checks/s), {successes} admitted, "
+          f"balance {STARTING_BALANCE} -> {balance}, {service.ledger.stats['flushes']} ledger flushes")
+
+    assert successes == STARTING_BALANCE // CHAT_COST
+    assert balance == STARTING_BALANCE - successes * CHAT_COST
+    assert balance >= 0
+    assert used_today == successes * CHAT_COST
+    assert len(usage_rows) == successes
+    assert sum(row.amount for row in usage_rows) == -successes * CHAT_COST
+
+
+def test_free_users_cannot_spend_on_elite_actions():
+    app = create_app()
+    user_id = make_user(app, STARTING_BALANCE)
+    service = fresh_service(app)
+    with app.app_context():
+        ok, message, cost = service.check_and_deduct_credits(user_id, 'health_assessment')
+    service.ledger.stop()
+    assert not ok and cost == 0 and 'Upgrade' in message
+    assert user_state(app, user_id)[0] == STARTING_BALANCE
+
+
+def test_rejected_ledger_row_does_not_block_others():
+    app = create_app()
+    user_id = make_user(app, STARTING_BALANCE)
+    ledger = CreditLedger(app, flush_interval=60, max_batch_attempts=2)
+    ledger.append(user_id, -2, 'usage')
+    ledger.append(user_id, None, 'usage')  # violates NOT NULL on amount
+    ledger.append(user_id, -3, 'usage')
+
+    assert ledger.flush() == 0  # the whole batch fails and is kept
+    assert ledger.pending() == 3
+    assert ledger.flush() == 2  # second failure: rows are written one by one
+    ledger.stop()
+
+    assert ledger.pending() == 0
+    assert ledger.stats['dead_lettered'] == 1
+    assert sorted(row.amount for row in user_state(app, user_id)[2]) == [-3, -2]
+
+
+if __name__ == '__main__':
+    test_concurrent_deductions_never_overdraw()
+    test_free_users_cannot_spend_on_elite_actions()
+    test_rejected_ledger_row_does_not_block_others()
+    print("✅ Credit ledger tests passed")
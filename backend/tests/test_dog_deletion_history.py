@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Chat history after a dog profile is deleted
+
+Deleting a dog writes a system note into the user's active conversation. The
+intelligent_chat history buffer may already hold that conversation's tail, so
+the next turn's context must include the note without waiting for the buffer
+TTL - otherwise the model keeps talking about the deleted dog.
+
+The route runs against an in-memory session standing in for Postgres; the
+history buffer is the real one:
+    python tests/test_dog_deletion_history.py
+    python -m pytest tests/test_dog_deletion_history.py -s
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the intelligent_chat service root to the path (its modules import from there)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'intelligent_chat'))
+
+# models.base builds its engine at import; nothing connects to it here
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/mrwhite_test")
+
+from api.routes.dogs import delete_dog_profile
+from models.conversation import Conversation
+from services.conversation_history import get_recent_history, history_buffer
+
+USER_ID = 41
+DOG_ID = 7
+CONVERSATION_ID = 9001
+
+
+class _Result:
+    def __init__(self, row=None, scalar=None):
+        self._row = row
+        self._scalar = scalar
+
+    def fetchone(self):
+        return self._row
+
+    def scalar_one_or_none(self):
+        return self._scalar
+
+
+class FakeSession:
+    """Answers the dog-deletion route's queries and records what it stores"""
+
+    def __init__(self, conversation):
+        self.conversation = conversation
+        self.added = []
+        self.committed = False
+        self.history_queries = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "SELECT name FROM ic_dog_profiles" in sql:
+            return _Result(row=("Rex",))
+        if "DELETE FROM ic_dog_profiles" in sql:
+            return _Result(row=(DOG_ID,))
+        if "ic_conversations" in sql:
+            return _Result(scalar=self.conversation)
+        if "ic_messages" in sql:
+            self.history_queries += 1
+            return []
+        raise AssertionError(f"Unexpected query: {sql}")
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+def test_history_includes_deletion_note_when_buffered():
+    buffer = history_buffer()
+    buffer.invalidate(CONVERSATION_ID)
+    seeded = buffer.seed(CONVERSATION_ID, [
+        {"role": "user", "content": "How often should Rex go to the groomer?"},
+        {"role": "assistant", "content": "Rex's coat does well with a trim every 6-8 weeks."},
+    ], buffer.begin_load())
+    assert seeded
+
+    db = FakeSession(Conversation(id=CONVERSATION_ID, user_id=USER_ID, is_archived=False))
+    response = asyncio.run(delete_dog_profile(dog_id=DOG_ID, db=db, current_user={"id": USER_ID}))
+    assert response.success and response.dog_name == "Rex"
+    assert db.committed and len(db.added) == 1
+
+    history = asyncio.run(get_recent_history(db, CONVERSATION_ID, 10))
+    assert db.history_queries == 0  # served from the buffer
+    assert len(history) == 3
+    assert history[-1]["role"] == "system"
+    assert "Rex's profile has been deleted" in history[-1]["content"]
+    assert history[-1]["content"] == db.added[0].content
+
+
+def test_history_unaffected_without_active_conversation():
+    buffer = history_buffer()
+    buffer.invalidate(CONVERSATION_ID)
+    buffer.seed(CONVERSATION_ID, [{"role": "user", "content": "Hi"}], buffer.begin_load())
+
+    db = FakeSession(conversation=None)
+    asyncio.run(delete_dog_profile(dog_id=DOG_ID, db=db, current_user={"id": USER_ID}))
+    assert db.committed and not db.added
+
+    history = asyncio.run(get_recent_history(db, CONVERSATION_ID, 10))
+    assert history == [{"role": "user", "content": "Hi"}]
+
+
+if __name__ == '__main__':
+    test_history_includes_deletion_note_when_buffered()
+    test_history_unaffected_without_active_conversation()
+    print("✅ Dog deletion history tests passed")